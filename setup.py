@@ -15,6 +15,9 @@ setup(
         'six==1.16.0',
         'tzdata==2024.1',
     ],
+    extras_require = {
+        'archive': ['pyarrow==16.1.0'],
+    },
     entry_points = {
         'console_scripts': [
             'kash = src.__main__:main',
@@ -5,16 +5,44 @@ from importlib.metadata import version as get_version
 from src.controller import (
     ImportParserController, 
     MakeImportReadyParserController, 
-    RunQueryParserController
+    RunQueryParserController,
+    TrendParserController,
+    ForecastParserController,
+    RecurringParserController,
+    SearchParserController,
+    RecategorizeParserController,
+    MerchantsParserController,
+    ReconcileParserController,
+    BalanceParserController,
+    AnomaliesParserController,
+    ArchiveParserController,
+    BudgetParserController,
+    DashboardExportParserController,
+    WatchParserController,
+    RunManifestParserController
 )
 from src.interface_text import get_help_menu
+from src.trend import parse_windows
+from src.categorize import RECATEGORIZE_BATCH_SIZE
+from src.anomalies import ANOMALY_THRESHOLD
+from src.archive import ARCHIVE_FORMATS
+from src.budgets import PERIODS
+from src.csv_input import CSV_ENGINES, DEFAULT_CSV_ENGINE
+from src.watch import POLL_INTERVAL
+from src.manifest import DEFAULT_JOBS
 from src.interface_funcs import (
     db_connection,
+    iso_date,
+    memory_size,
+    query_parameter,
     ConfigSectionIncompleteError,
     DuplicateAliasError,
     QueryNotDefinedError,
     BadQueryStructureError,
     UnknownAliasError,
+    QueryParameterError,
+    MissingDependencyError,
+    ArchiveFormatError,
 )
 
 version = get_version = ".".join(get_version("Kash").split("."))
@@ -66,6 +94,43 @@ def get_cli_args() -> argparse.Namespace:
         default='',
         help=textwrap.dedent(help_menu['import']['account_alias'])
     )
+    import_parser.add_argument(
+        '--category-rules',
+        metavar='<CATEGORY RULES FILEPATH>',
+        default=None,
+        help="Categorizes the imported transactions with the rules of this config file",
+    )
+    import_parser.add_argument(
+        '--skip-near-duplicates',
+        action='store_true',
+        default=False,
+        help="Leaves out new transactions that look like stored ones (same amount, close date and description)",
+    )
+    import_parser.add_argument(
+        '--csv-engine',
+        choices=CSV_ENGINES,
+        default=DEFAULT_CSV_ENGINE,
+        help="Engine parsing the CSV file (default: auto, i.e. pyarrow when installed, else pandas)",
+    )
+    import_parser.add_argument(
+        '--max-memory',
+        metavar='<SIZE>',
+        type=memory_size,
+        default=None,
+        help="Imports the file in chunks sized to stay under this much memory (e.g. 512M, 2G) and reports the peak memory of each stage",
+    )
+    import_parser.add_argument(
+        '--since',
+        type=iso_date,
+        default=None,
+        help="Only imports the transactions posted on or after this date (YYYY-MM-DD)",
+    )
+    import_parser.add_argument(
+        '--until',
+        type=iso_date,
+        default=None,
+        help="Only imports the transactions posted on or before this date (YYYY-MM-DD)",
+    )
     import_parser.add_argument(
         '--commit', '-c',
         action='store_true',
@@ -86,6 +151,32 @@ def get_cli_args() -> argparse.Namespace:
     make_import_ready_parser.add_argument(
         'raw_csv_file',
         metavar='<RAW CSV FILEPATH>',
+        help="CSV file, plain or compressed (.gz, .bz2, .xz, .zip), or \"-\" to read standard input and write to standard output",
+    )
+    make_import_ready_parser.add_argument(
+        '--csv-engine',
+        choices=CSV_ENGINES,
+        default=DEFAULT_CSV_ENGINE,
+        help="Engine parsing the CSV file (default: auto, i.e. pyarrow when installed, else pandas)",
+    )
+    make_import_ready_parser.add_argument(
+        '--max-memory',
+        metavar='<SIZE>',
+        type=memory_size,
+        default=None,
+        help="Converts the file in chunks sized to stay under this much memory (e.g. 512M, 2G) and reports the peak memory of each stage",
+    )
+    make_import_ready_parser.add_argument(
+        '--since',
+        type=iso_date,
+        default=None,
+        help="Only keeps the transactions posted on or after this date (YYYY-MM-DD)",
+    )
+    make_import_ready_parser.add_argument(
+        '--until',
+        type=iso_date,
+        default=None,
+        help="Only keeps the transactions posted on or before this date (YYYY-MM-DD)",
     )
 
     # Create Run Query Subparser
@@ -118,8 +209,647 @@ def get_cli_args() -> argparse.Namespace:
         default=False,
         action='store_true',
     )
+    run_query_parser.add_argument(
+        '--max-memory',
+        metavar='<SIZE>',
+        type=memory_size,
+        default=None,
+        help="Fetches the rows in chunks sized to stay under this much memory (e.g. 512M, 2G) and reports the peak memory of each stage",
+    )
+    run_query_parser.add_argument(
+        '--page-size',
+        metavar='<ROWS>',
+        type=int,
+        default=None,
+        help="Browses the results in pages of this many rows instead of displaying --rows rows",
+    )
+    run_query_parser.add_argument(
+        '--page-key',
+        metavar='<COLUMN>',
+        default='ID',
+        help="Column the pages are ordered by, ties broken by ID (default: ID); the query must return it and ID",
+    )
+    run_query_parser.add_argument(
+        '--descending',
+        default=False,
+        action='store_true',
+        help="Browses the pages in descending --page-key order",
+    )
+    run_query_parser.add_argument(
+        '--param',
+        dest='query_parameters',
+        metavar='<NAME=VALUE>',
+        type=query_parameter,
+        action='append',
+        default=None,
+        help="Binds a value to the :NAME parameter of the queries (may be repeated)",
+    )
+    run_query_parser.add_argument(
+        '--since',
+        type=iso_date,
+        default=None,
+        help="Binds this date (YYYY-MM-DD) to the :since parameter of the queries",
+    )
+    run_query_parser.add_argument(
+        '--until',
+        type=iso_date,
+        default=None,
+        help="Binds this date (YYYY-MM-DD) to the :until parameter of the queries",
+    )
 
-    return cli.parse_args()
+    # Create Trend Subparser
+    trend_parser = subparsers.add_parser(
+        'trend',
+        help="Finds spending trends over rolling windows"
+    )
+    trend_parser.set_defaults(func=start_trend_process)
+    trend_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    trend_parser.add_argument(
+        '--windows', '-w',
+        type=parse_windows,
+        default=[7, 30, 90],
+        help="Comma-separated rolling window sizes in days",
+    )
+    trend_parser.add_argument(
+        '--since',
+        type=iso_date,
+        default=None,
+        help="First date to report (YYYY-MM-DD). Defaults to one year before --until",
+    )
+    trend_parser.add_argument(
+        '--until',
+        type=iso_date,
+        default=None,
+        help="Last date to report (YYYY-MM-DD). Defaults to today",
+    )
+    trend_parser.add_argument(
+        '--account-alias', '-a',
+        dest='account_aliases',
+        action='append',
+        default=[],
+        help="Only analyze this account. Can be used multiple times",
+    )
+    trend_parser.add_argument(
+        '--top',
+        default=10,
+        type=int,
+        help="Number of descriptions to show in the growth table",
+    )
+    trend_parser.add_argument(
+        '--rows',
+        default=0,
+        type=int,
+        help="Number of daily rolling-window rows to display",
+    )
+    trend_parser.add_argument(
+        '--save-results',
+        default=False,
+        action='store_true',
+    )
+
+    # Create Forecast Subparser
+    forecast_parser = subparsers.add_parser(
+        'forecast',
+        help="Projects daily account balances"
+    )
+    forecast_parser.set_defaults(func=start_forecast_process)
+    forecast_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    forecast_parser.add_argument(
+        'forecast_config',
+        metavar='<FORECAST CONFIG>',
+        help="Config file with the scheduled items and budget limits",
+    )
+    forecast_parser.add_argument(
+        '--days', '-d',
+        default=90,
+        type=int,
+        help="Number of days to project",
+    )
+    forecast_parser.add_argument(
+        '--start',
+        type=iso_date,
+        default=None,
+        help="First forecast day (YYYY-MM-DD). Defaults to today",
+    )
+    forecast_parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help="Saves the projection to this CSV file",
+    )
+    forecast_parser.add_argument(
+        '--rows',
+        default=None,
+        type=int,
+        help="Number of days to display. Displays every day by default",
+    )
+    forecast_parser.add_argument(
+        '--simulate',
+        metavar='PATHS',
+        default=0,
+        type=int,
+        help="Runs a Monte Carlo simulation with this many paths instead of a single projection",
+    )
+    forecast_parser.add_argument(
+        '--seed',
+        default=None,
+        type=int,
+        help="Random seed of the simulation, for reproducible results",
+    )
+    forecast_parser.add_argument(
+        '--threshold',
+        default=0.0,
+        type=float,
+        help="Balance to report the probability of going below in a simulation",
+    )
+    forecast_parser.add_argument(
+        '--workers',
+        default=1,
+        type=int,
+        help="Number of processes running the simulation",
+    )
+    forecast_parser.add_argument(
+        '--time-limit',
+        default=None,
+        type=float,
+        help="Stops the simulation after this many seconds",
+    )
+    forecast_parser.add_argument(
+        '--include-recurring',
+        default=False,
+        action='store_true',
+        help="Adds the detected recurring transactions to the scheduled items",
+    )
+
+    # Create Recurring Subparser
+    recurring_parser = subparsers.add_parser(
+        'recurring',
+        help="Displays the detected recurring transactions"
+    )
+    recurring_parser.set_defaults(func=start_recurring_process)
+    recurring_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    recurring_parser.add_argument(
+        '--account-alias', '-a',
+        dest='account_aliases',
+        action='append',
+        default=[],
+        help="Only display this account. Can be used multiple times",
+    )
+    recurring_parser.add_argument(
+        '--rebuild',
+        default=False,
+        action='store_true',
+        help="Recomputes the recurring transactions from the full history",
+    )
+
+    # Create Search Subparser
+    search_parser = subparsers.add_parser(
+        'search',
+        help="Searches transaction descriptions and details"
+    )
+    search_parser.set_defaults(func=start_search_process)
+    search_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    search_parser.add_argument(
+        'terms',
+        metavar='<TERM>',
+        nargs='+',
+        help="Words that must all appear in the description or details",
+    )
+    search_parser.add_argument(
+        '--prefix',
+        default=False,
+        action='store_true',
+        help="Matches words starting with the terms",
+    )
+    search_parser.add_argument(
+        '--phrase',
+        default=False,
+        action='store_true',
+        help="Matches the terms as a single phrase",
+    )
+    search_parser.add_argument(
+        '--raw',
+        default=False,
+        action='store_true',
+        help="Passes the terms as an FTS5 query, e.g. 'coffee OR tea'",
+    )
+    search_parser.add_argument(
+        '--since',
+        type=iso_date,
+        default=None,
+        help="First posting date to search (YYYY-MM-DD)",
+    )
+    search_parser.add_argument(
+        '--until',
+        type=iso_date,
+        default=None,
+        help="Last posting date to search (YYYY-MM-DD)",
+    )
+    search_parser.add_argument(
+        '--account-alias', '-a',
+        dest='account_aliases',
+        action='append',
+        default=[],
+        help="Only search this account. Can be used multiple times",
+    )
+    search_parser.add_argument(
+        '--rows',
+        type=int,
+        default=50,
+        help="Maximum number of matches to display",
+    )
+
+    # Create Recategorize Subparser
+    recategorize_parser = subparsers.add_parser(
+        'recategorize',
+        help="Applies category rules to every transaction in the database"
+    )
+    recategorize_parser.set_defaults(func=start_recategorize_process)
+    recategorize_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    recategorize_parser.add_argument(
+        'category_rules',
+        metavar='<CATEGORY RULES FILEPATH>',
+    )
+    recategorize_parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=RECATEGORIZE_BATCH_SIZE,
+        help=f"Number of transactions processed per batch (default: {RECATEGORIZE_BATCH_SIZE})",
+    )
+
+    # Create Merchants Subparser
+    merchants_parser = subparsers.add_parser(
+        'merchants',
+        help="Displays the merchants with the most transactions"
+    )
+    merchants_parser.set_defaults(func=start_merchants_process)
+    merchants_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    merchants_parser.add_argument(
+        '--top',
+        type=int,
+        default=25,
+        help="Number of merchants to display",
+    )
+    merchants_parser.add_argument(
+        '--rebuild',
+        default=False,
+        action='store_true',
+        help="Renormalizes every description",
+    )
+
+    # Create Reconcile Subparser
+    reconcile_parser = subparsers.add_parser(
+        'reconcile',
+        help="Checks the balance chain of every account and displays the gaps"
+    )
+    reconcile_parser.set_defaults(func=start_reconcile_process)
+    reconcile_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    reconcile_parser.add_argument(
+        '--account-alias', '-a',
+        dest='account_aliases',
+        action='append',
+        default=[],
+        help="Only reconcile this account. Can be used multiple times",
+    )
+    reconcile_parser.add_argument(
+        '--rows',
+        type=int,
+        default=None,
+        help="Maximum number of gaps to display",
+    )
+    reconcile_parser.add_argument(
+        '--rebuild',
+        default=False,
+        action='store_true',
+        help="Checks every transaction again",
+    )
+
+    # Create Balance Subparser
+    balance_parser = subparsers.add_parser(
+        'balance',
+        help="Displays account balances as of a date, or over a date range"
+    )
+    balance_parser.set_defaults(func=start_balance_process)
+    balance_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    balance_parser.add_argument(
+        '--as-of',
+        type=iso_date,
+        default=None,
+        help="Displays the balances at the end of this date (YYYY-MM-DD). Defaults to the latest balances",
+    )
+    balance_parser.add_argument(
+        '--since',
+        type=iso_date,
+        default=None,
+        help="Displays the daily balances from this date (YYYY-MM-DD)",
+    )
+    balance_parser.add_argument(
+        '--until',
+        type=iso_date,
+        default=None,
+        help="Last date of the daily balances (YYYY-MM-DD). Defaults to today",
+    )
+    balance_parser.add_argument(
+        '--account-alias', '-a',
+        dest='account_aliases',
+        action='append',
+        default=[],
+        help="Only display this account. Can be used multiple times",
+    )
+    balance_parser.add_argument(
+        '--rows',
+        type=int,
+        default=None,
+        help="Maximum number of daily balances to display",
+    )
+    balance_parser.add_argument(
+        '--rebuild',
+        default=False,
+        action='store_true',
+        help="Recomputes the balance snapshots from the full history",
+    )
+
+    # Create Anomalies Subparser
+    anomalies_parser = subparsers.add_parser(
+        'anomalies',
+        help="Displays debits that are unusually large for their merchant or category"
+    )
+    anomalies_parser.set_defaults(func=start_anomalies_process)
+    anomalies_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    anomalies_parser.add_argument(
+        '--threshold',
+        type=float,
+        default=ANOMALY_THRESHOLD,
+        help=f"Minimum number of standard deviations above the mean. Defaults to {ANOMALY_THRESHOLD}",
+    )
+    anomalies_parser.add_argument(
+        '--since',
+        type=iso_date,
+        default=None,
+        help="Only displays debits posted from this date (YYYY-MM-DD)",
+    )
+    anomalies_parser.add_argument(
+        '--account-alias', '-a',
+        dest='account_aliases',
+        action='append',
+        default=[],
+        help="Only display this account. Can be used multiple times",
+    )
+    anomalies_parser.add_argument(
+        '--rows',
+        type=int,
+        default=50,
+        help="Maximum number of anomalies to display",
+    )
+
+    # Create Archive Subparser
+    archive_parser = subparsers.add_parser(
+        'archive',
+        help="Exports the bank activity table to one Parquet or Arrow file per month (requires pyarrow)"
+    )
+    archive_parser.set_defaults(func=start_archive_process)
+    archive_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    archive_parser.add_argument(
+        'directory',
+        metavar='<ARCHIVE DIRECTORY>',
+        type=str,
+    )
+    archive_parser.add_argument(
+        '--format',
+        dest='file_format',
+        choices=sorted(ARCHIVE_FORMATS),
+        default='parquet',
+        help="File format of the archive. Defaults to parquet",
+    )
+    archive_parser.add_argument(
+        '--rebuild',
+        default=False,
+        action='store_true',
+        help="Rewrites every month",
+    )
+
+    # Create Watch Subparser
+    watch_parser = subparsers.add_parser(
+        'watch',
+        help="Imports the bank downloads saved to a directory as soon as they are written"
+    )
+    watch_parser.set_defaults(func=start_watch_process)
+    watch_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    watch_parser.add_argument(
+        'directory',
+        metavar='<DOWNLOADS DIRECTORY>',
+        type=str,
+    )
+    watch_parser.add_argument(
+        'watch_config',
+        metavar='<WATCH CONFIG FILEPATH>',
+        type=str,
+        help="Config file mapping filename patterns to account aliases (and conversion configs)",
+    )
+    watch_parser.add_argument(
+        '--category-rules',
+        metavar='<CATEGORY RULES FILEPATH>',
+        default=None,
+        help="Categorizes the imported transactions with the rules of this config file",
+    )
+    watch_parser.add_argument(
+        '--skip-near-duplicates',
+        action='store_true',
+        default=False,
+        help="Leaves out new transactions that look like stored ones (same amount, close date and description)",
+    )
+    watch_parser.add_argument(
+        '--interval',
+        dest='poll_interval',
+        type=float,
+        default=POLL_INTERVAL,
+        help=f"Seconds between two scans of the directory. Defaults to {POLL_INTERVAL}",
+    )
+    watch_parser.add_argument(
+        '--once',
+        default=False,
+        action='store_true',
+        help="Imports the files waiting in the directory and exits",
+    )
+
+    # Create Run Manifest Subparser
+    run_manifest_parser = subparsers.add_parser(
+        'run-manifest',
+        help="Imports every file listed in a manifest in one run"
+    )
+    run_manifest_parser.set_defaults(func=start_run_manifest_process)
+    run_manifest_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    run_manifest_parser.add_argument(
+        'manifest',
+        metavar='<MANIFEST FILEPATH>',
+        type=str,
+        help="Config file listing the files (paths or glob patterns) of each account",
+    )
+    run_manifest_parser.add_argument(
+        '--category-rules',
+        metavar='<CATEGORY RULES FILEPATH>',
+        default=None,
+        help="Categorizes the imported transactions with the rules of this config file",
+    )
+    run_manifest_parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of files read in parallel. Defaults to {DEFAULT_JOBS}",
+    )
+    run_manifest_parser.add_argument(
+        '--commit', '-c',
+        action='store_true',
+        default=False,
+        help=textwrap.dedent(help_menu['import']['commit'])
+    )
+
+    # Create Budget Subparser
+    budget_parser = subparsers.add_parser(
+        'budget',
+        help="Displays how much of every budget is spent, and defines budgets"
+    )
+    budget_parser.set_defaults(func=start_budget_process)
+    budget_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    budget_edit_group = budget_parser.add_mutually_exclusive_group()
+    budget_edit_group.add_argument(
+        '--set',
+        dest='set_budget',
+        metavar='<NAME>',
+        default=None,
+        help="Creates or redefines the budget with this name (requires --limit)",
+    )
+    budget_edit_group.add_argument(
+        '--remove',
+        dest='remove_budget',
+        metavar='<NAME>',
+        default=None,
+        help="Deletes the budget with this name",
+    )
+    budget_parser.add_argument(
+        '--limit',
+        metavar='<AMOUNT>',
+        type=float,
+        default=None,
+        help="Spending limit per period of the budget set",
+    )
+    budget_parser.add_argument(
+        '--period',
+        choices=PERIODS,
+        default='monthly',
+        help="Period of the budget set. Defaults to monthly",
+    )
+    budget_parser.add_argument(
+        '--category',
+        default=None,
+        help="Only counts debits of this category against the budget set",
+    )
+    budget_parser.add_argument(
+        '--pattern',
+        default=None,
+        help="Only counts debits whose description matches this SQL LIKE pattern (e.g. %%GROCER%%) against the budget set",
+    )
+    budget_parser.add_argument(
+        '--account-alias', '-a',
+        default=None,
+        help="Only counts debits of this account against the budget set",
+    )
+    budget_parser.add_argument(
+        '--date',
+        type=iso_date,
+        default=None,
+        help="Displays the period containing this date (YYYY-MM-DD). Defaults to today",
+    )
+    budget_parser.add_argument(
+        '--periods',
+        type=int,
+        default=1,
+        help="Number of periods displayed per budget, up to the period of --date",
+    )
+
+    # Create Dashboard Export Subparser
+    dashboard_export_parser = subparsers.add_parser(
+        'dashboard-export',
+        help="Writes the transactions and their totals to the data sheets of the Dashboard workbook"
+    )
+    dashboard_export_parser.set_defaults(func=start_dashboard_export_process)
+    dashboard_export_parser.add_argument(
+        'sqlite_db',
+        metavar='<SQLITE DB>',
+        type=db_connection,
+    )
+    dashboard_export_parser.add_argument(
+        'workbook',
+        metavar='<WORKBOOK FILEPATH>',
+        type=str,
+        help="Dashboard workbook (.xlsx). Created with only the data sheets if it doesn't exist",
+    )
+    dashboard_export_parser.add_argument(
+        '--rebuild',
+        default=False,
+        action='store_true',
+        help="Rewrites every data sheet, even those whose data didn't change",
+    )
+
+    cli_args = cli.parse_args()
+    if getattr(cli_args, 'set_budget', None) and cli_args.limit is None:
+        budget_parser.error("--set requires --limit")
+    if getattr(cli_args, 'since', None) and getattr(cli_args, 'until', None) and cli_args.since > cli_args.until:
+        cli.error("--since is after --until")
+    if getattr(cli_args, 'page_size', None) is not None and cli_args.page_size < 1:
+        run_query_parser.error("--page-size must be at least 1")
+    return cli_args
 
 def start_import_process(cli_args: argparse.Namespace) -> None:
     """
@@ -151,6 +881,146 @@ def start_run_query_process(cli_args: argparse.Namespace) -> None:
     controller = RunQueryParserController(cli_args)
     controller.start_process()
 
+def start_trend_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the trend process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = TrendParserController(cli_args)
+    controller.start_process()
+
+def start_forecast_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the forecast process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = ForecastParserController(cli_args)
+    controller.start_process()
+
+def start_recurring_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the recurring process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = RecurringParserController(cli_args)
+    controller.start_process()
+
+def start_search_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the search process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = SearchParserController(cli_args)
+    controller.start_process()
+
+def start_recategorize_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the recategorize process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = RecategorizeParserController(cli_args)
+    controller.start_process()
+
+def start_merchants_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the merchants process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = MerchantsParserController(cli_args)
+    controller.start_process()
+
+def start_reconcile_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the reconcile process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = ReconcileParserController(cli_args)
+    controller.start_process()
+
+def start_balance_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the balance process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = BalanceParserController(cli_args)
+    controller.start_process()
+
+def start_anomalies_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the anomalies process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = AnomaliesParserController(cli_args)
+    controller.start_process()
+
+def start_archive_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the archive process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = ArchiveParserController(cli_args)
+    controller.start_process()
+
+def start_watch_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the watch process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = WatchParserController(cli_args)
+    controller.start_process()
+
+def start_run_manifest_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the run manifest process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = RunManifestParserController(cli_args)
+    controller.start_process()
+
+def start_budget_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the budget process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = BudgetParserController(cli_args)
+    controller.start_process()
+
+def start_dashboard_export_process(cli_args: argparse.Namespace) -> None:
+    """
+    Start the dashboard export process based on CLI arguments.
+
+    Args:
+        cli_args (argparse.Namespace): Parsed command-line arguments.
+    """
+    controller = DashboardExportParserController(cli_args)
+    controller.start_process()
+
 def main() -> None:
     """
     Main function to execute the command-line interface.
@@ -176,7 +1046,9 @@ def main() -> None:
     # Handle custom errors
     except (FileNotFoundError, ConfigSectionIncompleteError,
             DuplicateAliasError, QueryNotDefinedError,
-            BadQueryStructureError, UnknownAliasError) as e:
+            BadQueryStructureError, UnknownAliasError,
+            QueryParameterError, MissingDependencyError,
+            ArchiveFormatError) as e:
         print(f"Error: {e}")
 
     finally:
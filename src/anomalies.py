@@ -0,0 +1,202 @@
+import sqlite3
+
+import numpy
+import pandas
+
+from src.interface_funcs import get_metadata, set_metadata
+from src.reconcile import order_within_days, parse_balances
+
+# SQL queries
+SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT COALESCE(MAX(ID), 0) FROM bank_activity;"
+SELECT_NEW_ROWS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT ID, Transaction_ID, Account_Alias, Posting_Date, Merchant_ID, Category, Amount, Balance FROM bank_activity WHERE ID > ? AND ID <= ?;"""
+SELECT_STATS_FROM_SPENDING_STATS_TABLE = \
+    "SELECT Scope, Key, Count, Mean, M2 FROM spending_stats;"
+UPSERT_INTO_SPENDING_STATS_TABLE = \
+    """INSERT INTO spending_stats (Scope, Key, Count, Mean, M2) VALUES(?, ?, ?, ?, ?) ON CONFLICT(Scope, Key) DO UPDATE SET Count = excluded.Count, Mean = excluded.Mean, M2 = excluded.M2;"""
+UPDATE_ANOMALY_SCORE_IN_BANK_ACTIVITY_TABLE = \
+    "UPDATE bank_activity SET Anomaly_Score = ? WHERE ID = ?;"
+SELECT_ANOMALIES_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Posting_Date, Account_Alias, Description, Amount, Category, ROUND(Anomaly_Score, 1) FROM bank_activity WHERE Anomaly_Score >= ?{filters} ORDER BY Posting_Date DESC, ID ASC LIMIT ?;"""
+
+LAST_ID_METADATA_KEY = "spending_stats_last_id"
+
+# Scopes the statistics are kept for, and the bank activity column holding their key
+SCOPES = {"merchant": "Merchant ID", "category": "Category"}
+
+MIN_HISTORY = 5  # Debits a merchant or category needs before its new debits are scored
+ANOMALY_THRESHOLD = 3.0  # Scores from this many standard deviations above the mean are anomalies
+MIN_STD_RATIO = 0.05  # Floor of the standard deviation, relative to the mean, so fixed amounts don't score infinitely
+
+STATS_COLUMNS = ["Scope", "Key", "Count", "Mean", "M2"]
+
+
+def merge_stats(count_a, mean_a, m2_a, count_b, mean_b, m2_b) -> tuple:
+    """
+    Combine the count, mean and M2 of two sets of values (Chan et al.'s parallel form of Welford's
+    algorithm). Works element-wise on arrays; an empty set has a count of 0.
+
+    Args:
+        count_a, mean_a, m2_a: Count, mean and M2 of the first set.
+        count_b, mean_b, m2_b: Count, mean and M2 of the second set.
+
+    Returns:
+        tuple: Count, mean and M2 of the union.
+    """
+    count = count_a + count_b
+    safe_count = numpy.where(count > 0, count, 1)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * count_b / safe_count
+    m2 = m2_a + m2_b + delta ** 2 * count_a * count_b / safe_count
+    return count, mean, m2
+
+
+def score_debits(debits: pandas.DataFrame, stats: pandas.DataFrame) -> tuple:
+    """
+    Score debits against the statistics of their merchant and category, and update the statistics.
+
+    Each debit is scored against every debit before it: the stored statistics merged with the
+    earlier debits of the same batch, computed with grouped cumulative sums. The score is the
+    number of standard deviations above the mean, the highest over the scopes with enough history.
+
+    Args:
+        debits (pandas.DataFrame): Columns "ID", "Merchant ID" (Int64), "Category" and "Spent", oldest
+            first.
+        stats (pandas.DataFrame): Stored statistics (STATS_COLUMNS).
+
+    Returns:
+        tuple: Array of scores (NaN when not scored) and DataFrame of the updated statistics of the
+            keys present in the debits.
+    """
+    spent = debits["Spent"].to_numpy(dtype=float)
+    scores = numpy.full(len(spent), numpy.nan)
+    updated = []
+    for scope, column in SCOPES.items():
+        keys = debits[column].where(debits[column].notna(), None)
+        has_key = keys.notna().to_numpy()
+        if not has_key.any():
+            continue
+        keys = keys[has_key].astype(str).reset_index(drop=True)
+        values = pandas.Series(spent[has_key])
+
+        stored = stats[stats["Scope"] == scope].set_index("Key")
+        count_a = keys.map(stored["Count"]).fillna(0).to_numpy(dtype=float)
+        mean_a = keys.map(stored["Mean"]).fillna(0).to_numpy(dtype=float)
+        m2_a = keys.map(stored["M2"]).fillna(0).to_numpy(dtype=float)
+
+        # Statistics of the earlier debits of the batch with the same key
+        groups = values.groupby(keys)
+        count_b = groups.cumcount().to_numpy(dtype=float)
+        sum_b = (groups.cumsum() - values).to_numpy()
+        sum_sq_b = ((values ** 2).groupby(keys).cumsum() - values ** 2).to_numpy()
+        mean_b = sum_b / numpy.where(count_b > 0, count_b, 1)
+        m2_b = numpy.maximum(sum_sq_b - count_b * mean_b ** 2, 0)
+
+        count, mean, m2 = merge_stats(count_a, mean_a, m2_a, count_b, mean_b, m2_b)
+        std = numpy.sqrt(m2 / numpy.where(count > 1, count - 1, 1))
+        std = numpy.maximum(std, MIN_STD_RATIO * numpy.abs(mean))
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            scope_scores = numpy.where((count >= MIN_HISTORY) & (std > 0), (values.to_numpy() - mean) / std, numpy.nan)
+        scores[has_key] = numpy.fmax(scores[has_key], scope_scores)
+
+        # Statistics of every debit of the batch with the same key, merged into the stored ones
+        totals = values.groupby(keys).agg(["count", "mean", "var"])
+        totals["M2"] = totals["var"].fillna(0) * (totals["count"] - 1)
+        key_index = totals.index.to_series()
+        count, mean, m2 = merge_stats(
+            key_index.map(stored["Count"]).fillna(0).to_numpy(dtype=float),
+            key_index.map(stored["Mean"]).fillna(0).to_numpy(dtype=float),
+            key_index.map(stored["M2"]).fillna(0).to_numpy(dtype=float),
+            totals["count"].to_numpy(dtype=float), totals["mean"].to_numpy(), totals["M2"].to_numpy(),
+        )
+        updated.append(pandas.DataFrame({"Scope": scope, "Key": totals.index, "Count": count, "Mean": mean, "M2": m2}))
+
+    updated = pandas.concat(updated, ignore_index=True) if updated else pandas.DataFrame(columns=STATS_COLUMNS)
+    return scores, updated
+
+
+class AnomalyDetector:
+    """
+    Scores how unusual the amount of each debit is for its merchant and category.
+
+    The running statistics of every merchant and category live in the spending_stats table and are
+    only updated from the rows added since the last update (tracked in kash_metadata), so the
+    history is never read again. Scores are stored in the Anomaly_Score column.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initialize AnomalyDetector.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+        """
+        self._conn = conn
+
+    def update(self) -> pandas.Series:
+        """
+        Score the debits added since the last update and fold them into the statistics.
+
+        Merchant IDs must be up to date (MerchantIndex.update()) before calling this.
+
+        Returns:
+            pandas.Series: Anomaly score by transaction ID of the scored debits.
+        """
+        last_id = int(get_metadata(self._conn, LAST_ID_METADATA_KEY, 0))
+        max_id = self._conn.execute(SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+        if max_id <= last_id:
+            return pandas.Series(dtype=float)
+
+        records = self._conn.execute(SELECT_NEW_ROWS_FROM_BANK_ACTIVITY_TABLE, (last_id, max_id)).fetchall()
+        rows = pandas.DataFrame.from_records(
+            records, columns=["ID", "Transaction ID", "Account Alias", "Posting Date", "Merchant ID", "Category",
+                              "Amount", "Balance"])
+        # Credits are kept until the rows are ordered, since the balance chain of a day goes through them
+        rows = rows.assign(Balance=parse_balances(rows["Balance"]))
+        rows = pandas.concat([order_within_days(account_rows)
+                              for _, account_rows in rows.groupby("Account Alias", sort=False, dropna=False)])
+        rows = rows.sort_values("Posting Date", kind="stable")
+        debits = rows[rows["Amount"] < 0].reset_index(drop=True)
+        debits = debits.assign(Spent=-debits["Amount"], **{"Merchant ID": debits["Merchant ID"].astype("Int64")})
+        stats = pandas.DataFrame.from_records(self._conn.execute(SELECT_STATS_FROM_SPENDING_STATS_TABLE).fetchall(),
+                                              columns=STATS_COLUMNS)
+
+        scores, updated = score_debits(debits, stats)
+        scored = ~numpy.isnan(scores)
+        self._conn.executemany(UPDATE_ANOMALY_SCORE_IN_BANK_ACTIVITY_TABLE,
+                               zip(scores[scored].tolist(), debits["ID"][scored].tolist()))
+        self._conn.executemany(UPSERT_INTO_SPENDING_STATS_TABLE,
+                               updated[STATS_COLUMNS].itertuples(index=False, name=None))
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, max_id)
+        self._conn.commit()
+        return pandas.Series(scores[scored], index=debits["Transaction ID"][scored].to_numpy())
+
+    def get_anomalies(self, threshold: float = ANOMALY_THRESHOLD, since: str = None, account_aliases: list = None,
+                      limit: int = 50) -> pandas.DataFrame:
+        """
+        Get the debits scoring at least the threshold, latest first.
+
+        Args:
+            threshold (float, optional): Minimum score.
+            since (str, optional): First posting date (YYYY-MM-DD).
+            account_aliases (list, optional): Only include these accounts.
+            limit (int, optional): Maximum number of rows.
+
+        Returns:
+            pandas.DataFrame: Columns "Posting Date", "Account Alias", "Description", "Amount",
+                "Category" and "Score".
+        """
+        filters, args = "", [threshold]
+        if since:
+            filters += " AND Posting_Date >= ?"
+            args.append(since)
+        if account_aliases:
+            filters += f" AND Account_Alias IN ({', '.join('?' for _ in account_aliases)})"
+            args.extend(account_aliases)
+        query = SELECT_ANOMALIES_FROM_BANK_ACTIVITY_TABLE.format(filters=filters)
+        records = self._conn.execute(query, args + [limit]).fetchall()
+        columns = ["Posting Date", "Account Alias", "Description", "Amount", "Category", "Score"]
+        return pandas.DataFrame.from_records(records, columns=columns)
@@ -0,0 +1,265 @@
+import io
+import os
+import sqlite3
+import argparse
+import configparser
+import collections.abc
+
+import pandas
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from src.interface_funcs import db_connection, MissingDependencyError
+from src.user_settings import UserSettings, ImportParserUserSettings
+from src.controller import (
+    CHASE_COLUMN_NAMES,
+    CSVHandler,
+    DataBaseInterface,
+    read_csv_in_chase_format,
+    run_post_import_stages,
+)
+
+# Number of rows fetched from SQLite per batch by the query generators
+QUERY_BATCH_SIZE = 10000
+
+# Columns an "import-ready" DataFrame can leave out
+OPTIONAL_IMPORT_COLUMNS = ["Check or Slip #", "Extra 1"]
+
+DEPENDENCY_HELP = ("\nTroubleshooting help: Arrow batches are built with pyarrow, which is not installed."
+                   " Install it with \"pip install kash[archive]\" or \"pip install pyarrow\".")
+
+
+class KashDatabase:
+    """
+    Programmatic access to a Kash database.
+
+    One connection is opened (and the schema upgraded) when the object is created and is reused by
+    every call, so many imports and queries can run without starting the "kash" command each time.
+    Imports go through the same DataBaseInterface and CSVHandler as "kash import".
+
+    Usage:
+        with KashDatabase("bank.db") as kash_db:
+            kash_db.import_transactions("chase.csv", "Chase")
+            for row in kash_db.iter_query("SELECT Posting_Date, Amount FROM bank_activity;"):
+                ...
+
+    Attributes:
+        conn (sqlite3.Connection): SQLite database connection.
+    """
+    def __init__(self, sqlite_db, category_rules: str = None, commit: bool = True) -> None:
+        """
+        Initialize KashDatabase and connect to the database, creating it if it doesn't exist.
+
+        Args:
+            sqlite_db: Path to the SQLite database file (".db"), or a connection opened by db_connection.
+            category_rules (str, optional): Path to a category rules config applied to imports.
+            commit (bool, optional): Write imports to the database. When False, imports only report
+                what would be imported.
+        """
+        self.conn = sqlite_db if isinstance(sqlite_db, sqlite3.Connection) else db_connection(sqlite_db)
+        self._commit = commit
+        self._category_rules = None
+        if category_rules:
+            self._category_rules = self._get_import_settings(None, None, category_rules).category_rules
+
+    def __enter__(self) -> "KashDatabase":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self.conn.close()
+
+    def _get_import_settings(self, csv_file, account_alias: str, category_rules: str = None) -> ImportParserUserSettings:
+        """
+        Build the settings of an import, as "kash import" would from its command-line arguments.
+
+        Args:
+            csv_file: Path or file object of the "import-ready" CSV file.
+            account_alias (str): Account alias.
+            category_rules (str, optional): Path to a category rules config.
+
+        Returns:
+            ImportParserUserSettings: Import settings.
+        """
+        cli_args = argparse.Namespace(sqlite_db=self.conn, commit=self._commit, csv_file=csv_file,
+                                      account_alias=account_alias, category_rules=category_rules)
+        return ImportParserUserSettings(cli_args)
+
+    def import_transactions(self, transactions, account_alias: str, skip_near_duplicates: bool = False,
+                            conversion_config=None) -> pandas.DataFrame:
+        """
+        Import transactions of an account, like "kash import".
+
+        Settled transactions already in the database are skipped, the pending transactions of the
+        account are replaced, and the derived tables (merchants, anomalies, recurring transactions,
+        reconciliation and balances) are brought up to date.
+
+        Args:
+            transactions: Path or file object of an "import-ready" CSV file, a DataFrame with its
+                columns, or an iterable of rows (dicts keyed by those columns, or sequences in
+                their order). Posting dates are MM/DD/YYYY and pending transactions have a
+                balance of " ".
+            account_alias (str): Account alias.
+            skip_near_duplicates (bool, optional): Leave out the new transactions that look like
+                stored ones (see find_near_duplicates).
+            conversion_config (optional): Path (or ConfigParser) of a conversion config. transactions
+                is then the path or file object of a CSV file downloaded from another bank, converted
+                as by "kash make-import-ready".
+
+        Returns:
+            pandas.DataFrame: The new settled transactions, with a "Near Duplicate" column flagging
+                the likely duplicates (when not skipped) and an "Anomaly Score" column when committed.
+
+        Raises:
+            ValueError: If required columns are missing.
+            ConfigSectionIncompleteError: If the conversion config is incomplete.
+        """
+        if conversion_config is not None:
+            if not isinstance(conversion_config, configparser.ConfigParser):
+                conversion_config = UserSettings(argparse.Namespace()).get_config_object(conversion_config)
+            transactions = read_csv_in_chase_format(transactions, conversion_config)
+        user_settings = self._get_import_settings(self._to_csv_file(transactions), account_alias)
+        user_settings.category_rules = self._category_rules
+        db_interface = DataBaseInterface(user_settings)
+        csv_handler = CSVHandler(user_settings)
+        csv_handler.existing_transaction_ids = \
+            db_interface.get_existing_transaction_ids(csv_handler.get_csv_transaction_ids())
+
+        new_transactions_df = csv_handler.get_new_settled_transactions_df()
+        near_duplicates_df = db_interface.get_near_duplicates(new_transactions_df, account_alias)
+        near_duplicates = new_transactions_df["Transaction ID"].isin(near_duplicates_df["Transaction ID"])
+        if skip_near_duplicates:
+            new_transactions_df = new_transactions_df[~near_duplicates]
+        else:
+            new_transactions_df = new_transactions_df.assign(**{"Near Duplicate": near_duplicates})
+        db_interface.insert_df_into_bank_activity_table(new_transactions_df)
+        db_interface.insert_df_into_pending_transactions_table(csv_handler.get_new_pending_transactions_df(),
+                                                               account_alias)
+        if self._commit:
+            anomaly_scores = run_post_import_stages(self.conn, [account_alias])
+            new_transactions_df = new_transactions_df.assign(
+                **{"Anomaly Score": new_transactions_df["Transaction ID"].map(anomaly_scores)})
+        return new_transactions_df
+
+    @staticmethod
+    def _to_csv_file(transactions):
+        """
+        Turn DataFrames and iterables of rows into an in-memory "import-ready" CSV file.
+
+        Going through CSV text gives the columns the same types as a CSV file import, so the same
+        transaction gets the same transaction ID either way.
+
+        Args:
+            transactions: Path, file object, DataFrame or iterable of rows.
+
+        Returns:
+            Path or file object of the "import-ready" CSV file.
+
+        Raises:
+            ValueError: If required columns are missing.
+        """
+        if isinstance(transactions, (str, os.PathLike)) or hasattr(transactions, "read"):
+            return transactions
+        if not isinstance(transactions, pandas.DataFrame):
+            rows = list(transactions)
+            if rows and not isinstance(rows[0], collections.abc.Mapping):
+                rows = [dict(zip(CHASE_COLUMN_NAMES, row)) for row in rows]
+            transactions = pandas.DataFrame.from_records(rows, columns=CHASE_COLUMN_NAMES)
+
+        missing_columns = [column for column in CHASE_COLUMN_NAMES
+                           if column not in transactions.columns and column not in OPTIONAL_IMPORT_COLUMNS]
+        if missing_columns:
+            raise ValueError(f"Missing columns: {', '.join(missing_columns)}")
+        csv_file = io.StringIO()
+        transactions.reindex(columns=CHASE_COLUMN_NAMES).to_csv(csv_file, index=False)
+        csv_file.seek(0)
+        return csv_file
+
+    def iter_query(self, query: str, params=None, batch_size: int = QUERY_BATCH_SIZE):
+        """
+        Run a query and yield its rows, fetching them from SQLite one batch at a time.
+
+        Args:
+            query (str): SQL query.
+            params (optional): Query parameters (sequence for "?" placeholders, dict for ":name").
+            batch_size (int, optional): Number of rows fetched at a time.
+
+        Yields:
+            tuple: One row.
+        """
+        cursor = self.conn.execute(query, params or ())
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def iter_query_dfs(self, query: str, params=None, batch_size: int = QUERY_BATCH_SIZE):
+        """
+        Run a query and yield its rows as DataFrames of at most batch_size rows.
+
+        Args:
+            query (str): SQL query.
+            params (optional): Query parameters (sequence for "?" placeholders, dict for ":name").
+            batch_size (int, optional): Number of rows per DataFrame.
+
+        Yields:
+            pandas.DataFrame: One batch of rows, with the query's column names.
+        """
+        cursor = self.conn.execute(query, params or ())
+        columns = [description[0] for description in cursor.description or []]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield pandas.DataFrame.from_records(rows, columns=columns)
+
+    def iter_query_arrow(self, query: str, params=None, batch_size: int = QUERY_BATCH_SIZE):
+        """
+        Run a query and yield its rows as Arrow record batches of at most batch_size rows.
+
+        Each column must hold values of a single type (CAST in the query when needed).
+
+        Args:
+            query (str): SQL query.
+            params (optional): Query parameters (sequence for "?" placeholders, dict for ":name").
+            batch_size (int, optional): Number of rows per batch.
+
+        Yields:
+            pyarrow.RecordBatch: One batch of rows, with the query's column names.
+
+        Raises:
+            MissingDependencyError: If pyarrow is not installed.
+        """
+        if pyarrow is None:
+            raise MissingDependencyError(f"pyarrow is not installed.{DEPENDENCY_HELP}")
+        cursor = self.conn.execute(query, params or ())
+        columns = [description[0] for description in cursor.description or []]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield pyarrow.RecordBatch.from_arrays([pyarrow.array(values) for values in zip(*rows)], names=columns)
+
+    def query_df(self, query: str, params=None) -> pandas.DataFrame:
+        """
+        Run a query and return all of its rows.
+
+        Args:
+            query (str): SQL query.
+            params (optional): Query parameters (sequence for "?" placeholders, dict for ":name").
+
+        Returns:
+            pandas.DataFrame: The rows, with the query's column names.
+        """
+        cursor = self.conn.execute(query, params or ())
+        columns = [description[0] for description in cursor.description or []]
+        return pandas.DataFrame.from_records(cursor.fetchall(), columns=columns)
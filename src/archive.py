@@ -0,0 +1,238 @@
+import os
+import json
+import sqlite3
+
+import pandas
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from src.interface_funcs import MissingDependencyError, ArchiveFormatError
+
+# SQL queries
+SELECT_COLUMNS_FROM_BANK_ACTIVITY_TABLE = \
+    "PRAGMA table_info(bank_activity);"
+SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT COALESCE(MAX(ID), 0) FROM bank_activity;"
+SELECT_NEW_MONTHS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT DISTINCT SUBSTR(Posting_Date, 1, 7) FROM bank_activity WHERE ID > ? AND ID <= ? AND Posting_Date IS NOT NULL ORDER BY 1;"""
+# The unary "+" keeps SQLite from scanning the ID range instead of using the posting date index
+SELECT_MONTH_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT {columns} FROM bank_activity WHERE Posting_Date BETWEEN ? AND ? AND +ID <= ? ORDER BY ID;"""
+
+# Arrow type of the non-text columns. SQLite values are cast to them, since a column can hold values of several types.
+# Transaction IDs are 16-byte BLOBs (see src.fingerprint), which aren't valid UTF-8 text.
+ARCHIVE_COLUMN_TYPES = {"ID": "int64", "Transaction_ID": "binary", "Amount": "double", "Merchant_ID": "int64",
+                        "Anomaly_Score": "double"}
+SQLITE_TYPES = {"int64": "INTEGER", "double": "REAL", "string": "TEXT", "binary": "BLOB"}
+
+# File extension of each archive format
+ARCHIVE_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+MANIFEST_FILE_NAME = "manifest.json"
+
+DEPENDENCY_HELP = ("\nTroubleshooting help: Archives are written with pyarrow, which is not installed."
+                   " Install it with \"pip install kash[archive]\" or \"pip install pyarrow\".")
+
+
+class BankActivityArchive:
+    """
+    Columnar copy of the bank activity table, one Parquet or Arrow IPC file per posting month.
+
+    Exports only rewrite the months that received rows since the last export (tracked in the
+    archive's manifest), and the files are written to a temporary name first, so an interrupted
+    export leaves the previous files intact. Reads memory-map the files: Arrow IPC columns are
+    used in place without copying, Parquet columns are decoded from the mapped file.
+
+    Attributes:
+        directory (str): Directory holding the partitions and the manifest.
+    """
+    def __init__(self, directory: str) -> None:
+        """
+        Initialize BankActivityArchive.
+
+        Args:
+            directory (str): Directory holding the partitions and the manifest.
+
+        Raises:
+            MissingDependencyError: If pyarrow is not installed.
+        """
+        if pyarrow is None:
+            raise MissingDependencyError(f"pyarrow is not installed.{DEPENDENCY_HELP}")
+        self.directory = directory
+
+    def get_manifest(self) -> dict:
+        """
+        Read the archive's manifest.
+
+        Returns:
+            dict: "format", "last_id", "columns" (name to Arrow type name) and "partitions" (month to
+                number of rows), or an empty dict when nothing was exported yet.
+        """
+        path = os.path.join(self.directory, MANIFEST_FILE_NAME)
+        if not os.path.isfile(path):
+            return {}
+        with open(path) as manifest_file:
+            return json.load(manifest_file)
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """
+        Replace the archive's manifest.
+
+        Args:
+            manifest (dict): Manifest to write.
+        """
+        path = os.path.join(self.directory, MANIFEST_FILE_NAME)
+        with open(f"{path}.tmp", "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        os.replace(f"{path}.tmp", path)
+
+    def _partition_path(self, month: str, file_format: str) -> str:
+        """
+        Get the path of a month's file.
+
+        Args:
+            month (str): Posting month (YYYY-MM).
+            file_format (str): "parquet" or "arrow".
+
+        Returns:
+            str: Path of the file.
+        """
+        return os.path.join(self.directory, f"bank_activity_{month}{ARCHIVE_FORMATS[file_format]}")
+
+    def export(self, conn: sqlite3.Connection, file_format: str = "parquet", rebuild: bool = False) -> pandas.DataFrame:
+        """
+        Write the months that received rows since the last export.
+
+        Rows updated after they were exported (e.g. recategorized) are only exported again by a
+        rebuild.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+            file_format (str, optional): "parquet" or "arrow".
+            rebuild (bool, optional): Rewrite every month.
+
+        Returns:
+            pandas.DataFrame: Columns "Month", "Rows" and "File" of the written months.
+
+        Raises:
+            ArchiveFormatError: If the archive already holds another format and rebuild is False.
+        """
+        manifest = self.get_manifest()
+        if manifest and manifest["format"] != file_format and not rebuild:
+            raise ArchiveFormatError(f'The archive in {self.directory} is in {manifest["format"]} format. '
+                             f'Use --rebuild to rewrite it in {file_format} format.')
+        if rebuild:
+            for month in manifest.get("partitions", {}):
+                old_path = self._partition_path(month, manifest["format"])
+                if os.path.isfile(old_path):
+                    os.remove(old_path)
+            manifest = {}
+
+        os.makedirs(self.directory, exist_ok=True)
+        column_types = {column[1]: ARCHIVE_COLUMN_TYPES.get(column[1], "string")
+                        for column in conn.execute(SELECT_COLUMNS_FROM_BANK_ACTIVITY_TABLE).fetchall()}
+        schema = pyarrow.schema(list(column_types.items()))
+        query = SELECT_MONTH_FROM_BANK_ACTIVITY_TABLE.format(columns=", ".join(
+            f'CAST("{name}" AS {SQLITE_TYPES[column_type]})' for name, column_type in column_types.items()))
+        last_id = manifest.get("last_id", 0)
+        max_id = conn.execute(SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+        months = [record[0] for record in conn.execute(SELECT_NEW_MONTHS_FROM_BANK_ACTIVITY_TABLE, (last_id, max_id)).fetchall()]
+
+        partitions = manifest.get("partitions", {})
+        written = []
+        for month in months:
+            records = conn.execute(query, (f"{month}-01", f"{month}-31", max_id)).fetchall()
+            columns = list(zip(*records))
+            table = pyarrow.Table.from_arrays(
+                [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema)
+            path = self._partition_path(month, file_format)
+            self._write_table(table, path, file_format)
+            partitions[month] = table.num_rows
+            written.append((month, table.num_rows, os.path.basename(path)))
+
+        self._write_manifest({
+            "format": file_format,
+            "last_id": max_id,
+            "columns": {field.name: str(field.type) for field in schema},
+            "partitions": dict(sorted(partitions.items())),
+        })
+        return pandas.DataFrame.from_records(written, columns=["Month", "Rows", "File"])
+
+    @staticmethod
+    def _write_table(table, path: str, file_format: str) -> None:
+        """
+        Write a table to a file, replacing it only once the file is complete.
+
+        Args:
+            table (pyarrow.Table): Table to write.
+            path (str): Path of the file.
+            file_format (str): "parquet" or "arrow".
+        """
+        temporary_path = f"{path}.tmp"
+        if file_format == "parquet":
+            pyarrow.parquet.write_table(table, temporary_path)
+        else:
+            with pyarrow.OSFile(temporary_path, "wb") as sink:
+                with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        os.replace(temporary_path, path)
+
+    def read_table(self, columns: list = None, since: str = None, until: str = None):
+        """
+        Read the archived rows as an Arrow table, memory-mapping the files.
+
+        Only the months overlapping the date range are opened.
+
+        Args:
+            columns (list, optional): Columns to read, e.g. ["Posting_Date", "Amount"]. Defaults to all.
+            since (str, optional): First posting date (YYYY-MM-DD).
+            until (str, optional): Last posting date (YYYY-MM-DD).
+
+        Returns:
+            pyarrow.Table: The archived rows, oldest month first.
+        """
+        manifest = self.get_manifest()
+        names = columns or list(manifest.get("columns", {}))
+        # The date filter needs Posting_Date even when it isn't requested
+        read_names = names if not (since or until) or "Posting_Date" in names else names + ["Posting_Date"]
+        tables = []
+        for month in manifest.get("partitions", {}):
+            if (since and month < since[:7]) or (until and month > until[:7]):
+                continue
+            path = self._partition_path(month, manifest["format"])
+            if manifest["format"] == "parquet":
+                tables.append(pyarrow.parquet.read_table(path, columns=read_names, memory_map=True))
+            else:
+                tables.append(pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all().select(read_names))
+        if not tables:
+            column_types = manifest.get("columns", {})
+            return pyarrow.schema([(name, column_types.get(name, "string")) for name in names]).empty_table()
+
+        table = pyarrow.concat_tables(tables)
+        if since:
+            table = table.filter(pyarrow.compute.greater_equal(table["Posting_Date"], since))
+        if until:
+            table = table.filter(pyarrow.compute.less_equal(table["Posting_Date"], until))
+        return table.select(names)
+
+    def read_df(self, columns: list = None, since: str = None, until: str = None) -> pandas.DataFrame:
+        """
+        Read the archived rows as a DataFrame.
+
+        Numeric columns without missing values are handed to pandas without copying when the
+        archive is in Arrow format.
+
+        Args:
+            columns (list, optional): Columns to read. Defaults to all.
+            since (str, optional): First posting date (YYYY-MM-DD).
+            until (str, optional): Last posting date (YYYY-MM-DD).
+
+        Returns:
+            pandas.DataFrame: The archived rows.
+        """
+        return self.read_table(columns, since, until).to_pandas(split_blocks=True)
@@ -0,0 +1,241 @@
+import asyncio
+import sqlite3
+import contextlib
+import functools
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas
+
+from src.api import KashDatabase, QUERY_BATCH_SIZE
+
+# Number of read-only connections (and reader threads) serving queries concurrently
+DEFAULT_READERS = 4
+
+
+class AsyncKashDatabase:
+    """
+    asyncio interface to a Kash database, for services that can't block their event loop.
+
+    All writes (imports) run one at a time on a dedicated writer thread owning a KashDatabase.
+    Queries run on a pool of read-only connections served by reader threads; the database is put
+    in WAL mode so they read while an import writes. Cancelling a query interrupts its statement;
+    a cancelled import still finishes on the writer thread, so the database stays consistent.
+
+    Usage:
+        async with AsyncKashDatabase("bank.db") as kash_db:
+            await kash_db.import_transactions("chase.csv", "Chase")
+            async for row in kash_db.iter_query("SELECT Posting_Date, Amount FROM bank_activity;"):
+                ...
+
+    Attributes:
+        _sqlite_db (str): Path to the SQLite database file.
+        _category_rules (str): Path to a category rules config applied to imports.
+        _commit (bool): Write imports to the database.
+        _readers (int): Number of read-only connections.
+        _writer_executor (ThreadPoolExecutor): Single thread running the writes.
+        _reader_executor (ThreadPoolExecutor): Threads running the queries.
+        _kash_db (KashDatabase): Writer, only used on the writer thread.
+        _reader_conns (asyncio.Queue): Idle read-only connections.
+    """
+    def __init__(self, sqlite_db: str, category_rules: str = None, readers: int = DEFAULT_READERS,
+                 commit: bool = True) -> None:
+        """
+        Initialize AsyncKashDatabase. The connections are opened by open().
+
+        Args:
+            sqlite_db (str): Path to the SQLite database file (".db").
+            category_rules (str, optional): Path to a category rules config applied to imports.
+            readers (int, optional): Number of queries served concurrently.
+            commit (bool, optional): Write imports to the database.
+        """
+        self._sqlite_db = sqlite_db
+        self._category_rules = category_rules
+        self._commit = commit
+        self._readers = readers
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kash-writer")
+        self._reader_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="kash-reader")
+        self._kash_db = None
+        self._reader_conns = None
+
+    async def __aenter__(self) -> "AsyncKashDatabase":
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def _run(self, executor: ThreadPoolExecutor, func, *args):
+        """
+        Run a blocking function on an executor.
+
+        Args:
+            executor (ThreadPoolExecutor): Executor to run the function on.
+            func: Function to run.
+            *args: Arguments of the function.
+
+        Returns:
+            The function's return value.
+        """
+        return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(func, *args))
+
+    async def open(self) -> "AsyncKashDatabase":
+        """
+        Open the writer (creating and upgrading the database if needed) and the read-only connections.
+
+        Returns:
+            AsyncKashDatabase: self.
+        """
+        self._kash_db = await self._run(self._writer_executor, KashDatabase, self._sqlite_db,
+                                        self._category_rules, self._commit)
+        await self._run(self._writer_executor, self._kash_db.conn.execute, "PRAGMA journal_mode=WAL;")
+
+        uri = f"{Path(self._sqlite_db).absolute().as_uri()}?mode=ro"
+        self._reader_conns = asyncio.Queue()
+        for _ in range(self._readers):
+            # Each query holds its connection for its whole duration, whichever reader thread runs it
+            connect = functools.partial(sqlite3.connect, uri, uri=True, check_same_thread=False)
+            conn = await self._run(self._reader_executor, connect)
+            self._reader_conns.put_nowait(conn)
+        return self
+
+    async def close(self) -> None:
+        """
+        Close every connection and stop the threads. Queries still running are waited for.
+        """
+        if self._kash_db is not None:
+            await self._run(self._writer_executor, self._kash_db.close)
+            self._kash_db = None
+        for _ in range(self._readers if self._reader_conns is not None else 0):
+            conn = await self._reader_conns.get()
+            conn.close()
+        self._reader_conns = None
+        self._writer_executor.shutdown(wait=False)
+        self._reader_executor.shutdown(wait=False)
+
+    async def import_transactions(self, transactions, account_alias: str,
+                                  skip_near_duplicates: bool = False) -> pandas.DataFrame:
+        """
+        Import transactions of an account on the writer thread (see KashDatabase.import_transactions).
+
+        Args:
+            transactions: Path or file object of an "import-ready" CSV file, a DataFrame with its
+                columns, or an iterable of rows.
+            account_alias (str): Account alias.
+            skip_near_duplicates (bool, optional): Leave out the likely duplicates of stored transactions.
+
+        Returns:
+            pandas.DataFrame: The new settled transactions.
+        """
+        return await self._run(self._writer_executor, self._kash_db.import_transactions, transactions, account_alias,
+                               skip_near_duplicates)
+
+    @contextlib.asynccontextmanager
+    async def _reader_conn(self):
+        """
+        Check out an idle read-only connection, waiting for one when all are busy.
+
+        Yields:
+            sqlite3.Connection: Read-only connection.
+        """
+        conn = await self._reader_conns.get()
+        try:
+            yield conn
+        finally:
+            self._reader_conns.put_nowait(conn)
+
+    async def _run_reader(self, conn: sqlite3.Connection, func, *args):
+        """
+        Run a blocking call on a reader thread, interrupting the connection's statement when cancelled.
+
+        Args:
+            conn (sqlite3.Connection): Connection used by the call.
+            func: Function to run.
+            *args: Arguments of the function.
+
+        Returns:
+            The function's return value.
+        """
+        future = asyncio.ensure_future(self._run(self._reader_executor, func, *args))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            conn.interrupt()
+            # The connection goes back to the pool only once the interrupted statement has stopped
+            with contextlib.suppress(Exception):
+                await future
+            raise
+
+    async def query_df(self, query: str, params=None) -> pandas.DataFrame:
+        """
+        Run a query on a read-only connection and return all of its rows.
+
+        Args:
+            query (str): SQL query.
+            params (optional): Query parameters (sequence for "?" placeholders, dict for ":name").
+
+        Returns:
+            pandas.DataFrame: The rows, with the query's column names.
+        """
+        async with self._reader_conn() as conn:
+            read_sql_query = functools.partial(pandas.read_sql_query, query, conn, params=params)
+            return await self._run_reader(conn, read_sql_query)
+
+    async def iter_query(self, query: str, params=None, batch_size: int = QUERY_BATCH_SIZE):
+        """
+        Run a query on a read-only connection and yield its rows, fetching one batch at a time.
+
+        The connection is held until the iteration ends; wrap the iterator in
+        contextlib.aclosing() when leaving the loop early.
+
+        Args:
+            query (str): SQL query.
+            params (optional): Query parameters (sequence for "?" placeholders, dict for ":name").
+            batch_size (int, optional): Number of rows fetched at a time.
+
+        Yields:
+            tuple: One row.
+        """
+        async for rows in self._iter_batches(query, params, batch_size):
+            for row in rows:
+                yield row
+
+    async def iter_query_dfs(self, query: str, params=None, batch_size: int = QUERY_BATCH_SIZE):
+        """
+        Run a query on a read-only connection and yield its rows as DataFrames of at most batch_size rows.
+
+        Args:
+            query (str): SQL query.
+            params (optional): Query parameters (sequence for "?" placeholders, dict for ":name").
+            batch_size (int, optional): Number of rows per DataFrame.
+
+        Yields:
+            pandas.DataFrame: One batch of rows, with the query's column names.
+        """
+        columns = None
+        async for rows, cursor in self._iter_batches(query, params, batch_size, with_cursor=True):
+            columns = columns or [description[0] for description in cursor.description]
+            yield pandas.DataFrame.from_records(rows, columns=columns)
+
+    async def _iter_batches(self, query: str, params, batch_size: int, with_cursor: bool = False):
+        """
+        Run a query on a read-only connection and yield its rows one batch at a time.
+
+        Args:
+            query (str): SQL query.
+            params: Query parameters.
+            batch_size (int): Number of rows per batch.
+            with_cursor (bool, optional): Yield (rows, cursor) tuples.
+
+        Yields:
+            list: One batch of rows (with the cursor when with_cursor is True).
+        """
+        async with self._reader_conn() as conn:
+            cursor = await self._run_reader(conn, conn.execute, query, params or ())
+            try:
+                while True:
+                    rows = await self._run_reader(conn, cursor.fetchmany, batch_size)
+                    if not rows:
+                        return
+                    yield (rows, cursor) if with_cursor else rows
+            finally:
+                cursor.close()
@@ -0,0 +1,223 @@
+import sqlite3
+
+import numpy
+import pandas
+
+from src.interface_funcs import get_metadata, set_metadata
+from src.reconcile import parse_balances
+from src.reconcile import order_within_days
+
+# SQL queries
+SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT COALESCE(MAX(ID), 0) FROM bank_activity;"
+SELECT_NEW_DATES_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Account_Alias, MIN(Posting_Date) FROM bank_activity WHERE ID > ? AND ID <= ? GROUP BY Account_Alias;"""
+SELECT_ACCOUNT_ROWS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT ID, Posting_Date, Amount, Balance FROM bank_activity WHERE Account_Alias = ? AND Posting_Date >= ?;"""
+SELECT_ACCOUNT_ALIASES_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT DISTINCT Account_Alias FROM bank_activity;"""
+SELECT_BALANCE_AS_OF_FROM_BALANCE_SNAPSHOTS_TABLE = \
+    """SELECT Snapshot_Date, Balance FROM balance_snapshots WHERE Account_Alias = ? AND Snapshot_Date <= ? ORDER BY Snapshot_Date DESC LIMIT 1;"""
+SELECT_BALANCE_BEFORE_FROM_BALANCE_SNAPSHOTS_TABLE = \
+    """SELECT Balance FROM balance_snapshots WHERE Account_Alias = ? AND Snapshot_Date < ? ORDER BY Snapshot_Date DESC LIMIT 1;"""
+SELECT_BALANCE_RANGE_FROM_BALANCE_SNAPSHOTS_TABLE = \
+    """SELECT Snapshot_Date, Balance FROM balance_snapshots WHERE Account_Alias = ? AND Snapshot_Date > ? AND Snapshot_Date <= ?;"""
+DELETE_FROM_BALANCE_SNAPSHOTS_TABLE = \
+    "DELETE FROM balance_snapshots WHERE Account_Alias = ? AND Snapshot_Date >= ?;"
+INSERT_INTO_BALANCE_SNAPSHOTS_TABLE = \
+    """INSERT INTO balance_snapshots (Account_Alias, Snapshot_Date, Balance, Net_Amount, Transactions) VALUES(?, ?, ?, ?, ?);"""
+
+LAST_ID_METADATA_KEY = "balance_snapshots_last_id"
+
+# Latest possible date, used when no date is given
+END_OF_TIME = "9999-12-31"
+
+
+def daily_balances(rows: pandas.DataFrame, opening_balance: float = None) -> pandas.DataFrame:
+    """
+    Compute an account's end-of-day balances.
+
+    A row's balance is the latest known balance plus the amounts posted since, so rows (and days)
+    without a balance of their own still get one. Rows before the first known balance are based on
+    the opening balance, or on the first known balance when there is none.
+
+    Args:
+        rows (pandas.DataFrame): One account's rows, oldest first, with columns "Posting Date",
+            "Amount" and "Balance" (float, NaN when missing).
+        opening_balance (float, optional): Balance at the end of the day before the first row.
+
+    Returns:
+        pandas.DataFrame: Columns "Snapshot Date", "Balance", "Net Amount" and "Transactions", one
+            row per day. Empty when no balance is known.
+    """
+    columns = ["Snapshot Date", "Balance", "Net Amount", "Transactions"]
+    amounts = numpy.round(rows["Amount"].fillna(0).to_numpy(dtype=float) * 100).astype(numpy.int64)
+    running = pandas.Series(numpy.cumsum(amounts), index=rows.index)
+    offsets = (rows["Balance"] * 100).round() - running
+    if opening_balance is not None and not numpy.isnan(opening_balance):
+        offsets = offsets.ffill().fillna(round(opening_balance * 100))
+    else:
+        offsets = offsets.ffill().bfill()
+    if offsets.isna().all():
+        return pandas.DataFrame(columns=columns)
+
+    balances = pandas.DataFrame({
+        "Snapshot Date": rows["Posting Date"],
+        "Balance": (offsets + running) / 100,
+        "Amount": amounts / 100,
+    })
+    days = balances.groupby("Snapshot Date", sort=True)
+    return pandas.DataFrame({
+        "Snapshot Date": list(days.groups.keys()),
+        "Balance": days["Balance"].last().round(2).to_numpy(),
+        "Net Amount": days["Amount"].sum().round(2).to_numpy(),
+        "Transactions": days.size().to_numpy(),
+    }, columns=columns)
+
+
+class BalanceSnapshots:
+    """
+    Maintains and queries each account's end-of-day balances.
+
+    Updates read the rows added since the last update (tracked in kash_metadata) and recompute each
+    account's snapshots from the earliest date among them, starting from the snapshot before it.
+    Lookups are served by the (Account_Alias, Snapshot_Date) primary key.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initialize BalanceSnapshots.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+        """
+        self._conn = conn
+
+    def update(self) -> int:
+        """
+        Bring the snapshots up to date with the rows added since the last update.
+
+        Returns:
+            int: Number of snapshots written.
+        """
+        last_id = int(get_metadata(self._conn, LAST_ID_METADATA_KEY, 0))
+        max_id = self._conn.execute(SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+        if max_id <= last_id:
+            return 0
+        written = 0
+        for account_alias, since in self._conn.execute(SELECT_NEW_DATES_FROM_BANK_ACTIVITY_TABLE, (last_id, max_id)).fetchall():
+            written += self._snapshot_account(account_alias, since)
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, max_id)
+        self._conn.commit()
+        return written
+
+    def rebuild(self) -> int:
+        """
+        Recompute every snapshot.
+
+        Returns:
+            int: Number of snapshots written.
+        """
+        self._conn.execute("DELETE FROM balance_snapshots;")
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, 0)
+        return self.update()
+
+    def _snapshot_account(self, account_alias: str, since: str) -> int:
+        """
+        Recompute an account's snapshots from a date onward.
+
+        Args:
+            account_alias (str): Account alias.
+            since (str): First date to recompute (YYYY-MM-DD).
+
+        Returns:
+            int: Number of snapshots written.
+        """
+        record = self._conn.execute(SELECT_BALANCE_BEFORE_FROM_BALANCE_SNAPSHOTS_TABLE, (account_alias, since)).fetchone()
+        opening_balance = record[0] if record else None
+        records = self._conn.execute(SELECT_ACCOUNT_ROWS_FROM_BANK_ACTIVITY_TABLE, (account_alias, since)).fetchall()
+        rows = pandas.DataFrame.from_records(records, columns=["ID", "Posting Date", "Amount", "Balance"])
+        rows = order_within_days(rows.assign(Balance=parse_balances(rows["Balance"]))).reset_index(drop=True)
+
+        snapshots = daily_balances(rows, opening_balance)
+        self._conn.execute(DELETE_FROM_BALANCE_SNAPSHOTS_TABLE, (account_alias, since))
+        values = [(account_alias, snapshot_date, float(balance), float(net_amount), int(transactions))
+                  for snapshot_date, balance, net_amount, transactions in snapshots.itertuples(index=False, name=None)]
+        self._conn.executemany(INSERT_INTO_BALANCE_SNAPSHOTS_TABLE, values)
+        return len(values)
+
+    def get_account_aliases(self) -> list:
+        """
+        Get the account aliases of the bank activity table.
+
+        Returns:
+            list: Account aliases.
+        """
+        records = self._conn.execute(SELECT_ACCOUNT_ALIASES_FROM_BANK_ACTIVITY_TABLE).fetchall()
+        return [record[0] for record in records]
+
+    def balance_as_of(self, account_alias: str, as_of: str = None) -> tuple:
+        """
+        Get an account's balance at the end of a day.
+
+        Args:
+            account_alias (str): Account alias.
+            as_of (str, optional): Date (YYYY-MM-DD). Defaults to the latest snapshot.
+
+        Returns:
+            tuple: Date of the snapshot used and the balance, or None when no balance is known.
+        """
+        return self._conn.execute(SELECT_BALANCE_AS_OF_FROM_BALANCE_SNAPSHOTS_TABLE,
+                                  (account_alias, as_of or END_OF_TIME)).fetchone()
+
+    def get_balances(self, as_of: str = None, account_aliases: list = None) -> pandas.DataFrame:
+        """
+        Get the balance of several accounts at the end of a day.
+
+        Args:
+            as_of (str, optional): Date (YYYY-MM-DD). Defaults to each account's latest snapshot.
+            account_aliases (list, optional): Accounts to include. Defaults to every account.
+
+        Returns:
+            pandas.DataFrame: Columns "Account Alias", "Snapshot Date" and "Balance", for the
+                accounts with a known balance.
+        """
+        records = []
+        for account_alias in account_aliases or self.get_account_aliases():
+            record = self.balance_as_of(account_alias, as_of)
+            if record is not None:
+                records.append((account_alias,) + tuple(record))
+        return pandas.DataFrame.from_records(records, columns=["Account Alias", "Snapshot Date", "Balance"])
+
+    def get_balance_history(self, since: str, until: str, account_aliases: list = None) -> pandas.DataFrame:
+        """
+        Get every account's end-of-day balance for every day of a range.
+
+        Args:
+            since (str): First date (YYYY-MM-DD).
+            until (str): Last date (YYYY-MM-DD).
+            account_aliases (list, optional): Accounts to include. Defaults to every account.
+
+        Returns:
+            pandas.DataFrame: A "Date" column, one column per account and a "Total" column.
+        """
+        days = pandas.date_range(since, until, freq="D")
+        history = {}
+        for account_alias in account_aliases or self.get_account_aliases():
+            opening = self.balance_as_of(account_alias, since)
+            records = self._conn.execute(SELECT_BALANCE_RANGE_FROM_BALANCE_SNAPSHOTS_TABLE,
+                                         (account_alias, since, until)).fetchall()
+            if opening is not None:
+                records.insert(0, (since, opening[1]))
+            if not records:
+                continue
+            dates, balances = zip(*records)
+            series = pandas.Series(balances, index=pandas.to_datetime(dates, format="%Y-%m-%d"), dtype=float)
+            history[account_alias] = series.reindex(days).ffill()
+
+        df = pandas.DataFrame(history, index=days)
+        df["Total"] = df.sum(axis=1, min_count=1)
+        df.insert(0, "Date", days.strftime("%Y-%m-%d"))
+        return df.reset_index(drop=True).round(2)
@@ -0,0 +1,205 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pandas
+
+from src.interface_funcs import get_metadata, set_metadata
+
+# First day of the budget period of a bank activity row "a" for a budget "b"
+PERIOD_START_SQL = """CASE b.Period
+    WHEN 'weekly' THEN date(a.Posting_Date, '-6 days', 'weekday 1')
+    WHEN 'monthly' THEN date(a.Posting_Date, 'start of month')
+    WHEN 'quarterly' THEN date(a.Posting_Date, 'start of month', '-' || ((CAST(strftime('%m', a.Posting_Date) AS INTEGER) - 1) % 3) || ' months')
+    WHEN 'yearly' THEN date(a.Posting_Date, 'start of year')
+END"""
+
+# SQL queries
+SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT COALESCE(MAX(ID), 0) FROM bank_activity;"
+UPSERT_INTO_BUDGET_TOTALS_TABLE = \
+    f"""INSERT INTO budget_totals (Budget_ID, Period_Start, Spent, Transactions) SELECT b.ID, {PERIOD_START_SQL}, -SUM(a.Amount), COUNT(*) FROM bank_activity a JOIN budgets b ON a.Description LIKE b.Pattern AND (b.Category IS NULL OR a.Category = b.Category) AND (b.Account_Alias IS NULL OR a.Account_Alias = b.Account_Alias) WHERE a.ID > ? AND a.ID <= ? AND a.Amount < 0{{filters}} GROUP BY 1, 2 ON CONFLICT(Budget_ID, Period_Start) DO UPDATE SET Spent = Spent + excluded.Spent, Transactions = Transactions + excluded.Transactions;"""
+UPSERT_INTO_BUDGETS_TABLE = \
+    """INSERT INTO budgets (Name, Account_Alias, Category, Pattern, Period, Amount) VALUES(?, ?, ?, ?, ?, ?) ON CONFLICT(Name) DO UPDATE SET Account_Alias = excluded.Account_Alias, Category = excluded.Category, Pattern = excluded.Pattern, Period = excluded.Period, Amount = excluded.Amount;"""
+SELECT_ID_FROM_BUDGETS_TABLE = \
+    "SELECT ID FROM budgets WHERE Name = ?;"
+SELECT_BUDGETS_FROM_BUDGETS_TABLE = \
+    "SELECT ID, Name, Account_Alias, Category, Pattern, Period, Amount FROM budgets ORDER BY Name;"
+SELECT_TOTALS_FROM_BUDGET_TOTALS_TABLE = \
+    """SELECT Period_Start, Spent, Transactions FROM budget_totals WHERE Budget_ID = ? AND Period_Start >= ? AND Period_Start <= ?;"""
+DELETE_FROM_BUDGET_TOTALS_TABLE = \
+    "DELETE FROM budget_totals WHERE Budget_ID = ?;"
+DELETE_ALL_FROM_BUDGET_TOTALS_TABLE = \
+    "DELETE FROM budget_totals;"
+DELETE_FROM_BUDGETS_TABLE = \
+    "DELETE FROM budgets WHERE ID = ?;"
+
+LAST_ID_METADATA_KEY = "budget_totals_last_id"
+
+PERIODS = ["weekly", "monthly", "quarterly", "yearly"]
+PERIOD_MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12}  # Length of the month-based periods
+
+
+def period_start(day: date, period: str) -> date:
+    """
+    Get the first day of the budget period containing a day. Weeks start on Monday.
+
+    Args:
+        day (date): Any day of the period.
+        period (str): One of PERIODS.
+
+    Returns:
+        date: First day of the period.
+    """
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    months = PERIOD_MONTHS[period]
+    return day.replace(month=(day.month - 1) // months * months + 1, day=1)
+
+
+def previous_period_start(start: date, period: str) -> date:
+    """
+    Get the first day of the budget period before the one starting on `start`.
+
+    Args:
+        start (date): First day of a period.
+        period (str): One of PERIODS.
+
+    Returns:
+        date: First day of the previous period.
+    """
+    if period == "weekly":
+        return start - timedelta(days=7)
+    month_idx = start.year * 12 + start.month - 1 - PERIOD_MONTHS[period]
+    return date(month_idx // 12, month_idx % 12 + 1, 1)
+
+
+class BudgetTracker:
+    """
+    Keeps the running spending total of every budget for every period.
+
+    Budgets are stored in the budgets table: a spending limit per period for the debits matching an
+    optional account, category and description pattern (SQL LIKE syntax). Their totals live in the
+    budget_totals table and are only updated from the rows added since the last update (tracked in
+    kash_metadata), with a single grouped upsert, so reports never aggregate the bank activity table.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initialize BudgetTracker.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+        """
+        self._conn = conn
+
+    def update(self) -> None:
+        """
+        Add the debits imported since the last update to the totals of the budgets they match.
+        """
+        last_id = int(get_metadata(self._conn, LAST_ID_METADATA_KEY, 0))
+        max_id = self._conn.execute(SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+        if max_id <= last_id:
+            return
+        self._conn.execute(UPSERT_INTO_BUDGET_TOTALS_TABLE.format(filters=""), (last_id, max_id))
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, max_id)
+        self._conn.commit()
+
+    def rebuild(self) -> None:
+        """
+        Recompute the totals of every budget from the full history (e.g. after recategorizing).
+        """
+        self._conn.execute(DELETE_ALL_FROM_BUDGET_TOTALS_TABLE)
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, 0)
+        self.update()
+
+    def set_budget(self, name: str, amount: float, period: str = "monthly", category: str = None,
+                   pattern: str = None, account_alias: str = None) -> None:
+        """
+        Create a budget, or redefine an existing one, and compute its totals from the history.
+
+        Args:
+            name (str): Budget name.
+            amount (float): Spending limit per period.
+            period (str, optional): One of PERIODS.
+            category (str, optional): Only count debits of this category.
+            pattern (str, optional): Only count debits whose description matches this SQL LIKE pattern.
+            account_alias (str, optional): Only count debits of this account.
+
+        Raises:
+            ValueError: If the period is not one of PERIODS.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unknown budget period {period!r}, expected one of: {', '.join(PERIODS)}")
+        self._conn.execute(UPSERT_INTO_BUDGETS_TABLE,
+                           (name, account_alias, category, pattern or "%", period, abs(amount)))
+        budget_id = self._conn.execute(SELECT_ID_FROM_BUDGETS_TABLE, (name,)).fetchone()[0]
+        self._conn.execute(DELETE_FROM_BUDGET_TOTALS_TABLE, (budget_id,))
+        # The rows up to the last update are added for this budget only; the update adds the later
+        # rows for every budget
+        last_id = int(get_metadata(self._conn, LAST_ID_METADATA_KEY, 0))
+        self._conn.execute(UPSERT_INTO_BUDGET_TOTALS_TABLE.format(filters=" AND b.ID = ?"), (0, last_id, budget_id))
+        self._conn.commit()
+        self.update()
+
+    def remove_budget(self, name: str) -> bool:
+        """
+        Delete a budget and its totals.
+
+        Args:
+            name (str): Budget name.
+
+        Returns:
+            bool: False if there is no budget with this name.
+        """
+        row = self._conn.execute(SELECT_ID_FROM_BUDGETS_TABLE, (name,)).fetchone()
+        if row is None:
+            return False
+        self._conn.execute(DELETE_FROM_BUDGET_TOTALS_TABLE, row)
+        self._conn.execute(DELETE_FROM_BUDGETS_TABLE, row)
+        self._conn.commit()
+        return True
+
+    def get_budgets(self) -> pandas.DataFrame:
+        """
+        Get the budget definitions, by name.
+
+        Returns:
+            pandas.DataFrame: Columns "ID", "Name", "Account Alias", "Category", "Pattern", "Period"
+                and "Amount".
+        """
+        columns = ["ID", "Name", "Account Alias", "Category", "Pattern", "Period", "Amount"]
+        return pandas.DataFrame.from_records(self._conn.execute(SELECT_BUDGETS_FROM_BUDGETS_TABLE).fetchall(),
+                                             columns=columns)
+
+    def get_utilization(self, as_of: date = None, periods: int = 1) -> pandas.DataFrame:
+        """
+        Get how much of every budget was spent in the period containing a date and the periods before.
+
+        Reads the stored totals only; call update() first to include the latest imports.
+
+        Args:
+            as_of (date, optional): Day of the latest period. Defaults to today.
+            periods (int, optional): Number of periods per budget, latest first.
+
+        Returns:
+            pandas.DataFrame: Columns "Budget", "Period Start", "Limit", "Spent", "Remaining",
+                "Used (%)" and "Transactions".
+        """
+        as_of = as_of or date.today()
+        records = []
+        for budget in self.get_budgets().itertuples(index=False):
+            starts = [period_start(as_of, budget.Period)]
+            for _ in range(periods - 1):
+                starts.append(previous_period_start(starts[-1], budget.Period))
+            args = (budget.ID, str(starts[-1]), str(starts[0]))
+            totals = {start: (spent, transactions) for start, spent, transactions
+                      in self._conn.execute(SELECT_TOTALS_FROM_BUDGET_TOTALS_TABLE, args)}
+            for start in starts:
+                spent, transactions = totals.get(str(start), (0.0, 0))
+                records.append((budget.Name, str(start), budget.Amount, round(spent, 2),
+                                round(budget.Amount - spent, 2),
+                                round(100 * spent / budget.Amount, 1) if budget.Amount else None, transactions))
+        columns = ["Budget", "Period Start", "Limit", "Spent", "Remaining", "Used (%)", "Transactions"]
+        return pandas.DataFrame.from_records(records, columns=columns)
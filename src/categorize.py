@@ -0,0 +1,188 @@
+import re
+import sqlite3
+import hashlib
+import configparser
+
+import numpy
+import pandas
+
+from src.interface_funcs import ConfigSectionIncompleteError
+from src.interface_funcs import get_metadata
+from src.interface_funcs import set_metadata
+
+# SQL queries
+SELECT_DESCRIPTIONS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT ID, Description, Category FROM bank_activity WHERE ID > ? ORDER BY ID LIMIT ?;"""
+UPDATE_CATEGORY_IN_BANK_ACTIVITY_TABLE = \
+    """UPDATE bank_activity SET Category = ? WHERE ID = ?;"""
+SELECT_CATEGORY_TOTALS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Category, COUNT(*), ROUND(SUM(Amount), 2) FROM bank_activity GROUP BY Category ORDER BY COUNT(*) DESC;"""
+
+RULES_FINGERPRINT_METADATA_KEY = "category_rules_fingerprint"
+RECATEGORIZE_BATCH_SIZE = 50000
+
+CONFIG_HELP = ("\nTroubleshooting help: Ensure every section of the category rules file is a category name"
+               " defining keywords and/or patterns (one per line), and that every pattern is a valid regular"
+               " expression.")
+
+
+class CategoryRules:
+    """
+    Assigns categories to transaction descriptions.
+
+    Every rule is a category and a list of regular expressions. The rules are compiled into a single
+    case-insensitive regular expression with one named group per category, so a description is
+    scanned once whatever the number of rules. When several rules match, the first one wins.
+
+    Attributes:
+        rules (list): (category, patterns) tuples, in priority order.
+        fingerprint (str): Hash of the rules, used to tell when they change.
+    """
+    def __init__(self, rules: list) -> None:
+        """
+        Initialize CategoryRules and compile the combined matcher.
+
+        Args:
+            rules (list): (category, patterns) tuples, in priority order.
+
+        Raises:
+            re.error: If a pattern is not a valid regular expression.
+        """
+        self.rules = rules
+        self._categories = numpy.array([category for category, _ in rules], dtype=object)
+        self._groups = [f"category_{rule_idx}" for rule_idx in range(len(rules))]
+        # The lazy ".*?" makes the engine try every position for a rule before moving on to the next
+        # one, so rule order (not match position) decides which category wins.
+        alternatives = [f".*?(?P<{group}>{'|'.join(patterns)})" for group, (_, patterns) in zip(self._groups, rules)]
+        self._matcher = re.compile(f"^(?:{'|'.join(alternatives)})", re.IGNORECASE) if rules else None
+        self.fingerprint = hashlib.sha256(repr(rules).encode()).hexdigest()
+
+    def categorize(self, descriptions: pandas.Series) -> pandas.Series:
+        """
+        Find the category of every description.
+
+        Each distinct description is matched once, so repeated merchants cost nothing extra.
+
+        Args:
+            descriptions (pandas.Series): Transaction descriptions.
+
+        Returns:
+            pandas.Series: Category of each description (None when no rule matches), same index.
+        """
+        result = pandas.Series(None, index=descriptions.index, dtype=object)
+        if self._matcher is None or descriptions.empty:
+            return result
+
+        codes, uniques = pandas.factorize(descriptions.fillna("").astype(str))
+        matches = pandas.Series(uniques, dtype=object).str.extract(self._matcher)[self._groups].notna().to_numpy()
+        unique_categories = numpy.where(matches.any(axis=1), self._categories[matches.argmax(axis=1)], None)
+        result[:] = unique_categories[codes]
+        return result
+
+
+def load_category_rules(config: configparser.ConfigParser) -> CategoryRules:
+    """
+    Read the category rules from a category rules config.
+
+    Every section is a category, in priority order. `keywords` lists text to find anywhere in the
+    description, `patterns` lists regular expressions. Both are one entry per line and are matched
+    case-insensitively.
+
+    Args:
+        config (configparser.ConfigParser): Category rules config.
+
+    Returns:
+        CategoryRules: The compiled rules.
+
+    Raises:
+        ConfigSectionIncompleteError: If a section has no keywords or patterns, or a bad pattern.
+    """
+    rules = []
+    for section in config.sections():
+        keywords = config[section].get("keywords", "", raw=True).splitlines()
+        patterns = config[section].get("patterns", "", raw=True).splitlines()
+        expressions = [re.escape(keyword.strip()) for keyword in keywords if keyword.strip()]
+        expressions += [f"(?:{pattern.strip()})" for pattern in patterns if pattern.strip()]
+        if not expressions:
+            raise ConfigSectionIncompleteError(f"[{section}]: No keywords or patterns.{CONFIG_HELP}")
+        rules.append((section, expressions))
+    try:
+        return CategoryRules(rules)
+    except re.error as e:
+        raise ConfigSectionIncompleteError(f"Bad pattern: {e}.{CONFIG_HELP}")
+
+
+class Recategorizer:
+    """
+    Applies category rules to the transactions already in the bank activity table.
+
+    Rows are read and updated in ID order, one batch at a time, and only the rows whose category
+    changes are written. Each batch is committed, so memory use stays flat on large histories.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+        _rules (CategoryRules): Category rules to apply.
+    """
+    def __init__(self, conn: sqlite3.Connection, rules: CategoryRules) -> None:
+        """
+        Initialize Recategorizer.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+            rules (CategoryRules): Category rules to apply.
+        """
+        self._conn = conn
+        self._rules = rules
+
+    def is_current(self) -> bool:
+        """
+        Whether the history was last categorized with these rules.
+
+        Returns:
+            bool: True if the stored rules fingerprint matches the rules.
+        """
+        return get_metadata(self._conn, RULES_FINGERPRINT_METADATA_KEY) == self._rules.fingerprint
+
+    def mark_current(self) -> None:
+        """
+        Record that the history is categorized with these rules. The caller commits.
+        """
+        set_metadata(self._conn, RULES_FINGERPRINT_METADATA_KEY, self._rules.fingerprint)
+
+    def recategorize(self, batch_size: int = RECATEGORIZE_BATCH_SIZE) -> int:
+        """
+        Recompute the category of every transaction.
+
+        Args:
+            batch_size (int, optional): Number of rows read per batch.
+
+        Returns:
+            int: Number of transactions whose category changed.
+        """
+        changed = 0
+        last_id = 0
+        while True:
+            records = self._conn.execute(SELECT_DESCRIPTIONS_FROM_BANK_ACTIVITY_TABLE, (last_id, batch_size)).fetchall()
+            if not records:
+                break
+            df = pandas.DataFrame.from_records(records, columns=["ID", "Description", "Category"])
+            df["New Category"] = self._rules.categorize(df["Description"])
+            updates = df[df["Category"].fillna("") != df["New Category"].fillna("")]
+            self._conn.executemany(UPDATE_CATEGORY_IN_BANK_ACTIVITY_TABLE,
+                                   zip(updates["New Category"], updates["ID"].tolist()))
+            self._conn.commit()
+            changed += len(updates.index)
+            last_id = records[-1][0]
+        self.mark_current()
+        self._conn.commit()
+        return changed
+
+    def get_category_totals(self) -> pandas.DataFrame:
+        """
+        Count and sum the transactions of every category.
+
+        Returns:
+            pandas.DataFrame: Columns "Category", "Transactions" and "Total", largest category first.
+        """
+        records = self._conn.execute(SELECT_CATEGORY_TOTALS_FROM_BANK_ACTIVITY_TABLE).fetchall()
+        return pandas.DataFrame.from_records(records, columns=["Category", "Transactions", "Total"])
@@ -1,7 +1,11 @@
 import os
-import hashlib
+import sys
+import sqlite3
+import zipfile
+import contextlib
 import argparse
-from datetime import datetime
+import configparser
+from datetime import datetime, timedelta
 
 import pandas
 
@@ -9,22 +13,82 @@ from src.interface_funcs import (
     DuplicateAliasError, 
     BadQueryStructureError, 
     UnknownAliasError, 
-    ConfigSectionIncompleteError
+    ConfigSectionIncompleteError,
+    QueryParameterError,
+    get_query_parameter_names
 )
 from .user_settings import (
     UserSettings, 
     ImportParserUserSettings, 
     MakeImportReadyParserUserSettings, 
-    RunQueryParserUserSettings
+    RunQueryParserUserSettings,
+    TrendParserUserSettings,
+    ForecastParserUserSettings,
+    RecurringParserUserSettings,
+    SearchParserUserSettings,
+    RecategorizeParserUserSettings,
+    MerchantsParserUserSettings,
+    ReconcileParserUserSettings,
+    BalanceParserUserSettings,
+    AnomaliesParserUserSettings,
+    ArchiveParserUserSettings,
+    BudgetParserUserSettings,
+    DashboardExportParserUserSettings,
+    WatchParserUserSettings,
+    RunManifestParserUserSettings
 )
+from .trend import TrendEngine
+from .forecast import (
+    ForecastEngine,
+    load_scheduled_items,
+    load_budgets,
+    load_balance_overrides,
+    recurring_items
+)
+from .recurring import RecurringDetector
+from .search import TransactionSearch
+from .categorize import Recategorizer
+from .merchants import MerchantIndex
+from .reconcile import BalanceReconciler
+from .balances import BalanceSnapshots
+from .dedup import TransactionIdIndex, find_near_duplicates, transaction_ids_in, NEAR_DUPLICATE_DAYS, NEAR_DUPLICATE_COLUMNS
+from .fingerprint import transaction_fingerprint, normalize_date
+from .anomalies import AnomalyDetector, ANOMALY_THRESHOLD
+from .archive import BankActivityArchive
+from .budgets import BudgetTracker
+from .dashboard import DashboardWorkbook
+from .csv_input import read_csv_input, strip_compression_suffix, CSVChunkReader, STDIN_PATH, DEFAULT_CSV_ENGINE
+from .memory_budget import MemoryBudget
+from .pager import KeysetPager, parse_key_value
+from .watch import FolderWatcher, load_watch_routes
 
 # SQL queries
-SELECT_TRANSACTION_IDS_FROM_BANK_ACTIVITY_TABLE = \
-    "SELECT transaction_id FROM bank_activity;"
+SELECT_ANY_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT EXISTS (SELECT 1 FROM bank_activity);"
+SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT COALESCE(MAX(ID), 0) FROM bank_activity;"
 INSERT_INTO_BANK_ACTIVITY_TABLE = \
-    """INSERT INTO bank_activity (Account_Alias, Transaction_ID, Details, Posting_Date, Description, Amount, Type, Balance, Check_or_Slip_num, Reconciled) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"""
+    """INSERT INTO bank_activity (Account_Alias, Transaction_ID, Details, Posting_Date, Description, Amount, Type, Balance, Check_or_Slip_num, Reconciled, Category) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"""
 INSERT_INTO_PENDING_TRANSACTIONS_TABLE = \
     """INSERT INTO pending_transactions (Account_Alias, Transaction_ID, Details, Posting_Date, Description, Amount, Type, Balance, Check_or_Slip_num, Reconciled) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"""
+SELECT_TRANSACTION_IDS_FROM_PENDING_TRANSACTIONS_TABLE = \
+    "SELECT Transaction_ID FROM pending_transactions WHERE Account_Alias = ?;"
+SELECT_DATE_RANGE_TRANSACTION_IDS_FROM_PENDING_TRANSACTIONS_TABLE = \
+    "SELECT Transaction_ID FROM pending_transactions WHERE Account_Alias = ? AND Posting_Date BETWEEN ? AND ?;"
+SELECT_ACCOUNT_DATE_RANGE_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Transaction_ID AS "Transaction ID", Account_Alias AS "Account Alias", Posting_Date AS "Posting Date", Amount, Description FROM bank_activity WHERE Account_Alias = ? AND Posting_Date BETWEEN ? AND ?;"""
+SELECT_ACCOUNT_DATE_RANGE_UP_TO_ID_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Transaction_ID AS "Transaction ID", Account_Alias AS "Account Alias", Posting_Date AS "Posting Date", Amount, Description FROM bank_activity WHERE Account_Alias = ? AND Posting_Date BETWEEN ? AND ? AND ID <= ?;"""
+DELETE_FROM_PENDING_TRANSACTIONS_TABLE = \
+    "DELETE FROM pending_transactions WHERE Account_Alias = ? AND Transaction_ID = ?;"
+DELETE_SETTLED_FROM_PENDING_TRANSACTIONS_TABLE = \
+    """DELETE FROM pending_transactions WHERE EXISTS (SELECT 1 FROM bank_activity b WHERE b.Account_Alias = pending_transactions.Account_Alias AND b.Posting_Date >= pending_transactions.Posting_Date AND b.Posting_Date <= DATE(pending_transactions.Posting_Date, ?) AND b.Amount = pending_transactions.Amount AND b.Description = pending_transactions.Description) AND Account_Alias = ?;"""
+
+# Days after its pending date within which a transaction is expected to settle
+PENDING_SETTLEMENT_DAYS = 7
+
+# Commands of the run-query pager
+PAGER_PROMPT = "[n]ext (Enter), [p]revious, [f]irst, [j]ump <KEY>, [q]uit: "
 
 # Chase column names to config keys map
 CHASE_COLUMN_CONFIG_NAME_MAP = {
@@ -82,6 +146,8 @@ def print_bank_activity_dataframe(df: pandas.DataFrame) -> None:
     """
     Print formatted bank activity DataFrame.
 
+    When the DataFrame has an "Anomaly Score" column, unusually large debits are marked with "!".
+
     Args:
         df (pandas.DataFrame): DataFrame containing bank activity data.
     """
@@ -106,11 +172,240 @@ def print_bank_activity_dataframe(df: pandas.DataFrame) -> None:
             description = "{: <38}".format(description[:40])
             account_alias = row["Account Alias"]
             account_alias = "{: <14}".format(account_alias)
-            print(f"| {posting_date}|{amount}| {description} | {account_alias}|")
+            marker = "!" if row.get("Anomaly Score", 0) >= ANOMALY_THRESHOLD else " "
+            print(f"|{marker}{posting_date}|{amount}| {description} | {account_alias}|")
         print(f"+{small_column}+{small_column}+{large_column}+{small_column}+")
+        if "Anomaly Score" in df.columns and (df["Anomaly Score"] >= ANOMALY_THRESHOLD).any():
+            print('! Unusually large for the merchant or category (run "kash anomalies" for details)')
     else:
         print("No new settled transactions")
 
+def print_dataframe_table(title: str, df: pandas.DataFrame, number_of_rows: int = None, header: bool = False) -> None:
+    """
+    Print a DataFrame as a bordered table, one fixed-width cell per column.
+
+    Args:
+        title (str): Title printed above the table.
+        df (pandas.DataFrame): DataFrame to print.
+        number_of_rows (int, optional): Maximum number of rows to print. Prints all rows when None.
+        header (bool, optional): Print the column names as the first row.
+    """
+    max_length = 50  # Maximum length of each column value in characters
+    print(f'\n"{title}" results:')
+    if number_of_rows is not None:
+        df = df.head(number_of_rows)
+    if df.empty:
+        return
+
+    rows = [[str(value)[:max_length] for value in row] for row in df.itertuples(index=False, name=None)]
+    if header:
+        rows.insert(0, [str(column)[:max_length] for column in df.columns])
+    widths = [max(15, *(len(row[col_idx]) for row in rows)) for col_idx in range(len(df.columns))]
+    table_border = "+" + "+".join("-" * (width + 1) for width in widths) + "+"
+
+    print(table_border)
+    for row_idx, row in enumerate(rows):
+        print("|" + "|".join(f"{value:>{width}} " for value, width in zip(row, widths)) + "|")
+        if header and row_idx == 0:
+            print(table_border)
+    print(table_border)
+
+
+def run_post_import_stages(conn: sqlite3.Connection, account_aliases: list) -> pandas.Series:
+    """
+    Update the tables derived from the bank activity table with the newly imported rows.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        account_aliases (list): Aliases of the imported accounts.
+
+    Returns:
+        pandas.Series: Anomaly score by transaction ID of the newly imported debits.
+    """
+    MerchantIndex(conn).update()
+    anomaly_scores = AnomalyDetector(conn).update()
+    BudgetTracker(conn).update()
+    RecurringDetector(conn).update()
+    BalanceReconciler(conn).update(account_aliases)
+    BalanceSnapshots(conn).update()
+    return anomaly_scores
+
+
+def print_near_duplicates(near_duplicates_df: pandas.DataFrame, skipped: bool) -> None:
+    """
+    Print the new transactions that are likely already stored under a different transaction ID.
+
+    Args:
+        near_duplicates_df (pandas.DataFrame): Near-duplicates, as returned by find_near_duplicates.
+        skipped (bool): Whether the near-duplicates were left out of the import.
+    """
+    if near_duplicates_df.empty:
+        return
+    print_dataframe_table("possible duplicates", near_duplicates_df.drop(columns="Transaction ID"), header=True)
+    if skipped:
+        print(f"{len(near_duplicates_df.index)} possible duplicate(s) left out of the import")
+    else:
+        print(f'{len(near_duplicates_df.index)} possible duplicate(s) imported; '
+              'use "--skip-near-duplicates" to leave them out')
+
+
+def print_memory_report(memory_budget: MemoryBudget) -> None:
+    """
+    Print the peak memory of each stage of a process run within a memory budget, and its chunk size.
+
+    Args:
+        memory_budget (MemoryBudget): Memory budget of the process.
+    """
+    if memory_budget.peaks:
+        peaks_df = pandas.DataFrame({
+            "Stage": list(memory_budget.peaks),
+            "Peak Memory (MB)": [round(peak / 2 ** 20, 1) for peak in memory_budget.peaks.values()],
+        })
+        print_dataframe_table("peak memory", peaks_df, header=True)
+    print(f"Chunks of {memory_budget.chunk_rows} rows for a budget of {memory_budget.max_bytes / 2 ** 20:.0f} MB")
+    if memory_budget.is_exceeded():
+        print("The peak memory went over the budget: the data of one row takes more memory than estimated, "
+              "or the budget is too small for Kash itself")
+
+
+def read_csv_in_chase_format(raw_csv_file, conversion_config: configparser.ConfigParser,
+                             csv_engine: str = DEFAULT_CSV_ENGINE, since: str = None,
+                             until: str = None) -> pandas.DataFrame:
+    """
+    Read a CSV file downloaded from a bank and convert it to the columns of Chase CSV files
+    ("import-ready") as described by a conversion config.
+
+    Args:
+        raw_csv_file: Path (plain or compressed, or "-" for standard input) or file object of the
+            downloaded CSV file.
+        conversion_config (configparser.ConfigParser): Conversion config.
+        csv_engine (str, optional): CSV parsing engine, one of CSV_ENGINES.
+        since (str, optional): Drop the rows posted before this date (YYYY-MM-DD).
+        until (str, optional): Drop the rows posted after this date (YYYY-MM-DD).
+
+    Returns:
+        pandas.DataFrame: DataFrame with the Chase columns.
+    """
+    raw_df = read_csv_input(raw_csv_file, skip_rows=_count_header_rows(conversion_config), header=False,
+                            engine=csv_engine)
+    return filter_date_window(convert_dataframe_to_chase_format(raw_df, conversion_config), since, until)
+
+def iter_csv_in_chase_format(raw_csv_file, conversion_config: configparser.ConfigParser,
+                             memory_budget: MemoryBudget, since: str = None, until: str = None):
+    """
+    Read a CSV file downloaded from a bank chunk by chunk, sized to a memory budget, and convert
+    each chunk to the columns of Chase CSV files ("import-ready").
+
+    Args:
+        raw_csv_file: Path (plain or compressed, or "-" for standard input) or file object of the
+            downloaded CSV file.
+        conversion_config (configparser.ConfigParser): Conversion config.
+        memory_budget (MemoryBudget): Memory budget sizing the chunks.
+        since (str, optional): Drop the rows posted before this date (YYYY-MM-DD).
+        until (str, optional): Drop the rows posted after this date (YYYY-MM-DD).
+
+    Yields:
+        pandas.DataFrame: Each chunk, with the Chase columns.
+    """
+    with CSVChunkReader(raw_csv_file, skip_rows=_count_header_rows(conversion_config), header=False) as reader:
+        while True:
+            memory_budget.start_chunk()
+            with memory_budget.stage("parse"):
+                raw_df = reader.read(memory_budget.chunk_rows)
+                if raw_df is None:
+                    return
+            with memory_budget.stage("convert"):
+                df = filter_date_window(convert_dataframe_to_chase_format(raw_df, conversion_config), since, until)
+            try:
+                yield df
+            finally:
+                memory_budget.end_chunk(len(df.index))
+
+def _count_header_rows(conversion_config: configparser.ConfigParser) -> int:
+    """
+    Get the number of header lines of the CSV files described by a conversion config.
+
+    Args:
+        conversion_config (configparser.ConfigParser): Conversion config.
+
+    Returns:
+        int: 1 if the files have a header line, else 0.
+    """
+    has_header_config_value = conversion_config["HEADER"]["has_header"].strip()
+    return 1 if strtobool(has_header_config_value) else 0
+
+def convert_dataframe_to_chase_format(df: pandas.DataFrame, conversion_config: configparser.ConfigParser) -> pandas.DataFrame:
+    """
+    Convert DataFrame to Chase format.
+
+    Args:
+        df (pandas.DataFrame): DataFrame to be converted.
+        conversion_config (configparser.ConfigParser): Conversion config.
+
+    Returns:
+        pandas.DataFrame: DataFrame converted to Chase format.
+    """
+    # Calculate the number of rows in the DataFrame
+    count_row = df.shape[0]
+
+    # Create a list of empty strings with the same length as the DataFrame
+    empty_values = ["" for _ in range(count_row)]
+
+    # Insert empty columns with Chase column names to the DataFrame
+    for name in CHASE_COLUMN_NAMES:
+        df.insert(df.shape[1], name, empty_values, True)
+
+    try:
+        # Loop through the expected keys in the GENERAL section of the configuration
+        for key in CHASE_COLUMN_CONFIG_NAME_MAP.keys():
+            # Get the value associated with the key and strip any leading or trailing whitespace
+            value = conversion_config["GENERAL"][key].strip()
+            # Check if the value is not empty
+            if value:
+                # Convert the value to an integer, representing the index of the original DataFrame
+                index = int(value)
+                # Map the column in the Chase format to the corresponding column in the original DataFrame
+                df[CHASE_COLUMN_CONFIG_NAME_MAP[key]] = df[index]
+
+    except (ValueError, KeyError) as e:
+        # Handle missing or incorrect configuration for the GENERAL section
+        message = (f"{e}.\nTroubleshooting help: Ensure the GENERAL section contains the proper definitions"
+                   f" in the config file. Refer to the configs provided in src/test_files/ for help.")
+        raise ConfigSectionIncompleteError(message)
+
+    # Retain only the columns in the DataFrame that match Chase column names
+    df = df.loc[:, df.columns.intersection(CHASE_COLUMN_NAMES)]
+    return df
+
+def filter_date_window(df: pandas.DataFrame, since: str = None, until: str = None) -> pandas.DataFrame:
+    """
+    Keep the rows whose posting date is within a date window.
+
+    The "Posting Date" column may be in the CSV ("MM/DD/YYYY") or database ("YYYY-MM-DD") format.
+    The dates are parsed column-wise, and rows whose date can't be parsed are dropped as well.
+
+    Args:
+        df (pandas.DataFrame): DataFrame with a "Posting Date" column.
+        since (str, optional): First kept date (YYYY-MM-DD), no lower bound when None.
+        until (str, optional): Last kept date (YYYY-MM-DD), no upper bound when None.
+
+    Returns:
+        pandas.DataFrame: The rows within the window, or the DataFrame itself without a window.
+    """
+    if since is None and until is None:
+        return df
+    text = df["Posting Date"].astype(str).str.strip()
+    posting_dates = pandas.to_datetime(text, format="%m/%d/%Y", errors="coerce")
+    not_parsed = posting_dates.isna()
+    if not_parsed.any():
+        posting_dates[not_parsed] = pandas.to_datetime(text[not_parsed], format="%Y-%m-%d", errors="coerce")
+    in_window = posting_dates.notna()
+    if since is not None:
+        in_window &= posting_dates >= pandas.Timestamp(since)
+    if until is not None:
+        in_window &= posting_dates <= pandas.Timestamp(until)
+    return df[in_window]
+
 
 class Controller:
     """
@@ -154,15 +449,118 @@ class ImportParserController(Controller):
 
         This method retrieves new transactions from a CSV file and inserts them into the bank activity table.
         """
-        existing_transaction_ids = self._db_interface.get_existing_transaction_ids()
-        csv_handler = CSVHandler(self._user_settings, existing_transaction_ids)
+        first_import = not self._db_interface.has_transactions()
+        if self._user_settings.max_memory is None:
+            self._import()
+        else:
+            self._import_within_memory_budget()
+
+        if self._user_settings.category_rules:
+            self._check_category_rules(first_import)
+
+    def _import(self) -> None:
+        """
+        Import the CSV file at once and display its new transactions.
+        """
+        csv_handler = CSVHandler(self._user_settings)
+        csv_handler.existing_transaction_ids = \
+            self._db_interface.get_existing_transaction_ids(csv_handler.get_csv_transaction_ids())
         new_transactions_df = csv_handler.get_new_settled_transactions_df()
+        near_duplicates_df = self._db_interface.get_near_duplicates(new_transactions_df,
+                                                                    self._user_settings.account_alias)
+        if self._user_settings.skip_near_duplicates:
+            new_transactions_df = new_transactions_df[
+                ~new_transactions_df["Transaction ID"].isin(near_duplicates_df["Transaction ID"])]
         self._db_interface.insert_df_into_bank_activity_table(new_transactions_df)
-        print_bank_activity_dataframe(new_transactions_df)
 
         pending_transactions_df = csv_handler.get_new_pending_transactions_df()
-        self._db_interface.insert_df_into_pending_transactions_table(pending_transactions_df)
+        self._db_interface.insert_df_into_pending_transactions_table(pending_transactions_df,
+                                                                     self._user_settings.account_alias,
+                                                                     since=self._user_settings.since,
+                                                                     until=self._user_settings.until)
+
+        if self._user_settings.commit:
+            anomaly_scores = run_post_import_stages(self._user_settings.conn, [self._user_settings.account_alias])
+            new_transactions_df["Anomaly Score"] = new_transactions_df["Transaction ID"].map(anomaly_scores)
+        print_bank_activity_dataframe(new_transactions_df)
+        print_near_duplicates(near_duplicates_df, self._user_settings.skip_near_duplicates)
 
+    def _import_within_memory_budget(self) -> None:
+        """
+        Import the CSV file in chunks sized to --max-memory, in one transaction.
+
+        Each chunk is deduplicated and written before the next one is read. Near-duplicates are
+        only looked for among the rows stored before the import, so rows of the file don't match
+        each other, as in a single-pass import. The new transactions are displayed chunk by chunk,
+        then the peak memory of each stage.
+        """
+        account_alias = self._user_settings.account_alias
+        memory_budget = MemoryBudget(self._user_settings.max_memory)
+        csv_handler = CSVHandler(self._user_settings)
+        last_stored_id = self._db_interface.get_last_bank_activity_id()
+        pending_transactions_dfs = []
+        near_duplicates_dfs = []
+        new_transactions_count = 0
+        for csv_trans_df in csv_handler.iter_csv_trans_dfs(memory_budget):
+            with memory_budget.stage("deduplicate"):
+                csv_handler.existing_transaction_ids = \
+                    self._db_interface.get_existing_transaction_ids(csv_trans_df["Transaction ID"].tolist())
+                new_transactions_df = csv_handler.get_new_settled_transactions_df(csv_trans_df)
+                near_duplicates_df = self._db_interface.get_near_duplicates(new_transactions_df, account_alias,
+                                                                            last_stored_id)
+                if self._user_settings.skip_near_duplicates:
+                    new_transactions_df = new_transactions_df[
+                        ~new_transactions_df["Transaction ID"].isin(near_duplicates_df["Transaction ID"])]
+            with memory_budget.stage("write"):
+                self._db_interface.insert_df_into_bank_activity_table(new_transactions_df, commit_transaction=False)
+            pending_transactions_dfs.append(csv_handler.get_new_pending_transactions_df(csv_trans_df))
+            if not near_duplicates_df.empty:
+                near_duplicates_dfs.append(near_duplicates_df)
+            new_transactions_count += len(new_transactions_df.index)
+            if not new_transactions_df.empty:
+                print_bank_activity_dataframe(new_transactions_df)
+
+        with memory_budget.stage("write"):
+            pending_transactions_df = pandas.concat(pending_transactions_dfs, ignore_index=True) \
+                if pending_transactions_dfs else pandas.DataFrame(columns=["Transaction ID"])
+            self._db_interface.insert_df_into_pending_transactions_table(pending_transactions_df, account_alias,
+                                                                         since=self._user_settings.since,
+                                                                         until=self._user_settings.until)
+
+        if self._user_settings.commit:
+            with memory_budget.stage("post-import"):
+                anomaly_scores = run_post_import_stages(self._user_settings.conn, [account_alias])
+            if (anomaly_scores >= ANOMALY_THRESHOLD).any():
+                print(f"{int((anomaly_scores >= ANOMALY_THRESHOLD).sum())} new debit(s) unusually large for the "
+                      'merchant or category (run "kash anomalies" for details)')
+        if new_transactions_count:
+            print(f"{new_transactions_count} new settled transaction(s)")
+        else:
+            print("No new settled transactions")
+        if near_duplicates_dfs:
+            print_near_duplicates(pandas.concat(near_duplicates_dfs, ignore_index=True),
+                                  self._user_settings.skip_near_duplicates)
+        print_memory_report(memory_budget)
+
+    def _check_category_rules(self, first_import: bool) -> None:
+        """
+        Tell the user when the category rules changed since the history was last categorized.
+
+        The rules are only applied to the imported rows, so older rows keep the categories of the
+        rules they were categorized with until "kash recategorize" is run.
+
+        Args:
+            first_import (bool): Whether the database had no transactions before the import.
+        """
+        recategorizer = Recategorizer(self._user_settings.conn, self._user_settings.category_rules)
+        if recategorizer.is_current():
+            return
+        if first_import and self._user_settings.commit:
+            recategorizer.mark_current()
+            self._user_settings.conn.commit()
+            return
+        print('The category rules changed since the last "kash recategorize". '
+              'Run it to apply them to previously imported transactions.')
 
 class MakeImportReadyParserController(Controller):
     def __init__(self, cli_args: argparse.Namespace) -> None:
@@ -180,68 +578,62 @@ class MakeImportReadyParserController(Controller):
     def start_process(self) -> None:
         """
         Start the conversion process.
+
+        The raw CSV file may be compressed (.gz, .bz2, .xz, .zip). When it is read from standard
+        input ("-"), the converted CSV data is written to standard output instead of a file.
         """
+        if self._user_settings.max_memory is not None:
+            self._convert_within_memory_budget()
+            return
+        converted_df = read_csv_in_chase_format(self.raw_csv_file, self.conversion_config,
+                                                self._user_settings.csv_engine, self._user_settings.since,
+                                                self._user_settings.until)
+        if self.raw_csv_file == STDIN_PATH:
+            converted_df.to_csv(sys.stdout, index=False)
+            return
         new_file_path = self._get_new_filepath()
-        has_header_config_value = self.conversion_config["HEADER"]["has_header"].strip()
-        if strtobool(has_header_config_value):
-            raw_df = pandas.read_csv(self.raw_csv_file, header=None, skiprows=[0])
-        else:
-            raw_df = pandas.read_csv(self.raw_csv_file, header=None)
-        converted_df = self._convert_dataframe_to_chase_format(raw_df)
         converted_df.to_csv(new_file_path, index=False)
         print(new_file_path)
 
-    def _get_new_filepath(self):
-        """  
-        TODO: write docstring  
-        """  
-        path = os.path.dirname(self.raw_csv_file)
-        basename = os.path.basename(self.raw_csv_file)
-        filename, ext = os.path.splitext(basename)
-        new_filename = filename + "_import_ready" + ext
-        return os.path.join(path, new_filename).replace("\\", "/")
-
-    def _convert_dataframe_to_chase_format(self, df:pandas.DataFrame) -> pandas.DataFrame:
+    def _convert_within_memory_budget(self) -> None:
+        """
+        Convert the raw CSV file in chunks sized to --max-memory, writing each chunk before the
+        next one is read, then display the peak memory of each stage (on standard error when the
+        converted data goes to standard output).
         """
-        Convert DataFrame to Chase format.
+        memory_budget = MemoryBudget(self._user_settings.max_memory)
+        to_stdout = self.raw_csv_file == STDIN_PATH
+        new_file_path = None if to_stdout else self._get_new_filepath()
+        with (contextlib.nullcontext(sys.stdout) if to_stdout else open(new_file_path, "w", newline="")) as output:
+            header = True
+            for converted_df in iter_csv_in_chase_format(self.raw_csv_file, self.conversion_config, memory_budget,
+                                                         self._user_settings.since, self._user_settings.until):
+                with memory_budget.stage("write"):
+                    converted_df.to_csv(output, header=header, index=False)
+                header = False
+            if header:
+                pandas.DataFrame(columns=CHASE_COLUMN_NAMES).to_csv(output, index=False)
+        if to_stdout:
+            with contextlib.redirect_stdout(sys.stderr):
+                print_memory_report(memory_budget)
+            return
+        print(new_file_path)
+        print_memory_report(memory_budget)
 
-        Args:
-            df (pandas.DataFrame): DataFrame to be converted.
+    def _get_new_filepath(self):
+        """
+        Get the path of the converted file: the raw CSV file's path, without compression suffix,
+        with "_import_ready" added to the filename. The extension is ".csv" when the name has none
+        (e.g. "raw.zip").
 
         Returns:
-            pandas.DataFrame: DataFrame converted to Chase format.
+            str: Path of the "import-ready" CSV file.
         """
-        # Calculate the number of rows in the DataFrame
-        count_row = df.shape[0]
-
-        # Create a list of empty strings with the same length as the DataFrame
-        empty_values = ["" for _ in range(count_row)]
-
-        # Insert empty columns with Chase column names to the DataFrame
-        for name in CHASE_COLUMN_NAMES:
-            df.insert(df.shape[1], name, empty_values, True)
-
-        try:
-            # Loop through the expected keys in the GENERAL section of the configuration
-            for key in CHASE_COLUMN_CONFIG_NAME_MAP.keys():
-                # Get the value associated with the key and strip any leading or trailing whitespace
-                value = self.conversion_config["GENERAL"][key].strip()
-                # Check if the value is not empty
-                if value:
-                    # Convert the value to an integer, representing the index of the original DataFrame
-                    index = int(value)
-                    # Map the column in the Chase format to the corresponding column in the original DataFrame
-                    df[CHASE_COLUMN_CONFIG_NAME_MAP[key]] = df[index]
-
-        except (ValueError, KeyError) as e:
-            # Handle missing or incorrect configuration for the GENERAL section
-            message = (f"{e}.\nTroubleshooting help: Ensure the GENERAL section contains the proper definitions"
-                    f" in the config file. Refer to the configs provided in src/test_files/ for help.")
-            raise ConfigSectionIncompleteError(message)
-
-        # Retain only the columns in the DataFrame that match Chase column names
-        df = df.loc[:, df.columns.intersection(CHASE_COLUMN_NAMES)]
-        return df
+        path = os.path.dirname(self.raw_csv_file)
+        basename = os.path.basename(strip_compression_suffix(self.raw_csv_file))
+        filename, ext = os.path.splitext(basename)
+        new_filename = filename + "_import_ready" + (ext or ".csv")
+        return os.path.join(path, new_filename).replace("\\", "/")
 
 
 class RunQueryParserController(Controller):
@@ -260,6 +652,7 @@ class RunQueryParserController(Controller):
         self.queries_config = self._user_settings.queries_config
         self.call_query_map = self._create_query_alias_map()
         self.queries = self._get_queries()
+        self._check_query_parameters()
 
     def start_process(self) -> None:
         """
@@ -274,13 +667,110 @@ class RunQueryParserController(Controller):
         """
         Execute and display the results of predefined queries.
         """
+        if self._user_settings.page_size is not None:
+            self._browse_queries()
+            return
+        if self._user_settings.max_memory is not None:
+            self._execute_queries_within_memory_budget()
+            return
         number_or_rows = self._user_settings.rows
         for query_call, query in self.queries:
-            df = pandas.DataFrame(self._db_interface.execute_query(query))
+            df = pandas.DataFrame(self._db_interface.execute_query(query, self._user_settings.query_parameters))
             self._display_query_results(query_call, df, number_or_rows)
             if self._user_settings.save_results:
                 self._save_query_results(query_call, df, number_or_rows)
 
+    def _execute_queries_within_memory_budget(self) -> None:
+        """
+        Execute the queries, fetching their rows in chunks sized to --max-memory.
+
+        Each chunk is displayed (and saved) before the next one is fetched, and no more rows than
+        displayed are fetched. The peak memory of each stage is displayed last.
+        """
+        memory_budget = MemoryBudget(self._user_settings.max_memory)
+        number_or_rows = self._user_settings.rows
+        for query_call, query in self.queries:
+            print(f'\n"{query_call}" results:')
+            table_border = None
+            remaining_rows = number_or_rows
+            save_results = self._user_settings.save_results
+            with (open(self._get_query_results_filename(query_call), "w", newline="") if save_results
+                  else contextlib.nullcontext()) as csv_file:
+                for df in self._db_interface.iter_query_chunks(query, memory_budget,
+                                                               self._user_settings.query_parameters):
+                    df = df.head(remaining_rows)
+                    for _, row in df.iterrows():
+                        if table_border is None:
+                            table_border = self._create_border(row)
+                            print(table_border)
+                        self._display_row(row)
+                    if save_results:
+                        with memory_budget.stage("save"):
+                            df.to_csv(csv_file, header=df.index[0] == 0)  # Header above the first chunk
+                    remaining_rows -= len(df.index)
+                    if remaining_rows <= 0:
+                        break
+            if table_border is not None:
+                print(table_border)
+        print_memory_report(memory_budget)
+
+    def _browse_queries(self) -> None:
+        """
+        Browse the results of the queries page by page, one query after the other.
+
+        Each page is fetched with a keyset seek over the connection kept open between pages. The
+        commands are read from the standard input; its end quits.
+        """
+        for query_call, query in self.queries:
+            pager = KeysetPager(self._user_settings.conn, query, self._user_settings.page_size,
+                                key=self._user_settings.page_key, descending=self._user_settings.descending,
+                                parameters=self._user_settings.query_parameters)
+            df = pager.first()
+            self._display_page(query_call, pager, df)
+            while True:
+                try:
+                    command = input(PAGER_PROMPT).strip()
+                except EOFError:
+                    print()
+                    return
+                action, _, value = command.partition(" ")
+                action = action.lower()
+                if action in ("", "n", "next"):
+                    df = pager.next()
+                elif action in ("p", "prev", "previous"):
+                    df = pager.previous()
+                elif action in ("f", "first"):
+                    df = pager.first()
+                elif action in ("j", "jump") and value.strip():
+                    df = pager.jump(parse_key_value(value.strip()))
+                elif action in ("q", "quit"):
+                    break
+                else:
+                    print(f'Unknown command "{command}"')
+                    continue
+                self._display_page(query_call, pager, df)
+
+    def _display_page(self, query_call: str, pager: KeysetPager, df: pandas.DataFrame) -> None:
+        """
+        Display a page of query results with its position.
+
+        Args:
+            query_call (str): Query alias.
+            pager (KeysetPager): Pager the page comes from.
+            df (pandas.DataFrame): Rows of the page.
+        """
+        if pager.page_number is None:
+            title = f"{query_call}, page ? (after a jump)"
+        else:
+            title = f"{query_call}, page {pager.page_number}"
+            if not df.empty:
+                title += f" (rows {pager.first_row:,}-{pager.first_row + len(df.index) - 1:,})"
+        print_dataframe_table(title, df, header=True)
+        if df.empty:
+            print("No rows")
+        elif pager.is_last_page:
+            print("Last page")
+
     def _display_query_results(self, query_call: str, df: pandas.DataFrame, number_or_rows: int) -> None:
         """
         Display the results of a query with formatting.
@@ -353,9 +843,21 @@ class RunQueryParserController(Controller):
             df (pandas.DataFrame): DataFrame containing query results.
             number_or_rows (int): Maximum number of rows to save.
         """
-        csv_file_name = f"{query_call}_results.csv"
+        csv_file_name = self._get_query_results_filename(query_call)
         df.head(number_or_rows).to_csv(csv_file_name)
 
+    def _get_query_results_filename(self, query_call: str) -> str:
+        """
+        Get the name of the CSV file the results of a query are saved to.
+
+        Args:
+            query_call (str): Query alias.
+
+        Returns:
+            str: Filename.
+        """
+        return f"{query_call}_results.csv"
+
     def _get_queries(self) -> list:
         """
         Retrieve and validate user queries.
@@ -365,6 +867,26 @@ class RunQueryParserController(Controller):
         """
         return [(query_call, self._validate_query(query_call)) for query_call in self._user_settings.query_calls]
 
+    def _check_query_parameters(self) -> None:
+        """
+        Check that every named parameter of the queries has a value, and that every value is used.
+
+        Raises:
+            QueryParameterError: If a parameter has no value, or a value is used by no query.
+        """
+        parameters = self._user_settings.query_parameters
+        used_names = set()
+        for query_call, query in self.queries:
+            names = get_query_parameter_names(query)
+            missing_names = sorted(names - parameters.keys())
+            if missing_names:
+                raise QueryParameterError(f"{query_call}: no value for {', '.join(':' + name for name in missing_names)}; "
+                                          'pass it with "--param NAME=VALUE" (or --since/--until)')
+            used_names |= names
+        unused_names = sorted(parameters.keys() - used_names)
+        if unused_names:
+            raise QueryParameterError(f"No query uses {', '.join(':' + name for name in unused_names)}")
+
     def _validate_query(self, query:str) -> str:
         """
         Validate user query.
@@ -410,6 +932,559 @@ class RunQueryParserController(Controller):
                     raise DuplicateAliasError(f"{alias}: Alias is used multiple times in [ALIASES]: {self._user_settings.queries_config_path}")
         return query_alias_map
 
+class TrendParserController(Controller):
+    """
+    Controller for spending trend analysis.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize TrendParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = TrendParserUserSettings(cli_args)
+        self._trend_engine = TrendEngine(self._user_settings.conn, self._user_settings.windows)
+
+    def start_process(self) -> None:
+        """
+        Start the trend analysis and display (and optionally save) its tables.
+        """
+        results = self._trend_engine.analyze(
+            since=self._user_settings.since,
+            until=self._user_settings.until,
+            account_aliases=self._user_settings.account_aliases,
+            top=self._user_settings.top,
+        )
+        rolling = results["rolling"].reset_index(names="Posting Date")
+        rolling["Posting Date"] = rolling["Posting Date"].dt.strftime("%Y-%m-%d")
+        results["rolling"] = rolling
+
+        for name, df in results.items():
+            if name == "rolling":
+                # The daily table is long, only display it when asked to
+                if self._user_settings.rows:
+                    print_dataframe_table("trend rolling", df.tail(self._user_settings.rows), header=True)
+            else:
+                print_dataframe_table(f"trend {name}", df, header=True)
+            if self._user_settings.save_results:
+                df.to_csv(f"trend_{name}_results.csv", index=False)
+
+
+class ForecastParserController(Controller):
+    """
+    Controller for cash-flow forecasts.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize ForecastParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = ForecastParserUserSettings(cli_args)
+        self.forecast_config = self._user_settings.forecast_config
+        self._forecast_engine = ForecastEngine(self._user_settings.conn)
+
+    def start_process(self) -> None:
+        """
+        Start the forecast process.
+
+        Projects the daily balances, displays them and optionally saves them to a CSV file.
+        """
+        start = self._user_settings.start
+        if start:
+            start = datetime.strptime(start, "%Y-%m-%d").date()
+        items = load_scheduled_items(self.forecast_config)
+        if self._user_settings.include_recurring:
+            recurring = RecurringDetector(self._user_settings.conn).get_recurring_transactions()
+            items = pandas.concat([items, recurring_items(recurring, start)], ignore_index=True)
+        budgets = load_budgets(self.forecast_config)
+        balance_overrides = load_balance_overrides(self.forecast_config)
+        if self._user_settings.simulate:
+            self._start_simulation(items, budgets, start, balance_overrides)
+            return
+
+        df = self._forecast_engine.project(
+            items,
+            budgets,
+            start=start,
+            days=self._user_settings.days,
+            balance_overrides=balance_overrides,
+        )
+        print_dataframe_table(f"{self._user_settings.days}-day forecast", df, self._user_settings.rows, header=True)
+        if self._user_settings.output:
+            df.to_csv(self._user_settings.output, index=False)
+            print(self._user_settings.output)
+
+    def _start_simulation(self, items: pandas.DataFrame, budgets: pandas.DataFrame, start, balance_overrides: dict) -> None:
+        """
+        Run the Monte Carlo simulation, display its percentile bands and account summary and
+        optionally save the bands to a CSV file.
+
+        Args:
+            items (pandas.DataFrame): Scheduled items.
+            budgets (pandas.DataFrame): Budgets.
+            start (date): First forecast day, today when None.
+            balance_overrides (dict): Settled balances to use instead of the database's.
+        """
+        results = self._forecast_engine.simulate(
+            items,
+            budgets,
+            start=start,
+            days=self._user_settings.days,
+            balance_overrides=balance_overrides,
+            paths=self._user_settings.simulate,
+            seed=self._user_settings.seed,
+            threshold=self._user_settings.threshold,
+            workers=self._user_settings.workers,
+            time_limit=self._user_settings.time_limit,
+        )
+        print(f"Simulated {results['paths']} path(s) with seed {results['seed']}")
+        print_dataframe_table(f"{self._user_settings.days}-day forecast bands", results["bands"],
+                              self._user_settings.rows, header=True)
+        print_dataframe_table("minimum balances", results["accounts"], header=True)
+        if self._user_settings.output:
+            results["bands"].to_csv(self._user_settings.output, index=False)
+            print(self._user_settings.output)
+
+
+class RecurringParserController(Controller):
+    """
+    Controller for recurring transaction detection.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize RecurringParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = RecurringParserUserSettings(cli_args)
+        self._recurring_detector = RecurringDetector(self._user_settings.conn)
+
+    def start_process(self) -> None:
+        """
+        Start the recurring process.
+
+        Brings the recurring transactions table up to date (or rebuilds it) and displays the
+        recurring transactions.
+        """
+        if self._user_settings.rebuild:
+            self._recurring_detector.rebuild()
+        else:
+            self._recurring_detector.update()
+        df = self._recurring_detector.get_recurring_transactions()
+        if self._user_settings.account_aliases:
+            df = df[df["Account Alias"].isin(self._user_settings.account_aliases)]
+        print_dataframe_table("recurring", df, header=True)
+
+
+class SearchParserController(Controller):
+    """
+    Controller for full-text transaction search.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize SearchParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = SearchParserUserSettings(cli_args)
+        self._transaction_search = TransactionSearch(self._user_settings.conn)
+
+    def start_process(self) -> None:
+        """
+        Start the search process.
+
+        Searches the descriptions and details of the transactions and displays the best matches.
+
+        Raises:
+            BadQueryStructureError: If no terms are given, or the raw query is invalid.
+        """
+        df = self._transaction_search.search(
+            self._user_settings.terms,
+            prefix=self._user_settings.prefix,
+            phrase=self._user_settings.phrase,
+            raw=self._user_settings.raw,
+            since=self._user_settings.since,
+            until=self._user_settings.until,
+            account_aliases=self._user_settings.account_aliases,
+            limit=self._user_settings.rows,
+        )
+        print_dataframe_table("search", df.drop(columns=["ID"]), header=True)
+
+
+class RecategorizeParserController(Controller):
+    """
+    Controller for applying category rules to the transaction history.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize RecategorizeParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = RecategorizeParserUserSettings(cli_args)
+        self._recategorizer = Recategorizer(self._user_settings.conn, self._user_settings.category_rules)
+
+    def start_process(self) -> None:
+        """
+        Start the recategorize process.
+
+        Recomputes the category of every transaction in batches and displays the transactions
+        count and total of each category.
+        """
+        changed = self._recategorizer.recategorize(self._user_settings.batch_size)
+        print(f"{changed} transaction(s) recategorized")
+        if changed:
+            # Category budgets count the transactions by their stored category
+            BudgetTracker(self._user_settings.conn).rebuild()
+        print_dataframe_table("categories", self._recategorizer.get_category_totals(), header=True)
+
+
+class MerchantsParserController(Controller):
+    """
+    Controller for merchant normalization.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize MerchantsParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = MerchantsParserUserSettings(cli_args)
+        self._merchant_index = MerchantIndex(self._user_settings.conn)
+
+    def start_process(self) -> None:
+        """
+        Start the merchants process.
+
+        Brings the merchant IDs up to date (or renormalizes every description) and displays the
+        merchants with the most transactions.
+        """
+        if self._user_settings.rebuild:
+            self._merchant_index.rebuild()
+        else:
+            self._merchant_index.update()
+        print_dataframe_table("merchants", self._merchant_index.get_merchants(self._user_settings.top), header=True)
+
+
+class ReconcileParserController(Controller):
+    """
+    Controller for balance chain reconciliation.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize ReconcileParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = ReconcileParserUserSettings(cli_args)
+        self._reconciler = BalanceReconciler(self._user_settings.conn)
+
+    def start_process(self) -> None:
+        """
+        Start the reconcile process.
+
+        Checks the balance chain of the rows that haven't been checked yet (or of every row) and
+        displays the reconciliation summary and the gaps of each account.
+        """
+        account_aliases = self._user_settings.account_aliases or None
+        if self._user_settings.rebuild:
+            self._reconciler.rebuild(account_aliases)
+        else:
+            self._reconciler.update(account_aliases)
+
+        summary = self._reconciler.get_summary()
+        gaps = self._reconciler.get_gaps()
+        if account_aliases:
+            summary = summary[summary["Account Alias"].isin(account_aliases)]
+            gaps = gaps[gaps["Account Alias"].isin(account_aliases)]
+        print_dataframe_table("reconciliation", summary, header=True)
+        print_dataframe_table("gaps", gaps, self._user_settings.rows, header=True)
+
+
+class BalanceParserController(Controller):
+    """
+    Controller for balance lookups.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize BalanceParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = BalanceParserUserSettings(cli_args)
+        self._balance_snapshots = BalanceSnapshots(self._user_settings.conn)
+
+    def start_process(self) -> None:
+        """
+        Start the balance process.
+
+        Brings the balance snapshots up to date (or recomputes them), then displays each account's
+        balance as of a date, or its daily balances over a date range when --since is given.
+        """
+        if self._user_settings.rebuild:
+            self._balance_snapshots.rebuild()
+        else:
+            self._balance_snapshots.update()
+
+        account_aliases = self._user_settings.account_aliases or None
+        if self._user_settings.since:
+            until = self._user_settings.until or datetime.today().strftime("%Y-%m-%d")
+            df = self._balance_snapshots.get_balance_history(self._user_settings.since, until, account_aliases)
+            print_dataframe_table("balance history", df, self._user_settings.rows, header=True)
+        else:
+            df = self._balance_snapshots.get_balances(self._user_settings.as_of, account_aliases)
+            print_dataframe_table("balance", df, header=True)
+
+
+class AnomaliesParserController(Controller):
+    """
+    Controller for anomaly listings.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize AnomaliesParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = AnomaliesParserUserSettings(cli_args)
+        self._anomaly_detector = AnomalyDetector(self._user_settings.conn)
+
+    def start_process(self) -> None:
+        """
+        Start the anomalies process.
+
+        Scores the debits added since the last run, then displays the debits scoring at least the
+        threshold, latest first.
+        """
+        MerchantIndex(self._user_settings.conn).update()
+        self._anomaly_detector.update()
+        df = self._anomaly_detector.get_anomalies(self._user_settings.threshold, self._user_settings.since,
+                                                  self._user_settings.account_aliases or None,
+                                                  self._user_settings.rows)
+        print_dataframe_table("anomalies", df, header=True)
+
+
+class ArchiveParserController(Controller):
+    """
+    Controller for columnar archive exports.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize ArchiveParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = ArchiveParserUserSettings(cli_args)
+        self._archive = BankActivityArchive(self._user_settings.directory)
+
+    def start_process(self) -> None:
+        """
+        Start the archive process.
+
+        Writes the months of the bank activity table that received rows since the last export (or
+        every month with --rebuild), then displays the files written.
+
+        Raises:
+            ArchiveFormatError: If the archive is in another file format and --rebuild isn't given.
+        """
+        df = self._archive.export(self._user_settings.conn, self._user_settings.file_format,
+                                  self._user_settings.rebuild)
+        if df.empty:
+            print(f"The archive in {self._user_settings.directory} is up to date")
+            return
+        print_dataframe_table("archive", df, header=True)
+
+
+class BudgetParserController(Controller):
+    """
+    Controller for budget tracking.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize BudgetParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = BudgetParserUserSettings(cli_args)
+        self._budget_tracker = BudgetTracker(self._user_settings.conn)
+
+    def start_process(self) -> None:
+        """
+        Start the budget process.
+
+        Creates, redefines or deletes a budget if asked, adds the transactions imported since the
+        last update to the running totals, then displays the spending of every budget in the
+        period of the date (and the periods before it) and the overruns.
+        """
+        if self._user_settings.set_budget:
+            self._budget_tracker.set_budget(self._user_settings.set_budget, self._user_settings.limit,
+                                            self._user_settings.period, self._user_settings.category,
+                                            self._user_settings.pattern, self._user_settings.account_alias)
+        elif self._user_settings.remove_budget:
+            if not self._budget_tracker.remove_budget(self._user_settings.remove_budget):
+                print(f"Error: {self._user_settings.remove_budget}: budget does not exist")
+                return
+        self._budget_tracker.update()
+        as_of = datetime.strptime(self._user_settings.date, "%Y-%m-%d").date() if self._user_settings.date else None
+        df = self._budget_tracker.get_utilization(as_of, self._user_settings.periods)
+        if df.empty:
+            print('No budgets defined; use "--set <NAME> --limit <AMOUNT>" to define one')
+            return
+        print_dataframe_table("budgets", df, header=True)
+        overruns = df[df["Spent"] > df["Limit"]]
+        if not overruns.empty:
+            print(f"{len(overruns.index)} budget period(s) over the limit: " +
+                  ", ".join(f"{name} ({start})" for name, start in zip(overruns["Budget"], overruns["Period Start"])))
+
+
+class DashboardExportParserController(Controller):
+    """
+    Controller for Dashboard workbook exports.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize DashboardExportParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = DashboardExportParserUserSettings(cli_args)
+        self._workbook = DashboardWorkbook(self._user_settings.workbook)
+
+    def start_process(self) -> None:
+        """
+        Start the dashboard export process.
+
+        Brings the budget totals up to date, writes the data sheets of the workbook whose source
+        data changed since the last export (or every data sheet with --rebuild), then displays the
+        sheets written.
+        """
+        BudgetTracker(self._user_settings.conn).update()
+        try:
+            df = self._workbook.export(self._user_settings.conn, self._user_settings.rebuild)
+        except (ValueError, zipfile.BadZipFile) as e:
+            print(f"Error: {e}")
+            return
+        except PermissionError:
+            print(f"Error: {self._user_settings.workbook} can't be written; close it in Excel and try again")
+            return
+        if (df["Status"] == "unchanged").all():
+            print(f"The data sheets of {self._user_settings.workbook} are up to date")
+            return
+        print_dataframe_table("dashboard export", df, header=True)
+
+
+class WatchParserController(Controller):
+    """
+    Controller for watching a directory of bank downloads.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize WatchParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = WatchParserUserSettings(cli_args)
+
+    def start_process(self) -> None:
+        """
+        Start the watch process.
+
+        Imports the files already waiting in the directory, then keeps importing new files as they
+        are downloaded (unless --once), displaying the new transactions of each file.
+        """
+        # Imported here: api.py imports this module
+        from .api import KashDatabase
+
+        routes = load_watch_routes(self._user_settings.watch_config, self._user_settings.watch_config_directory)
+        kash_db = KashDatabase(self._user_settings.conn, self._user_settings.category_rules)
+        watcher = FolderWatcher(kash_db, self._user_settings.directory, routes,
+                                self._user_settings.skip_near_duplicates)
+        if self._user_settings.once:
+            self._print_imported(watcher.poll())
+            return
+        print(f"Watching {self._user_settings.directory} (Ctrl+C to stop)")
+        watcher.run(self._user_settings.poll_interval, on_import=self._print_imported)
+
+    def _print_imported(self, imported: list) -> None:
+        """
+        Display the new transactions of each imported file.
+
+        Args:
+            imported (list): (filename, account alias, DataFrame of the new settled transactions) tuples.
+        """
+        for filename, account_alias, new_transactions_df in imported:
+            print(f"\n{filename} ({account_alias}):")
+            print_bank_activity_dataframe(new_transactions_df)
+            near_duplicates = new_transactions_df.get("Near Duplicate")
+            if near_duplicates is not None and near_duplicates.any():
+                print(f'{near_duplicates.sum()} possible duplicate(s) imported; '
+                      'use "--skip-near-duplicates" to leave them out')
+
+
+class RunManifestParserController(Controller):
+    """
+    Controller for running import manifests.
+    """
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize RunManifestParserController with user settings.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments.
+        """
+        super().__init__(cli_args)
+        self._user_settings = RunManifestParserUserSettings(cli_args)
+
+    def start_process(self) -> None:
+        """
+        Start the run-manifest process.
+
+        Imports every file of the manifest, then displays one summary row per file.
+        """
+        # Imported here: manifest.py builds on CSVHandler and DataBaseInterface of this module
+        from .manifest import ManifestRun, load_manifest
+
+        sources = load_manifest(self._user_settings.manifest, self._user_settings.manifest_directory)
+        manifest_run = ManifestRun(self._db_interface, self._user_settings.conn, sources,
+                                   self._user_settings.category_rules, self._user_settings.commit,
+                                   self._user_settings.jobs)
+        summary_df, new_transactions_df = manifest_run.run()
+        if summary_df.empty:
+            print("No file matches the paths of the manifest")
+            return
+        print_dataframe_table("run-manifest", summary_df, header=True)
+        print(f"{len(new_transactions_df.index)} new settled transaction(s) from {len(summary_df.index)} file(s)")
+        if not self._user_settings.commit:
+            print('Nothing was written; add "--commit" to import them')
+
+
 class DataBaseInterface:
     """
     Interface for interacting with the database.
@@ -424,23 +1499,79 @@ class DataBaseInterface:
         self._user_settings = user_settings
         self._conn = self._user_settings.conn
         self._commit = self._user_settings.commit
+        self._transaction_id_index = TransactionIdIndex(self._conn)
 
-    def get_existing_transaction_ids(self) -> list:
+    def has_transactions(self) -> bool:
         """
-        Retrieve existing transaction IDs from the database.
+        Check whether the bank activity table has any transaction.
 
         Returns:
-            list: List of existing transaction IDs.
+            bool: True if it has at least one transaction.
         """
-        records = self._conn.execute(SELECT_TRANSACTION_IDS_FROM_BANK_ACTIVITY_TABLE).fetchall()
-        return [record[0] for record in records]
+        return bool(self._conn.execute(SELECT_ANY_FROM_BANK_ACTIVITY_TABLE).fetchone()[0])
 
-    def insert_df_into_bank_activity_table(self, df: pandas.DataFrame) -> None:
+    def get_existing_transaction_ids(self, transaction_ids: list) -> set:
+        """
+        Find which of the given transaction IDs are already in the database.
+
+        Only the IDs the transaction ID Bloom filter may have seen are looked up.
+
+        Args:
+            transaction_ids (list): Transaction IDs to check.
+
+        Returns:
+            set: The transaction IDs already stored.
+        """
+        return self._transaction_id_index.find_existing(transaction_ids)
+
+    def get_last_bank_activity_id(self) -> int:
+        """
+        Get the ID of the last row of the bank activity table.
+
+        Returns:
+            int: The largest ID, or 0 when the table is empty.
+        """
+        return self._conn.execute(SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+
+    def get_near_duplicates(self, df: pandas.DataFrame, account_alias: str, max_id: int = None) -> pandas.DataFrame:
+        """
+        Find the new transactions of an account that are likely already stored under a different
+        transaction ID (see find_near_duplicates).
+
+        Only the stored transactions of the account posted within NEAR_DUPLICATE_DAYS days of the
+        new transactions' date range are read.
+
+        Args:
+            df (pandas.DataFrame): New settled transactions.
+            account_alias (str): Account alias.
+            max_id (int, optional): Only compare with the stored rows up to this ID, e.g. to leave
+                out the rows an import in chunks wrote from the same file.
+
+        Returns:
+            pandas.DataFrame: Near-duplicates.
+        """
+        posting_dates = [datetime.strptime(normalize_date(date), "%Y-%m-%d") for date in df["Posting Date"]]
+        if not posting_dates:
+            return pandas.DataFrame(columns=NEAR_DUPLICATE_COLUMNS)
+        window = timedelta(days=NEAR_DUPLICATE_DAYS)
+        params = (account_alias, (min(posting_dates) - window).strftime("%Y-%m-%d"),
+                  (max(posting_dates) + window).strftime("%Y-%m-%d"))
+        if max_id is None:
+            stored_df = pandas.read_sql_query(SELECT_ACCOUNT_DATE_RANGE_FROM_BANK_ACTIVITY_TABLE, self._conn,
+                                              params=params)
+        else:
+            stored_df = pandas.read_sql_query(SELECT_ACCOUNT_DATE_RANGE_UP_TO_ID_FROM_BANK_ACTIVITY_TABLE, self._conn,
+                                              params=(*params, max_id))
+        return find_near_duplicates(df, stored_df)
+
+    def insert_df_into_bank_activity_table(self, df: pandas.DataFrame, commit_transaction: bool = True) -> None:
         """
         Insert DataFrame into the bank activity table.
 
         Args:
             df (pandas.DataFrame): DataFrame to be inserted.
+            commit_transaction (bool, optional): Commit the rows. When False, the caller commits, e.g.
+                to write several DataFrames in one transaction.
         """
         df = df.reset_index()
         for _, row in df.iterrows():
@@ -455,26 +1586,44 @@ class DataBaseInterface:
             balance = row["Balance"]
             check_or_slip_num = row["Check or Slip #"]
             reconciled = 'N'
+            category = row.get("Category")
             values = (account_alias, transaction_id, details, formatted_posting_date,
-                      description, amount, type_, balance, check_or_slip_num, reconciled)
+                      description, amount, type_, balance, check_or_slip_num, reconciled, category)
             if self._commit:
                 self._conn.execute(INSERT_INTO_BANK_ACTIVITY_TABLE, values)
         if self._commit:
-            self._conn.commit()
+            self._transaction_id_index.save()
+            if commit_transaction:
+                self._conn.commit()
 
-    def insert_df_into_pending_transactions_table(self, df: pandas.DataFrame) -> None:
+    def insert_df_into_pending_transactions_table(self, df: pandas.DataFrame, account_alias: str,
+                                                  commit_transaction: bool = True, since: str = None,
+                                                  until: str = None) -> None:
         """
-        Insert DataFrame into the bank activity table.
+        Bring the pending transactions of the imported account in line with DataFrame.
+
+        The CSV file lists every pending transaction of the account, so the stored pending rows of
+        the account are diffed against it: rows no longer listed are deleted and only the new rows
+        are inserted. Other accounts' pending rows are left alone. Pending rows that have since
+        settled in the bank activity table are deleted as well. When the file was imported within
+        a date window, only the stored pending rows within the window are diffed.
 
         Args:
-            df (pandas.DataFrame): DataFrame to be inserted.
+            df (pandas.DataFrame): DataFrame of the pending transactions of the imported CSV file.
+            account_alias (str): Alias of the imported account.
+            commit_transaction (bool, optional): Commit the changes. When False, the caller commits.
+            since (str, optional): First date of the import window (YYYY-MM-DD).
+            until (str, optional): Last date of the import window (YYYY-MM-DD).
         """
-        if self._commit:
-            self.delete_all_pending_transactions_table_records()    
+        if not self._commit:
+            return
 
-        df = df.reset_index()
+        stored_transaction_ids = self.get_pending_transaction_ids(account_alias, since, until)
+        csv_transaction_ids = set(df["Transaction ID"])
+        self.delete_pending_transactions_table_records(account_alias, stored_transaction_ids - csv_transaction_ids)
+
+        df = df[~transaction_ids_in(df["Transaction ID"], stored_transaction_ids)].reset_index()
         for _, row in df.iterrows():
-            account_alias = row["Account Alias"]
             transaction_id = row['Transaction ID']
             details = row["Details"]
             posting_date = row["Posting Date"]
@@ -487,42 +1636,105 @@ class DataBaseInterface:
             reconciled = 'N'
             values = (account_alias, transaction_id, details, formatted_posting_date,
                       description, amount, type_, balance, check_or_slip_num, reconciled)
-            if self._commit:
-                self._conn.execute(INSERT_INTO_PENDING_TRANSACTIONS_TABLE, values)
-        if self._commit:
+            self._conn.execute(INSERT_INTO_PENDING_TRANSACTIONS_TABLE, values)
+
+        self.delete_settled_pending_transactions_table_records(account_alias)
+        if commit_transaction:
             self._conn.commit()
 
-    def execute_query(self, query: str, args: list = None):
+    def execute_query(self, query: str, args=None):
         """
         Execute SQL query.
 
         Args:
             query (str): SQL query string.
-            args (list, optional): Query arguments.
+            args (list | dict, optional): Query arguments, positional or by parameter name.
 
         Returns:
             list: Query results.
         """
         if args:
-            print(query)
             return self._conn.execute(query, args).fetchall()
         return self._conn.execute(query).fetchall()
 
-    def delete_all_pending_transactions_table_records(self) -> None:
+    def iter_query_chunks(self, query: str, memory_budget: MemoryBudget, args=None):
         """
-        deletes pending transactions table records.
+        Execute SQL query and fetch its rows chunk by chunk, sized to a memory budget.
 
         Args:
-            None
+            query (str): SQL query string.
+            memory_budget (MemoryBudget): Memory budget sizing the chunks.
+            args (list | dict, optional): Query arguments, positional or by parameter name.
+
+        Yields:
+            pandas.DataFrame: Rows of each chunk, with numbered columns and an index continuing
+                from the previous chunk.
+        """
+        cursor = self._conn.execute(query, args or ())
+        first_row = 0
+        while True:
+            memory_budget.start_chunk()
+            with memory_budget.stage("query"):
+                rows = cursor.fetchmany(memory_budget.chunk_rows)
+                if not rows:
+                    return
+                df = pandas.DataFrame(rows, index=range(first_row, first_row + len(rows)))
+            try:
+                yield df
+            finally:
+                memory_budget.end_chunk(len(rows))
+            first_row += len(rows)
+
+    def get_pending_transaction_ids(self, account_alias: str, since: str = None, until: str = None) -> set:
+        """
+        Retrieve the transaction IDs of an account's pending transactions.
+
+        Args:
+            account_alias (str): Account alias.
+            since (str, optional): Only those posted on or after this date (YYYY-MM-DD).
+            until (str, optional): Only those posted on or before this date (YYYY-MM-DD).
+
+        Returns:
+            set: Transaction IDs of the pending transactions.
+        """
+        if since is None and until is None:
+            records = self._conn.execute(SELECT_TRANSACTION_IDS_FROM_PENDING_TRANSACTIONS_TABLE, (account_alias,)).fetchall()
+        else:
+            records = self._conn.execute(SELECT_DATE_RANGE_TRANSACTION_IDS_FROM_PENDING_TRANSACTIONS_TABLE,
+                                         (account_alias, since or "0000-01-01", until or "9999-12-31")).fetchall()
+        return {record[0] for record in records}
+
+    def delete_pending_transactions_table_records(self, account_alias: str, transaction_ids: set) -> None:
+        """
+        Delete an account's pending transactions.
+
+        Args:
+            account_alias (str): Account alias.
+            transaction_ids (set): Transaction IDs of the pending transactions to delete.
 
         Returns:
             None
         """
-        query = """
-            DELETE
-            FROM
-                pending_transactions;"""
-        self._conn.execute(query)
+        self._conn.executemany(DELETE_FROM_PENDING_TRANSACTIONS_TABLE,
+                               [(account_alias, transaction_id) for transaction_id in transaction_ids])
+
+    def delete_settled_pending_transactions_table_records(self, account_alias: str) -> int:
+        """
+        Delete an account's pending transactions that have settled.
+
+        A pending transaction has settled when the bank activity table has a transaction of the same
+        account with the same description and amount, posted on the pending date or up to
+        PENDING_SETTLEMENT_DAYS days later. All of them are found and deleted in a single statement.
+
+        Args:
+            account_alias (str): Account alias.
+
+        Returns:
+            int: Number of deleted pending transactions.
+        """
+        cursor = self._conn.execute(DELETE_SETTLED_FROM_PENDING_TRANSACTIONS_TABLE,
+                                    (f"+{PENDING_SETTLEMENT_DAYS} days", account_alias))
+        return cursor.rowcount
 
 
 class CSVHandler:
@@ -533,7 +1745,7 @@ class CSVHandler:
         _user_settings (ImportParserUserSettings): User settings object.
         _csv_file (str): "Import-ready" CSV filepath
         _account_alias (str): Account alias.
-        existing_transaction_ids (list): List of existing transaction IDs.
+        existing_transaction_ids (set): Transaction IDs of the CSV file already in the database.
 
     Methods:
         get_new_settled_transactions_df(csv_file: str) -> pandas.DataFrame: Get DataFrame of new settled transactions from CSV file.
@@ -543,70 +1755,141 @@ class CSVHandler:
         _create_dataframe_from_import_ready_csv(csv_file: str): Create DataFrame from a Chase CSV file.
         _add_required_columns_to_df(df: pandas.DataFrame) -> pandas.DataFrame: Add required columns to DataFrame.
     """
-    def __init__(self, user_settings:ImportParserUserSettings, existing_transaction_ids:list) -> None:
+    def __init__(self, user_settings:ImportParserUserSettings, existing_transaction_ids:set = frozenset()) -> None:
         """
         Initialize CSVHandler with user settings and existing transaction IDs.
 
         Args:
             user_settings (ImportParserUserSettings): User settings object.
-            existing_transaction_ids (list): List of existing transaction IDs.
+            existing_transaction_ids (set, optional): Transaction IDs of the CSV file already in the database.
         """
         self._user_settings = user_settings
         self._csv_file = self._user_settings.csv_file
         self._account_alias = self._user_settings.account_alias
         self.existing_transaction_ids = existing_transaction_ids
+        self._csv_trans_df = None  # Transactions of the CSV file, read on first use
 
-    def get_new_settled_transactions_df(self) -> pandas.DataFrame:
+    def get_new_settled_transactions_df(self, csv_trans_df: pandas.DataFrame = None) -> pandas.DataFrame:
         """
         Get DataFrame of new settled transactions from the imported CSV file.
 
         Args:
-            None
+            csv_trans_df (pandas.DataFrame, optional): Chunk of the CSV file (see iter_csv_trans_dfs).
+                The whole file by default.
 
         Returns:
             pandas.DataFrame: DataFrame of new settled transactions.
         """
-        # Create DataFrame from a Chase CSV file
-        csv_trans_df = self._create_dataframe_from_import_ready_csv(self._csv_file)
+        if csv_trans_df is None:
+            csv_trans_df = self._get_csv_trans_df()
 
         # Filter out rows with empty balance
         csv_trans_df = csv_trans_df[csv_trans_df['Balance'] != ' ']
 
         # Exclude transactions already present in the bank activity table
-        return csv_trans_df[~csv_trans_df["Transaction ID"].isin(self.existing_transaction_ids)]
+        new_trans_df = csv_trans_df[~transaction_ids_in(csv_trans_df["Transaction ID"], self.existing_transaction_ids)]
+
+        # Categorize the new transactions
+        return self._add_category_column_to_df(new_trans_df)
 
-    def get_new_pending_transactions_df(self) -> pandas.DataFrame:
+    def get_new_pending_transactions_df(self, csv_trans_df: pandas.DataFrame = None) -> pandas.DataFrame:
         """
         Get DataFrame of new pending transactions from the imported CSV file.
 
         Args:
-            None
+            csv_trans_df (pandas.DataFrame, optional): Chunk of the CSV file (see iter_csv_trans_dfs).
+                The whole file by default.
 
         Returns:
             pandas.DataFrame: DataFrame of new settled transactions.
         """
-        # Create DataFrame from a Chase CSV file
-        csv_trans_df = self._create_dataframe_from_import_ready_csv(self._csv_file)
+        if csv_trans_df is None:
+            csv_trans_df = self._get_csv_trans_df()
 
         # Return DataFrame with rows that contain empty balance
         return csv_trans_df[csv_trans_df['Balance'] == ' ']
 
+    def get_csv_transaction_ids(self) -> list:
+        """
+        Get the transaction IDs of every row of the imported CSV file.
+
+        Returns:
+            list: Transaction IDs.
+        """
+        return self._get_csv_trans_df()["Transaction ID"].tolist()
+
+    def iter_csv_trans_dfs(self, memory_budget: MemoryBudget):
+        """
+        Read the imported CSV file chunk by chunk, sized to a memory budget.
+
+        The chunk ends (and is measured by the budget) when the next chunk is requested, so the
+        chunk's processing by the caller is measured with it.
+
+        Args:
+            memory_budget (MemoryBudget): Memory budget sizing the chunks.
+
+        Yields:
+            pandas.DataFrame: DataFrame of each chunk, with the required columns.
+        """
+        with CSVChunkReader(self._csv_file, names=CHASE_COLUMN_NAMES, text_columns=["Balance"]) as reader:
+            while True:
+                memory_budget.start_chunk()
+                with memory_budget.stage("parse"):
+                    df = reader.read(memory_budget.chunk_rows)
+                    if df is None:
+                        return
+                    df = filter_date_window(df, self._user_settings.since, self._user_settings.until)
+                    df = self._add_required_columns_to_df(df)
+                try:
+                    yield df
+                finally:
+                    memory_budget.end_chunk(len(df.index))
+
+    def _get_csv_trans_df(self) -> pandas.DataFrame:
+        """
+        Get DataFrame of the imported CSV file, reading the file only once.
+
+        Returns:
+            pandas.DataFrame: DataFrame created from the CSV file.
+        """
+        if self._csv_trans_df is None:
+            # Create DataFrame from a Chase CSV file
+            self._csv_trans_df = self._create_dataframe_from_import_ready_csv(self._csv_file)
+        return self._csv_trans_df
+
+    def _add_category_column_to_df(self, df: pandas.DataFrame) -> pandas.DataFrame:
+        """
+        Adds the "Category" column to DataFrame, using the category rules when given.
+
+        Args:
+            df (pandas.DataFrame): DataFrame to be processed.
+
+        Returns:
+            pandas.DataFrame: DataFrame with the "Category" column (None when no rule matches).
+        """
+        category_rules = self._user_settings.category_rules
+        if category_rules is None:
+            return df.assign(Category=None)
+        return df.assign(Category=category_rules.categorize(df["Description"]))
+
     def _create_dataframe_from_import_ready_csv(self, import_ready_csv_file:str) -> pandas.DataFrame:
         """
         Create DataFrame from an "import-ready" CSV file.
 
         Args:
-            import_ready_csv_file (str): Path to "import-ready" CSV file.
+            import_ready_csv_file (str): Path to "import-ready" CSV file, plain or compressed (.gz, .bz2,
+                .xz, or .zip with one or more CSV files), or "-" for standard input.
 
         Returns:
             pandas.DataFrame: DataFrame created from the CSV file.
         """
-        # Specify converters to handle datatype conversions
-        converters = {"Balance": str}
+        # Read CSV file into DataFrame, replacing the header with the column names.
+        # The balance stays text, since pending transactions have a blank (" ") balance.
+        df = read_csv_input(import_ready_csv_file, names=CHASE_COLUMN_NAMES,
+                            text_columns=["Balance"], engine=self._user_settings.csv_engine)
 
-        # Read CSV file into DataFrame, skipping the first row (header) and specifying column names
-        df = pandas.read_csv(import_ready_csv_file, delimiter=",", skiprows=[0], header=None, names=CHASE_COLUMN_NAMES, \
-                        converters=converters)
+        # Drop the rows outside the --since/--until window before they are fingerprinted
+        df = filter_date_window(df, self._user_settings.since, self._user_settings.until)
 
         # Add required columns to DataFrame
         return self._add_required_columns_to_df(df)
@@ -615,10 +1898,11 @@ class CSVHandler:
         """
         Adds columns "Transaction ID" and "Account Alias" to DataFrame.
 
-        The "Transaction ID" is the row's unique identifier. It is a calculated hash of the values of other columns:
+        The "Transaction ID" is the row's unique identifier, computed by transaction_fingerprint from
+        the normalized values of the other columns:
             Details
-            Postind Date
-            Descsription
+            Posting Date
+            Description
             Amount
             Type
             Balance
@@ -631,32 +1915,14 @@ class CSVHandler:
         Returns:
             pandas.DataFrame: Processed DataFrame with newly added columns: "Transaction ID" and "Account Alias".
         """
-        # Initialize lists to store transaction IDs and account aliases
-        transaction_ids = []
-        account_aliases = []
-
-        # Iterate over each row in the DataFrame
-        for _, row in df.iterrows():
-            # Extract relevant columns for generating transaction ID
-            details = str(row["Details"])
-            posting_date = str(row["Posting Date"])
-            description = str(row["Description"])
-            amount = str(row["Amount"])
-            type_ = str(row["Type"])
-            balance = str(row["Balance"])
-            check_or_slip_num = str(row["Check or Slip #"])
-
-            # Concatenate columns to create a hashable string
-            hashable = "".join([details, posting_date, description, amount, type_, balance, \
-                                check_or_slip_num, self._account_alias])
-
-
-            # Generate transaction ID using SHA-256 hash function
-            transaction_id = hashlib.sha256(hashable.encode()).hexdigest()
-
-            # Append transaction ID and account alias to respective lists
-            transaction_ids.append(transaction_id)
-            account_aliases.append(self._account_alias)
+        transaction_ids = [
+            transaction_fingerprint(details, posting_date, description, amount, type_, balance,
+                                    check_or_slip_num, self._account_alias)
+            for details, posting_date, description, amount, type_, balance, check_or_slip_num in zip(
+                df["Details"], df["Posting Date"], df["Description"], df["Amount"], df["Type"],
+                df["Balance"], df["Check or Slip #"])
+        ]
+        account_aliases = [self._account_alias] * len(transaction_ids)
 
         # Insert transaction ID and account alias columns into DataFrame
         df.insert(0, "Transaction ID", transaction_ids, True)
@@ -0,0 +1,371 @@
+import io
+import os
+import sys
+import zipfile
+
+import numpy
+import pandas
+
+try:
+    import pyarrow
+    import pyarrow.csv
+except ImportError:  # pyarrow is optional (pip install kash[archive])
+    pyarrow = None
+
+from src.interface_funcs import MissingDependencyError
+
+STDIN_PATH = "-"  # Path reading the CSV data from standard input
+
+# Compression of the files with these suffixes (pandas infers the others from the path)
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zip": "zip"}
+# Compression of the streams starting with these bytes (standard input and file objects)
+COMPRESSION_MAGIC_NUMBERS = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz", b"PK\x03\x04": "zip"}
+
+# CSV parsing engines: "pyarrow" parses files on several threads, "pandas" is pandas' C parser and
+# "auto" uses pyarrow when it's installed and supports the input, and pandas otherwise
+CSV_ENGINES = ("auto", "pyarrow", "pandas")
+DEFAULT_CSV_ENGINE = "auto"
+ARROW_COMPRESSIONS = (None, "gzip", "bz2")  # Compressions pyarrow decompresses while it parses
+
+DEPENDENCY_HELP = ("\nTroubleshooting help: The pyarrow CSV engine needs pyarrow, which is not installed."
+                   " Install it with \"pip install kash[archive]\" or \"pip install pyarrow\", or use"
+                   " \"--csv-engine pandas\".")
+
+
+def strip_compression_suffix(path: str) -> str:
+    """
+    Remove the compression suffix of a path ("activity.csv.gz" -> "activity.csv").
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        str: The path without its compression suffix, if any.
+    """
+    root, ext = os.path.splitext(path)
+    return root if ext.lower() in COMPRESSION_SUFFIXES else path
+
+
+def _detect_compression(stream) -> str:
+    """
+    Get the compression of a binary stream from its first bytes, without consuming them.
+
+    Args:
+        stream: Binary stream supporting peek() (e.g. sys.stdin.buffer).
+
+    Returns:
+        str: "gzip", "bz2", "xz" or "zip", or None when the stream isn't compressed.
+    """
+    head = stream.peek(6)
+    return next((compression for magic, compression in COMPRESSION_MAGIC_NUMBERS.items()
+                 if head.startswith(magic)), None)
+
+
+def _open_source(source) -> tuple:
+    """
+    Get the data and compression of a CSV source.
+
+    Args:
+        source: Path, STDIN_PATH, or file object.
+
+    Returns:
+        tuple: Path or binary file object of the data (a zip archive read from standard input is
+            buffered in memory) and its compression, or None.
+    """
+    if isinstance(source, str) and source == STDIN_PATH:
+        source = sys.stdin.buffer
+    if isinstance(source, (str, os.PathLike)):
+        compression = COMPRESSION_SUFFIXES.get(os.path.splitext(str(source))[1].lower())
+    elif hasattr(source, "peek"):
+        compression = _detect_compression(source)
+    else:
+        compression = None
+    if compression == "zip" and not isinstance(source, (str, os.PathLike)):
+        source = io.BytesIO(source.read())
+    return source, compression
+
+
+def _read_csv_with_pandas(source, skip_rows: int, header: bool, names: list, text_columns: list,
+                         compression: str = None) -> pandas.DataFrame:
+    """
+    Parse CSV data with pandas' C parser.
+
+    Text columns go through str converters, which pandas 2.2 runs faster than dtype=str.
+
+    Args:
+        source: Path or binary file object.
+        skip_rows (int): Number of lines skipped at the start.
+        header (bool): The first line after the skipped ones names the columns.
+        names (list): Column names when there is no header line, or None to number the columns.
+        text_columns (list): Columns kept as text.
+        compression (str, optional): Compression of the data.
+
+    Returns:
+        pandas.DataFrame: The rows read.
+    """
+    return pandas.read_csv(source, header=0 if header else None, skiprows=skip_rows, names=names,
+                           compression=compression, converters={column: str for column in text_columns})
+
+
+def _read_csv_with_arrow(path: str, skip_rows: int, header: bool, names: list,
+                         text_columns: list) -> pandas.DataFrame:
+    """
+    Parse a CSV file with pyarrow, on several threads.
+
+    Text columns are typed as strings while they are parsed, and the other columns are typed like
+    pandas' C parser types them: dates stay text and empty columns are floats. Rows may have more
+    fields than there are names (e.g. the trailing comma of Chase exports), the missing columns
+    are added empty.
+
+    Args:
+        path (str): Path to the file, plain, gzip or bz2 compressed.
+        skip_rows (int): Number of lines skipped at the start.
+        header (bool): The first line after the skipped ones names the columns.
+        names (list): Column names when there is no header line, or None to number the columns.
+        text_columns (list): Columns kept as text.
+
+    Returns:
+        pandas.DataFrame: The rows read.
+
+    Raises:
+        ValueError: If the rows don't have the same number of fields or have more fields than
+            there are names (pyarrow.ArrowInvalid is a ValueError).
+    """
+    if header:
+        column_types = {column: pyarrow.string() for column in text_columns}
+    else:
+        column_types = {f"f{names.index(column)}": pyarrow.string() for column in text_columns}
+    table = pyarrow.csv.read_csv(
+        path,
+        read_options=pyarrow.csv.ReadOptions(skip_rows=skip_rows, autogenerate_column_names=not header),
+        convert_options=pyarrow.csv.ConvertOptions(column_types=column_types, strings_can_be_null=True))
+    if names is not None and table.num_columns > len(names):
+        raise ValueError(f"Expected at most {len(names)} fields per row, got {table.num_columns}")
+
+    columns = []
+    for column in table.columns:
+        if pyarrow.types.is_temporal(column.type):
+            column = column.cast(pyarrow.string())
+        elif pyarrow.types.is_null(column.type):
+            column = column.cast(pyarrow.float64())
+        columns.append(column)
+    df = pyarrow.Table.from_arrays(columns, names=table.column_names).to_pandas()
+    for name, column in zip(table.column_names, columns):
+        if pyarrow.types.is_string(column.type) and column.null_count:
+            df[name] = df[name].where(df[name].notna(), numpy.nan)  # Missing text is NaN, not None
+    if header:
+        return df
+    if names is None:
+        df.columns = range(len(df.columns))
+        return df
+    df.columns = names[:len(df.columns)]
+    return df.reindex(columns=names)
+
+
+def _read_zip_members(zip_file, skip_rows: int, header: bool, names: list, text_columns: list) -> pandas.DataFrame:
+    """
+    Read every CSV member of a zip archive and concatenate them in archive order.
+
+    Each member is decompressed as it's parsed; directories and macOS metadata are skipped.
+
+    Args:
+        zip_file: Path or seekable binary file object of the archive.
+        skip_rows (int): Number of lines skipped at the start of each member.
+        header (bool): The first line after the skipped ones names the columns.
+        names (list): Column names when there is no header line, or None to number the columns.
+        text_columns (list): Columns kept as text.
+
+    Returns:
+        pandas.DataFrame: Rows of every member.
+
+    Raises:
+        ValueError: If the archive has no member.
+    """
+    with zipfile.ZipFile(zip_file) as archive:
+        members = [member for member in archive.infolist()
+                   if not member.is_dir() and not member.filename.startswith("__MACOSX/")]
+        if not members:
+            raise ValueError(f"No CSV file in the zip archive {zip_file}")
+        dfs = []
+        for member in members:
+            with archive.open(member) as member_file:
+                dfs.append(_read_csv_with_pandas(member_file, skip_rows, header, names, text_columns))
+    return pandas.concat(dfs, ignore_index=True)
+
+
+def resolve_csv_engine(engine: str = DEFAULT_CSV_ENGINE) -> str:
+    """
+    Get the engine parsing CSV files.
+
+    Args:
+        engine (str, optional): One of CSV_ENGINES.
+
+    Returns:
+        str: "pyarrow" or "pandas".
+
+    Raises:
+        ValueError: If the engine is unknown.
+        MissingDependencyError: If the pyarrow engine is requested and pyarrow is not installed.
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Unknown CSV engine {engine!r}, expected one of {', '.join(CSV_ENGINES)}")
+    if engine == "pyarrow" and pyarrow is None:
+        raise MissingDependencyError(f"pyarrow is not installed.{DEPENDENCY_HELP}")
+    if engine == "auto":
+        return "pandas" if pyarrow is None else "pyarrow"
+    return engine
+
+
+def read_csv_input(source, skip_rows: int = 0, header: bool = True, names: list = None,
+                   text_columns: list = (), engine: str = DEFAULT_CSV_ENGINE) -> pandas.DataFrame:
+    """
+    Read CSV data from a plain or compressed file, or from standard input.
+
+    Paths ending with .gz, .bz2 or .xz are decompressed while they are parsed, and every member of
+    a .zip archive is read. Standard input ("-") and binary file objects are decompressed the same
+    way when their first bytes show a compression format. A zip archive read from standard input
+    is buffered in memory, since zip archives can only be read from seekable files.
+
+    Plain, gzip and bz2 files are parsed by the pyarrow engine when it's selected; other inputs,
+    and files pyarrow can't parse with the "auto" engine, are parsed by pandas. Text columns are
+    kept as strings, missing values becoming "".
+
+    Args:
+        source: Path, STDIN_PATH, or file object.
+        skip_rows (int, optional): Number of lines skipped at the start.
+        header (bool, optional): The first line after the skipped ones names the columns. Otherwise
+            the columns are numbered.
+        names (list, optional): Column names, replacing the header line if there is one.
+        text_columns (list, optional): Columns kept as text.
+        engine (str, optional): One of CSV_ENGINES.
+
+    Returns:
+        pandas.DataFrame: The rows read.
+
+    Raises:
+        ValueError: If a zip archive has no member, or if the engine is unknown.
+        MissingDependencyError: If the pyarrow engine is requested and pyarrow is not installed.
+    """
+    use_arrow = resolve_csv_engine(engine) == "pyarrow"
+    if names is not None and header:
+        skip_rows, header = skip_rows + 1, False
+    source, compression = _open_source(source)
+
+    if compression == "zip":
+        df = _read_zip_members(source, skip_rows, header, names, text_columns)
+    elif use_arrow and isinstance(source, (str, os.PathLike)) and compression in ARROW_COMPRESSIONS:
+        try:
+            df = _read_csv_with_arrow(str(source), skip_rows, header, names, text_columns)
+        except ValueError:
+            if engine == "pyarrow":
+                raise
+            df = _read_csv_with_pandas(source, skip_rows, header, names, text_columns, compression)
+    else:
+        df = _read_csv_with_pandas(source, skip_rows, header, names, text_columns, compression)
+    for column in text_columns:
+        df[column] = df[column].fillna("")
+    return df
+
+
+class CSVChunkReader:
+    """
+    Reads CSV data chunk by chunk, from the same inputs as read_csv_input.
+
+    Chunks are parsed by pandas' C parser, which can stop after any number of rows, so the size of
+    each chunk can be chosen once the previous one is processed. The members of a zip archive are
+    read one after the other; a chunk never spans two members.
+
+    Attributes:
+        _text_columns (list): Columns kept as text.
+        _readers: Generator of the pandas readers of the data (one per zip member).
+        _reader: pandas reader of the current member, or None once every chunk was read.
+    """
+    def __init__(self, source, skip_rows: int = 0, header: bool = True, names: list = None,
+                 text_columns: list = ()) -> None:
+        """
+        Initialize CSVChunkReader.
+
+        Args:
+            source: Path, STDIN_PATH, or file object.
+            skip_rows (int, optional): Number of lines skipped at the start (of each zip member).
+            header (bool, optional): The first line after the skipped ones names the columns.
+                Otherwise the columns are numbered.
+            names (list, optional): Column names, replacing the header line if there is one.
+            text_columns (list, optional): Columns kept as text.
+
+        Raises:
+            ValueError: If a zip archive has no member.
+        """
+        if names is not None and header:
+            skip_rows, header = skip_rows + 1, False
+        self._text_columns = text_columns
+        read_csv_kwargs = dict(header=0 if header else None, skiprows=skip_rows, names=names,
+                               converters={column: str for column in text_columns}, iterator=True)
+        self._readers = self._open_readers(source, read_csv_kwargs)
+        self._reader = next(self._readers, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def _open_readers(source, read_csv_kwargs: dict):
+        """
+        Open a pandas reader for the data, or for each member of a zip archive.
+
+        Args:
+            source: Path, STDIN_PATH, or file object.
+            read_csv_kwargs (dict): Options of pandas.read_csv.
+
+        Yields:
+            pandas.io.parsers.TextFileReader: Reader of the data or of a zip member.
+
+        Raises:
+            ValueError: If a zip archive has no member.
+        """
+        source, compression = _open_source(source)
+        if compression != "zip":
+            with pandas.read_csv(source, compression=compression, **read_csv_kwargs) as reader:
+                yield reader
+            return
+        with zipfile.ZipFile(source) as archive:
+            members = [member for member in archive.infolist()
+                       if not member.is_dir() and not member.filename.startswith("__MACOSX/")]
+            if not members:
+                raise ValueError(f"No CSV file in the zip archive {source}")
+            for member in members:
+                with archive.open(member) as member_file:
+                    with pandas.read_csv(member_file, **read_csv_kwargs) as reader:
+                        yield reader
+
+    def read(self, rows: int) -> pandas.DataFrame:
+        """
+        Read the next chunk.
+
+        Args:
+            rows (int): Maximum number of rows of the chunk.
+
+        Returns:
+            pandas.DataFrame: The rows read, or None when every row was read.
+        """
+        while self._reader is not None:
+            try:
+                df = self._reader.get_chunk(rows)
+            except StopIteration:
+                df = None
+            if df is None or df.empty:
+                self._reader = next(self._readers, None)
+                continue
+            for column in self._text_columns:
+                df[column] = df[column].fillna("")
+            return df
+        return None
+
+    def close(self) -> None:
+        """
+        Close the input.
+        """
+        self._reader = None
+        self._readers.close()
@@ -0,0 +1,611 @@
+import os
+import re
+import shutil
+import sqlite3
+import hashlib
+import zipfile
+import posixpath
+from datetime import date
+from xml.sax.saxutils import escape, quoteattr
+import xml.etree.ElementTree as ElementTree
+
+import numpy
+import pandas
+
+# SQL queries
+SELECT_BANK_ACTIVITY_SIGNATURE = \
+    """SELECT COUNT(*), MAX(ID), (SELECT Value FROM kash_metadata WHERE Key = 'category_rules_fingerprint') FROM bank_activity;"""
+# The unary "+" makes SQLite sort the table scan, which is faster than looking every row up from the posting date index
+SELECT_TRANSACTIONS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Posting_Date AS "Posting Date", Account_Alias AS "Account Alias", Description, Category, Amount, CAST(NULLIF(TRIM(Balance), '') AS REAL) AS Balance, Type FROM bank_activity ORDER BY +Posting_Date DESC, ID ASC LIMIT ?;"""
+SELECT_MONTHLY_TOTALS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT date(Posting_Date, 'start of month') AS "Month", Account_Alias AS "Account Alias", ROUND(TOTAL(CASE WHEN Amount > 0 THEN Amount END), 2) AS "Income", ROUND(-TOTAL(CASE WHEN Amount < 0 THEN Amount END), 2) AS "Spending", ROUND(TOTAL(Amount), 2) AS "Net", COUNT(*) AS "Transactions" FROM bank_activity GROUP BY 1, 2 ORDER BY 1 DESC, 2 LIMIT ?;"""
+SELECT_CATEGORY_TOTALS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT date(Posting_Date, 'start of month') AS "Month", COALESCE(Category, 'Uncategorized') AS "Category", ROUND(-TOTAL(Amount), 2) AS "Spending", COUNT(*) AS "Transactions" FROM bank_activity WHERE Amount < 0 GROUP BY 1, 2 ORDER BY 1 DESC, 3 DESC LIMIT ?;"""
+SELECT_BALANCES_FROM_BALANCE_SNAPSHOTS_TABLE = \
+    """SELECT Snapshot_Date AS "Date", Account_Alias AS "Account Alias", Balance FROM balance_snapshots ORDER BY 1 DESC, 2 LIMIT ?;"""
+SELECT_BUDGETS_FROM_BUDGET_TOTALS_TABLE = \
+    """SELECT b.Name AS "Budget", b.Period AS "Period", t.Period_Start AS "Period Start", b.Amount AS "Limit", ROUND(t.Spent, 2) AS "Spent", t.Transactions AS "Transactions" FROM budget_totals t JOIN budgets b ON b.ID = t.Budget_ID ORDER BY 1, 3 DESC LIMIT ?;"""
+SELECT_PENDING_FROM_PENDING_TRANSACTIONS_TABLE = \
+    """SELECT Posting_Date AS "Posting Date", Account_Alias AS "Account Alias", Description, Amount FROM pending_transactions ORDER BY Posting_Date DESC, ID ASC LIMIT ?;"""
+
+# Data sheets, in workbook order: (query, signature query). A sheet is rewritten when the result of
+# its signature query changes, or when its rows change if it has none (small sheets).
+DASHBOARD_SHEETS = {
+    "Transactions": (SELECT_TRANSACTIONS_FROM_BANK_ACTIVITY_TABLE, SELECT_BANK_ACTIVITY_SIGNATURE),
+    "Monthly Totals": (SELECT_MONTHLY_TOTALS_FROM_BANK_ACTIVITY_TABLE, SELECT_BANK_ACTIVITY_SIGNATURE),
+    "Category Totals": (SELECT_CATEGORY_TOTALS_FROM_BANK_ACTIVITY_TABLE, SELECT_BANK_ACTIVITY_SIGNATURE),
+    "Balances": (SELECT_BALANCES_FROM_BALANCE_SNAPSHOTS_TABLE, None),
+    "Budgets": (SELECT_BUDGETS_FROM_BUDGET_TOTALS_TABLE, None),
+    "Pending": (SELECT_PENDING_FROM_PENDING_TRANSACTIONS_TABLE, None),
+}
+DATE_COLUMNS = {"Posting Date", "Month", "Date", "Period Start"}  # Written as Excel dates
+MAX_SHEET_ROWS = 1048575  # Excel's row limit, less the header
+WRITE_BATCH_SIZE = 10000  # Rows fetched and written at a time
+COMPRESS_LEVEL = 1  # Deflate level of the parts written; higher levels are several times slower for ~10% smaller files
+
+EXCEL_EPOCH = date(1899, 12, 30)  # Day 0 of Excel's date serial numbers
+DATE_NUMBER_FORMAT_ID = 14  # Built-in short date format
+SIGNATURE_PROPERTY_PREFIX = "Kash "  # Custom document properties holding the signature of each sheet
+
+# Open Packaging Conventions namespaces, relationship types and content types
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CUSTOM_PROPERTIES_NS = "http://schemas.openxmlformats.org/officeDocument/2006/custom-properties"
+VARIANT_TYPES_NS = "http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes"
+CUSTOM_PROPERTIES_FMTID = "{D5CDD505-2E9C-101B-9397-08002B2CF9AE}"
+WORKSHEET_RELATIONSHIP = RELATIONSHIPS_NS + "/worksheet"
+CALC_CHAIN_RELATIONSHIP = RELATIONSHIPS_NS + "/calcChain"
+CUSTOM_PROPERTIES_RELATIONSHIP = RELATIONSHIPS_NS + "/custom-properties"
+WORKSHEET_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+CUSTOM_PROPERTIES_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.custom-properties+xml"
+
+CONTENT_TYPES_PART = "[Content_Types].xml"
+PACKAGE_RELS_PART = "_rels/.rels"
+WORKBOOK_PART = "xl/workbook.xml"
+WORKBOOK_RELS_PART = "xl/_rels/workbook.xml.rels"
+STYLES_PART = "xl/styles.xml"
+CUSTOM_PROPERTIES_PART = "docProps/custom.xml"
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+# Parts of a new workbook, before its sheets are added
+NEW_WORKBOOK_PARTS = {
+    CONTENT_TYPES_PART: XML_DECLARATION + (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'),
+    PACKAGE_RELS_PART: XML_DECLARATION + (
+        f'<Relationships xmlns="{PACKAGE_RELATIONSHIPS_NS}">'
+        f'<Relationship Id="rId1" Type="{RELATIONSHIPS_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'),
+    WORKBOOK_PART: XML_DECLARATION + (
+        f'<workbook xmlns="{MAIN_NS}" xmlns:r="{RELATIONSHIPS_NS}"><sheets></sheets></workbook>'),
+    WORKBOOK_RELS_PART: XML_DECLARATION + (
+        f'<Relationships xmlns="{PACKAGE_RELATIONSHIPS_NS}">'
+        f'<Relationship Id="rId1" Type="{RELATIONSHIPS_NS}/styles" Target="styles.xml"/>'
+        '</Relationships>'),
+    STYLES_PART: XML_DECLARATION + (
+        f'<styleSheet xmlns="{MAIN_NS}">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'),
+}
+
+# Characters XML 1.0 doesn't allow, even escaped
+ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def column_letter(column_idx: int) -> str:
+    """
+    Get the letters of a spreadsheet column.
+
+    Args:
+        column_idx (int): Column index, from 0.
+
+    Returns:
+        str: Column letters ("A", ..., "Z", "AA", ...).
+    """
+    letters = ""
+    column_idx += 1
+    while column_idx:
+        column_idx, remainder = divmod(column_idx - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def to_excel_date(value):
+    """
+    Convert a YYYY-MM-DD date to an Excel date serial number.
+
+    Args:
+        value: Date string.
+
+    Returns:
+        int: Serial number, or None if the value isn't a date.
+    """
+    try:
+        return (date.fromisoformat(value) - EXCEL_EPOCH).days
+    except (TypeError, ValueError):
+        return None
+
+
+def cell_contents(values, date_column: bool, date_style: int) -> list:
+    """
+    Build the XML of cells after their reference: a number, a date serial number for the dates of
+    a date column, or an inline string.
+
+    Args:
+        values: Distinct values.
+        date_column (bool): Whether the text values are YYYY-MM-DD dates.
+        date_style (int): Index of the cell format of dates.
+
+    Returns:
+        list: XML of each value's cell, starting after the cell reference ("" for NaN and infinities).
+    """
+    contents = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            contents.append(f'"><v>{value!r}</v></c>' if value - value == 0 else "")
+            continue
+        serial = to_excel_date(value) if date_column else None
+        if serial is not None:
+            contents.append(f'" s="{date_style}"><v>{serial}</v></c>')
+        else:
+            text = escape(ILLEGAL_XML_CHARS.sub("", str(value)))
+            contents.append(f'" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return contents
+
+
+def sheet_rows_xml(rows: list, first_row_num: int, columns: list, date_style: int) -> str:
+    """
+    Build the XML of a batch of worksheet rows.
+
+    The cells are built a column at a time with vectorized string concatenation. The XML of the
+    values of text columns is built once per distinct value, since descriptions and dates repeat a
+    lot. Empty cells (None, NaN) are left out.
+
+    Args:
+        rows (list): Row tuples.
+        first_row_num (int): Row number of the first row (from 1).
+        columns (list): Column names; the DATE_COLUMNS are written as Excel dates.
+        date_style (int): Index of the cell format of dates.
+
+    Returns:
+        str: XML of the rows.
+    """
+    df = pandas.DataFrame.from_records(rows, columns=range(len(columns)), coerce_float=False)
+    row_nums = pandas.Series(numpy.arange(first_row_num, first_row_num + len(rows)).astype(str))
+    xml = '<row r="' + row_nums + '">'
+    for column_idx, column in enumerate(columns):
+        values = df[column_idx]
+        prefix = f'<c r="{column_letter(column_idx)}' + row_nums
+        if values.dtype.kind in "iuf":
+            valid = numpy.isfinite(values.to_numpy(dtype=float))
+            cells = prefix + '"><v>' + values.astype(str) + "</v></c>"
+        else:
+            codes, uniques = pandas.factorize(values)
+            contents = cell_contents(uniques, column in DATE_COLUMNS, date_style)
+            valid = numpy.array([content != "" for content in contents] + [False])[codes]
+            cells = prefix + numpy.array(contents + [""], dtype=object)[codes]
+        xml = xml + cells.where(valid, "")
+    return "".join((xml + "</row>").tolist())
+
+
+def write_sheet(out, columns: list, row_batches, date_style: int) -> int:
+    """
+    Write a worksheet part, streaming the rows. Strings are written inline, so the sheet doesn't
+    depend on the workbook's shared strings.
+
+    Args:
+        out: Binary file object of the part.
+        columns (list): Column names, written as the first row.
+        row_batches: Iterable of lists of row tuples.
+        date_style (int): Index of the cell format of the DATE_COLUMNS.
+
+    Returns:
+        int: Number of rows written, without the header.
+    """
+    out.write((XML_DECLARATION + f'<worksheet xmlns="{MAIN_NS}"><sheetData>').encode())
+    header = "".join(f'<c r="{column_letter(column_idx)}1{content}'
+                     for column_idx, content in enumerate(cell_contents(columns, False, date_style)))
+    out.write(f'<row r="1">{header}</row>'.encode())
+    rows_written = 0
+    for rows in row_batches:
+        if rows:
+            out.write(sheet_rows_xml(rows, rows_written + 2, columns, date_style).encode())
+            rows_written += len(rows)
+    out.write(b"</sheetData></worksheet>")
+    return rows_written
+
+
+def add_date_style(styles_xml: str) -> tuple:
+    """
+    Find the cell format of dates in a styles part, adding it if the workbook has none.
+
+    Args:
+        styles_xml (str): Content of xl/styles.xml.
+
+    Returns:
+        tuple: Index of the date cell format, and the (possibly updated) styles part.
+    """
+    cell_xfs = re.search(r"<cellXfs\b[^>]*?(?:/>|>(.*?)</cellXfs>)", styles_xml, re.DOTALL)
+    xfs = re.findall(r"<xf\b[^>]*?(?:/>|>.*?</xf>)", cell_xfs.group(1) or "", re.DOTALL) if cell_xfs else []
+    for xf_idx, xf in enumerate(xfs):
+        if re.match(rf'<xf\b[^>]*\bnumFmtId="{DATE_NUMBER_FORMAT_ID}"', xf):
+            return xf_idx, styles_xml
+    date_xf = f'<xf numFmtId="{DATE_NUMBER_FORMAT_ID}" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    new_cell_xfs = f'<cellXfs count="{len(xfs) + 1}">{"".join(xfs)}{date_xf}</cellXfs>'
+    if cell_xfs:
+        styles_xml = styles_xml[:cell_xfs.start()] + new_cell_xfs + styles_xml[cell_xfs.end():]
+    else:
+        styles_xml = re.sub(r"(</cellStyleXfs>|</borders>)", lambda match: match.group(1) + new_cell_xfs,
+                            styles_xml, count=1)
+    return len(xfs), styles_xml
+
+
+def read_signatures(custom_xml: str) -> dict:
+    """
+    Read the sheet signatures stored in the custom document properties.
+
+    Args:
+        custom_xml (str): Content of docProps/custom.xml.
+
+    Returns:
+        dict: Signature by sheet name.
+    """
+    signatures = {}
+    for prop in ElementTree.fromstring(custom_xml).iter(f"{{{CUSTOM_PROPERTIES_NS}}}property"):
+        name = prop.get("name", "")
+        if name.startswith(SIGNATURE_PROPERTY_PREFIX):
+            signatures[name[len(SIGNATURE_PROPERTY_PREFIX):]] = "".join(prop.itertext())
+    return signatures
+
+
+def write_signatures(custom_xml: str, signatures: dict) -> str:
+    """
+    Store the sheet signatures in the custom document properties, keeping the other properties.
+
+    Args:
+        custom_xml (str): Content of docProps/custom.xml, or None when the workbook has none.
+        signatures (dict): Signature by sheet name.
+
+    Returns:
+        str: New content of docProps/custom.xml.
+    """
+    properties = []
+    if custom_xml:
+        for prop in re.findall(r"<(?:\w+:)?property\b.*?</(?:\w+:)?property>", custom_xml, re.DOTALL):
+            name = re.search(r'\bname="([^"]*)"', prop)
+            if not (name and name.group(1).startswith(SIGNATURE_PROPERTY_PREFIX)):
+                properties.append(prop)
+    properties = [re.sub(r'\bpid="\d+"', f'pid="{pid}"', prop, count=1) for pid, prop in enumerate(properties, 2)]
+    for pid, (sheet_name, signature) in enumerate(signatures.items(), len(properties) + 2):
+        properties.append(f'<property fmtid="{CUSTOM_PROPERTIES_FMTID}" pid="{pid}" '
+                          f'name={quoteattr(SIGNATURE_PROPERTY_PREFIX + sheet_name)}>'
+                          f'<vt:lpwstr>{escape(signature)}</vt:lpwstr></property>')
+    return XML_DECLARATION + (f'<Properties xmlns="{CUSTOM_PROPERTIES_NS}" xmlns:vt="{VARIANT_TYPES_NS}">'
+                              f'{"".join(properties)}</Properties>')
+
+
+def insert_before(xml: str, closing_tag: str, fragment: str) -> str:
+    """
+    Insert an XML fragment before the last occurrence of a closing tag.
+
+    The workbook parts are edited as text rather than through an XML parser, so the namespace
+    prefixes and declarations Excel relies on (e.g. mc:Ignorable) are kept as they are.
+
+    Args:
+        xml (str): XML text.
+        closing_tag (str): Closing tag, e.g. "</sheets>".
+        fragment (str): XML fragment.
+
+    Returns:
+        str: Updated XML text.
+    """
+    position = xml.rindex(closing_tag)
+    return xml[:position] + fragment + xml[position:]
+
+
+class DashboardWorkbook:
+    """
+    Writes the data sheets of the Dashboard workbook straight from the database.
+
+    Each data sheet (DASHBOARD_SHEETS) has a signature: a hash of a cheap query on the tables it is
+    built from, or of its rows for small sheets. Signatures are stored in the workbook's custom
+    document properties, which Excel keeps when it saves the workbook, and an export only rewrites
+    the sheets whose signature changed. The other parts of the workbook (the Dashboard's own sheets,
+    charts, formulas) are copied as they are, and the new workbook is written to a temporary file
+    first, so an interrupted export leaves the previous workbook intact.
+
+    Sheets are streamed from the database cursor as XML, without loading them in memory. Their
+    content replaces the previous data sheet; formulas referencing them should use whole columns
+    (e.g. Transactions!E:E) since the number of rows changes. Formulas are recalculated when the
+    workbook is next opened.
+
+    Attributes:
+        path (str): Path to the workbook (.xlsx). It's created if it doesn't exist.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Initialize DashboardWorkbook.
+
+        Args:
+            path (str): Path to the workbook (.xlsx).
+        """
+        self.path = path
+
+    def _read_parts(self) -> dict:
+        """
+        Read the parts of the workbook the export edits.
+
+        Returns:
+            dict: Content of each edited part by name (None for a missing part), plus "names", the
+                names of every part in the workbook.
+        """
+        if not os.path.isfile(self.path):
+            parts = dict(NEW_WORKBOOK_PARTS)
+            parts[CUSTOM_PROPERTIES_PART] = None
+            parts["names"] = []
+            return parts
+        with zipfile.ZipFile(self.path) as workbook:
+            names = workbook.namelist()
+            parts = {name: workbook.read(name).decode("utf-8") if name in names else None
+                     for name in (CONTENT_TYPES_PART, PACKAGE_RELS_PART, WORKBOOK_PART, WORKBOOK_RELS_PART,
+                                  STYLES_PART, CUSTOM_PROPERTIES_PART)}
+        if parts[WORKBOOK_PART] is None:
+            raise ValueError(f"{self.path} is not an Excel workbook")
+        if parts[STYLES_PART] is None:
+            parts[STYLES_PART] = NEW_WORKBOOK_PARTS[STYLES_PART]
+        parts["names"] = names
+        return parts
+
+    @staticmethod
+    def _get_sheet_parts(parts: dict) -> dict:
+        """
+        Map the sheet names of the workbook to their worksheet parts. Names are casefolded, since
+        Excel sheet names are case-insensitive.
+
+        Args:
+            parts (dict): Output of _read_parts().
+
+        Returns:
+            dict: Part name (e.g. "xl/worksheets/sheet1.xml") by casefolded sheet name.
+        """
+        targets = {
+            relationship.get("Id"): relationship.get("Target")
+            for relationship in ElementTree.fromstring(parts[WORKBOOK_RELS_PART])
+        }
+        sheet_parts = {}
+        for sheet in ElementTree.fromstring(parts[WORKBOOK_PART]).iter(f"{{{MAIN_NS}}}sheet"):
+            target = targets.get(sheet.get(f"{{{RELATIONSHIPS_NS}}}id"), "")
+            part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            sheet_parts[sheet.get("name").casefold()] = part
+        return sheet_parts
+
+    @staticmethod
+    def _get_signature(conn: sqlite3.Connection, query: str, signature_query: str, signature_results: dict) -> tuple:
+        """
+        Compute the signature of a data sheet.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+            query (str): Query of the sheet.
+            signature_query (str): Query whose result changes when the sheet does, or None.
+            signature_results (dict): Results of the signature queries already run, by query.
+
+        Returns:
+            tuple: Signature, and the rows of the sheet when they were read to compute it (else None).
+        """
+        digest = hashlib.sha256(query.encode())
+        rows = None
+        if signature_query:
+            if signature_query not in signature_results:
+                signature_results[signature_query] = conn.execute(signature_query).fetchall()
+            digest.update(repr(signature_results[signature_query]).encode())
+        else:
+            rows = conn.execute(query, (MAX_SHEET_ROWS,)).fetchall()
+            digest.update(repr(rows).encode())
+        return digest.hexdigest(), rows
+
+    def export(self, conn: sqlite3.Connection, rebuild: bool = False) -> pandas.DataFrame:
+        """
+        Write the data sheets whose source data changed since the last export.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+            rebuild (bool, optional): Rewrite every data sheet.
+
+        Returns:
+            pandas.DataFrame: Columns "Sheet", "Rows" (None for the sheets left as they were) and
+                "Status", one row per data sheet.
+
+        Raises:
+            ValueError: If the file is not an Excel workbook.
+        """
+        parts = self._read_parts()
+        sheet_parts = self._get_sheet_parts(parts)
+        signatures = read_signatures(parts[CUSTOM_PROPERTIES_PART]) if parts[CUSTOM_PROPERTIES_PART] else {}
+
+        changed = {}
+        signature_results = {}
+        for sheet_name, (query, signature_query) in DASHBOARD_SHEETS.items():
+            signature, rows = self._get_signature(conn, query, signature_query, signature_results)
+            if rebuild or sheet_name.casefold() not in sheet_parts or signatures.get(sheet_name) != signature:
+                changed[sheet_name] = rows
+            signatures[sheet_name] = signature
+        summary = [{"Sheet": sheet_name, "Rows": None, "Status": "unchanged"} for sheet_name in DASHBOARD_SHEETS]
+        if not changed:
+            return pandas.DataFrame(summary).astype({"Rows": "Int64"})
+
+        new_parts = self._add_sheets(parts, sheet_parts,
+                                     [name for name in changed if name.casefold() not in sheet_parts])
+        date_style, parts[STYLES_PART] = add_date_style(parts[STYLES_PART])
+        parts[CUSTOM_PROPERTIES_PART] = write_signatures(parts[CUSTOM_PROPERTIES_PART], signatures)
+        self._drop_calc_chain(parts)
+
+        rows_written = {}
+
+        def write_changed_sheet(out, sheet_name):
+            query = DASHBOARD_SHEETS[sheet_name][0]
+            rows = changed[sheet_name]
+            if rows is None:
+                cursor = conn.execute(query, (MAX_SHEET_ROWS,))
+                row_batches = iter(lambda: cursor.fetchmany(WRITE_BATCH_SIZE), [])
+            else:
+                cursor = conn.execute(query, (0,))
+                row_batches = [rows]
+            columns = [description[0] for description in cursor.description]
+            rows_written[sheet_name] = write_sheet(out, columns, row_batches, date_style)
+
+        sheet_writers = {sheet_parts[sheet_name.casefold()]: sheet_name for sheet_name in changed}
+        self._write_package(parts, new_parts, sheet_writers, write_changed_sheet)
+
+        for row in summary:
+            if row["Sheet"] in rows_written:
+                row["Rows"] = rows_written[row["Sheet"]]
+                row["Status"] = "truncated" if row["Rows"] == MAX_SHEET_ROWS else "written"
+        return pandas.DataFrame(summary).astype({"Rows": "Int64"})
+
+    @staticmethod
+    def _add_sheets(parts: dict, sheet_parts: dict, sheet_names: list) -> list:
+        """
+        Add new worksheets to the workbook, its relationships and its content types.
+
+        Args:
+            parts (dict): Output of _read_parts(), updated in place.
+            sheet_parts (dict): Output of _get_sheet_parts(), updated in place.
+            sheet_names (list): Names of the sheets to add.
+
+        Returns:
+            list: Names of the new parts.
+        """
+        new_parts = []
+        existing_parts = set(parts["names"]) | set(sheet_parts.values())
+        relationship_ids = set(re.findall(r'\bId="([^"]+)"', parts[WORKBOOK_RELS_PART]))
+        sheet_ids = [int(sheet_id) for sheet_id in re.findall(r'<(?:\w+:)?sheet\b[^>]*\bsheetId="(\d+)"',
+                                                                  parts[WORKBOOK_PART])]
+        prefix = re.search(rf'xmlns:(\w+)="{re.escape(RELATIONSHIPS_NS)}"', parts[WORKBOOK_PART])
+        id_attribute = f"{prefix.group(1)}:id" if prefix else f'xmlns:r="{RELATIONSHIPS_NS}" r:id'
+        for sheet_name in sheet_names:
+            part_idx = 1
+            while f"xl/worksheets/sheet{part_idx}.xml" in existing_parts:
+                part_idx += 1
+            part = f"xl/worksheets/sheet{part_idx}.xml"
+            relationship_idx = 1
+            while f"rId{relationship_idx}" in relationship_ids:
+                relationship_idx += 1
+            relationship_id = f"rId{relationship_idx}"
+            sheet_id = max(sheet_ids, default=0) + 1
+
+            parts[WORKBOOK_PART] = insert_before(
+                parts[WORKBOOK_PART], "</sheets>" if "</sheets>" in parts[WORKBOOK_PART] else "</workbook>",
+                f'<sheet name={quoteattr(sheet_name)} sheetId="{sheet_id}" {id_attribute}="{relationship_id}"/>')
+            parts[WORKBOOK_RELS_PART] = insert_before(
+                parts[WORKBOOK_RELS_PART], "</Relationships>",
+                f'<Relationship Id="{relationship_id}" Type="{WORKSHEET_RELATIONSHIP}" '
+                f'Target="worksheets/sheet{part_idx}.xml"/>')
+            parts[CONTENT_TYPES_PART] = insert_before(
+                parts[CONTENT_TYPES_PART], "</Types>",
+                f'<Override PartName="/{part}" ContentType="{WORKSHEET_CONTENT_TYPE}"/>')
+
+            existing_parts.add(part)
+            relationship_ids.add(relationship_id)
+            sheet_ids.append(sheet_id)
+            sheet_parts[sheet_name.casefold()] = part
+            new_parts.append(part)
+
+        if f'PartName="/{CUSTOM_PROPERTIES_PART}"' not in parts[CONTENT_TYPES_PART]:
+            parts[CONTENT_TYPES_PART] = insert_before(
+                parts[CONTENT_TYPES_PART], "</Types>",
+                f'<Override PartName="/{CUSTOM_PROPERTIES_PART}" ContentType="{CUSTOM_PROPERTIES_CONTENT_TYPE}"/>')
+        if CUSTOM_PROPERTIES_RELATIONSHIP not in parts[PACKAGE_RELS_PART]:
+            package_ids = set(re.findall(r'\bId="([^"]+)"', parts[PACKAGE_RELS_PART]))
+            relationship_idx = 1
+            while f"rId{relationship_idx}" in package_ids:
+                relationship_idx += 1
+            parts[PACKAGE_RELS_PART] = insert_before(
+                parts[PACKAGE_RELS_PART], "</Relationships>",
+                f'<Relationship Id="rId{relationship_idx}" Type="{CUSTOM_PROPERTIES_RELATIONSHIP}" '
+                f'Target="{CUSTOM_PROPERTIES_PART}"/>')
+        return new_parts
+
+    @staticmethod
+    def _drop_calc_chain(parts: dict) -> None:
+        """
+        Remove the calculation chain and have Excel recalculate every formula on open.
+
+        The chain lists the cells with formulas; Excel rebuilds it, and cached formula results are
+        stale once the data sheets change.
+
+        Args:
+            parts (dict): Output of _read_parts(), updated in place.
+        """
+        parts[WORKBOOK_RELS_PART] = re.sub(rf'<Relationship\b[^>]*\bType="{re.escape(CALC_CHAIN_RELATIONSHIP)}"[^>]*/>',
+                                           "", parts[WORKBOOK_RELS_PART])
+        parts[CONTENT_TYPES_PART] = re.sub(r'<Override\b[^>]*\bPartName="/xl/calcChain.xml"[^>]*/>', "",
+                                           parts[CONTENT_TYPES_PART])
+        workbook_xml = parts[WORKBOOK_PART]
+        calc_pr = re.search(r"<(\w+:)?calcPr\b[^>]*?/?>", workbook_xml)
+        if calc_pr:
+            element = re.sub(r'\s+fullCalcOnLoad="[^"]*"', "", calc_pr.group(0))
+            element = re.sub(r"(\s*/?>)$", r' fullCalcOnLoad="1"\1', element)
+            workbook_xml = workbook_xml[:calc_pr.start()] + element + workbook_xml[calc_pr.end():]
+        else:
+            # calcPr follows the sheets, function groups, external references and defined names
+            anchor = max((workbook_xml.rfind(tag) + len(tag) for tag in
+                          ("</sheets>", "</functionGroups>", "</externalReferences>", "</definedNames>")
+                          if tag in workbook_xml), default=None)
+            if anchor is not None:
+                prefix = re.match(r"(?:<\?xml[^>]*\?>\s*)?<(\w+:)?workbook\b", workbook_xml)
+                ns_prefix = prefix.group(1) or "" if prefix else ""
+                workbook_xml = workbook_xml[:anchor] + f'<{ns_prefix}calcPr fullCalcOnLoad="1"/>' + workbook_xml[anchor:]
+        parts[WORKBOOK_PART] = workbook_xml
+
+    def _write_package(self, parts: dict, new_parts: list, sheet_writers: dict, write_changed_sheet) -> None:
+        """
+        Write the workbook to a temporary file, then move it over the previous one.
+
+        Args:
+            parts (dict): Edited parts, output of _read_parts().
+            new_parts (list): Names of the worksheet parts added to the workbook.
+            sheet_writers (dict): Sheet name by worksheet part name, of the sheets to rewrite.
+            write_changed_sheet: Function writing a sheet, called with the part's file object and the
+                sheet name.
+        """
+        edited = {name: content for name, content in parts.items() if name != "names" and content is not None}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as out:
+                # [Content_Types].xml comes first in Excel's own files
+                for name in sorted(edited, key=lambda name: name != CONTENT_TYPES_PART):
+                    out.writestr(name, edited[name])
+                if parts["names"]:
+                    with zipfile.ZipFile(self.path) as workbook:
+                        for info in workbook.infolist():
+                            name = info.filename
+                            if name == "xl/calcChain.xml" or name in edited:
+                                continue
+                            if name in sheet_writers:
+                                with out.open(name, "w", force_zip64=True) as part:
+                                    write_changed_sheet(part, sheet_writers[name])
+                                continue
+                            with workbook.open(info) as source, out.open(name, "w", force_zip64=True) as part:
+                                shutil.copyfileobj(source, part, 1024 * 1024)
+                for name in new_parts:
+                    with out.open(name, "w", force_zip64=True) as part:
+                        write_changed_sheet(part, sheet_writers[name])
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
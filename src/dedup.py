@@ -0,0 +1,314 @@
+import sqlite3
+import difflib
+import hashlib
+
+import numpy
+import pandas
+
+from src.interface_funcs import get_metadata, set_metadata
+from src.fingerprint import (
+    TRANSACTION_ID_SIZE,
+    FINGERPRINT_VERSION,
+    normalize_text,
+    normalize_date,
+    normalize_money
+)
+
+# SQL queries
+SELECT_NEW_TRANSACTION_IDS_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT ID, Transaction_ID FROM bank_activity WHERE ID > ? ORDER BY ID;"
+SELECT_COUNT_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT COUNT(*) FROM bank_activity;"
+SELECT_EXISTING_TRANSACTION_IDS_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT DISTINCT Transaction_ID FROM bank_activity WHERE Transaction_ID IN ({placeholders});"
+
+BLOOM_BITS_METADATA_KEY = "transaction_id_bloom_bits"
+BLOOM_ITEMS_METADATA_KEY = "transaction_id_bloom_items"
+LAST_ID_METADATA_KEY = "transaction_id_bloom_last_id"
+VERSION_METADATA_KEY = "transaction_id_bloom_version"  # Fingerprint version of the saved filter
+
+BITS_PER_ITEM = 10  # About 1% false positives with HASH_COUNT hashes
+HASH_COUNT = 7
+MIN_CAPACITY = 10000  # Items a new filter is sized for, at least
+LOOKUP_BATCH_SIZE = 500  # Transaction IDs per "IN (...)" lookup, below SQLite's parameter limit
+
+NEAR_DUPLICATE_DAYS = 3  # Posting dates of near-duplicates are at most this many days apart
+NEAR_DUPLICATE_SIMILARITY = 0.75  # Minimum similarity ratio of the descriptions of near-duplicates
+NEAR_DUPLICATE_COLUMNS = ["Transaction ID", "Posting Date", "Amount", "Description",
+                          "Stored Posting Date", "Stored Description", "Similarity"]
+
+
+def transaction_ids_in(transaction_ids: pandas.Series, ids) -> pandas.Series:
+    """
+    Check which transaction IDs are in a collection of IDs.
+
+    The IDs are compared as objects: Series.isin() converts a collection of bytes to a fixed-width
+    bytes array, which drops trailing NUL bytes.
+
+    Args:
+        transaction_ids (pandas.Series): Transaction IDs.
+        ids: Collection of transaction IDs, e.g. a set.
+
+    Returns:
+        pandas.Series: Booleans, True for the IDs in the collection.
+    """
+    return transaction_ids.isin(pandas.Index(list(ids), dtype=object))
+
+
+def bloom_keys(transaction_ids: list) -> numpy.ndarray:
+    """
+    Get the two 64-bit hash values of each transaction ID.
+
+    Transaction IDs are already SHA-256 digests, so their bytes are used directly, with the leading
+    fingerprint version byte moved to the end so the low bits of both values vary. IDs in any other
+    form (e.g. from older imports) are hashed first.
+
+    Args:
+        transaction_ids (list): Transaction IDs.
+
+    Returns:
+        numpy.ndarray: uint64 array of shape (number of IDs, 2).
+    """
+    keys = b"".join(
+        transaction_id[1:] + transaction_id[:1]
+        if isinstance(transaction_id, bytes) and len(transaction_id) == TRANSACTION_ID_SIZE
+        else hashlib.sha256(str(transaction_id).encode()).digest()[:TRANSACTION_ID_SIZE]
+        for transaction_id in transaction_ids)
+    return numpy.frombuffer(keys, dtype="<u8").reshape(-1, 2)
+
+
+class BloomFilter:
+    """
+    Bit array answering "definitely not seen" or "maybe seen" for transaction IDs.
+
+    Bit positions are derived from the IDs by double hashing (h1 + i * h2), computed for a whole
+    batch of IDs at once with NumPy.
+
+    Attributes:
+        bits (numpy.ndarray): uint8 array of the bits.
+        items (int): Number of IDs added.
+    """
+    def __init__(self, bits: numpy.ndarray, items: int = 0) -> None:
+        """
+        Initialize BloomFilter.
+
+        Args:
+            bits (numpy.ndarray): uint8 array of the bits.
+            items (int, optional): Number of IDs already added.
+        """
+        self.bits = bits
+        self.items = items
+
+    @classmethod
+    def with_capacity(cls, capacity: int) -> "BloomFilter":
+        """
+        Create an empty filter sized for a number of IDs.
+
+        Args:
+            capacity (int): Number of IDs.
+
+        Returns:
+            BloomFilter: Empty filter.
+        """
+        size = (max(capacity, MIN_CAPACITY) * BITS_PER_ITEM + 7) // 8
+        return cls(numpy.zeros(size, dtype=numpy.uint8))
+
+    @property
+    def capacity(self) -> int:
+        """
+        int: Number of IDs the filter holds before false positives exceed about 1%.
+        """
+        return len(self.bits) * 8 // BITS_PER_ITEM
+
+    def _positions(self, transaction_ids: list) -> numpy.ndarray:
+        """
+        Get the bit positions of each transaction ID.
+
+        Args:
+            transaction_ids (list): Transaction IDs.
+
+        Returns:
+            numpy.ndarray: uint64 array of shape (number of IDs, HASH_COUNT).
+        """
+        keys = bloom_keys(transaction_ids)
+        h1, h2 = keys[:, :1], keys[:, 1:] | numpy.uint64(1)
+        with numpy.errstate(over="ignore"):
+            return (h1 + numpy.arange(HASH_COUNT, dtype=numpy.uint64) * h2) % numpy.uint64(len(self.bits) * 8)
+
+    def add(self, transaction_ids: list) -> None:
+        """
+        Add transaction IDs to the filter.
+
+        Args:
+            transaction_ids (list): Transaction IDs.
+        """
+        if not transaction_ids:
+            return
+        positions = self._positions(transaction_ids).ravel()
+        numpy.bitwise_or.at(self.bits, positions >> numpy.uint64(3),
+                            numpy.left_shift(1, positions & numpy.uint64(7)).astype(numpy.uint8))
+        self.items += len(transaction_ids)
+
+    def might_contain(self, transaction_ids: list) -> numpy.ndarray:
+        """
+        Check transaction IDs against the filter.
+
+        Args:
+            transaction_ids (list): Transaction IDs.
+
+        Returns:
+            numpy.ndarray: Boolean array, False for the IDs that were definitely never added.
+        """
+        if not transaction_ids:
+            return numpy.zeros(0, dtype=bool)
+        positions = self._positions(transaction_ids)
+        bits = (self.bits[positions >> numpy.uint64(3)] >> (positions & numpy.uint64(7)).astype(numpy.uint8)) & 1
+        return bits.all(axis=1)
+
+
+class TransactionIdIndex:
+    """
+    Finds which transaction IDs are already in the bank activity table.
+
+    A Bloom filter of every stored transaction ID is persisted in kash_metadata, so it is committed
+    together with the imported rows. Transaction IDs the filter has never seen are new without
+    querying the table; only the others are looked up, through the transaction ID index. Rows
+    added since the filter was saved (tracked by their ID) are added when it is loaded, and the
+    filter is rebuilt twice as large when it holds more IDs than it was sized for.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+        _bloom_filter (BloomFilter): Filter of the stored transaction IDs, loaded on first use.
+        _last_id (int): Highest bank activity ID added to the filter.
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initialize TransactionIdIndex.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+        """
+        self._conn = conn
+        self._bloom_filter = None
+        self._last_id = 0
+
+    def _load(self) -> BloomFilter:
+        """
+        Load the saved filter and add the rows stored since it was saved.
+
+        Returns:
+            BloomFilter: Filter of every stored transaction ID.
+        """
+        if self._bloom_filter is None:
+            bits = get_metadata(self._conn, BLOOM_BITS_METADATA_KEY)
+            if int(get_metadata(self._conn, VERSION_METADATA_KEY, 0)) != FINGERPRINT_VERSION:
+                bits = None  # Saved before the transaction IDs were recomputed
+            if bits is None:
+                count = self._conn.execute(SELECT_COUNT_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+                self._bloom_filter, self._last_id = BloomFilter.with_capacity(2 * count), 0
+            else:
+                self._bloom_filter = BloomFilter(numpy.frombuffer(bits, dtype=numpy.uint8).copy(),
+                                                 int(get_metadata(self._conn, BLOOM_ITEMS_METADATA_KEY, 0)))
+                self._last_id = int(get_metadata(self._conn, LAST_ID_METADATA_KEY, 0))
+
+        records = self._conn.execute(SELECT_NEW_TRANSACTION_IDS_FROM_BANK_ACTIVITY_TABLE, (self._last_id,)).fetchall()
+        if records:
+            if self._bloom_filter.items + len(records) > self._bloom_filter.capacity:
+                # Start over from every stored row with twice the room
+                count = self._conn.execute(SELECT_COUNT_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+                self._bloom_filter, self._last_id = BloomFilter.with_capacity(2 * count), 0
+                records = self._conn.execute(SELECT_NEW_TRANSACTION_IDS_FROM_BANK_ACTIVITY_TABLE, (0,)).fetchall()
+            self._bloom_filter.add([record[1] for record in records])
+            self._last_id = records[-1][0]
+        return self._bloom_filter
+
+    def find_existing(self, transaction_ids: list) -> set:
+        """
+        Find which transaction IDs are already in the bank activity table.
+
+        Args:
+            transaction_ids (list): Transaction IDs to check.
+
+        Returns:
+            set: The transaction IDs already stored.
+        """
+        transaction_ids = list(transaction_ids)
+        might_exist = self._load().might_contain(transaction_ids)
+        candidates = [transaction_id for transaction_id, maybe in zip(transaction_ids, might_exist) if maybe]
+        existing = set()
+        for batch_start in range(0, len(candidates), LOOKUP_BATCH_SIZE):
+            batch = candidates[batch_start:batch_start + LOOKUP_BATCH_SIZE]
+            query = SELECT_EXISTING_TRANSACTION_IDS_FROM_BANK_ACTIVITY_TABLE.format(
+                placeholders=", ".join("?" for _ in batch))
+            existing.update(record[0] for record in self._conn.execute(query, batch).fetchall())
+        return existing
+
+    def save(self) -> None:
+        """
+        Add the rows stored since the filter was loaded and save it. The caller commits.
+        """
+        bloom_filter = self._load()
+        set_metadata(self._conn, BLOOM_BITS_METADATA_KEY, bloom_filter.bits.tobytes())
+        set_metadata(self._conn, BLOOM_ITEMS_METADATA_KEY, bloom_filter.items)
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, self._last_id)
+        set_metadata(self._conn, VERSION_METADATA_KEY, FINGERPRINT_VERSION)
+
+
+def find_near_duplicates(new_df: pandas.DataFrame, stored_df: pandas.DataFrame,
+                         days: int = NEAR_DUPLICATE_DAYS,
+                         min_similarity: float = NEAR_DUPLICATE_SIMILARITY) -> pandas.DataFrame:
+    """
+    Find the new transactions that are likely already stored under a different transaction ID,
+    e.g. from an overlapping export that posted a day later or worded the description differently.
+
+    A new transaction is a near-duplicate of a stored one of the same account with the same amount,
+    a posting date at most "days" apart and a description similarity ratio of at least
+    min_similarity. Both sides are sorted by (account, amount, date) and merged, so only the rows
+    inside each window are compared. Each stored transaction matches at most one new transaction,
+    so repeated identical purchases are only reported when there are more of them than stored.
+
+    Args:
+        new_df (pandas.DataFrame): New transactions, with the "Transaction ID", "Account Alias",
+            "Posting Date", "Amount" and "Description" columns.
+        stored_df (pandas.DataFrame): Stored transactions, with the same columns.
+        days (int, optional): Maximum number of days between the posting dates.
+        min_similarity (float, optional): Minimum description similarity ratio (0 to 1).
+
+    Returns:
+        pandas.DataFrame: One row per near-duplicate (NEAR_DUPLICATE_COLUMNS), in the order of new_df.
+    """
+    def sort_keys(df):
+        ordinals = [pandas.Timestamp(normalize_date(date)).toordinal() for date in df["Posting Date"]]
+        return sorted(zip(df["Account Alias"].map(normalize_text), df["Amount"].map(normalize_money),
+                          ordinals, range(len(df))))
+
+    stored = sort_keys(stored_df)
+    descriptions = stored_df["Description"].map(normalize_text).tolist()
+    matched = set()
+    pairs = {}
+    start = 0
+    for account, amount, ordinal, new_index in sort_keys(new_df):
+        # Stored rows before the window of this row are before the window of every following row
+        while start < len(stored) and stored[start][:3] < (account, amount, ordinal - days):
+            start += 1
+        description = normalize_text(new_df["Description"].iat[new_index])
+        best = None
+        position = start
+        while position < len(stored) and stored[position][:3] <= (account, amount, ordinal + days):
+            stored_index = stored[position][3]
+            if stored_index not in matched:
+                similarity = difflib.SequenceMatcher(None, description, descriptions[stored_index]).ratio()
+                candidate = (similarity, -abs(stored[position][2] - ordinal), stored_index)
+                if similarity >= min_similarity and (best is None or candidate > best):
+                    best = candidate
+            position += 1
+        if best is not None:
+            matched.add(best[2])
+            pairs[new_index] = best
+
+    records = [(new_df["Transaction ID"].iat[new_index], new_df["Posting Date"].iat[new_index],
+                new_df["Amount"].iat[new_index], new_df["Description"].iat[new_index],
+                stored_df["Posting Date"].iat[stored_index], stored_df["Description"].iat[stored_index],
+                round(similarity, 2))
+               for new_index, (similarity, _, stored_index) in sorted(pairs.items())]
+    return pandas.DataFrame.from_records(records, columns=NEAR_DUPLICATE_COLUMNS)
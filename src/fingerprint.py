@@ -0,0 +1,108 @@
+import re
+import math
+import hashlib
+from decimal import Decimal, InvalidOperation
+
+# Transaction IDs are TRANSACTION_ID_SIZE bytes: the fingerprint version followed by the first
+# bytes of a SHA-256 digest of the normalized fields, stored as BLOBs
+TRANSACTION_ID_SIZE = 16
+FINGERPRINT_VERSION = 2
+FINGERPRINT_VERSION_METADATA_KEY = "transaction_fingerprint_version"
+
+# Separates the fields of the hashed string. Whitespace to str.split(), so normalized text never contains it.
+FIELD_SEPARATOR = "\x1f"
+
+# Posting dates of CSV files ("MM/DD/YYYY") and of the database ("YYYY-MM-DD")
+DATE_PATTERN = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})|(\d{4})-(\d{1,2})-(\d{1,2})")
+
+
+def normalize_text(value) -> str:
+    """
+    Normalize a text field: missing values become "", runs of whitespace become one space and
+    letters are upper-cased. Integral floats (pandas reads check numbers as floats) lose their ".0".
+
+    Args:
+        value: Field value.
+
+    Returns:
+        str: Normalized text.
+    """
+    if isinstance(value, str):
+        return " ".join(value.split()).upper()
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return " ".join(str(value).split()).upper()
+
+
+def normalize_date(value) -> str:
+    """
+    Normalize a posting date to "YYYY-MM-DD", from the CSV ("MM/DD/YYYY") or database format.
+
+    Args:
+        value: Posting date.
+
+    Returns:
+        str: ISO date, or the normalized text when it's not a known date format.
+    """
+    text = normalize_text(value)
+    match = DATE_PATTERN.fullmatch(text)
+    if match is None:
+        return text
+    month, day, year = match.group(1, 2, 3) if match.group(3) else match.group(5, 6, 4)
+    return f"{year}-{int(month):02d}-{int(day):02d}"
+
+
+def normalize_money(value) -> str:
+    """
+    Normalize an amount or balance to a plain number with two decimals ("1,234.5" -> "1234.50").
+
+    Args:
+        value: Amount or balance.
+
+    Returns:
+        str: Normalized amount, or "" when it's blank (e.g. the balance of pending transactions).
+    """
+    text = normalize_text(value).replace(",", "").replace("$", "")
+    try:
+        return str(Decimal(text).quantize(Decimal("0.01")))
+    except (InvalidOperation, ValueError):
+        return text
+
+
+def transaction_fingerprint(details, posting_date, description, amount, type_, balance,
+                            check_or_slip_num, account_alias) -> bytes:
+    """
+    Get the transaction ID of a transaction.
+
+    The fields are normalized and joined with FIELD_SEPARATOR behind a version tag, so different
+    transactions can't produce the same hashed string, and the same transaction gets the same ID
+    whether it comes from a CSV file or from the database, however its export formatted it.
+
+    Args:
+        details: "Details" field.
+        posting_date: Posting date, "MM/DD/YYYY" or "YYYY-MM-DD".
+        description: Description.
+        amount: Amount.
+        type_: "Type" field.
+        balance: Balance (blank for pending transactions).
+        check_or_slip_num: Check or slip number.
+        account_alias: Account alias.
+
+    Returns:
+        bytes: TRANSACTION_ID_SIZE-byte transaction ID, starting with FINGERPRINT_VERSION.
+    """
+    fields = [
+        f"v{FINGERPRINT_VERSION}",
+        normalize_text(details),
+        normalize_date(posting_date),
+        normalize_text(description),
+        normalize_money(amount),
+        normalize_text(type_),
+        normalize_money(balance),
+        normalize_text(check_or_slip_num),
+        normalize_text(account_alias),
+    ]
+    digest = hashlib.sha256(FIELD_SEPARATOR.join(fields).encode()).digest()
+    return bytes([FINGERPRINT_VERSION]) + digest[:TRANSACTION_ID_SIZE - 1]
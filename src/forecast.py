@@ -0,0 +1,573 @@
+import time
+import sqlite3
+import configparser
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date, timedelta
+
+import numpy
+import pandas
+
+from src.interface_funcs import ConfigSectionIncompleteError
+from src.balances import BalanceSnapshots
+
+# SQL queries
+SELECT_PENDING_TOTALS_FROM_PENDING_TRANSACTIONS_TABLE = \
+    """SELECT Account_Alias, SUM(Amount) FROM pending_transactions GROUP BY Account_Alias;"""
+SELECT_SPENT_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT -COALESCE(SUM(Amount), 0) FROM bank_activity WHERE Account_Alias = ? AND Posting_Date >= ? AND Posting_Date <= ? AND Amount < 0 AND Description LIKE ?;"""
+SELECT_BUDGET_HISTORY_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Posting_Date, -Amount FROM bank_activity WHERE Account_Alias = ? AND Posting_Date >= ? AND Posting_Date < ? AND Amount < 0 AND Description LIKE ?;"""
+
+# Monte Carlo settings
+SIMULATION_CHUNK_SIZE = 500  # Paths simulated per task. Fixed so results don't depend on the number of workers
+MAX_SIMULATION_PATHS = 100000
+PERCENTILES = [5, 25, 50, 75, 95]
+
+# Scheduled item frequencies: (unit, step). Day-based frequencies step in days, month-based in months.
+FREQUENCIES = {
+    "once": ("D", 0),
+    "daily": ("D", 1),
+    "weekly": ("D", 7),
+    "biweekly": ("D", 14),
+    "monthly": ("M", 1),
+    "quarterly": ("M", 3),
+    "yearly": ("M", 12),
+}
+
+SCHEDULE_SECTION_PREFIX = "SCHEDULE "
+BUDGET_SECTION_PREFIX = "BUDGET "
+BALANCES_SECTION = "BALANCES"
+
+CONFIG_HELP = ("\nTroubleshooting help: Ensure every [SCHEDULE <name>] section defines account_alias, amount,"
+               " start (YYYY-MM-DD) and frequency, and every [BUDGET <name>] section defines account_alias"
+               " and amount in the forecast config file.")
+
+
+def load_scheduled_items(config: configparser.ConfigParser) -> pandas.DataFrame:
+    """
+    Read the [SCHEDULE <name>] sections of a forecast config.
+
+    Each section defines a scheduled expense (negative amount) or income (positive amount):
+        account_alias, amount, start (YYYY-MM-DD), frequency (one of FREQUENCIES) and an optional
+        end (YYYY-MM-DD).
+
+    Args:
+        config (configparser.ConfigParser): Forecast config.
+
+    Returns:
+        pandas.DataFrame: Columns "Name", "Account Alias", "Amount", "Start", "End", "Unit" and "Step".
+
+    Raises:
+        ConfigSectionIncompleteError: If a section is missing a key or has a bad value.
+    """
+    records = []
+    for section in config.sections():
+        if not section.startswith(SCHEDULE_SECTION_PREFIX):
+            continue
+        try:
+            frequency = config[section]["frequency"].strip().lower()
+            unit, step = FREQUENCIES[frequency]
+            end = config[section].get("end", "").strip()
+            records.append({
+                "Name": section[len(SCHEDULE_SECTION_PREFIX):].strip(),
+                "Account Alias": config[section]["account_alias"].strip(),
+                "Amount": float(config[section]["amount"]),
+                "Start": numpy.datetime64(config[section]["start"].strip(), "D"),
+                "End": numpy.datetime64(end, "D") if end else numpy.datetime64("NaT", "D"),
+                "Unit": unit,
+                "Step": step,
+            })
+        except (ValueError, KeyError) as e:
+            raise ConfigSectionIncompleteError(f"[{section}]: {e}.{CONFIG_HELP}")
+    columns = ["Name", "Account Alias", "Amount", "Start", "End", "Unit", "Step"]
+    return pandas.DataFrame.from_records(records, columns=columns)
+
+
+def recurring_items(recurring: pandas.DataFrame, start: date = None) -> pandas.DataFrame:
+    """
+    Turn detected recurring transactions into scheduled items.
+
+    Each item repeats at the detected period, starting from the last seen occurrence, with the
+    group's average amount. Items that missed more than one occurrence before the forecast start
+    are considered cancelled and left out.
+
+    Args:
+        recurring (pandas.DataFrame): Output of RecurringDetector.get_recurring_transactions().
+        start (date, optional): First forecast day. Defaults to today.
+
+    Returns:
+        pandas.DataFrame: Scheduled items in the format of load_scheduled_items().
+    """
+    last_date = pandas.to_datetime(recurring["Last Date"], format="%Y-%m-%d")
+    next_date = pandas.to_datetime(recurring["Next Date"], format="%Y-%m-%d")
+    recurring = recurring[next_date + (next_date - last_date) >= pandas.Timestamp(start or date.today())]
+    units, steps = zip(*recurring["Period"].map(FREQUENCIES)) if len(recurring) else ((), ())
+    return pandas.DataFrame({
+        "Name": recurring["Description"],
+        "Account Alias": recurring["Account Alias"],
+        "Amount": recurring["Average Amount"].astype(float),
+        "Start": pandas.to_datetime(recurring["Last Date"], format="%Y-%m-%d"),
+        "End": pandas.Series(pandas.NaT, index=recurring.index, dtype="datetime64[ns]"),
+        "Unit": list(units),
+        "Step": list(steps),
+    })
+
+
+def load_budgets(config: configparser.ConfigParser) -> pandas.DataFrame:
+    """
+    Read the [BUDGET <name>] sections of a forecast config.
+
+    Each section defines a monthly spending limit: account_alias, amount and an optional
+    description pattern (SQL LIKE syntax) selecting the transactions that count against it.
+
+    Args:
+        config (configparser.ConfigParser): Forecast config.
+
+    Returns:
+        pandas.DataFrame: Columns "Name", "Account Alias", "Amount" and "Pattern".
+
+    Raises:
+        ConfigSectionIncompleteError: If a section is missing a key or has a bad value.
+    """
+    records = []
+    for section in config.sections():
+        if not section.startswith(BUDGET_SECTION_PREFIX):
+            continue
+        try:
+            records.append({
+                "Name": section[len(BUDGET_SECTION_PREFIX):].strip(),
+                "Account Alias": config[section]["account_alias"].strip(),
+                "Amount": abs(float(config[section]["amount"])),
+                "Pattern": config[section].get("pattern", "%", raw=True).strip() or "%",
+            })
+        except (ValueError, KeyError) as e:
+            raise ConfigSectionIncompleteError(f"[{section}]: {e}.{CONFIG_HELP}")
+    return pandas.DataFrame.from_records(records, columns=["Name", "Account Alias", "Amount", "Pattern"])
+
+
+def load_balance_overrides(config: configparser.ConfigParser) -> dict:
+    """
+    Read the optional [BALANCES] section of a forecast config.
+
+    It maps account aliases to starting balances, for accounts whose imports have no balance column.
+    The config must be read case-sensitively for the keys to match the account aliases.
+
+    Args:
+        config (configparser.ConfigParser): Forecast config.
+
+    Returns:
+        dict: Starting balance by account alias.
+
+    Raises:
+        ConfigSectionIncompleteError: If a balance is not a number.
+    """
+    if not config.has_section(BALANCES_SECTION):
+        return {}
+    try:
+        return {key: float(value) for key, value in config.items(BALANCES_SECTION, raw=True)}
+    except ValueError as e:
+        raise ConfigSectionIncompleteError(f"[{BALANCES_SECTION}]: {e}.{CONFIG_HELP}")
+
+
+def scheduled_occurrences(items: pandas.DataFrame, start: numpy.datetime64, days: int) -> pandas.DataFrame:
+    """
+    Expand scheduled items into their occurrences within [start, start + days).
+
+    Occurrences are generated for all items of the same unit at once by broadcasting each item's
+    first in-range occurrence against a range of step multiples. Monthly occurrences keep the
+    start's day of month, clipped to the month's length.
+
+    Args:
+        items (pandas.DataFrame): Output of load_scheduled_items().
+        start (numpy.datetime64): First forecast day.
+        days (int): Number of forecast days.
+
+    Returns:
+        pandas.DataFrame: Columns "Account Alias", "Day" (offset from start) and "Amount".
+    """
+    start = numpy.datetime64(start, "D")
+    stop = start + days
+    frames = []
+
+    # Day-based frequencies, including one-off items (step 0)
+    day_items = items[items["Unit"] == "D"]
+    if len(day_items):
+        first = day_items["Start"].to_numpy(dtype="datetime64[D]")
+        step = day_items["Step"].to_numpy(dtype=numpy.int64)
+        recurring_step = numpy.maximum(step, 1)
+        # Number of steps needed to reach the forecast start
+        skipped = numpy.where(step > 0, numpy.maximum(-((first - start).astype(numpy.int64) // recurring_step), 0), 0)
+        max_count = int(days // recurring_step.min()) + 1 if (step > 0).any() else 1
+        multiples = numpy.arange(max_count)
+        dates = first[:, None] + ((skipped[:, None] + multiples[None, :]) * step[:, None]).astype("timedelta64[D]")
+        valid = multiples[None, :] < numpy.where(step > 0, max_count, 1)[:, None]
+        frames.append(_occurrence_frame(day_items, dates, valid, start, stop))
+
+    # Month-based frequencies
+    month_items = items[items["Unit"] == "M"]
+    if len(month_items):
+        first = month_items["Start"].to_numpy(dtype="datetime64[D]")
+        step = month_items["Step"].to_numpy(dtype=numpy.int64)
+        first_month = first.astype("datetime64[M]")
+        day_of_month = (first - first_month.astype("datetime64[D]")).astype(numpy.int64)
+        start_month = start.astype("datetime64[M]")
+        months_behind = (start_month - first_month).astype(numpy.int64)
+        skipped = numpy.maximum(months_behind // step, 0)
+        max_count = int(days // 28 // step.min()) + 2
+        multiples = numpy.arange(max_count)
+        months = first_month[:, None] + ((skipped[:, None] + multiples[None, :]) * step[:, None]).astype("timedelta64[M]")
+        month_length = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(numpy.int64)
+        dates = months.astype("datetime64[D]") + numpy.minimum(day_of_month[:, None], month_length - 1).astype("timedelta64[D]")
+        valid = numpy.ones(dates.shape, dtype=bool)
+        frames.append(_occurrence_frame(month_items, dates, valid, start, stop))
+
+    if not frames:
+        return pandas.DataFrame(columns=["Account Alias", "Day", "Amount"])
+    return pandas.concat(frames, ignore_index=True)
+
+
+def _occurrence_frame(items: pandas.DataFrame, dates: numpy.ndarray, valid: numpy.ndarray,
+                      start: numpy.datetime64, stop: numpy.datetime64) -> pandas.DataFrame:
+    """
+    Flatten an items x occurrences date matrix into occurrence rows inside the forecast range.
+    """
+    first = items["Start"].to_numpy(dtype="datetime64[D]")
+    end = items["End"].to_numpy(dtype="datetime64[D]")
+    end = numpy.where(numpy.isnat(end), stop, end)
+    valid = valid & (dates >= start) & (dates < stop) & (dates >= first[:, None]) & (dates <= end[:, None])
+    item_idx, _ = numpy.nonzero(valid)
+    return pandas.DataFrame({
+        "Account Alias": items["Account Alias"].to_numpy()[item_idx],
+        "Day": (dates[valid] - start).astype(numpy.int64),
+        "Amount": items["Amount"].to_numpy()[item_idx],
+    })
+
+
+def weekday(dates: numpy.ndarray) -> numpy.ndarray:
+    """
+    Day of the week of datetime64[D] values, Monday being 0 (1970-01-01 was a Thursday).
+    """
+    return (dates.astype("datetime64[D]").astype(numpy.int64) + 3) % 7
+
+
+def simulate_chunk(seed: numpy.random.SeedSequence, paths: int, rates: numpy.ndarray, amounts: list,
+                   category_accounts: numpy.ndarray, baseline: numpy.ndarray) -> tuple:
+    """
+    Simulate a chunk of Monte Carlo paths.
+
+    For every spending category, the number of transactions per path and day is drawn from a
+    Poisson distribution with the category's daily rate, and each transaction's amount is resampled
+    from the category's historical amounts. All paths and days of a category are drawn at once.
+
+    This is a module-level function so it can run in a worker process.
+
+    Args:
+        seed (numpy.random.SeedSequence): Seed of this chunk.
+        paths (int): Number of paths to simulate.
+        rates (numpy.ndarray): categories x days matrix of expected transactions per day.
+        amounts (list): One array of historical amounts (positive values) per category.
+        category_accounts (numpy.ndarray): Account index of each category.
+        baseline (numpy.ndarray): accounts x days matrix of balances from scheduled items only.
+
+    Returns:
+        tuple: paths x days matrix of total balances and paths x accounts matrix of minimum balances.
+    """
+    rng = numpy.random.default_rng(seed)
+    accounts, days = baseline.shape
+    spending = numpy.zeros((paths, accounts, days))
+    for category_idx, category_amounts in enumerate(amounts):
+        counts = rng.poisson(rates[category_idx], size=(paths, days))
+        draws = rng.choice(category_amounts, size=int(counts.sum()))
+        cells = numpy.repeat(numpy.arange(paths * days), counts.ravel())
+        daily = numpy.bincount(cells, weights=draws, minlength=paths * days).reshape(paths, days)
+        spending[:, category_accounts[category_idx], :] += daily
+    balances = baseline[None, :, :] - numpy.cumsum(spending, axis=2)
+    return balances.sum(axis=1), balances.min(axis=2)
+
+
+class ForecastEngine:
+    """
+    Projects daily account balances from current balances, scheduled items and budgets.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initialize ForecastEngine.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+        """
+        self._conn = conn
+
+    def get_current_balances(self, balance_overrides: dict = None) -> dict:
+        """
+        Get each account's starting balance: its latest settled balance plus its pending amounts.
+
+        The settled balance is the account's latest balance snapshot, brought up to date first.
+
+        Args:
+            balance_overrides (dict, optional): Settled balances to use instead of the database's.
+
+        Returns:
+            dict: Starting balance by account alias.
+        """
+        snapshots = BalanceSnapshots(self._conn)
+        snapshots.update()
+        latest = snapshots.get_balances()
+        balances = dict(zip(latest["Account Alias"], latest["Balance"].astype(float)))
+        balances.update(balance_overrides or {})
+
+        for account_alias, pending_total in self._conn.execute(SELECT_PENDING_TOTALS_FROM_PENDING_TRANSACTIONS_TABLE):
+            if account_alias in balances:
+                balances[account_alias] += pending_total or 0.0
+        return balances
+
+    def get_budget_spent(self, budgets: pandas.DataFrame, start: date) -> numpy.ndarray:
+        """
+        Get how much of each budget was already spent in the month of `start`, before `start`.
+
+        Args:
+            budgets (pandas.DataFrame): Output of load_budgets().
+            start (date): First forecast day.
+
+        Returns:
+            numpy.ndarray: Amount spent per budget.
+        """
+        month_start = start.replace(day=1).strftime("%Y-%m-%d")
+        last_day = (start - timedelta(days=1)).strftime("%Y-%m-%d")
+        spent = [
+            self._conn.execute(SELECT_SPENT_FROM_BANK_ACTIVITY_TABLE,
+                               (account_alias, month_start, last_day, pattern)).fetchone()[0]
+            for account_alias, pattern in zip(budgets["Account Alias"], budgets["Pattern"])
+        ]
+        return numpy.array(spent, dtype=float)
+
+    def project(self, items: pandas.DataFrame, budgets: pandas.DataFrame, start: date = None,
+                days: int = 90, balance_overrides: dict = None) -> pandas.DataFrame:
+        """
+        Project end-of-day balances for every account.
+
+        Daily flows are accumulated into an accounts x days matrix with numpy.add.at and turned into
+        balances with a cumulative sum. A budget's remaining amount for the current month is spread
+        evenly over the month's remaining days, and its full amount over every later month's days.
+
+        Args:
+            items (pandas.DataFrame): Output of load_scheduled_items().
+            budgets (pandas.DataFrame): Output of load_budgets().
+            start (date, optional): First forecast day. Defaults to today.
+            days (int, optional): Number of days to project.
+            balance_overrides (dict, optional): Settled balances to use instead of the database's.
+
+        Returns:
+            pandas.DataFrame: One row per day with a "Date" column, one column per account and "Total".
+        """
+        start = start or date.today()
+        start64 = numpy.datetime64(start, "D")
+        accounts, starting, flows = self._scheduled_flows(items, budgets, start64, days, balance_overrides)
+
+        if len(budgets):
+            account_idx = {account_alias: idx for idx, account_alias in enumerate(accounts)}
+            flows -= self._budget_flows(budgets, start, start64, days, account_idx)
+
+        projected = starting[:, None] + numpy.cumsum(flows, axis=1)
+
+        df = pandas.DataFrame(projected.T, columns=accounts)
+        df["Total"] = df.sum(axis=1)
+        df.insert(0, "Date", numpy.datetime_as_string(start64 + numpy.arange(days), unit="D"))
+        return df.round(2)
+
+    def _scheduled_flows(self, items: pandas.DataFrame, budgets: pandas.DataFrame, start64: numpy.datetime64,
+                         days: int, balance_overrides: dict) -> tuple:
+        """
+        Get the forecast accounts, their starting balances and their scheduled daily flows.
+
+        Returns:
+            tuple: Sorted account aliases, starting balance array and accounts x days flow matrix.
+        """
+        balances = self.get_current_balances(balance_overrides)
+        occurrences = scheduled_occurrences(items, start64, days)
+
+        accounts = sorted(set(balances) | set(occurrences["Account Alias"]) | set(budgets["Account Alias"]))
+        account_idx = {account_alias: idx for idx, account_alias in enumerate(accounts)}
+        flows = numpy.zeros((len(accounts), days))
+
+        if len(occurrences):
+            rows = occurrences["Account Alias"].map(account_idx).to_numpy()
+            numpy.add.at(flows, (rows, occurrences["Day"].to_numpy()), occurrences["Amount"].to_numpy())
+
+        starting = numpy.array([balances.get(account_alias, 0.0) for account_alias in accounts])
+        return accounts, starting, flows
+
+    def _budget_flows(self, budgets: pandas.DataFrame, start: date, start64: numpy.datetime64,
+                      days: int, account_idx: dict) -> numpy.ndarray:
+        """
+        Spread each budget's expected spending over the forecast days.
+
+        Returns:
+            numpy.ndarray: accounts x days matrix of expected spending (positive values).
+        """
+        day_dates = start64 + numpy.arange(days)
+        months = day_dates.astype("datetime64[M]")
+        month_length = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(numpy.int64)
+        in_first_month = months == months[0]
+
+        amounts = budgets["Amount"].to_numpy(dtype=float)
+        remaining = numpy.maximum(amounts - self.get_budget_spent(budgets, start), 0.0)
+        # Remaining days in the first month, including the first forecast day
+        first_month_days = int(month_length[0]) - (start.day - 1)
+
+        daily = numpy.where(in_first_month[None, :],
+                            remaining[:, None] / first_month_days,
+                            amounts[:, None] / month_length[None, :])
+
+        spending = numpy.zeros((len(account_idx), days))
+        rows = budgets["Account Alias"].map(account_idx).to_numpy()
+        numpy.add.at(spending, rows, daily)
+        return spending
+
+    def fit_budget_distributions(self, budgets: pandas.DataFrame, start: date, days: int,
+                                 lookback_days: int = 365) -> tuple:
+        """
+        Fit each budget category's amount and timing distributions from its history.
+
+        Timing is a Poisson rate per day of the week (transactions on that weekday divided by the
+        number of such weekdays in the lookback period) and amounts are the empirical distribution
+        of the category's past amounts. A category without history spends its budget evenly.
+
+        Args:
+            budgets (pandas.DataFrame): Output of load_budgets().
+            start (date): First forecast day.
+            days (int): Number of forecast days.
+            lookback_days (int, optional): Days of history to fit on.
+
+        Returns:
+            tuple: categories x days rate matrix and one array of amounts per category.
+        """
+        start64 = numpy.datetime64(start, "D")
+        history_start = start64 - lookback_days
+        weekday_count = numpy.bincount(weekday(history_start + numpy.arange(lookback_days)), minlength=7)
+        forecast_weekdays = weekday(start64 + numpy.arange(days))
+
+        rates = numpy.zeros((len(budgets), days))
+        amounts = []
+        for budget_idx, (account_alias, pattern, amount) in enumerate(
+                zip(budgets["Account Alias"], budgets["Pattern"], budgets["Amount"])):
+            args = (account_alias, str(history_start), str(start64), pattern)
+            records = self._conn.execute(SELECT_BUDGET_HISTORY_FROM_BANK_ACTIVITY_TABLE, args).fetchall()
+            if not records:
+                rates[budget_idx] = 1.0
+                amounts.append(numpy.array([amount * 12 / 365]))
+                continue
+            dates, values = zip(*records)
+            history_weekdays = weekday(numpy.array(dates, dtype="datetime64[D]"))
+            weekday_rates = numpy.bincount(history_weekdays, minlength=7) / numpy.maximum(weekday_count, 1)
+            rates[budget_idx] = weekday_rates[forecast_weekdays]
+            amounts.append(numpy.array(values, dtype=float))
+        return rates, amounts
+
+    def simulate(self, items: pandas.DataFrame, budgets: pandas.DataFrame, start: date = None,
+                 days: int = 90, balance_overrides: dict = None, paths: int = 10000, seed: int = None,
+                 threshold: float = 0.0, workers: int = 1, time_limit: float = None,
+                 lookback_days: int = 365) -> dict:
+        """
+        Run a Monte Carlo simulation of the forecast.
+
+        Scheduled items are applied as in project(), while each budget category's spending is
+        simulated from the distributions fitted by fit_budget_distributions(). Paths are simulated
+        in fixed-size chunks, each with its own child of the seed, so a seeded run gives the same
+        result with any number of workers. Chunks run in a process pool when workers > 1. When a
+        time limit is given, chunks that haven't finished in time are dropped.
+
+        Args:
+            items (pandas.DataFrame): Output of load_scheduled_items().
+            budgets (pandas.DataFrame): Output of load_budgets().
+            start (date, optional): First forecast day. Defaults to today.
+            days (int, optional): Number of days to project.
+            balance_overrides (dict, optional): Settled balances to use instead of the database's.
+            paths (int, optional): Number of paths, capped at MAX_SIMULATION_PATHS.
+            seed (int, optional): Random seed. A random one is picked (and returned) when None.
+            threshold (float, optional): Balance to report the probability of going below.
+            workers (int, optional): Number of worker processes.
+            time_limit (float, optional): Maximum simulation time in seconds.
+            lookback_days (int, optional): Days of history to fit on.
+
+        Returns:
+            dict: "bands" (percentiles of the total balance per day), "accounts" (minimum balance
+                percentiles per account), "paths" (number of simulated paths) and "seed".
+        """
+        start = start or date.today()
+        start64 = numpy.datetime64(start, "D")
+        accounts, starting, flows = self._scheduled_flows(items, budgets, start64, days, balance_overrides)
+        baseline = starting[:, None] + numpy.cumsum(flows, axis=1)
+        account_idx = {account_alias: idx for idx, account_alias in enumerate(accounts)}
+        rates, amounts = self.fit_budget_distributions(budgets, start, days, lookback_days)
+        category_accounts = budgets["Account Alias"].map(account_idx).to_numpy(dtype=numpy.int64)
+
+        paths = max(1, min(paths, MAX_SIMULATION_PATHS))
+        seed_sequence = numpy.random.SeedSequence(seed)
+        chunk_sizes = [min(SIMULATION_CHUNK_SIZE, paths - offset) for offset in range(0, paths, SIMULATION_CHUNK_SIZE)]
+        chunk_seeds = seed_sequence.spawn(len(chunk_sizes))
+        chunk_args = [(chunk_seed, chunk_size, rates, amounts, category_accounts, baseline)
+                      for chunk_seed, chunk_size in zip(chunk_seeds, chunk_sizes)]
+
+        results = self._run_chunks(chunk_args, workers, time_limit)
+        totals = numpy.concatenate([result[0] for result in results])
+        minimums = numpy.concatenate([result[1] for result in results])
+
+        bands = pandas.DataFrame(numpy.percentile(totals, PERCENTILES, axis=0).T,
+                                 columns=[f"P{percentile}" for percentile in PERCENTILES])
+        bands.insert(0, "Date", numpy.datetime_as_string(start64 + numpy.arange(days), unit="D"))
+        bands["Mean"] = totals.mean(axis=0)
+        bands[f"P(Below {threshold:g})"] = (totals < threshold).mean(axis=0)
+
+        account_summary = pandas.DataFrame({
+            "Account Alias": accounts + ["Total"],
+            "Starting Balance": numpy.append(starting, starting.sum()),
+            "P5 Minimum": numpy.append(numpy.percentile(minimums, 5, axis=0), numpy.percentile(totals.min(axis=1), 5)),
+            "P50 Minimum": numpy.append(numpy.median(minimums, axis=0), numpy.median(totals.min(axis=1))),
+            f"P(Below {threshold:g})": numpy.append((minimums < threshold).mean(axis=0),
+                                                    (totals.min(axis=1) < threshold).mean()),
+        })
+        return {
+            "bands": bands.round(2),
+            "accounts": account_summary.round(2),
+            "paths": len(totals),
+            "seed": seed_sequence.entropy,
+        }
+
+    def _run_chunks(self, chunk_args: list, workers: int, time_limit: float) -> list:
+        """
+        Run simulate_chunk() over every chunk, inline or in a process pool, within the time limit.
+
+        The first chunk always completes so there is something to report.
+
+        Returns:
+            list: Results of the completed chunks, in chunk order.
+        """
+        deadline = time.monotonic() + time_limit if time_limit else None
+        if workers <= 1:
+            results = []
+            for args in chunk_args:
+                if results and deadline and time.monotonic() > deadline:
+                    break
+                results.append(simulate_chunk(*args))
+            return results
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(simulate_chunk, *args) for args in chunk_args]
+            pending = set(futures)
+            while pending:
+                timeout = max(deadline - time.monotonic(), 0) if deadline else None
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done and futures[0].done():
+                    # Out of time: drop the chunks that haven't finished
+                    break
+                if not done:
+                    futures[0].result()
+            return [future.result() for future in futures if future.done() and not future.cancelled()]
+        finally:
+            # Leaving a "with" block would wait for the running chunks, past the time limit
+            executor.shutdown(wait=False, cancel_futures=True)
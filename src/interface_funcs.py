@@ -1,6 +1,26 @@
+import re
 import sqlite3
+import argparse
+from datetime import datetime
 from pathlib import Path
 
+from src.fingerprint import (
+    TRANSACTION_ID_SIZE,
+    FINGERPRINT_VERSION,
+    FINGERPRINT_VERSION_METADATA_KEY,
+    transaction_fingerprint
+)
+
+MEMORY_SIZE_UNITS = {"": 1, "K": 2 ** 10, "M": 2 ** 20, "G": 2 ** 30}  # Suffixes of memory sizes
+MEMORY_SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([KMG]?)B?", re.IGNORECASE)
+# Named parameters of SQL queries (:name, @name or $name), and the literals, quoted identifiers and
+# comments they can't appear in
+QUERY_PARAMETER_PATTERN = re.compile(r"(?<![\w:@$])[:@$]([A-Za-z_]\w*)")
+QUERY_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\]|--[^\n]*|/\*.*?(?:\*/|$)", re.DOTALL)
+
+TRANSACTION_ID_FORMAT = "blob"
+TRANSACTION_ID_FORMAT_METADATA_KEY = "transaction_id_format"
+
 
 def create_bank_activity_table(conn: sqlite3.Connection) -> None:
     """
@@ -69,7 +89,7 @@ def create_pending_transactions_table(conn: sqlite3.Connection) -> None:
         None
     """
     query = """
-        CREATE TABLE
+        CREATE TABLE IF NOT EXISTS
             pending_transactions(
                 ID INTEGER PRIMARY KEY,
                 Account_Alias,
@@ -86,6 +106,525 @@ def create_pending_transactions_table(conn: sqlite3.Connection) -> None:
             );"""
     conn.execute(query)
 
+def create_bank_activity_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Create the bank activity indexes used by date-range reads, if they don't exist.
+
+    The posting date index only holds the columns date-range reads filter on: an index carrying the
+    selected columns too would be picked to answer narrow queries without ORDER BY, returning their
+    rows in posting date order instead of insertion order. The account index serves per-account
+    "latest row" lookups. The transaction ID index serves the duplicate checks of imports.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE INDEX IF NOT EXISTS
+            idx_bank_activity_posting_date_account
+        ON
+            bank_activity(Posting_Date, Account_Alias);"""
+    conn.execute(query)
+    # Covering index of earlier versions, see above
+    query = """
+        DROP INDEX IF EXISTS
+            idx_bank_activity_posting_date;"""
+    conn.execute(query)
+    query = """
+        CREATE INDEX IF NOT EXISTS
+            idx_bank_activity_account_alias
+        ON
+            bank_activity(Account_Alias, Posting_Date);"""
+    conn.execute(query)
+    query = """
+        CREATE INDEX IF NOT EXISTS
+            idx_bank_activity_transaction_id
+        ON
+            bank_activity(Transaction_ID);"""
+    conn.execute(query)
+
+
+def add_bank_activity_columns(conn: sqlite3.Connection) -> None:
+    """
+    Add the columns filled by the import stages (and their indexes) to the bank activity table, if
+    they don't exist.
+
+    Category holds the category assigned by the category rules. Merchant_ID references the
+    merchants table, so aggregations per merchant group by a compact integer. Anomaly_Score is how
+    unusual the amount of a debit is for its merchant or category. The partial index
+    over the rows not reconciled yet lets reconciliation find where to resume without a scan.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    columns = [record[1] for record in conn.execute("PRAGMA table_info(bank_activity);").fetchall()]
+    if "Category" not in columns:
+        conn.execute("ALTER TABLE bank_activity ADD COLUMN Category;")
+    if "Merchant_ID" not in columns:
+        conn.execute("ALTER TABLE bank_activity ADD COLUMN Merchant_ID INTEGER;")
+    if "Anomaly_Score" not in columns:
+        conn.execute("ALTER TABLE bank_activity ADD COLUMN Anomaly_Score REAL;")
+    query = """
+        CREATE INDEX IF NOT EXISTS
+            idx_bank_activity_category
+        ON
+            bank_activity(Category, Posting_Date);"""
+    conn.execute(query)
+    query = """
+        CREATE INDEX IF NOT EXISTS
+            idx_bank_activity_merchant_id
+        ON
+            bank_activity(Merchant_ID, Posting_Date);"""
+    conn.execute(query)
+    query = """
+        CREATE INDEX IF NOT EXISTS
+            idx_bank_activity_anomaly_score
+        ON
+            bank_activity(Anomaly_Score);"""
+    conn.execute(query)
+    query = """
+        CREATE INDEX IF NOT EXISTS
+            idx_bank_activity_unreconciled
+        ON
+            bank_activity(Account_Alias, Posting_Date)
+        WHERE
+            COALESCE(Reconciled, 'N') = 'N';"""
+    conn.execute(query)
+
+
+def create_pending_transactions_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Create the pending transactions index used to diff an account's pending rows, if it doesn't exist.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE INDEX IF NOT EXISTS
+            idx_pending_transactions_account_alias
+        ON
+            pending_transactions(Account_Alias, Transaction_ID);"""
+    conn.execute(query)
+
+
+def create_kash_metadata_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the key/value table holding Kash's bookkeeping (e.g. the last processed row of each
+    incremental stage), if it doesn't exist.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            kash_metadata(
+                Key TEXT PRIMARY KEY,
+                Value
+            );"""
+    conn.execute(query)
+
+
+def create_recurring_transactions_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the recurring transactions table, if it doesn't exist.
+
+    It holds one row per (account, description key, amount band) group with the group's running
+    interval statistics. Groups that aren't recurring have a NULL Period.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            recurring_transactions(
+                ID INTEGER PRIMARY KEY,
+                Account_Alias,
+                Description_Key,
+                Amount_Band INTEGER,
+                Description,
+                Period,
+                Occurrences INTEGER,
+                Amount_Sum REAL,
+                Interval_Count INTEGER,
+                Interval_Sum REAL,
+                Interval_Sum_Sq REAL,
+                First_Date,
+                Last_Date,
+                Next_Date,
+                Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(Account_Alias, Description_Key, Amount_Band)
+            );"""
+    conn.execute(query)
+
+
+def create_merchants_tables(conn: sqlite3.Connection) -> None:
+    """
+    Create the merchants table and the lookup table mapping raw descriptions to merchants, if they
+    don't exist.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            merchants(
+                ID INTEGER PRIMARY KEY,
+                Merchant_Key TEXT UNIQUE,
+                Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            );"""
+    conn.execute(query)
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            merchant_descriptions(
+                Description TEXT PRIMARY KEY,
+                Merchant_ID INTEGER REFERENCES merchants(ID)
+            );"""
+    conn.execute(query)
+
+
+def create_balance_gaps_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the balance gaps table, if it doesn't exist.
+
+    It holds one row per break in an account's balance chain: the transaction whose balance doesn't
+    follow from the previous balance, and the date range the missing transactions belong to.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            balance_gaps(
+                ID INTEGER PRIMARY KEY,
+                Account_Alias,
+                Row_ID INTEGER UNIQUE,
+                Start_Date,
+                End_Date,
+                Expected_Balance REAL,
+                Balance REAL,
+                Difference REAL,
+                Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            );"""
+    conn.execute(query)
+
+
+def create_balance_snapshots_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the balance snapshots table, if it doesn't exist.
+
+    It holds each account's end-of-day balance for every day with transactions. The primary key is
+    (Account_Alias, Snapshot_Date), so the balance as of any date is a single index lookup.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            balance_snapshots(
+                Account_Alias TEXT,
+                Snapshot_Date TEXT,
+                Balance REAL,
+                Net_Amount REAL,
+                Transactions INTEGER,
+                PRIMARY KEY(Account_Alias, Snapshot_Date)
+            ) WITHOUT ROWID;"""
+    conn.execute(query)
+
+
+def create_watched_files_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the watched files table, if it doesn't exist.
+
+    It records the files imported by "kash watch" with their size and modification time, so a
+    restarted watcher only imports new or changed files.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            watched_files(
+                Path TEXT PRIMARY KEY,
+                Size INTEGER,
+                Modified_NS INTEGER,
+                Account_Alias TEXT,
+                Transactions INTEGER,
+                Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            );"""
+    conn.execute(query)
+
+
+def create_spending_stats_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the spending statistics table, if it doesn't exist.
+
+    It holds the running count, mean and sum of squared deviations (Welford's M2) of the debits of
+    every merchant and every category.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            spending_stats(
+                Scope TEXT,
+                Key TEXT,
+                Count INTEGER,
+                Mean REAL,
+                M2 REAL,
+                PRIMARY KEY(Scope, Key)
+            );"""
+    conn.execute(query)
+
+
+def create_budgets_tables(conn: sqlite3.Connection) -> None:
+    """
+    Create the budgets table and the table holding their running totals, if they don't exist.
+
+    A budget is a spending limit per period (weekly, monthly, quarterly or yearly) for the debits
+    matching an optional account, category and description pattern. Its totals hold one row per
+    period, keyed by the period's first day.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            budgets(
+                ID INTEGER PRIMARY KEY,
+                Name TEXT UNIQUE,
+                Account_Alias,
+                Category,
+                Pattern,
+                Period,
+                Amount REAL,
+                Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            );"""
+    conn.execute(query)
+    query = """
+        CREATE TABLE IF NOT EXISTS
+            budget_totals(
+                Budget_ID INTEGER,
+                Period_Start TEXT,
+                Spent REAL,
+                Transactions INTEGER,
+                PRIMARY KEY(Budget_ID, Period_Start)
+            ) WITHOUT ROWID;"""
+    conn.execute(query)
+
+
+def create_bank_activity_fts_table(conn: sqlite3.Connection) -> bool:
+    """
+    Create the full-text index over the Description and Details of the bank activity table, if it
+    doesn't exist, along with the triggers keeping it in sync.
+
+    The index is an external content FTS5 table: it stores only the index, not a copy of the text.
+    When it's created on a database that already has rows, it is built from them.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        bool: False if this SQLite build doesn't support FTS5, True otherwise.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bank_activity_fts';").fetchone()
+    if exists:
+        return True
+
+    query = """
+        CREATE VIRTUAL TABLE
+            bank_activity_fts
+        USING fts5(
+            Description,
+            Details,
+            content='bank_activity',
+            content_rowid='ID'
+        );"""
+    try:
+        conn.execute(query)
+    except sqlite3.OperationalError:
+        return False
+
+    query = """
+        CREATE TRIGGER IF NOT EXISTS
+            bank_activity_fts_insert
+        AFTER INSERT ON bank_activity BEGIN
+            INSERT INTO bank_activity_fts(rowid, Description, Details)
+            VALUES (new.ID, new.Description, new.Details);
+        END;"""
+    conn.execute(query)
+    query = """
+        CREATE TRIGGER IF NOT EXISTS
+            bank_activity_fts_delete
+        AFTER DELETE ON bank_activity BEGIN
+            INSERT INTO bank_activity_fts(bank_activity_fts, rowid, Description, Details)
+            VALUES ('delete', old.ID, old.Description, old.Details);
+        END;"""
+    conn.execute(query)
+    query = """
+        CREATE TRIGGER IF NOT EXISTS
+            bank_activity_fts_update
+        AFTER UPDATE OF Description, Details ON bank_activity BEGIN
+            INSERT INTO bank_activity_fts(bank_activity_fts, rowid, Description, Details)
+            VALUES ('delete', old.ID, old.Description, old.Details);
+            INSERT INTO bank_activity_fts(rowid, Description, Details)
+            VALUES (new.ID, new.Description, new.Details);
+        END;"""
+    conn.execute(query)
+    conn.execute("INSERT INTO bank_activity_fts(bank_activity_fts) VALUES ('rebuild');")
+    return True
+
+
+def get_metadata(conn: sqlite3.Connection, key: str, default=None):
+    """
+    Get a value from the kash_metadata table.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        key (str): Metadata key.
+        default (optional): Value returned when the key doesn't exist.
+
+    Returns:
+        The stored value, or default.
+    """
+    record = conn.execute("SELECT Value FROM kash_metadata WHERE Key = ?;", (key,)).fetchone()
+    return default if record is None else record[0]
+
+
+def set_metadata(conn: sqlite3.Connection, key: str, value) -> None:
+    """
+    Set a value in the kash_metadata table. The caller commits.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        key (str): Metadata key.
+        value: Value to store.
+
+    Returns:
+        None
+    """
+    conn.execute("INSERT OR REPLACE INTO kash_metadata (Key, Value) VALUES(?, ?);", (key, value))
+
+
+def convert_transaction_ids(conn: sqlite3.Connection) -> int:
+    """
+    Convert the transaction IDs of older databases, stored as 64-character SHA-256 hex digests, to
+    the TRANSACTION_ID_SIZE-byte BLOBs imports now store. Runs once per database (tracked in
+    kash_metadata).
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        int: Number of converted transaction IDs.
+    """
+    if get_metadata(conn, TRANSACTION_ID_FORMAT_METADATA_KEY) == TRANSACTION_ID_FORMAT:
+        return 0
+    converted = 0
+    for table in ("bank_activity", "pending_transactions"):
+        records = conn.execute(f"SELECT rowid, Transaction_ID FROM {table} WHERE typeof(Transaction_ID) = 'text';").fetchall()
+        values = []
+        for rowid, transaction_id in records:
+            if len(transaction_id) != 64:
+                continue
+            try:
+                values.append((bytes.fromhex(transaction_id)[:TRANSACTION_ID_SIZE], rowid))
+            except ValueError:
+                continue
+        conn.executemany(f"UPDATE {table} SET Transaction_ID = ? WHERE rowid = ?;", values)
+        converted += len(values)
+    set_metadata(conn, TRANSACTION_ID_FORMAT_METADATA_KEY, TRANSACTION_ID_FORMAT)
+    return converted
+
+
+def update_transaction_fingerprints(conn: sqlite3.Connection) -> int:
+    """
+    Recompute the transaction IDs of bank activity and pending transactions with the current
+    fingerprint version. The fingerprint fields are normalized, so they are rebuilt from the stored
+    columns. Runs once per fingerprint version (tracked in kash_metadata).
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        int: Number of updated transaction IDs.
+    """
+    if int(get_metadata(conn, FINGERPRINT_VERSION_METADATA_KEY, 0)) == FINGERPRINT_VERSION:
+        return 0
+    updated = 0
+    for table in ("bank_activity", "pending_transactions"):
+        records = conn.execute(f"""SELECT rowid, Details, Posting_Date, Description, Amount, Type, Balance,
+                                   Check_or_Slip_num, Account_Alias FROM {table};""").fetchall()
+        values = [(transaction_fingerprint(*record[1:]), record[0]) for record in records]
+        conn.executemany(f"UPDATE {table} SET Transaction_ID = ? WHERE rowid = ?;", values)
+        updated += len(values)
+    set_metadata(conn, FINGERPRINT_VERSION_METADATA_KEY, FINGERPRINT_VERSION)
+    return updated
+
+
+def upgrade_db(conn: sqlite3.Connection) -> None:
+    """
+    Bring a new or existing database up to the current schema.
+
+    Every statement run here is idempotent, so it is safe to call on each connection.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        None
+    """
+    create_bank_activity_indexes(conn)
+    add_bank_activity_columns(conn)
+    create_pending_transactions_table(conn)
+    create_pending_transactions_indexes(conn)
+    create_kash_metadata_table(conn)
+    convert_transaction_ids(conn)
+    update_transaction_fingerprints(conn)
+    create_recurring_transactions_table(conn)
+    create_merchants_tables(conn)
+    create_balance_gaps_table(conn)
+    create_balance_snapshots_table(conn)
+    create_spending_stats_table(conn)
+    create_watched_files_table(conn)
+    create_budgets_tables(conn)
+    create_bank_activity_fts_table(conn)
+    conn.commit()
+
+
 def db_connection(path: str) -> sqlite3.Connection:
     """
     Connect to an SQLite database, creating it if it doesn't exist, and return the connection.
@@ -118,6 +657,7 @@ def db_connection(path: str) -> sqlite3.Connection:
             print(f"Created new DB:\n{filepath}")
         else:
             check_bank_activity_table_exists(con)
+        upgrade_db(con)
     except Exception as e:
         raise SQLOperationalError(e)
 
@@ -144,6 +684,78 @@ def pathlib_path(filepath: str) -> str:
     return filepath
 
 
+def iso_date(date_str: str) -> str:
+    """
+    Validate a date string in YYYY-MM-DD format, the format dates are stored in the database.
+
+    Args:
+        date_str (str): Date string.
+
+    Returns:
+        str: The validated date string.
+
+    Raises:
+        argparse.ArgumentTypeError: If the date is not in YYYY-MM-DD format.
+    """
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Date is not in YYYY-MM-DD format: {date_str}")
+    return date_str
+
+
+def memory_size(size_str: str) -> int:
+    """
+    Parse a memory size such as "512M", "1.5GB" or "800000" (bytes).
+
+    Args:
+        size_str (str): Memory size, in bytes or with a K, M or G suffix (powers of 1024).
+
+    Returns:
+        int: The size in bytes.
+
+    Raises:
+        argparse.ArgumentTypeError: If the size can't be parsed or is zero.
+    """
+    match = MEMORY_SIZE_PATTERN.fullmatch(size_str.strip())
+    if match is None or float(match.group(1)) <= 0:
+        raise argparse.ArgumentTypeError(f"Memory size is not a positive number of bytes, K, M or G: {size_str}")
+    return int(float(match.group(1)) * MEMORY_SIZE_UNITS[match.group(2).upper()])
+
+
+def query_parameter(parameter_str: str) -> tuple:
+    """
+    Parse a query parameter given as NAME=VALUE.
+
+    Args:
+        parameter_str (str): Parameter name and value.
+
+    Returns:
+        tuple: The name (without a leading ":") and the value, as text.
+
+    Raises:
+        argparse.ArgumentTypeError: If there is no "=" or the name is not a valid parameter name.
+    """
+    name, separator, value = parameter_str.partition("=")
+    name = name.strip().lstrip(":")
+    if not separator or re.fullmatch(r"[A-Za-z_]\w*", name) is None:
+        raise argparse.ArgumentTypeError(f"Query parameter is not in NAME=VALUE format: {parameter_str}")
+    return name, value
+
+
+def get_query_parameter_names(query: str) -> set:
+    """
+    Get the names of the named parameters (:name, @name or $name) of an SQL query.
+
+    Args:
+        query (str): SQL query.
+
+    Returns:
+        set: Parameter names, without their prefix.
+    """
+    return set(QUERY_PARAMETER_PATTERN.findall(QUERY_LITERAL_PATTERN.sub(" ", query)))
+
+
 class WrongFileExtension(Exception):
     """Exception raised when the file extension is incorrect."""
     pass
@@ -176,4 +788,19 @@ class BadQueryStructureError(Exception):
 
 class UnknownAliasError(Exception):
     """Exception raised for unknown aliases."""
+    pass
+
+
+class QueryParameterError(Exception):
+    """Exception raised when a query parameter is missing or unused."""
+    pass
+
+
+class MissingDependencyError(Exception):
+    """Exception raised when an optional dependency is not installed."""
+    pass
+
+
+class ArchiveFormatError(Exception):
+    """Exception raised when an archive is in another file format."""
     pass
\ No newline at end of file
@@ -5,7 +5,7 @@ def get_help_menu() -> dict:
         'import': {
             'desc': """Subcommand that works directly with a local database""",
             'sqlite_db': """Path to new or existing sqlite db""",
-            'csv_file': """Imports new records from csv file(s)""",
+            'csv_file': """Imports new records from an "import-ready" CSV file, plain or compressed (.gz, .bz2, .xz, .zip), or "-" for standard input""",
             'account_alias': """The alias given to the set of transactions during import""",
             'commit': """Commits changes to database based on analysis""",
         },
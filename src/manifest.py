@@ -0,0 +1,276 @@
+import io
+import os
+import glob
+import argparse
+import configparser
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas
+
+from src.interface_funcs import ConfigSectionIncompleteError
+from src.dedup import find_near_duplicates, transaction_ids_in
+from src.csv_input import DEFAULT_CSV_ENGINE
+from src.user_settings import UserSettings
+from src.controller import (
+    CSVHandler,
+    DataBaseInterface,
+    read_csv_in_chase_format,
+    run_post_import_stages,
+)
+
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)  # Files parsed concurrently
+SUMMARY_COLUMNS = ["Source", "File", "Account", "Rows", "New", "Pending", "Possible Duplicates"]
+
+CONFIG_HELP = ("\nTroubleshooting help: Ensure every section of the manifest defines \"paths\" (one path or"
+               " glob pattern per line) and an \"account_alias\", and optionally a \"conversion_config\" path"
+               " and \"skip_near_duplicates\".")
+
+
+class ManifestSource:
+    """
+    Files of one account listed in a manifest.
+
+    Attributes:
+        name (str): Name of the source (its manifest section).
+        patterns (list): Paths or glob patterns of the files.
+        account_alias (str): Alias of the account the files are imported into.
+        conversion_config (str): Path to the conversion config of files that aren't "import-ready",
+            or None.
+        skip_near_duplicates (bool): Leave out likely duplicates of stored transactions.
+    """
+    def __init__(self, name: str, patterns: list, account_alias: str, conversion_config: str = None,
+                 skip_near_duplicates: bool = False) -> None:
+        """
+        Initialize ManifestSource.
+
+        Args:
+            name (str): Name of the source.
+            patterns (list): Paths or glob patterns of the files.
+            account_alias (str): Account alias.
+            conversion_config (str, optional): Path to a conversion config.
+            skip_near_duplicates (bool, optional): Leave out likely duplicates of stored transactions.
+        """
+        self.name = name
+        self.patterns = patterns
+        self.account_alias = account_alias
+        self.conversion_config = conversion_config
+        self.skip_near_duplicates = skip_near_duplicates
+
+    def get_paths(self) -> list:
+        """
+        Expand the patterns of the source.
+
+        Returns:
+            list: Paths of the existing files, sorted within each pattern, without repeats.
+        """
+        paths = []
+        for pattern in self.patterns:
+            paths.extend(path for path in sorted(glob.glob(pattern, recursive=True)) if os.path.isfile(path))
+        return list(dict.fromkeys(paths))
+
+
+def load_manifest(config: configparser.ConfigParser, manifest_directory: str = "") -> list:
+    """
+    Read the sources of a manifest.
+
+    Every section is a source, with its `paths` (one path or glob pattern per line), the
+    `account_alias` of the files and, for files that aren't "import-ready", the path of their
+    `conversion_config`. `skip_near_duplicates = true` leaves out likely duplicates of stored
+    transactions. Relative paths are relative to the manifest's directory, and options of the
+    DEFAULT section apply to every source.
+
+    Args:
+        config (configparser.ConfigParser): Manifest.
+        manifest_directory (str, optional): Directory of the manifest file.
+
+    Returns:
+        list: ManifestSource objects, in manifest order.
+
+    Raises:
+        ConfigSectionIncompleteError: If a section has no paths or account alias, if an option
+            is invalid, or if there is no section.
+    """
+    sources = []
+    for section in config.sections():
+        patterns = [line.strip() for line in config[section].get("paths", "").splitlines() if line.strip()]
+        account_alias = config[section].get("account_alias", "").strip()
+        if not patterns or not account_alias:
+            raise ConfigSectionIncompleteError(f"[{section}]: No paths or account_alias.{CONFIG_HELP}")
+        conversion_config = config[section].get("conversion_config", "").strip() or None
+        if conversion_config:
+            conversion_config = os.path.join(manifest_directory, conversion_config)
+        try:
+            skip_near_duplicates = config[section].getboolean("skip_near_duplicates", False)
+        except ValueError as e:
+            raise ConfigSectionIncompleteError(f"[{section}]: {e}.{CONFIG_HELP}")
+        patterns = [os.path.join(manifest_directory, os.path.expanduser(pattern)) for pattern in patterns]
+        sources.append(ManifestSource(section, patterns, account_alias, conversion_config, skip_near_duplicates))
+    if not sources:
+        raise ConfigSectionIncompleteError(f"No sources.{CONFIG_HELP}")
+    return sources
+
+
+def read_source_file(path: str, account_alias: str, conversion_config: str = None) -> tuple:
+    """
+    Read, convert and fingerprint one file of a manifest. Runs in a worker process.
+
+    Args:
+        path (str): Path to the file (plain or compressed).
+        account_alias (str): Account alias.
+        conversion_config (str, optional): Path to the conversion config of the file.
+
+    Returns:
+        tuple: DataFrames of the settled and of the pending transactions of the file.
+    """
+    csv_file = path
+    if conversion_config:
+        config = UserSettings(argparse.Namespace()).get_config_object(conversion_config)
+        # Converted rows go through CSV text, so they get the same types as an import-ready file
+        csv_file = io.StringIO(read_csv_in_chase_format(path, config).to_csv(index=False))
+    user_settings = argparse.Namespace(csv_file=csv_file, account_alias=account_alias, category_rules=None,
+                                       csv_engine=DEFAULT_CSV_ENGINE, since=None, until=None)
+    csv_handler = CSVHandler(user_settings)
+    return csv_handler.get_new_settled_transactions_df(), csv_handler.get_new_pending_transactions_df()
+
+
+class ManifestRun:
+    """
+    Imports every file of a manifest as one pipeline.
+
+    The files are read, converted and fingerprinted in parallel worker processes. Their settled
+    transactions are then deduplicated in one pass (against each other, so overlapping exports
+    of an account are imported once, and against the database through one transaction ID lookup),
+    checked for near-duplicates of stored transactions and of the earlier files of their account,
+    and written in one transaction together with the pending transactions of each account, taken
+    from its most recently modified file. The derived tables are brought up to date once, for all
+    the imported accounts.
+
+    Attributes:
+        _db_interface (DataBaseInterface): Interface to the database.
+        _conn (sqlite3.Connection): SQLite database connection.
+        _sources (list): ManifestSource objects.
+        _category_rules (CategoryRules): Rules categorizing the imported transactions, or None.
+        _commit (bool): Write to the database.
+        _jobs (int): Number of worker processes.
+    """
+    def __init__(self, db_interface: DataBaseInterface, conn, sources: list, category_rules=None,
+                 commit: bool = False, jobs: int = DEFAULT_JOBS) -> None:
+        """
+        Initialize ManifestRun.
+
+        Args:
+            db_interface (DataBaseInterface): Interface to the database.
+            conn (sqlite3.Connection): SQLite database connection.
+            sources (list): ManifestSource objects.
+            category_rules (CategoryRules, optional): Rules categorizing the imported transactions.
+            commit (bool, optional): Write to the database.
+            jobs (int, optional): Number of worker processes (1 reads the files in this process).
+        """
+        self._db_interface = db_interface
+        self._conn = conn
+        self._sources = sources
+        self._category_rules = category_rules
+        self._commit = commit
+        self._jobs = jobs
+
+    def _read_files(self, files: list) -> list:
+        """
+        Read the files, in parallel when there are several files and jobs.
+
+        Args:
+            files (list): (ManifestSource, path) tuples.
+
+        Returns:
+            list: (settled DataFrame, pending DataFrame) of each file, in the order of files.
+        """
+        args = ([path for _, path in files], [source.account_alias for source, _ in files],
+                [source.conversion_config for source, _ in files])
+        if self._jobs <= 1 or len(files) <= 1:
+            return list(map(read_source_file, *args))
+        with ProcessPoolExecutor(max_workers=min(self._jobs, len(files))) as executor:
+            return list(executor.map(read_source_file, *args))
+
+    def run(self) -> tuple:
+        """
+        Run the manifest.
+
+        Returns:
+            tuple: Summary DataFrame (one row per file, SUMMARY_COLUMNS) and the DataFrame of the
+                new settled transactions.
+        """
+        files = [(source, path) for source in self._sources for path in source.get_paths()]
+        results = self._read_files(files)
+
+        # Settled transactions: drop the ones of earlier files of the run, then the stored ones
+        seen_transaction_ids = set()
+        settled_dfs = []
+        for settled_df, _ in results:
+            settled_dfs.append(settled_df[~transaction_ids_in(settled_df["Transaction ID"], seen_transaction_ids)])
+            seen_transaction_ids.update(settled_df["Transaction ID"])
+        existing_transaction_ids = self._db_interface.get_existing_transaction_ids(list(seen_transaction_ids))
+        settled_dfs = [df[~transaction_ids_in(df["Transaction ID"], existing_transaction_ids)] for df in settled_dfs]
+
+        # Near-duplicates of the stored transactions and of the earlier files of the account
+        near_duplicate_ids = set()
+        skipped_ids = set()
+        earlier_dfs = {}
+        for (source, _), settled_df in zip(files, settled_dfs):
+            near_duplicates_df = self._db_interface.get_near_duplicates(settled_df, source.account_alias)
+            earlier_df = earlier_dfs.get(source.account_alias)
+            if earlier_df is not None:
+                # Empty frames are left out, pandas warns when concatenating them
+                near_duplicates_dfs = [df for df in (near_duplicates_df, find_near_duplicates(settled_df, earlier_df))
+                                       if not df.empty]
+                if near_duplicates_dfs:
+                    near_duplicates_df = pandas.concat(near_duplicates_dfs)
+            near_duplicates = set(near_duplicates_df["Transaction ID"])
+            near_duplicate_ids |= near_duplicates
+            if source.skip_near_duplicates:
+                skipped_ids |= near_duplicates
+            kept_df = settled_df[~transaction_ids_in(settled_df["Transaction ID"], skipped_ids)]
+            if earlier_df is None or earlier_df.empty:
+                earlier_dfs[source.account_alias] = kept_df
+            elif not kept_df.empty:
+                earlier_dfs[source.account_alias] = pandas.concat([earlier_df, kept_df])
+
+        summary = []
+        for (source, path), (read_df, pending_df), settled_df in zip(files, results, settled_dfs):
+            transaction_ids = settled_df["Transaction ID"]
+            summary.append((source.name, os.path.basename(path), source.account_alias,
+                            len(read_df.index) + len(pending_df.index),
+                            int((~transaction_ids_in(transaction_ids, skipped_ids)).sum()), len(pending_df.index),
+                            int(transaction_ids_in(transaction_ids, near_duplicate_ids).sum())))
+        summary_df = pandas.DataFrame.from_records(summary, columns=SUMMARY_COLUMNS)
+
+        if not settled_dfs:
+            return summary_df, pandas.DataFrame()
+        new_transactions_df = pandas.concat(settled_dfs, ignore_index=True)
+        new_transactions_df = new_transactions_df[~transaction_ids_in(new_transactions_df["Transaction ID"], skipped_ids)]
+        if self._category_rules is not None:
+            new_transactions_df = new_transactions_df.assign(
+                Category=self._category_rules.categorize(new_transactions_df["Description"]))
+
+        self._write(files, results, new_transactions_df)
+        return summary_df, new_transactions_df
+
+    def _write(self, files: list, results: list, new_transactions_df: pandas.DataFrame) -> None:
+        """
+        Write the new settled transactions and the pending transactions in one transaction, then
+        update the derived tables.
+
+        Args:
+            files (list): (ManifestSource, path) tuples.
+            results (list): (settled DataFrame, pending DataFrame) of each file.
+            new_transactions_df (pandas.DataFrame): New settled transactions.
+        """
+        if not self._commit or not files:
+            return
+        self._db_interface.insert_df_into_bank_activity_table(new_transactions_df, commit_transaction=False)
+        latest_pending_dfs = {}
+        for (source, path), (_, pending_df) in sorted(zip(files, results), key=lambda item: os.path.getmtime(item[0][1])):
+            latest_pending_dfs[source.account_alias] = pending_df
+        for account_alias, pending_df in latest_pending_dfs.items():
+            self._db_interface.insert_df_into_pending_transactions_table(pending_df, account_alias,
+                                                                         commit_transaction=False)
+        self._conn.commit()
+        run_post_import_stages(self._conn, list(latest_pending_dfs))
@@ -0,0 +1,143 @@
+import os
+import sys
+import contextlib
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SAMPLE_ROWS = 1000  # Rows of the first chunk, whose memory sizes the next chunks
+MIN_CHUNK_ROWS = 100  # Fewest rows per chunk, however small the budget
+CHUNK_SHARE = 0.5  # Share of the available memory one chunk may use (the previous chunk may still be held)
+
+
+def get_current_memory() -> int:
+    """
+    Get the resident memory of the process.
+
+    Returns:
+        int: Resident memory in bytes, or None when the platform doesn't report it (only Linux does).
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def get_peak_memory() -> int:
+    """
+    Get the peak resident memory of the process, since its start or the last reset_peak_memory().
+
+    Returns:
+        int: Peak resident memory in bytes, or None when the platform doesn't report it.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_peak_memory() -> bool:
+    """
+    Reset the peak resident memory of the process to its current resident memory.
+
+    Returns:
+        bool: True if the peak was reset (Linux), False if the platform doesn't support it.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class MemoryBudget:
+    """
+    Sizes the chunks of a chunked process to a memory budget and records the peak memory of its stages.
+
+    The first chunk has SAMPLE_ROWS rows and is processed with tracemalloc on, which measures the
+    memory its rows take through every stage. The next chunks get as many rows as fit in
+    CHUNK_SHARE of the budget left over by the process when the budget was created. Only the first
+    chunk is traced, since tracemalloc makes the per-row work several times slower.
+
+    The peak memory of a stage is the peak resident memory of the process while it runs. Linux
+    resets the peak at the start of each stage; on other platforms it's the peak since the process
+    started.
+
+    Attributes:
+        max_bytes (int): Memory budget in bytes.
+        chunk_rows (int): Number of rows of the next chunk.
+        bytes_per_row (float): Memory taken by a row, measured on the first chunk, or None.
+        peaks (dict): Peak resident memory of each stage in bytes, in the order the stages ran.
+        _available (int): Bytes the chunks may use: the budget minus the memory in use at creation.
+    """
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Initialize MemoryBudget.
+
+        Args:
+            max_bytes (int): Memory budget in bytes, for the whole process.
+        """
+        self.max_bytes = max_bytes
+        self.chunk_rows = SAMPLE_ROWS
+        self.bytes_per_row = None
+        self.peaks = {}
+        current_memory = get_current_memory() or 0
+        self._available = max(max_bytes - current_memory, 0)
+
+    def start_chunk(self) -> None:
+        """
+        Start processing a chunk. Traces the memory of the first chunk.
+        """
+        if self.bytes_per_row is None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def end_chunk(self, rows: int) -> None:
+        """
+        Finish processing a chunk. Sizes the next chunks once the first chunk is measured.
+
+        Args:
+            rows (int): Number of rows of the chunk.
+        """
+        if self.bytes_per_row is not None or not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.bytes_per_row = peak / max(rows, 1)
+        self.chunk_rows = max(MIN_CHUNK_ROWS, int(self._available * CHUNK_SHARE / max(self.bytes_per_row, 1)))
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        Record the peak memory of a stage. A stage run once per chunk keeps its highest peak.
+
+        Args:
+            name (str): Name of the stage.
+        """
+        reset_peak_memory()
+        try:
+            yield
+        finally:
+            peak = get_peak_memory()
+            if peak is not None:
+                self.peaks[name] = max(self.peaks.get(name, 0), peak)
+
+    def is_exceeded(self) -> bool:
+        """
+        Check whether a stage went over the budget.
+
+        Returns:
+            bool: True if the peak memory of a stage is larger than the budget.
+        """
+        return any(peak > self.max_bytes for peak in self.peaks.values())
@@ -0,0 +1,165 @@
+import re
+import sqlite3
+import functools
+
+import numpy
+import pandas
+
+from src.interface_funcs import get_metadata, set_metadata
+
+# SQL queries
+SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT COALESCE(MAX(ID), 0) FROM bank_activity;"
+SELECT_UNSEEN_DESCRIPTIONS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT DISTINCT b.Description FROM bank_activity b LEFT JOIN merchant_descriptions d ON d.Description = b.Description WHERE b.ID > ? AND b.ID <= ? AND b.Description IS NOT NULL AND d.Description IS NULL;"""
+INSERT_INTO_MERCHANTS_TABLE = \
+    "INSERT OR IGNORE INTO merchants (Merchant_Key) VALUES(?);"
+INSERT_INTO_MERCHANT_DESCRIPTIONS_TABLE = \
+    """INSERT OR REPLACE INTO merchant_descriptions (Description, Merchant_ID) SELECT ?, ID FROM merchants WHERE Merchant_Key = ?;"""
+# Only rows whose merchant changes are written (UPDATE ... FROM needs SQLite 3.33+)
+UPDATE_MERCHANT_ID_IN_BANK_ACTIVITY_TABLE = \
+    """UPDATE bank_activity SET Merchant_ID = m.Merchant_ID FROM (SELECT b.ID, d.Merchant_ID FROM bank_activity b LEFT JOIN merchant_descriptions d ON d.Description = b.Description WHERE b.ID > ? AND b.ID <= ?) m WHERE bank_activity.ID = m.ID AND bank_activity.Merchant_ID IS NOT m.Merchant_ID;"""
+DELETE_UNUSED_FROM_MERCHANTS_TABLE = \
+    "DELETE FROM merchants WHERE ID NOT IN (SELECT Merchant_ID FROM merchant_descriptions);"
+SELECT_MERCHANT_TOTALS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT m.ID, m.Merchant_Key, COUNT(*), ROUND(SUM(b.Amount), 2), MIN(b.Posting_Date), MAX(b.Posting_Date) FROM bank_activity b JOIN merchants m ON m.ID = b.Merchant_ID GROUP BY b.Merchant_ID ORDER BY COUNT(*) DESC LIMIT ?;"""
+
+LAST_ID_METADATA_KEY = "merchants_last_id"
+
+# Number of distinct raw descriptions whose merchant key is kept in memory
+MERCHANT_KEY_CACHE_SIZE = 65536
+
+# Rules applied in order to an upper-cased description: payment processor prefixes ("SQ *",
+# "TST* ", ...), dates, long numbers (store, reference and card numbers) and punctuation are
+# removed, then whitespace is collapsed.
+NORMALIZATION_RULES = [
+    (re.compile(r"^(?:SQ|TST|SP|PP|PAYPAL|IN|BT)\s?\*\s*"), " "),
+    (re.compile(r"\d{1,2}/\d{1,2}(/\d{2,4})?"), " "),
+    (re.compile(r"[#*X]*\d{3,}"), " "),
+    (re.compile(r"[^A-Z0-9&]+"), " "),
+    (re.compile(r"\s+"), " "),
+]
+
+
+@functools.lru_cache(maxsize=MERCHANT_KEY_CACHE_SIZE)
+def merchant_key(description: str) -> str:
+    """
+    Reduce a raw bank description to the key shared by every transaction of the same merchant.
+
+    Args:
+        description (str): Raw description.
+
+    Returns:
+        str: Merchant key, empty when nothing is left of the description.
+    """
+    key = description.upper()
+    for pattern, replacement in NORMALIZATION_RULES:
+        key = pattern.sub(replacement, key)
+    return key.strip()
+
+
+def normalize_descriptions(descriptions: pandas.Series) -> pandas.Series:
+    """
+    Find the merchant key of every description.
+
+    Each distinct description is normalized once (and remembered across calls by merchant_key's
+    cache).
+
+    Args:
+        descriptions (pandas.Series): Raw descriptions.
+
+    Returns:
+        pandas.Series: Merchant keys, same index.
+    """
+    codes, uniques = pandas.factorize(descriptions.fillna("").astype(str))
+    keys = numpy.array([merchant_key(description) for description in uniques], dtype=object)
+    return pandas.Series(keys[codes], index=descriptions.index, dtype=object)
+
+
+class MerchantIndex:
+    """
+    Maps the descriptions of the bank activity table to merchants.
+
+    Every distinct raw description is normalized once and recorded in the merchant_descriptions
+    lookup table, and each transaction gets the integer ID of its merchant in the Merchant_ID
+    column. Updates only read the rows added since the last update (tracked in kash_metadata), and
+    only normalize the descriptions never seen before.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initialize MerchantIndex.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+        """
+        self._conn = conn
+
+    def update(self) -> int:
+        """
+        Assign merchants to the rows added since the last update.
+
+        Returns:
+            int: Number of descriptions seen for the first time.
+        """
+        last_id = int(get_metadata(self._conn, LAST_ID_METADATA_KEY, 0))
+        max_id = self._conn.execute(SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+        if max_id <= last_id:
+            return 0
+        new_descriptions = self._map_new_descriptions(last_id, max_id)
+        self._conn.execute(UPDATE_MERCHANT_ID_IN_BANK_ACTIVITY_TABLE, (last_id, max_id))
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, max_id)
+        self._conn.commit()
+        return new_descriptions
+
+    def rebuild(self) -> int:
+        """
+        Normalize every description again (e.g. after the normalization rules changed).
+
+        Merchants keep their ID when their key still exists; merchants left without descriptions
+        are deleted.
+
+        Returns:
+            int: Number of distinct descriptions.
+        """
+        self._conn.execute("DELETE FROM merchant_descriptions;")
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, 0)
+        descriptions = self.update()
+        self._conn.execute(DELETE_UNUSED_FROM_MERCHANTS_TABLE)
+        self._conn.commit()
+        return descriptions
+
+    def _map_new_descriptions(self, first_id: int, last_id: int) -> int:
+        """
+        Record the merchant of the descriptions of a range of rows that aren't in the lookup table.
+
+        Args:
+            first_id (int): Rows with a higher ID are read.
+            last_id (int): Rows with a higher ID are ignored.
+
+        Returns:
+            int: Number of descriptions added to the lookup table.
+        """
+        records = self._conn.execute(SELECT_UNSEEN_DESCRIPTIONS_FROM_BANK_ACTIVITY_TABLE, (first_id, last_id)).fetchall()
+        descriptions = [record[0] for record in records]
+        keys = [merchant_key(str(description)) for description in descriptions]
+        self._conn.executemany(INSERT_INTO_MERCHANTS_TABLE, [(key,) for key in dict.fromkeys(keys) if key])
+        self._conn.executemany(INSERT_INTO_MERCHANT_DESCRIPTIONS_TABLE, zip(descriptions, keys))
+        return len(descriptions)
+
+    def get_merchants(self, top: int = 25) -> pandas.DataFrame:
+        """
+        Count and sum the transactions of the merchants with the most transactions.
+
+        Args:
+            top (int, optional): Number of merchants to return.
+
+        Returns:
+            pandas.DataFrame: Columns "Merchant ID", "Merchant", "Transactions", "Total", "First Date"
+                and "Last Date".
+        """
+        records = self._conn.execute(SELECT_MERCHANT_TOTALS_FROM_BANK_ACTIVITY_TABLE, (top,)).fetchall()
+        columns = ["Merchant ID", "Merchant", "Transactions", "Total", "First Date", "Last Date"]
+        return pandas.DataFrame.from_records(records, columns=columns)
@@ -0,0 +1,244 @@
+import sqlite3
+
+import pandas
+
+from src.interface_funcs import BadQueryStructureError
+
+# SQL queries
+# The query of an alias is wrapped as a subquery; SQLite flattens it, so the key range becomes a
+# seek on the index (or the rowid) of the key column instead of skipping the earlier rows.
+SELECT_COLUMNS_FROM_QUERY = \
+    "SELECT * FROM ({query}) LIMIT 0;"
+SELECT_PAGE_FROM_QUERY = \
+    "SELECT * FROM ({query}) WHERE {key} IS NOT NULL{after} ORDER BY {order} LIMIT :kash_page_limit;"
+
+TIEBREAK_COLUMN = "ID"
+
+
+def quote_identifier(name: str) -> str:
+    """
+    Quote a column name as an SQL identifier.
+
+    Args:
+        name (str): Column name.
+
+    Returns:
+        str: The name in double quotes, with inner double quotes doubled.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def parse_key_value(value: str):
+    """
+    Convert a key typed by the user to the number it spells, if any, so it compares like the
+    values of numeric columns.
+
+    Args:
+        value (str): Key value.
+
+    Returns:
+        int | float | str: The value as an int or a float when it is a number, else unchanged.
+    """
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+class KeysetPager:
+    """
+    Walks the rows of a query page by page with keyset pagination.
+
+    The rows are ordered by a key column, ties broken by the ID column. Each page starts after the
+    key of the last row of the previous page, so fetching page 1,000 costs as much as fetching page
+    1 (no OFFSET). Going back seeks backward from the key of the first row of the current page. Rows
+    whose key is NULL are left out.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+        _query (str): Query of the rows.
+        _parameters (dict): Values of the named parameters of the query.
+        page_size (int): Number of rows per page.
+        key (str): Column the rows are ordered by.
+        descending (bool): Whether the rows are in descending key order.
+        columns (list): Columns of the query.
+        page_number (int): Number of the current page, None after a jump.
+        first_row (int): Number of the first row of the current page, None after a jump.
+        is_last_page (bool): Whether the current page is the last one.
+    """
+    def __init__(self, conn: sqlite3.Connection, query: str, page_size: int, key: str = TIEBREAK_COLUMN,
+                 descending: bool = False, parameters: dict = None) -> None:
+        """
+        Initialize KeysetPager.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+            query (str): Query of the rows. It must return the ID column.
+            page_size (int): Number of rows per page.
+            key (str, optional): Column the rows are ordered by.
+            descending (bool, optional): Walk the rows in descending key order.
+            parameters (dict, optional): Values of the named parameters of the query.
+
+        Raises:
+            BadQueryStructureError: If the query doesn't return the key or the ID column.
+        """
+        self._conn = conn
+        self._query = query.strip().rstrip(";")
+        self._parameters = dict(parameters or {})
+        self.page_size = page_size
+        self.descending = descending
+        cursor = conn.execute(SELECT_COLUMNS_FROM_QUERY.format(query=self._query), self._parameters)
+        self.columns = [column[0] for column in cursor.description]
+        self.key = self._find_column(key)
+        self._key_columns = [self.key]
+        if self.key != TIEBREAK_COLUMN:
+            self._key_columns.append(self._find_column(TIEBREAK_COLUMN))
+        self._page = None
+        self._back_start = None
+        self._last_key = None
+        self.page_number = None
+        self.first_row = None
+        self.is_last_page = True
+
+    def _find_column(self, name: str) -> str:
+        """
+        Find a column of the query by name, ignoring case.
+
+        Args:
+            name (str): Column name.
+
+        Returns:
+            str: Column name as returned by the query.
+
+        Raises:
+            BadQueryStructureError: If the query doesn't return the column.
+        """
+        for column in self.columns:
+            if column.casefold() == name.casefold():
+                return column
+        raise BadQueryStructureError(f"Paging needs the {name} column in the query results: {self._query}")
+
+    def _fetch(self, start: tuple, backward: bool = False) -> list:
+        """
+        Fetch the rows of a page, and one more to tell whether more rows follow it.
+
+        Args:
+            start (tuple): None for the first page, ("after", key values) for the rows after the
+                key of a row, or ("at", value) for the rows from a key value on.
+            backward (bool, optional): Fetch the rows before the key instead, nearest first.
+
+        Returns:
+            list: Up to page_size + 1 rows.
+        """
+        quoted = [quote_identifier(column) for column in self._key_columns]
+        descending = self.descending != backward
+        operator = "<" if descending else ">"
+        after, args = "", dict(self._parameters, kash_page_limit=self.page_size + 1)
+        if start is not None:
+            kind, values = start
+            if kind == "after":
+                names = [f"kash_page_key_{idx}" for idx in range(len(values))]
+                after = f" AND ({', '.join(quoted)}) {operator} ({', '.join(':' + name for name in names)})"
+                args.update(zip(names, values))
+            else:
+                after = f" AND {quoted[0]} {operator}{'' if backward else '='} :kash_page_key_0"
+                args["kash_page_key_0"] = values
+        direction = " DESC" if descending else ""
+        query = SELECT_PAGE_FROM_QUERY.format(query=self._query, key=quoted[0], after=after,
+                                              order=", ".join(column + direction for column in quoted))
+        return self._conn.execute(query, args).fetchall()
+
+    def _show(self, rows: list, start: tuple) -> pandas.DataFrame:
+        """
+        Make rows the current page.
+
+        Args:
+            rows (list): Rows of the page, in key order.
+            start (tuple): Start the page was fetched from, to go back from when it's empty.
+
+        Returns:
+            pandas.DataFrame: Rows of the page.
+        """
+        if rows:
+            key_idx = [self.columns.index(column) for column in self._key_columns]
+            self._back_start = ("after", tuple(rows[0][idx] for idx in key_idx))
+            self._last_key = tuple(rows[-1][idx] for idx in key_idx)
+        else:
+            self._back_start = start
+        self._page = pandas.DataFrame(rows, columns=self.columns)
+        return self._page
+
+    def first(self) -> pandas.DataFrame:
+        """
+        Go to the first page.
+
+        Returns:
+            pandas.DataFrame: Rows of the page.
+        """
+        rows = self._fetch(None)
+        self.is_last_page = len(rows) <= self.page_size
+        self.page_number, self.first_row = 1, 1
+        self._show(rows[:self.page_size], None)
+        self._back_start = None
+        return self._page
+
+    def next(self) -> pandas.DataFrame:
+        """
+        Go to the page after the current one. Stays on the last page.
+
+        Returns:
+            pandas.DataFrame: Rows of the page.
+        """
+        if self._page is None:
+            return self.first()
+        if self.is_last_page:
+            return self._page
+        start = ("after", self._last_key)
+        rows = self._fetch(start)
+        self.is_last_page = len(rows) <= self.page_size
+        if self.page_number is not None:
+            self.page_number += 1
+            self.first_row += self.page_size
+        return self._show(rows[:self.page_size], start)
+
+    def previous(self) -> pandas.DataFrame:
+        """
+        Go to the page before the current one, seeking backward from the first key of the current
+        page. Stays on the first page.
+
+        Returns:
+            pandas.DataFrame: Rows of the page.
+        """
+        if self._page is None:
+            return self.first()
+        if self._back_start is None:
+            return self._page
+        rows = self._fetch(self._back_start, backward=True)
+        if len(rows) <= self.page_size:
+            # No page before that one: the rows are the start of the first page
+            return self.first()
+        self.is_last_page = False
+        if self.page_number is not None:
+            self.page_number -= 1
+            self.first_row -= self.page_size
+        return self._show(rows[self.page_size - 1::-1], None)
+
+    def jump(self, value) -> pandas.DataFrame:
+        """
+        Go to the page starting at the first row whose key is at or past a value.
+
+        The page numbers are unknown from there on, since the rows before it aren't counted.
+
+        Args:
+            value: Key value.
+
+        Returns:
+            pandas.DataFrame: Rows of the page.
+        """
+        start = ("at", value)
+        rows = self._fetch(start)
+        self.is_last_page = len(rows) <= self.page_size
+        self.page_number, self.first_row = None, None
+        return self._show(rows[:self.page_size], start)
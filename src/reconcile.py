@@ -0,0 +1,316 @@
+import sqlite3
+from collections import Counter
+
+import numpy
+import pandas
+
+# SQL queries
+SELECT_ACCOUNT_ALIASES_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT DISTINCT Account_Alias FROM bank_activity;"""
+SELECT_FIRST_UNCHECKED_DATE_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT MIN(Posting_Date) FROM bank_activity WHERE Account_Alias = ? AND COALESCE(Reconciled, 'N') = 'N';"""
+SELECT_ANCHOR_DATE_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT MAX(Posting_Date) FROM bank_activity WHERE Account_Alias = ? AND Reconciled IN ('Y', 'G') AND TRIM(COALESCE(Balance, '')) != '' AND Posting_Date < ?;"""
+SELECT_ACCOUNT_ROWS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT ID, Posting_Date, Amount, Balance, Reconciled FROM bank_activity WHERE Account_Alias = ? AND Posting_Date >= ?;"""
+UPDATE_RECONCILED_IN_BANK_ACTIVITY_TABLE = \
+    "UPDATE bank_activity SET Reconciled = ? WHERE ID = ?;"
+RESET_RECONCILED_IN_BANK_ACTIVITY_TABLE = \
+    "UPDATE bank_activity SET Reconciled = 'N' WHERE Account_Alias = ?;"
+SELECT_ROW_IDS_FROM_BALANCE_GAPS_TABLE = \
+    "SELECT Row_ID FROM balance_gaps WHERE Account_Alias = ?;"
+DELETE_FROM_BALANCE_GAPS_TABLE = \
+    "DELETE FROM balance_gaps WHERE Row_ID = ?;"
+INSERT_INTO_BALANCE_GAPS_TABLE = \
+    """INSERT INTO balance_gaps (Account_Alias, Row_ID, Start_Date, End_Date, Expected_Balance, Balance, Difference) VALUES(?, ?, ?, ?, ?, ?, ?);"""
+SELECT_GAPS_FROM_BALANCE_GAPS_TABLE = \
+    """SELECT Account_Alias, Start_Date, End_Date, Expected_Balance, Balance, Difference FROM balance_gaps ORDER BY Account_Alias, End_Date;"""
+SELECT_SUMMARY_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Account_Alias, COUNT(*), SUM(Reconciled = 'Y'), SUM(Reconciled = 'G'), SUM(COALESCE(Reconciled, 'N') = 'N') FROM bank_activity GROUP BY Account_Alias ORDER BY Account_Alias;"""
+
+# Values of the Reconciled column
+RECONCILED = "Y"  # The balance follows from the previous balance and the amounts in between
+GAP = "G"  # The balance doesn't follow: transactions before this one are missing
+UNCHECKED = "N"  # Not checked yet, or no later balance to check against
+
+GAP_COLUMNS = ["Row ID", "Start Date", "End Date", "Expected Balance", "Balance", "Difference"]
+
+
+def parse_balances(balances: pandas.Series) -> pandas.Series:
+    """
+    Convert stored balances to numbers.
+
+    Args:
+        balances (pandas.Series): Balances as stored, e.g. "1,234.56", " " or None.
+
+    Returns:
+        pandas.Series: Balances as floats, NaN when missing.
+    """
+    cleaned = balances.astype(str).str.replace(r"[$,\s]", "", regex=True)
+    return pandas.to_numeric(cleaned, errors="coerce")
+
+
+def order_within_days(rows: pandas.DataFrame) -> pandas.DataFrame:
+    """
+    Sort one account's rows oldest first.
+
+    Bank exports list the rows newest first, so the rows of a day imported from one file are in
+    descending ID order. Rows of a day imported from several files aren't, so a day whose balances
+    don't chain in that order (each balance equal to the previous balance plus the amount) is
+    ordered by following its balances instead. Days with a missing balance, or whose balances can't
+    be chained, keep the ID order.
+
+    Args:
+        rows (pandas.DataFrame): Columns "ID", "Posting Date", "Amount" and "Balance" (float, NaN
+            when missing).
+
+    Returns:
+        pandas.DataFrame: The rows, oldest first.
+    """
+    rows = rows.sort_values(["Posting Date", "ID"], ascending=[True, False], kind="stable")
+    dates = rows["Posting Date"].to_numpy(dtype=object)
+    amounts = numpy.round(rows["Amount"].fillna(0).to_numpy(dtype=float) * 100)
+    balances = numpy.round(rows["Balance"].to_numpy(dtype=float) * 100)
+    same_day = dates[1:] == dates[:-1]
+    known = ~numpy.isnan(balances)
+    broken = same_day & known[1:] & known[:-1] & (balances[1:] != balances[:-1] + amounts[1:])
+    if not broken.any():
+        return rows
+
+    order = numpy.arange(len(dates))
+    day_starts = numpy.flatnonzero(numpy.r_[True, ~same_day])
+    day_ends = numpy.r_[day_starts[1:], len(dates)]
+    for day in numpy.unique(numpy.searchsorted(day_starts, numpy.flatnonzero(broken) + 1, side="right") - 1):
+        start, end = day_starts[day], day_ends[day]
+        opening = balances[order[start - 1]] if start else numpy.nan
+        chained = _chain_day(amounts[start:end], balances[start:end], opening)
+        if chained is not None:
+            order[start:end] = start + chained
+    return rows.iloc[order]
+
+
+def _chain_day(amounts: numpy.ndarray, balances: numpy.ndarray, opening: float):
+    """
+    Order the rows of a day so that each balance equals the previous balance plus the amount.
+
+    Args:
+        amounts (numpy.ndarray): Amounts in cents, in descending ID order.
+        balances (numpy.ndarray): Balances in cents, in the same order.
+        opening (float): Balance in cents before the day, NaN when unknown.
+
+    Returns:
+        numpy.ndarray: Positions of the rows, oldest first, or None when they don't chain. Ties are
+            broken by the descending ID order.
+    """
+    if numpy.isnan(balances).any():
+        return None
+    previous = (balances - amounts).tolist()
+    balances = balances.tolist()
+    following = {}
+    for idx, balance in enumerate(previous):
+        following.setdefault(balance, []).append(idx)
+    if numpy.isnan(opening) or opening not in following:
+        # Start from the row whose previous balance isn't the balance of another row of the day
+        counts = Counter(balances)
+        starts = [idx for idx, balance in enumerate(previous)
+                  if counts[balance] == (balance == balances[idx])]
+        if not starts:
+            return None
+        opening = previous[starts[0]]
+
+    chained, current = [], opening
+    for _ in range(len(balances)):
+        candidates = following.get(current)
+        if not candidates:
+            return None
+        chained.append(candidates.pop(0))
+        current = balances[chained[-1]]
+    return numpy.array(chained)
+
+
+def check_balance_chain(rows: pandas.DataFrame, anchor: tuple = None) -> tuple:
+    """
+    Check that each balance equals the previous balance plus the amounts in between.
+
+    Works in integer cents on cumulative sums: the chain holds when the balance minus the running
+    total of amounts is the same for every row with a balance. Rows without a balance get the status
+    of the next row with a balance; rows after the last balance stay unchecked.
+
+    Args:
+        rows (pandas.DataFrame): One account's rows, oldest first, with columns "ID", "Posting Date",
+            "Amount" and "Balance" (float, NaN when missing).
+        anchor (tuple, optional): (posting date, balance) of the reconciled row right before `rows`.
+            Without it, the first balance starts the chain.
+
+    Returns:
+        tuple: Array of Reconciled values (one per row) and DataFrame of gaps (GAP_COLUMNS).
+    """
+    statuses = numpy.full(len(rows.index), UNCHECKED, dtype=object)
+    balances = rows["Balance"].to_numpy(dtype=float)
+    known_idx = numpy.flatnonzero(~numpy.isnan(balances))
+    if not len(known_idx):
+        return statuses, pandas.DataFrame(columns=GAP_COLUMNS)
+
+    running = numpy.cumsum(numpy.round(rows["Amount"].fillna(0).to_numpy(dtype=float) * 100).astype(numpy.int64))
+    offsets = numpy.round(balances[known_idx] * 100).astype(numpy.int64) - running[known_idx]
+    previous_offsets = numpy.empty_like(offsets)
+    previous_offsets[1:] = offsets[:-1]
+    previous_offsets[0] = round(anchor[1] * 100) if anchor else offsets[0]
+    breaks = offsets != previous_offsets
+
+    known_statuses = numpy.where(breaks, GAP, RECONCILED)
+    next_known = numpy.searchsorted(known_idx, numpy.arange(len(rows.index)))
+    has_next = next_known < len(known_idx)
+    statuses[has_next] = known_statuses[next_known[has_next]]
+
+    dates = rows["Posting Date"].to_numpy(dtype=object)
+    previous_dates = numpy.empty(len(known_idx), dtype=object)
+    previous_dates[1:] = dates[known_idx[:-1]]
+    previous_dates[0] = anchor[0] if anchor else dates[known_idx[0]]
+    gap_idx = known_idx[breaks]
+    expected = (previous_offsets[breaks] + running[gap_idx]) / 100
+    gaps = pandas.DataFrame({
+        "Row ID": rows["ID"].to_numpy()[gap_idx],
+        "Start Date": previous_dates[breaks],
+        "End Date": dates[gap_idx],
+        "Expected Balance": expected,
+        "Balance": balances[gap_idx],
+        "Difference": numpy.round(balances[gap_idx] - expected, 2),
+    }, columns=GAP_COLUMNS)
+    return statuses, gaps
+
+
+class BalanceReconciler:
+    """
+    Reconciles the balance chain of every account in the bank activity table.
+
+    Each run starts, per account, from the last checked balance on a day before the earliest
+    unchecked row, so after an import only the new rows (and the rows after them, when older rows
+    were imported) are read. Rows of a day are ordered with order_within_days(). The Reconciled column is set in bulk and the breaks are recorded in the balance_gaps table.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initialize BalanceReconciler.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+        """
+        self._conn = conn
+
+    def get_account_aliases(self) -> list:
+        """
+        Get the account aliases of the bank activity table.
+
+        Returns:
+            list: Account aliases.
+        """
+        records = self._conn.execute(SELECT_ACCOUNT_ALIASES_FROM_BANK_ACTIVITY_TABLE).fetchall()
+        return [record[0] for record in records]
+
+    def update(self, account_aliases: list = None) -> int:
+        """
+        Check the rows that haven't been checked yet.
+
+        Args:
+            account_aliases (list, optional): Only check these accounts. Defaults to every account.
+
+        Returns:
+            int: Number of rows whose Reconciled value changed.
+        """
+        changed = 0
+        for account_alias in account_aliases or self.get_account_aliases():
+            changed += self._reconcile_account(account_alias)
+        self._conn.commit()
+        return changed
+
+    def rebuild(self, account_aliases: list = None) -> int:
+        """
+        Check every row again.
+
+        Args:
+            account_aliases (list, optional): Only check these accounts. Defaults to every account.
+
+        Returns:
+            int: Number of rows whose Reconciled value changed.
+        """
+        for account_alias in account_aliases or self.get_account_aliases():
+            self._conn.execute(RESET_RECONCILED_IN_BANK_ACTIVITY_TABLE, (account_alias,))
+        return self.update(account_aliases)
+
+    def _reconcile_account(self, account_alias: str) -> int:
+        """
+        Check an account's rows from its last checked row onward.
+
+        Args:
+            account_alias (str): Account alias.
+
+        Returns:
+            int: Number of rows whose Reconciled value changed.
+        """
+        first_date = self._conn.execute(SELECT_FIRST_UNCHECKED_DATE_FROM_BANK_ACTIVITY_TABLE, (account_alias,)).fetchone()[0]
+        if first_date is None:
+            return 0
+        # Whole days are read, since new rows can fall anywhere in the order of their day
+        anchor_date = self._conn.execute(SELECT_ANCHOR_DATE_FROM_BANK_ACTIVITY_TABLE, (account_alias, first_date)).fetchone()[0]
+
+        records = self._conn.execute(SELECT_ACCOUNT_ROWS_FROM_BANK_ACTIVITY_TABLE, (account_alias, anchor_date or "")).fetchall()
+        rows = pandas.DataFrame.from_records(records, columns=["ID", "Posting Date", "Amount", "Balance", "Reconciled"])
+        rows = order_within_days(rows.assign(Balance=parse_balances(rows["Balance"])))
+        anchor = None
+        if anchor_date is not None:
+            # Keep the rows after the anchor, the last checked balance of its day
+            is_anchor = (rows["Posting Date"] == anchor_date) & rows["Reconciled"].isin([RECONCILED, GAP]) & rows["Balance"].notna()
+            anchor_idx = numpy.flatnonzero(is_anchor.to_numpy())
+            if len(anchor_idx):
+                anchor = (anchor_date, float(rows["Balance"].iloc[anchor_idx[-1]]))
+                rows = rows.iloc[anchor_idx[-1] + 1:]
+
+        statuses, gaps = check_balance_chain(rows, anchor)
+        changed = rows["Reconciled"].fillna(UNCHECKED).to_numpy(dtype=object) != statuses
+        self._conn.executemany(UPDATE_RECONCILED_IN_BANK_ACTIVITY_TABLE,
+                               zip(statuses[changed], rows["ID"].to_numpy()[changed].tolist()))
+        self._write_gaps(account_alias, set(rows["ID"].tolist()), gaps)
+        return int(changed.sum())
+
+    def _write_gaps(self, account_alias: str, checked_ids: set, gaps: pandas.DataFrame) -> None:
+        """
+        Replace the recorded gaps of the checked rows.
+
+        Args:
+            account_alias (str): Account alias.
+            checked_ids (set): IDs of the checked rows.
+            gaps (pandas.DataFrame): Gaps found in the checked rows.
+        """
+        records = self._conn.execute(SELECT_ROW_IDS_FROM_BALANCE_GAPS_TABLE, (account_alias,)).fetchall()
+        stale_ids = [(record[0],) for record in records if record[0] in checked_ids]
+        self._conn.executemany(DELETE_FROM_BALANCE_GAPS_TABLE, stale_ids)
+        values = [(account_alias, int(gap[0]), gap[1], gap[2], float(gap[3]), float(gap[4]), float(gap[5]))
+                  for gap in gaps.itertuples(index=False, name=None)]
+        self._conn.executemany(INSERT_INTO_BALANCE_GAPS_TABLE, values)
+
+    def get_summary(self) -> pandas.DataFrame:
+        """
+        Count the reconciled, gap and unchecked rows of every account.
+
+        Returns:
+            pandas.DataFrame: Columns "Account Alias", "Transactions", "Reconciled", "Gaps" and "Unchecked".
+        """
+        records = self._conn.execute(SELECT_SUMMARY_FROM_BANK_ACTIVITY_TABLE).fetchall()
+        columns = ["Account Alias", "Transactions", "Reconciled", "Gaps", "Unchecked"]
+        return pandas.DataFrame.from_records(records, columns=columns)
+
+    def get_gaps(self) -> pandas.DataFrame:
+        """
+        Get the recorded breaks of the balance chains.
+
+        Returns:
+            pandas.DataFrame: Columns "Account Alias", "Start Date", "End Date", "Expected Balance",
+                "Balance" and "Difference". The missing transactions were posted between the start
+                and end dates and add up to the difference.
+        """
+        records = self._conn.execute(SELECT_GAPS_FROM_BALANCE_GAPS_TABLE).fetchall()
+        columns = ["Account Alias", "Start Date", "End Date", "Expected Balance", "Balance", "Difference"]
+        return pandas.DataFrame.from_records(records, columns=columns)
@@ -0,0 +1,271 @@
+import sqlite3
+
+import numpy
+import pandas
+
+from src.interface_funcs import get_metadata, set_metadata
+from src.merchants import normalize_descriptions
+
+# SQL queries
+SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE = \
+    "SELECT COALESCE(MAX(ID), 0) FROM bank_activity;"
+SELECT_NEW_ROWS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT ID, Account_Alias, Posting_Date, Description, Amount FROM bank_activity WHERE ID > ? AND ID <= ?;"""
+SELECT_ACCOUNT_ROWS_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT ID, Account_Alias, Posting_Date, Description, Amount FROM bank_activity WHERE Account_Alias = ? AND ID <= ?;"""
+SELECT_STATE_FROM_RECURRING_TRANSACTIONS_TABLE = \
+    """SELECT Account_Alias, Description_Key, Amount_Band, Description, Occurrences, Amount_Sum, Interval_Count, Interval_Sum, Interval_Sum_Sq, First_Date, Last_Date FROM recurring_transactions WHERE Account_Alias = ?;"""
+UPSERT_INTO_RECURRING_TRANSACTIONS_TABLE = \
+    """INSERT INTO recurring_transactions (Account_Alias, Description_Key, Amount_Band, Description, Period, Occurrences, Amount_Sum, Interval_Count, Interval_Sum, Interval_Sum_Sq, First_Date, Last_Date, Next_Date) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(Account_Alias, Description_Key, Amount_Band) DO UPDATE SET Description = excluded.Description, Period = excluded.Period, Occurrences = excluded.Occurrences, Amount_Sum = excluded.Amount_Sum, Interval_Count = excluded.Interval_Count, Interval_Sum = excluded.Interval_Sum, Interval_Sum_Sq = excluded.Interval_Sum_Sq, First_Date = excluded.First_Date, Last_Date = excluded.Last_Date, Next_Date = excluded.Next_Date, Timestamp = CURRENT_TIMESTAMP;"""
+DELETE_ACCOUNT_FROM_RECURRING_TRANSACTIONS_TABLE = \
+    "DELETE FROM recurring_transactions WHERE Account_Alias = ?;"
+SELECT_RECURRING_FROM_RECURRING_TRANSACTIONS_TABLE = \
+    """SELECT Account_Alias, Description, Period, ROUND(Amount_Sum / Occurrences, 2), Occurrences, First_Date, Last_Date, Next_Date FROM recurring_transactions WHERE Period IS NOT NULL ORDER BY Account_Alias, Next_Date;"""
+
+LAST_ID_METADATA_KEY = "recurring_transactions_last_id"
+
+# Periods: (expected interval in days, tolerance in days, minimum occurrences). A group is
+# recurring when the mean of its intervals is within the tolerance of the expected interval and
+# their standard deviation is within the tolerance as well.
+PERIODS = {
+    "weekly": (7.0, 1.5, 4),
+    "biweekly": (14.0, 2.0, 3),
+    "monthly": (30.44, 3.5, 3),
+    "yearly": (365.25, 10.0, 2),
+}
+
+# Amounts whose ratio is within this factor usually share an amount band
+AMOUNT_BAND_RATIO = 1.15
+
+KEY_COLUMNS = ["Account Alias", "Description Key", "Amount Band"]
+STATE_COLUMNS = KEY_COLUMNS + ["Description", "Occurrences", "Amount Sum", "Interval Count", "Interval Sum",
+                               "Interval Sum Sq", "First Date", "Last Date"]
+
+
+def amount_bands(amounts: pandas.Series) -> numpy.ndarray:
+    """
+    Bucket amounts into signed, logarithmic bands.
+
+    The band index is offset so that it's positive for any amount of at least a cent, which keeps
+    debits (negative bands) and credits (positive bands) apart.
+
+    Args:
+        amounts (pandas.Series): Transaction amounts.
+
+    Returns:
+        numpy.ndarray: Integer band of each amount, 0 for zero amounts.
+    """
+    values = amounts.to_numpy(dtype=float)
+    magnitude = numpy.abs(values)
+    bands = numpy.round(numpy.log(numpy.where(magnitude > 0, magnitude, 1.0)) / numpy.log(AMOUNT_BAND_RATIO))
+    return (numpy.sign(values) * (bands + 100)).astype(numpy.int64)
+
+
+def classify_periods(state: pandas.DataFrame) -> pandas.Series:
+    """
+    Classify each group's period from its running interval statistics.
+
+    Args:
+        state (pandas.DataFrame): Groups with "Occurrences", "Interval Count", "Interval Sum" and
+            "Interval Sum Sq" columns.
+
+    Returns:
+        pandas.Series: Period name of each group, None when it isn't recurring.
+    """
+    count = state["Interval Count"].to_numpy(dtype=float)
+    safe_count = numpy.maximum(count, 1)
+    mean = state["Interval Sum"].to_numpy(dtype=float) / safe_count
+    variance = state["Interval Sum Sq"].to_numpy(dtype=float) / safe_count - mean ** 2
+    std = numpy.sqrt(numpy.maximum(variance, 0))
+    occurrences = state["Occurrences"].to_numpy()
+
+    conditions = [
+        (count > 0) & (numpy.abs(mean - interval) <= tolerance) & (std <= tolerance) & (occurrences >= minimum)
+        for interval, tolerance, minimum in PERIODS.values()
+    ]
+    periods = numpy.select(conditions, list(PERIODS.keys()), default="")
+    return pandas.Series(periods, index=state.index).replace("", None)
+
+
+def detect(rows: pandas.DataFrame, state: pandas.DataFrame) -> tuple:
+    """
+    Fold new transactions into the running statistics of their groups.
+
+    New rows are collapsed to one occurrence per group and day, sorted together with each known
+    group's last date, and the day intervals are computed with a single grouped diff.
+
+    Args:
+        rows (pandas.DataFrame): New transactions with "Account Alias", "Posting Date", "Description"
+            and "Amount" columns.
+        state (pandas.DataFrame): Known groups (STATE_COLUMNS) of the rows' accounts.
+
+    Returns:
+        tuple: Updated groups (STATE_COLUMNS plus "Period" and "Next Date") and the list of accounts
+            with rows older than their group's last date, whose statistics need a rebuild.
+    """
+    state = state.astype({"Amount Band": numpy.int64, "Occurrences": numpy.int64, "Amount Sum": float,
+                          "Interval Count": numpy.int64, "Interval Sum": float, "Interval Sum Sq": float})
+    rows = rows.assign(**{
+        "Description Key": normalize_descriptions(rows["Description"]),
+        "Amount Band": amount_bands(rows["Amount"]),
+        "Date": pandas.to_datetime(rows["Posting Date"], format="%Y-%m-%d"),
+    })
+    days = rows.groupby(KEY_COLUMNS + ["Date"], sort=False).agg(
+        Amount=("Amount", "sum"), Description=("Description", "last")).reset_index()
+
+    anchors = state[KEY_COLUMNS].assign(Date=pandas.to_datetime(state["Last Date"], format="%Y-%m-%d"), Anchor=True)
+    timeline = pandas.concat([anchors, days.assign(Anchor=False)], ignore_index=True)
+    # On the same day, the anchor sorts first so the new day gets a zero interval
+    timeline = timeline.sort_values(KEY_COLUMNS + ["Date", "Anchor"], ascending=[True] * 4 + [False])
+    timeline["Interval"] = timeline.groupby(KEY_COLUMNS)["Date"].diff().dt.days
+
+    # New days older than the group's last known date can't be chained incrementally
+    new_days = timeline[~timeline["Anchor"]]
+    known_last = new_days[KEY_COLUMNS].merge(anchors[KEY_COLUMNS + ["Date"]], how="left", on=KEY_COLUMNS)["Date"]
+    out_of_order = new_days[known_last.to_numpy() > new_days["Date"].to_numpy()]
+    out_of_order_accounts = sorted(out_of_order["Account Alias"].unique().tolist())
+    # Only days after the group's last known date are new occurrences
+    new_days = new_days[~(known_last.to_numpy() >= new_days["Date"].to_numpy())]
+
+    interval = new_days["Interval"].where(new_days["Interval"] > 0)
+    new_days = new_days.assign(Interval=interval, IntervalSq=interval ** 2)
+    updates = new_days.groupby(KEY_COLUMNS).agg(**{
+        "Description": ("Description", "last"),
+        "Occurrences": ("Date", "size"),
+        "Amount Sum": ("Amount", "sum"),
+        "Interval Count": ("Interval", "count"),
+        "Interval Sum": ("Interval", "sum"),
+        "Interval Sum Sq": ("IntervalSq", "sum"),
+        "First Date": ("Date", "min"),
+        "Last Date": ("Date", "max"),
+    })
+
+    known = state.set_index(KEY_COLUMNS).reindex(updates.index)
+    known_first = pandas.to_datetime(known["First Date"], format="%Y-%m-%d")
+    known_last = pandas.to_datetime(known["Last Date"], format="%Y-%m-%d")
+    merged = pandas.DataFrame({
+        "Description": updates["Description"],
+        "Occurrences": updates["Occurrences"] + known["Occurrences"].fillna(0).astype(numpy.int64),
+        "Amount Sum": updates["Amount Sum"] + known["Amount Sum"].fillna(0.0),
+        "Interval Count": updates["Interval Count"] + known["Interval Count"].fillna(0).astype(numpy.int64),
+        "Interval Sum": updates["Interval Sum"] + known["Interval Sum"].fillna(0.0),
+        "Interval Sum Sq": updates["Interval Sum Sq"] + known["Interval Sum Sq"].fillna(0.0),
+        "First Date": known_first.where(known_first < updates["First Date"], updates["First Date"]),
+        "Last Date": known_last.where(known_last > updates["Last Date"], updates["Last Date"]),
+    })
+    merged["Period"] = classify_periods(merged)
+    mean_interval = (merged["Interval Sum"] / merged["Interval Count"].clip(lower=1)).round()
+    next_date = merged["Last Date"] + pandas.to_timedelta(mean_interval, unit="D")
+    merged["Next Date"] = next_date.dt.strftime("%Y-%m-%d").where(merged["Period"].notna(), None)
+    merged["First Date"] = merged["First Date"].dt.strftime("%Y-%m-%d")
+    merged["Last Date"] = merged["Last Date"].dt.strftime("%Y-%m-%d")
+    return merged.reset_index(), out_of_order_accounts
+
+
+class RecurringDetector:
+    """
+    Maintains the recurring_transactions table.
+
+    Only bank activity rows added since the last update are read; the running statistics of their
+    groups are updated in place.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initialize RecurringDetector.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+        """
+        self._conn = conn
+
+    def update(self) -> int:
+        """
+        Fold the bank activity rows added since the last update into the recurring transactions table.
+
+        Accounts that received rows older than what was already processed are rebuilt from their
+        full history.
+
+        Returns:
+            int: Number of bank activity rows processed.
+        """
+        last_id = get_metadata(self._conn, LAST_ID_METADATA_KEY, 0)
+        max_id = self._conn.execute(SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+        rows = self._read_rows(SELECT_NEW_ROWS_FROM_BANK_ACTIVITY_TABLE, (last_id, max_id))
+        if not rows.empty:
+            accounts = rows["Account Alias"].unique().tolist()
+            updated, out_of_order_accounts = detect(rows, self._read_state(accounts))
+            self._write(updated)
+            for account_alias in out_of_order_accounts:
+                self._rebuild_account(account_alias, max_id)
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, max_id)
+        self._conn.commit()
+        return len(rows.index)
+
+    def rebuild(self) -> int:
+        """
+        Recompute the recurring transactions table from the full history of every account.
+
+        Returns:
+            int: Number of accounts rebuilt.
+        """
+        max_id = self._conn.execute(SELECT_MAX_ID_FROM_BANK_ACTIVITY_TABLE).fetchone()[0]
+        self._conn.execute("DELETE FROM recurring_transactions;")
+        accounts = [record[0] for record in self._conn.execute("SELECT DISTINCT Account_Alias FROM bank_activity;")]
+        for account_alias in accounts:
+            self._rebuild_account(account_alias, max_id)
+        set_metadata(self._conn, LAST_ID_METADATA_KEY, max_id)
+        self._conn.commit()
+        return len(accounts)
+
+    def get_recurring_transactions(self) -> pandas.DataFrame:
+        """
+        Get the groups detected as recurring.
+
+        Returns:
+            pandas.DataFrame: One row per recurring group, ordered by account and next date.
+        """
+        columns = ["Account Alias", "Description", "Period", "Average Amount", "Occurrences",
+                   "First Date", "Last Date", "Next Date"]
+        records = self._conn.execute(SELECT_RECURRING_FROM_RECURRING_TRANSACTIONS_TABLE).fetchall()
+        return pandas.DataFrame.from_records(records, columns=columns)
+
+    def _rebuild_account(self, account_alias: str, max_id: int) -> None:
+        """
+        Recompute the groups of one account from its full history (up to max_id).
+        """
+        self._conn.execute(DELETE_ACCOUNT_FROM_RECURRING_TRANSACTIONS_TABLE, (account_alias,))
+        rows = self._read_rows(SELECT_ACCOUNT_ROWS_FROM_BANK_ACTIVITY_TABLE, (account_alias, max_id))
+        if not rows.empty:
+            updated, _ = detect(rows, pandas.DataFrame(columns=STATE_COLUMNS))
+            self._write(updated)
+
+    def _read_rows(self, query: str, args: tuple) -> pandas.DataFrame:
+        """
+        Read bank activity rows into a DataFrame.
+        """
+        records = self._conn.execute(query, args).fetchall()
+        columns = ["ID", "Account Alias", "Posting Date", "Description", "Amount"]
+        df = pandas.DataFrame.from_records(records, columns=columns)
+        df["Amount"] = pandas.to_numeric(df["Amount"], errors="coerce").fillna(0.0)
+        return df
+
+    def _read_state(self, account_aliases: list) -> pandas.DataFrame:
+        """
+        Read the known groups of some accounts.
+        """
+        records = []
+        for account_alias in account_aliases:
+            records.extend(self._conn.execute(SELECT_STATE_FROM_RECURRING_TRANSACTIONS_TABLE, (account_alias,)).fetchall())
+        return pandas.DataFrame.from_records(records, columns=STATE_COLUMNS)
+
+    def _write(self, updated: pandas.DataFrame) -> None:
+        """
+        Upsert updated groups into the recurring transactions table.
+        """
+        columns = KEY_COLUMNS + ["Description", "Period", "Occurrences", "Amount Sum", "Interval Count",
+                                 "Interval Sum", "Interval Sum Sq", "First Date", "Last Date", "Next Date"]
+        values = updated[columns].astype(object).where(updated[columns].notna(), None)
+        self._conn.executemany(UPSERT_INTO_RECURRING_TRANSACTIONS_TABLE, values.itertuples(index=False, name=None))
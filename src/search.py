@@ -0,0 +1,164 @@
+import sqlite3
+
+import pandas
+
+from src.interface_funcs import BadQueryStructureError
+
+# SQL queries
+# The full-text index is created and kept in sync by src.interface_funcs.create_bank_activity_fts_table.
+SELECT_MATCHES_FROM_BANK_ACTIVITY_FTS_TABLE = \
+    """SELECT b.ID, b.Posting_Date, b.Account_Alias, b.Description, b.Amount FROM bank_activity_fts f JOIN bank_activity b ON b.ID = f.rowid WHERE bank_activity_fts MATCH ?{filters} ORDER BY f.rank LIMIT ?;"""
+SELECT_MATCHES_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT b.ID, b.Posting_Date, b.Account_Alias, b.Description, b.Amount FROM bank_activity b WHERE {matches}{filters} ORDER BY b.Posting_Date DESC LIMIT ?;"""
+
+SEARCH_COLUMNS = ["ID", "Posting Date", "Account Alias", "Description", "Amount"]
+
+
+def quote_term(term: str) -> str:
+    """
+    Quote a term as an FTS5 string so operators and punctuation in it are matched literally.
+
+    Args:
+        term (str): Search term.
+
+    Returns:
+        str: The term in double quotes, with inner double quotes doubled.
+    """
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_match_query(terms: list, prefix: bool = False, phrase: bool = False) -> str:
+    """
+    Build an FTS5 MATCH expression from search terms.
+
+    Every term must match (implicit AND). With `phrase`, the terms must appear next to each other
+    in order. With `prefix`, the last term (or every term, when not a phrase) matches as a prefix.
+
+    Args:
+        terms (list): Search terms.
+        prefix (bool, optional): Match terms as prefixes.
+        phrase (bool, optional): Match the terms as a single phrase.
+
+    Returns:
+        str: FTS5 query expression.
+
+    Raises:
+        BadQueryStructureError: If no terms are given.
+    """
+    words = [word for term in terms for word in term.split()]
+    if not words:
+        raise BadQueryStructureError("No search terms given")
+    suffix = "*" if prefix else ""
+    if phrase:
+        return quote_term(" ".join(words)) + suffix
+    return " ".join(quote_term(word) + suffix for word in words)
+
+
+class TransactionSearch:
+    """
+    Searches transaction descriptions and details.
+
+    Uses the bank_activity_fts full-text index, so a query reads only the matching rows, ranked by
+    relevance (bm25). When the SQLite build has no FTS5 support the search falls back to a LIKE scan.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+        has_fts (bool): Whether the full-text index is available.
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """
+        Initialize TransactionSearch.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+        """
+        self._conn = conn
+        self.has_fts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'bank_activity_fts';").fetchone() is not None
+
+    def _filters(self, since: str, until: str, account_aliases: list) -> tuple:
+        """
+        Build the optional date and account filters appended to the WHERE clause of the queries.
+
+        Args:
+            since (str): First date (YYYY-MM-DD), or None.
+            until (str): Last date (YYYY-MM-DD), or None.
+            account_aliases (list): Account aliases, or None for all accounts.
+
+        Returns:
+            tuple: SQL fragment and its arguments.
+        """
+        clauses, args = [], []
+        if since:
+            clauses.append("b.Posting_Date >= ?")
+            args.append(since)
+        if until:
+            clauses.append("b.Posting_Date <= ?")
+            args.append(until)
+        if account_aliases:
+            clauses.append(f"b.Account_Alias IN ({', '.join('?' for _ in account_aliases)})")
+            args.extend(account_aliases)
+        return "".join(f" AND {clause}" for clause in clauses), args
+
+    def search(self, terms: list, prefix: bool = False, phrase: bool = False, raw: bool = False,
+               since: str = None, until: str = None, account_aliases: list = None,
+               limit: int = 50) -> pandas.DataFrame:
+        """
+        Search transactions whose description or details match the terms.
+
+        Args:
+            terms (list): Search terms.
+            prefix (bool, optional): Match terms as prefixes.
+            phrase (bool, optional): Match the terms as a single phrase.
+            raw (bool, optional): Pass the terms to FTS5 as a query expression (e.g. "coffee OR tea").
+            since (str, optional): First date (YYYY-MM-DD).
+            until (str, optional): Last date (YYYY-MM-DD).
+            account_aliases (list, optional): Only search these accounts.
+            limit (int, optional): Maximum number of rows to return.
+
+        Returns:
+            pandas.DataFrame: Matching transactions, best match first.
+
+        Raises:
+            BadQueryStructureError: If no terms are given, or the raw query is invalid or given
+                without the full-text index.
+        """
+        filters, filter_args = self._filters(since, until, account_aliases)
+        if self.has_fts:
+            match = " ".join(terms) if raw else build_match_query(terms, prefix, phrase)
+            query = SELECT_MATCHES_FROM_BANK_ACTIVITY_FTS_TABLE.format(filters=filters)
+            args = [match] + filter_args + [limit]
+        else:
+            if raw:
+                raise BadQueryStructureError("Raw queries require SQLite with FTS5 support")
+            patterns = self._like_patterns(terms, prefix, phrase)
+            matches = " AND ".join("(b.Description LIKE ? OR b.Details LIKE ?)" for _ in patterns)
+            query = SELECT_MATCHES_FROM_BANK_ACTIVITY_TABLE.format(matches=matches, filters=filters)
+            args = [arg for pattern in patterns for arg in (pattern, pattern)] + filter_args + [limit]
+        try:
+            records = self._conn.execute(query, args).fetchall()
+        except sqlite3.OperationalError as e:
+            raise BadQueryStructureError(f"Invalid search query: {e}") from e
+        return pandas.DataFrame.from_records(records, columns=SEARCH_COLUMNS)
+
+    def _like_patterns(self, terms: list, prefix: bool, phrase: bool) -> list:
+        """
+        Build LIKE patterns approximating build_match_query() for the fallback scan.
+
+        Args:
+            terms (list): Search terms.
+            prefix (bool): Unused, LIKE patterns always match substrings.
+            phrase (bool): Match the terms as a single phrase.
+
+        Returns:
+            list: LIKE patterns, all of which must match.
+
+        Raises:
+            BadQueryStructureError: If no terms are given.
+        """
+        words = [word for term in terms for word in term.split()]
+        if not words:
+            raise BadQueryStructureError("No search terms given")
+        if phrase:
+            words = [" ".join(words)]
+        return [f"%{word}%" for word in words]
@@ -0,0 +1,245 @@
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+
+import numpy
+import pandas
+
+# SQL queries
+# Both queries read the date range through the index idx_bank_activity_posting_date_account.
+SELECT_DAILY_SPENDING_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Posting_Date, -SUM(Amount) FROM bank_activity WHERE Posting_Date >= ? AND Posting_Date <= ? AND Amount < 0{accounts} GROUP BY Posting_Date;"""
+SELECT_DESCRIPTION_SPENDING_FROM_BANK_ACTIVITY_TABLE = \
+    """SELECT Description, -SUM(CASE WHEN Posting_Date > ? THEN Amount ELSE 0 END), -SUM(CASE WHEN Posting_Date <= ? THEN Amount ELSE 0 END) FROM bank_activity WHERE Posting_Date > ? AND Posting_Date <= ? AND Amount < 0{accounts} GROUP BY Description;"""
+
+DEFAULT_WINDOWS = [7, 30, 90]
+
+
+def parse_windows(windows: str) -> list:
+    """
+    Parse a comma-separated list of window sizes (in days).
+
+    Args:
+        windows (str): Comma-separated window sizes, e.g. "7,30,90".
+
+    Returns:
+        list: Sorted list of unique positive window sizes.
+
+    Raises:
+        argparse.ArgumentTypeError: If a window size is not a positive integer.
+    """
+    parsed = set()
+    for value in windows.split(","):
+        value = value.strip()
+        if not value:
+            continue
+        if not value.isdigit() or int(value) == 0:
+            raise argparse.ArgumentTypeError(f"Window size must be a positive number of days: {value}")
+        parsed.add(int(value))
+    if not parsed:
+        raise argparse.ArgumentTypeError(f"No window sizes given: {windows}")
+    return sorted(parsed)
+
+
+class TrendEngine:
+    """
+    Computes spending trends over the bank activity table.
+
+    Spending is the absolute value of negative amounts. SQLite aggregates the date range, read
+    through the posting date index, to one row per day (and one row per description), and the
+    rolling statistics are then computed over that daily series with vectorized pandas operations.
+
+    Attributes:
+        _conn (sqlite3.Connection): SQLite database connection.
+        windows (list): Window sizes in days.
+    """
+    def __init__(self, conn: sqlite3.Connection, windows: list = None) -> None:
+        """
+        Initialize TrendEngine.
+
+        Args:
+            conn (sqlite3.Connection): SQLite database connection.
+            windows (list, optional): Window sizes in days. Defaults to DEFAULT_WINDOWS.
+        """
+        self._conn = conn
+        self.windows = windows or DEFAULT_WINDOWS
+
+    def _accounts_filter(self, account_aliases: list) -> tuple:
+        """
+        Build the optional account filter appended to the WHERE clause of the queries.
+
+        Args:
+            account_aliases (list): Account aliases, or None for all accounts.
+
+        Returns:
+            tuple: SQL fragment and its arguments.
+        """
+        if not account_aliases:
+            return "", []
+        return f" AND Account_Alias IN ({', '.join('?' for _ in account_aliases)})", list(account_aliases)
+
+    def load_daily_spending(self, since: str, until: str, account_aliases: list = None) -> pandas.Series:
+        """
+        Read total spending per day between two dates (inclusive).
+
+        Args:
+            since (str): First date (YYYY-MM-DD).
+            until (str): Last date (YYYY-MM-DD).
+            account_aliases (list, optional): Only read rows of these accounts.
+
+        Returns:
+            pandas.Series: Daily spending indexed by every day in the range, zero-filled.
+        """
+        accounts, account_args = self._accounts_filter(account_aliases)
+        query = SELECT_DAILY_SPENDING_FROM_BANK_ACTIVITY_TABLE.format(accounts=accounts)
+        records = self._conn.execute(query, [since, until] + account_args).fetchall()
+
+        days = pandas.date_range(since, until, freq="D")
+        if not records:
+            return pandas.Series(0.0, index=days)
+        dates, totals = zip(*records)
+        daily = pandas.Series(totals, index=pandas.to_datetime(dates, format="%Y-%m-%d"), dtype=float)
+        return daily.reindex(days, fill_value=0.0)
+
+    def load_description_spending(self, until_date: datetime, window: int,
+                                  account_aliases: list = None) -> pandas.DataFrame:
+        """
+        Read each description's spending in the latest window and in the window before it.
+
+        Args:
+            until_date (datetime): Last day of the latest window.
+            window (int): Window size in days.
+            account_aliases (list, optional): Only read rows of these accounts.
+
+        Returns:
+            pandas.DataFrame: Columns "Description", "Current" and "Previous".
+        """
+        current_start = (until_date - timedelta(days=window)).strftime("%Y-%m-%d")
+        previous_start = (until_date - timedelta(days=2 * window)).strftime("%Y-%m-%d")
+        accounts, account_args = self._accounts_filter(account_aliases)
+        query = SELECT_DESCRIPTION_SPENDING_FROM_BANK_ACTIVITY_TABLE.format(accounts=accounts)
+        args = [current_start, current_start, previous_start, until_date.strftime("%Y-%m-%d")] + account_args
+        records = self._conn.execute(query, args).fetchall()
+        return pandas.DataFrame.from_records(records, columns=["Description", "Current", "Previous"])
+
+    def analyze(self, since: str = None, until: str = None, account_aliases: list = None,
+                top: int = 10) -> dict:
+        """
+        Compute rolling totals, moving averages, month-over-month deltas and per-description growth.
+
+        Rows older than `since` are read as well (up to twice the largest window) so the first
+        windows in the range are complete.
+
+        Args:
+            since (str, optional): First reported date (YYYY-MM-DD). Defaults to one year before `until`.
+            until (str, optional): Last reported date (YYYY-MM-DD). Defaults to today.
+            account_aliases (list, optional): Only analyze these accounts.
+            top (int, optional): Number of descriptions to report in the growth table.
+
+        Returns:
+            dict: DataFrames keyed by "windows", "monthly", "growth" and "rolling".
+        """
+        until_date = datetime.strptime(until, "%Y-%m-%d") if until else datetime.today()
+        until_date = until_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        since_date = datetime.strptime(since, "%Y-%m-%d") if since else until_date - timedelta(days=365)
+        lookback_date = since_date - timedelta(days=2 * max(self.windows))
+
+        daily = self.load_daily_spending(lookback_date.strftime("%Y-%m-%d"), until_date.strftime("%Y-%m-%d"),
+                                         account_aliases)
+        descriptions = self.load_description_spending(until_date, max(self.windows), account_aliases)
+
+        rolling = self._rolling(daily)
+        return {
+            "windows": self._window_summary(rolling),
+            "monthly": self._monthly(daily.loc[since_date:]),
+            "growth": self._description_growth(descriptions, top),
+            "rolling": rolling.loc[since_date:],
+        }
+
+    def _rolling(self, daily: pandas.Series) -> pandas.DataFrame:
+        """
+        Compute rolling totals and moving averages for every window.
+
+        Args:
+            daily (pandas.Series): Daily spending.
+
+        Returns:
+            pandas.DataFrame: One "<n>d Total" and one "<n>d Average" column per window.
+        """
+        columns = {"Daily": daily}
+        for window in self.windows:
+            total = daily.rolling(window, min_periods=1).sum()
+            columns[f"{window}d Total"] = total
+            columns[f"{window}d Average"] = total / window
+        return pandas.DataFrame(columns).round(2)
+
+    def _window_summary(self, rolling: pandas.DataFrame) -> pandas.DataFrame:
+        """
+        Compare the latest window of each size to the window right before it.
+
+        Args:
+            rolling (pandas.DataFrame): Output of _rolling().
+
+        Returns:
+            pandas.DataFrame: Current total, previous total and change per window.
+        """
+        rows = []
+        for window in self.windows:
+            totals = rolling[f"{window}d Total"]
+            current = totals.iloc[-1]
+            previous = totals.iloc[-1 - window] if len(totals) > window else numpy.nan
+            rows.append({
+                "Window": f"{window}d",
+                "Total": current,
+                "Daily Average": round(current / window, 2),
+                "Previous Total": previous,
+                "Change": round(current - previous, 2),
+                "Change %": _percent_change(current, previous),
+            })
+        return pandas.DataFrame(rows)
+
+    def _monthly(self, daily: pandas.Series) -> pandas.DataFrame:
+        """
+        Compute monthly totals and their month-over-month deltas.
+
+        Args:
+            daily (pandas.Series): Daily spending.
+
+        Returns:
+            pandas.DataFrame: Month, total, delta and percent delta.
+        """
+        monthly = daily.resample("MS").sum()
+        delta_percent = monthly.pct_change(fill_method=None) * 100
+        df = pandas.DataFrame({
+            "Month": monthly.index.strftime("%Y-%m"),
+            "Total": monthly.values,
+            "Delta": monthly.diff().values,
+            "Delta %": delta_percent.replace([numpy.inf, -numpy.inf], numpy.nan).values,
+        })
+        return df.round(2)
+
+    def _description_growth(self, descriptions: pandas.DataFrame, top: int) -> pandas.DataFrame:
+        """
+        Compute each description's change between the latest window and the window before it.
+
+        Args:
+            descriptions (pandas.DataFrame): Output of load_description_spending().
+            top (int): Number of descriptions to return, ordered by absolute change.
+
+        Returns:
+            pandas.DataFrame: Description, current total, previous total, change and percent change.
+        """
+        growth = descriptions.copy()
+        growth["Change"] = growth["Current"] - growth["Previous"]
+        growth["Change %"] = growth["Change"] / growth["Previous"].replace(0.0, numpy.nan) * 100
+        order = growth["Change"].abs().sort_values(ascending=False, kind="stable").index
+        return growth.loc[order].head(top).reset_index(drop=True).round(2)
+
+
+def _percent_change(current: float, previous: float) -> float:
+    """
+    Percent change from previous to current, NaN when previous is zero or missing.
+    """
+    if not previous or numpy.isnan(previous):
+        return numpy.nan
+    return round((current - previous) / previous * 100, 2)
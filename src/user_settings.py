@@ -2,6 +2,9 @@ import os
 import argparse
 import configparser
 
+from .categorize import load_category_rules
+from .csv_input import DEFAULT_CSV_ENGINE
+
 
 class UserSettings:
     """Base class for managing user settings."""
@@ -17,12 +20,13 @@ class UserSettings:
         self.conn = getattr(cli_args, 'sqlite_db', None)  # SQLite database connection
         self.commit = getattr(cli_args, 'commit', False)  # Whether to commit changes to database
 
-    def get_config_object(self, config_file: str) -> configparser.ConfigParser:
+    def get_config_object(self, config_file: str, case_sensitive: bool = False) -> configparser.ConfigParser:
         """
         Get a ConfigParser object from the specified configuration file.
 
         Args:
             config_file (str): Path to the configuration file.
+            case_sensitive (bool, optional): Keep the case of option names (e.g. when they are account aliases).
 
         Returns:
             configparser.ConfigParser: ConfigParser object initialized with the file contents.
@@ -33,6 +37,8 @@ class UserSettings:
         if not os.path.isfile(config_file):
             raise FileNotFoundError(f"Could not locate config file:\n{config_file}")
         cp = configparser.ConfigParser()
+        if case_sensitive:
+            cp.optionxform = str
         cp.read(config_file)
         return cp
 
@@ -50,6 +56,15 @@ class ImportParserUserSettings(UserSettings):
         super().__init__(cli_args)
         self.csv_file = cli_args.csv_file  # Path to the CSV file
         self.account_alias = cli_args.account_alias  # Account alias for importing bank activity
+        self.skip_near_duplicates = getattr(cli_args, 'skip_near_duplicates', False)  # Leave likely duplicates out
+        self.csv_engine = getattr(cli_args, 'csv_engine', DEFAULT_CSV_ENGINE)  # Engine parsing the CSV file
+        self.max_memory = getattr(cli_args, 'max_memory', None)  # Memory budget in bytes, None to read the file at once
+        self.since = getattr(cli_args, 'since', None)  # First imported posting date (YYYY-MM-DD), None for no lower bound
+        self.until = getattr(cli_args, 'until', None)  # Last imported posting date (YYYY-MM-DD), None for no upper bound
+        category_rules_path = getattr(cli_args, 'category_rules', None)  # Path to the category rules config
+        self.category_rules = None  # Rules categorizing the imported transactions, if given
+        if category_rules_path:
+            self.category_rules = load_category_rules(self.get_config_object(category_rules_path))
 
 class MakeImportReadyParserUserSettings(UserSettings):
     def __init__(self, cli_args: argparse.Namespace) -> None:
@@ -62,6 +77,10 @@ class MakeImportReadyParserUserSettings(UserSettings):
         super().__init__(cli_args)
         self.raw_csv_file = cli_args.raw_csv_file  # Path to the raw CSV file
         self.conversion_config = self.get_config_object(cli_args.conversion_config)
+        self.csv_engine = getattr(cli_args, 'csv_engine', DEFAULT_CSV_ENGINE)  # Engine parsing the raw CSV file
+        self.max_memory = getattr(cli_args, 'max_memory', None)  # Memory budget in bytes, None to read the file at once
+        self.since = getattr(cli_args, 'since', None)  # First converted posting date (YYYY-MM-DD), None for no lower bound
+        self.until = getattr(cli_args, 'until', None)  # Last converted posting date (YYYY-MM-DD), None for no upper bound
 
 class RunQueryParserUserSettings(UserSettings):
     """Class for managing user settings related to query operations."""
@@ -78,4 +97,266 @@ class RunQueryParserUserSettings(UserSettings):
         self.queries_config = self.get_config_object(self.queries_config_path)  # ConfigParser object for queries configuration file
         self.query_calls = cli_args.query_calls  # Lis of query calls to execute
         self.save_results = cli_args.save_results
-        self.rows = cli_args.rows
\ No newline at end of file
+        self.rows = cli_args.rows
+        self.max_memory = getattr(cli_args, 'max_memory', None)  # Memory budget in bytes, None to fetch rows at once
+        self.query_parameters = dict(getattr(cli_args, 'query_parameters', None) or [])  # Values of the named query parameters
+        if getattr(cli_args, 'since', None) is not None:
+            self.query_parameters["since"] = cli_args.since  # --since binds :since
+        if getattr(cli_args, 'until', None) is not None:
+            self.query_parameters["until"] = cli_args.until  # --until binds :until
+        self.page_size = getattr(cli_args, 'page_size', None)  # Rows per page when browsing, None to display --rows rows
+        self.page_key = getattr(cli_args, 'page_key', 'ID')  # Column the pages are ordered by
+        self.descending = getattr(cli_args, 'descending', False)  # Browse in descending key order
+
+class TrendParserUserSettings(UserSettings):
+    """Class for managing user settings related to trend analysis."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize TrendParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.windows = cli_args.windows  # Window sizes in days
+        self.since = cli_args.since  # First reported date (YYYY-MM-DD)
+        self.until = cli_args.until  # Last reported date (YYYY-MM-DD)
+        self.account_aliases = cli_args.account_aliases  # Accounts to analyze, all when empty
+        self.top = cli_args.top  # Number of descriptions in the growth table
+        self.rows = cli_args.rows  # Number of rolling-window rows to display
+        self.save_results = cli_args.save_results
+
+
+class ForecastParserUserSettings(UserSettings):
+    """Class for managing user settings related to cash-flow forecasts."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize ForecastParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.forecast_config_path = cli_args.forecast_config  # Path to the forecast configuration file
+        self.forecast_config = self.get_config_object(self.forecast_config_path, case_sensitive=True)
+        self.days = cli_args.days  # Number of days to project
+        self.start = cli_args.start  # First forecast day (YYYY-MM-DD), today when None
+        self.output = cli_args.output  # CSV file to save the projection to
+        self.rows = cli_args.rows  # Number of days to display
+        self.simulate = cli_args.simulate  # Number of Monte Carlo paths, no simulation when 0
+        self.seed = cli_args.seed  # Random seed of the simulation
+        self.threshold = cli_args.threshold  # Balance to report the probability of going below
+        self.workers = cli_args.workers  # Number of simulation worker processes
+        self.time_limit = cli_args.time_limit  # Maximum simulation time in seconds
+        self.include_recurring = cli_args.include_recurring  # Add detected recurring transactions
+
+
+class RecurringParserUserSettings(UserSettings):
+    """Class for managing user settings related to recurring transactions."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize RecurringParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.rebuild = cli_args.rebuild  # Recompute from the full history
+        self.account_aliases = cli_args.account_aliases  # Accounts to display, all when empty
+
+
+class SearchParserUserSettings(UserSettings):
+    """Class for managing user settings related to transaction search."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize SearchParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.terms = cli_args.terms  # Search terms
+        self.prefix = cli_args.prefix  # Match terms as prefixes
+        self.phrase = cli_args.phrase  # Match terms as a single phrase
+        self.raw = cli_args.raw  # Pass terms as an FTS5 query expression
+        self.since = cli_args.since  # First posting date to search
+        self.until = cli_args.until  # Last posting date to search
+        self.account_aliases = cli_args.account_aliases  # Accounts to search, all when empty
+        self.rows = cli_args.rows  # Maximum number of matches to display
+
+
+class RecategorizeParserUserSettings(UserSettings):
+    """Class for managing user settings related to recategorizing transactions."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize RecategorizeParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.category_rules = load_category_rules(self.get_config_object(cli_args.category_rules))  # Rules to apply
+        self.batch_size = cli_args.batch_size  # Number of transactions processed per batch
+
+
+class MerchantsParserUserSettings(UserSettings):
+    """Class for managing user settings related to merchants."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize MerchantsParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.rebuild = cli_args.rebuild  # Renormalize every description
+        self.top = cli_args.top  # Number of merchants to display
+
+
+class ReconcileParserUserSettings(UserSettings):
+    """Class for managing user settings related to balance reconciliation."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize ReconcileParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.rebuild = cli_args.rebuild  # Check every row again
+        self.account_aliases = cli_args.account_aliases  # Accounts to reconcile, all when empty
+        self.rows = cli_args.rows  # Maximum number of gaps to display
+
+
+class BalanceParserUserSettings(UserSettings):
+    """Class for managing user settings related to balance lookups."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize BalanceParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.as_of = cli_args.as_of  # Date of the balances, latest when None
+        self.since = cli_args.since  # First date of the balance history
+        self.until = cli_args.until  # Last date of the balance history
+        self.account_aliases = cli_args.account_aliases  # Accounts to display, all when empty
+        self.rows = cli_args.rows  # Maximum number of history rows to display
+        self.rebuild = cli_args.rebuild  # Recompute every snapshot
+
+
+class AnomaliesParserUserSettings(UserSettings):
+    """Class for managing user settings related to anomaly listings."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize AnomaliesParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.threshold = cli_args.threshold  # Minimum score, in standard deviations above the mean
+        self.since = cli_args.since  # First posting date to display
+        self.account_aliases = cli_args.account_aliases  # Accounts to display, all when empty
+        self.rows = cli_args.rows  # Maximum number of anomalies to display
+
+
+class ArchiveParserUserSettings(UserSettings):
+    """Class for managing user settings related to columnar archive exports."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize ArchiveParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.directory = cli_args.directory  # Directory of the archive files
+        self.file_format = cli_args.file_format  # "parquet" or "arrow"
+        self.rebuild = cli_args.rebuild  # Rewrite every month
+
+class WatchParserUserSettings(UserSettings):
+    """Class for managing user settings related to watching a directory of bank downloads."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize WatchParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.directory = cli_args.directory  # Directory the bank downloads are saved to
+        # Account and conversion config of each filename pattern
+        self.watch_config = self.get_config_object(cli_args.watch_config, case_sensitive=True)
+        self.watch_config_directory = os.path.dirname(cli_args.watch_config)  # Base of relative paths
+        self.category_rules = cli_args.category_rules  # Path to the category rules config, if given
+        self.skip_near_duplicates = cli_args.skip_near_duplicates  # Leave likely duplicates out
+        self.poll_interval = cli_args.poll_interval  # Seconds between two scans of the directory
+        self.once = cli_args.once  # Import the waiting files and exit
+
+class RunManifestParserUserSettings(UserSettings):
+    """Class for managing user settings related to running import manifests."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize RunManifestParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        # Sources (paths, account alias, conversion config) of the import
+        self.manifest = self.get_config_object(cli_args.manifest, case_sensitive=True)
+        self.manifest_directory = os.path.dirname(cli_args.manifest)  # Base of relative paths
+        self.jobs = cli_args.jobs  # Number of files parsed concurrently
+        category_rules_path = cli_args.category_rules  # Path to the category rules config
+        self.category_rules = None  # Rules categorizing the imported transactions, if given
+        if category_rules_path:
+            self.category_rules = load_category_rules(self.get_config_object(category_rules_path))
+
+class BudgetParserUserSettings(UserSettings):
+    """Class for managing user settings related to budget tracking."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize BudgetParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.set_budget = cli_args.set_budget  # Name of the budget to create or redefine
+        self.remove_budget = cli_args.remove_budget  # Name of the budget to delete
+        self.limit = cli_args.limit  # Spending limit per period of the budget set
+        self.period = cli_args.period  # Period of the budget set
+        self.category = cli_args.category  # Category counted against the budget set, all when None
+        self.pattern = cli_args.pattern  # Description LIKE pattern counted against the budget set
+        self.account_alias = cli_args.account_alias  # Account counted against the budget set, all when None
+        self.date = cli_args.date  # Day of the period to display, today when None
+        self.periods = cli_args.periods  # Number of periods displayed per budget
+
+class DashboardExportParserUserSettings(UserSettings):
+    """Class for managing user settings related to Dashboard workbook exports."""
+
+    def __init__(self, cli_args: argparse.Namespace) -> None:
+        """
+        Initialize DashboardExportParserUserSettings with command-line arguments.
+
+        Args:
+            cli_args (argparse.Namespace): Command-line arguments parsed by argparse.
+        """
+        super().__init__(cli_args)
+        self.workbook = cli_args.workbook  # Path to the Dashboard workbook
+        self.rebuild = cli_args.rebuild  # Rewrite every data sheet
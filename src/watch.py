@@ -0,0 +1,232 @@
+import os
+import time
+import fnmatch
+import configparser
+
+import pandas
+
+from src.interface_funcs import ConfigSectionIncompleteError
+
+# SQL queries
+SELECT_WATCHED_FILES_TABLE = \
+    "SELECT Path, Size, Modified_NS FROM watched_files;"
+INSERT_INTO_WATCHED_FILES_TABLE = \
+    """INSERT OR REPLACE INTO watched_files (Path, Size, Modified_NS, Account_Alias, Transactions) VALUES(?, ?, ?, ?, ?);"""
+
+POLL_INTERVAL = 1.0  # Seconds between two scans of the directory
+SETTLE_SECONDS = 2.0  # A file is imported once it hasn't been written to for this long
+PARTIAL_FILE_SUFFIXES = (".crdownload", ".part", ".partial", ".download", ".tmp")  # Downloads in progress
+
+CONFIG_HELP = ("\nTroubleshooting help: Ensure every section of the watch config file defines a filename"
+               " \"pattern\" and an \"account_alias\", and optionally a \"conversion_config\" path.")
+
+
+class WatchRoute:
+    """
+    Account (and optional conversion config) of the files whose name matches a pattern.
+
+    Attributes:
+        name (str): Name of the route (its config section).
+        pattern (str): Shell-style filename pattern, matched case-insensitively.
+        account_alias (str): Alias of the account the files are imported into.
+        conversion_config (str): Path to the conversion config of files that aren't "import-ready",
+            or None.
+    """
+    def __init__(self, name: str, pattern: str, account_alias: str, conversion_config: str = None) -> None:
+        """
+        Initialize WatchRoute.
+
+        Args:
+            name (str): Name of the route.
+            pattern (str): Shell-style filename pattern.
+            account_alias (str): Account alias.
+            conversion_config (str, optional): Path to a conversion config.
+        """
+        self.name = name
+        self.pattern = pattern
+        self.account_alias = account_alias
+        self.conversion_config = conversion_config
+
+    def matches(self, filename: str) -> bool:
+        """
+        Check whether a filename matches the route's pattern.
+
+        Args:
+            filename (str): Name of the file (without directory).
+
+        Returns:
+            bool: True if the file belongs to the route.
+        """
+        return fnmatch.fnmatch(filename.lower(), self.pattern.lower())
+
+
+def load_watch_routes(config: configparser.ConfigParser, config_directory: str = "") -> list:
+    """
+    Read the routes of a watch config.
+
+    Every section is a route, in priority order, with a filename `pattern` (e.g. "Chase1234_*.csv"),
+    the `account_alias` of the files and, for files that aren't "import-ready", the path of their
+    `conversion_config` (relative to the watch config's directory).
+
+    Args:
+        config (configparser.ConfigParser): Watch config.
+        config_directory (str, optional): Directory of the watch config file.
+
+    Returns:
+        list: WatchRoute objects.
+
+    Raises:
+        ConfigSectionIncompleteError: If a section has no pattern or account alias, or if there is
+            no section.
+    """
+    routes = []
+    for section in config.sections():
+        pattern = config[section].get("pattern", "").strip()
+        account_alias = config[section].get("account_alias", "").strip()
+        if not pattern or not account_alias:
+            raise ConfigSectionIncompleteError(f"[{section}]: No pattern or account_alias.{CONFIG_HELP}")
+        conversion_config = config[section].get("conversion_config", "").strip() or None
+        if conversion_config:
+            conversion_config = os.path.join(config_directory, conversion_config)
+        routes.append(WatchRoute(section, pattern, account_alias, conversion_config))
+    if not routes:
+        raise ConfigSectionIncompleteError(f"No routes.{CONFIG_HELP}")
+    return routes
+
+
+class FolderWatcher:
+    """
+    Imports the bank downloads dropped into a directory as soon as they are completely written.
+
+    The directory is scanned every poll interval (one os.scandir call, so idle scans are cheap). A
+    file is imported once its size and modification time didn't change since the previous scan
+    and it wasn't modified for SETTLE_SECONDS, so files still being written are left alone.
+    Imports go through one KashDatabase, keeping the connection open between files. Imported
+    files are recorded in the watched_files table with their size and modification time, so only
+    new or changed files are imported, including after a restart.
+
+    Attributes:
+        _kash_db (KashDatabase): Database the files are imported into.
+        _directory (str): Watched directory.
+        _routes (list): WatchRoute objects, in priority order.
+        _skip_near_duplicates (bool): Leave out likely duplicates of stored transactions.
+        _settle_seconds (float): Seconds without writes before a file is imported.
+        _clock: Function returning the current time (time.time).
+        _done (dict): (Size, modification time) of each imported, failed or unrouted file, by path.
+        _seen (dict): (Size, modification time) of each waiting file at the previous scan, by path.
+    """
+    def __init__(self, kash_db, directory: str, routes: list, skip_near_duplicates: bool = False,
+                 settle_seconds: float = SETTLE_SECONDS, clock=time.time) -> None:
+        """
+        Initialize FolderWatcher and load the files imported before.
+
+        Args:
+            kash_db (KashDatabase): Database the files are imported into.
+            directory (str): Directory to watch.
+            routes (list): WatchRoute objects, in priority order.
+            skip_near_duplicates (bool, optional): Leave out likely duplicates of stored transactions.
+            settle_seconds (float, optional): Seconds without writes before a file is imported.
+            clock (optional): Function returning the current time.
+
+        Raises:
+            FileNotFoundError: If the directory doesn't exist.
+        """
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"Could not locate directory:\n{directory}")
+        self._kash_db = kash_db
+        self._directory = directory
+        self._routes = routes
+        self._skip_near_duplicates = skip_near_duplicates
+        self._settle_seconds = settle_seconds
+        self._clock = clock
+        records = self._kash_db.conn.execute(SELECT_WATCHED_FILES_TABLE).fetchall()
+        self._done = {path: (size, modified_ns) for path, size, modified_ns in records}
+        self._seen = {}
+
+    def _get_route(self, filename: str) -> WatchRoute:
+        """
+        Get the first route matching a filename.
+
+        Args:
+            filename (str): Name of the file.
+
+        Returns:
+            WatchRoute: The route, or None when no route matches.
+        """
+        return next((route for route in self._routes if route.matches(filename)), None)
+
+    def _get_settled_files(self) -> list:
+        """
+        Scan the directory for the new or changed files that are completely written.
+
+        Returns:
+            list: (path, size, modification time in nanoseconds) tuples, oldest first.
+        """
+        now = self._clock()
+        seen = {}
+        settled = []
+        with os.scandir(self._directory) as entries:
+            for entry in entries:
+                if (entry.name.startswith(".") or entry.name.lower().endswith(PARTIAL_FILE_SUFFIXES)
+                        or not entry.is_file()):
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                path = os.path.abspath(entry.path)
+                if self._done.get(path) == signature:
+                    continue
+                if now - stat.st_mtime >= self._settle_seconds and self._seen.get(path, signature) == signature:
+                    settled.append((path, *signature))
+                else:
+                    seen[path] = signature
+        self._seen = seen
+        return sorted(settled, key=lambda file: file[2])
+
+    def poll(self) -> list:
+        """
+        Import the new or changed files that are completely written.
+
+        A file that fails to import is reported and retried only once it changes.
+
+        Returns:
+            list: (filename, account alias, DataFrame of the new settled transactions) of each
+                imported file.
+        """
+        imported = []
+        for path, size, modified_ns in self._get_settled_files():
+            filename = os.path.basename(path)
+            self._done[path] = (size, modified_ns)
+            route = self._get_route(filename)
+            if route is None:
+                print(f"{filename}: No route matches the filename, skipped")
+                continue
+            try:
+                new_transactions_df = self._kash_db.import_transactions(
+                    path, route.account_alias, skip_near_duplicates=self._skip_near_duplicates,
+                    conversion_config=route.conversion_config)
+            except (ValueError, KeyError, OSError, UnicodeDecodeError,
+                    pandas.errors.ParserError, ConfigSectionIncompleteError) as e:
+                print(f"{filename}: Could not import ({e}), skipped until the file changes")
+                continue
+            self._kash_db.conn.execute(INSERT_INTO_WATCHED_FILES_TABLE,
+                                       (path, size, modified_ns, route.account_alias, len(new_transactions_df.index)))
+            self._kash_db.conn.commit()
+            imported.append((filename, route.account_alias, new_transactions_df))
+        return imported
+
+    def run(self, poll_interval: float = POLL_INTERVAL, on_import=None) -> None:
+        """
+        Poll the directory until interrupted (Ctrl+C).
+
+        Args:
+            poll_interval (float, optional): Seconds between two scans.
+            on_import (optional): Function called with the return value of each poll importing files.
+        """
+        try:
+            while True:
+                imported = self.poll()
+                if imported and on_import is not None:
+                    on_import(imported)
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            return
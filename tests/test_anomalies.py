@@ -0,0 +1,92 @@
+import sqlite3
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.anomalies import merge_stats
+from src.anomalies import score_debits
+from src.anomalies import AnomalyDetector
+from src.anomalies import STATS_COLUMNS
+
+
+class TestAnomalyFunctions(TestCase):
+
+    def test_merge_stats(self):
+        a, b = np.array([1.0, 2.0, 4.0]), np.array([7.0, 10.0])
+
+        count, mean, m2 = merge_stats(len(a), a.mean(), a.var() * len(a), len(b), b.mean(), b.var() * len(b))
+
+        values = np.concatenate([a, b])
+        self.assertEqual(count, 5)
+        self.assertAlmostEqual(mean, values.mean())
+        self.assertAlmostEqual(m2, values.var() * len(values))
+
+    def test_score_debits(self):
+        debits = pd.DataFrame({
+            "ID": range(7),
+            "Merchant ID": pd.array([1, 1, 1, 1, 1, 1, None], dtype="Int64"),
+            "Category": None,
+            "Spent": [10.0, 12.0, 11.0, 9.0, 10.0, 40.0, 500.0],
+        })
+
+        scores, stats = score_debits(debits, pd.DataFrame(columns=STATS_COLUMNS))
+
+        self.assertTrue(np.isnan(scores[:5]).all())
+        expected = (40.0 - 10.4) / np.std([10.0, 12.0, 11.0, 9.0, 10.0], ddof=1)
+        self.assertAlmostEqual(scores[5], expected)
+        self.assertTrue(np.isnan(scores[6]))
+        self.assertEqual(stats[["Scope", "Key", "Count"]].values.tolist(), [["merchant", "1", 6]])
+        self.assertAlmostEqual(stats["Mean"].iloc[0], 15.333333333)
+
+
+class TestAnomalyDetector(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        self.detector = AnomalyDetector(self.conn)
+        self.insert([(f"T{day}", f"2024-01-{day:02}", -20.0 - day % 3) for day in range(1, 11)])
+
+    def insert(self, rows):
+        query = """INSERT INTO bank_activity (Transaction_ID, Account_Alias, Posting_Date, Description, Amount, Category) VALUES(?, 'Chase', ?, 'GROCER', ?, 'Groceries');"""
+        self.conn.executemany(query, rows)
+        self.conn.commit()
+
+    def test_update_is_incremental(self):
+        self.assertEqual(len(self.detector.update()), 5)
+        self.assertTrue(self.detector.update().empty)
+
+        self.insert([("T11", "2024-01-11", -95.0), ("T12", "2024-01-12", -21.0)])
+        scores = self.detector.update()
+
+        self.assertEqual(scores.index.tolist(), ["T11", "T12"])
+        self.assertGreater(scores["T11"], 3)
+        self.assertLess(scores["T12"], 3)
+        count = self.conn.execute("SELECT Count FROM spending_stats WHERE Scope = 'category';").fetchone()[0]
+        self.assertEqual(count, 12)
+
+    def test_update_orders_days_by_balance(self):
+        self.detector.update()
+        # Same-day rows of a file listing them oldest first: the balances show the spike came first
+        query = """INSERT INTO bank_activity (Transaction_ID, Account_Alias, Posting_Date, Description, Amount, Category, Balance) VALUES(?, 'Chase', '2024-01-11', 'GROCER', ?, 'Groceries', ?);"""
+        self.conn.executemany(query, [("T11", -95.0, "905.00"), ("T12", -21.0, "884.00")])
+        self.conn.commit()
+
+        scores = self.detector.update()
+
+        self.assertEqual(scores.index.tolist(), ["T11", "T12"])
+        self.assertLess(scores["T12"], 3)
+
+    def test_get_anomalies(self):
+        self.insert([("T11", "2024-01-11", -95.0)])
+        self.detector.update()
+
+        df = self.detector.get_anomalies()
+
+        self.assertEqual(df[["Posting Date", "Amount", "Category"]].values.tolist(),
+                         [["2024-01-11", -95.0, "Groceries"]])
+        self.assertTrue(self.detector.get_anomalies(account_aliases=["Amex"]).empty)
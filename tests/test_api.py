@@ -0,0 +1,76 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+
+from src.api import KashDatabase
+from src.fingerprint import transaction_fingerprint
+
+CSV_TEXT = (
+    "Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n"
+    "DEBIT,08/03/2024,\"GROCER\",-12.50,DEBIT_CARD,980.00,\n"
+    "DEBIT,08/02/2024,\"COFFEE BAR\",-4.00,DEBIT_CARD,992.50,\n"
+    "DEBIT,08/02/2024,\"BOOKSTORE\",-9.00,DEBIT_CARD, ,\n"
+)
+
+
+class TestKashDatabase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch("builtins.print"):
+            self.kash_db = KashDatabase(os.path.join(self.directory.name, "test.db"))
+
+    def tearDown(self):
+        self.kash_db.close()
+        self.directory.cleanup()
+
+    def test_import_transactions_from_csv_file(self):
+        df = self.kash_db.import_transactions(StringIO(CSV_TEXT), "Chase")
+
+        self.assertEqual(df["Description"].tolist(), ["GROCER", "COFFEE BAR"])
+        self.assertIn("Anomaly Score", df.columns)
+        pending = self.kash_db.query_df("SELECT Description FROM pending_transactions;")
+        self.assertEqual(pending["Description"].tolist(), ["BOOKSTORE"])
+
+    def test_import_transactions_from_dataframe_and_rows(self):
+        self.kash_db.import_transactions(StringIO(CSV_TEXT), "Chase")
+        df = pd.read_csv(StringIO(CSV_TEXT), converters={"Balance": str})
+
+        self.assertTrue(self.kash_db.import_transactions(df, "Chase").empty)
+        self.assertTrue(self.kash_db.import_transactions(df.to_dict("records"), "Chase").empty)
+        self.assertEqual(len(self.kash_db.import_transactions(df.itertuples(index=False), "Amex").index), 2)
+
+    def test_import_transactions_twice_with_ids_ending_in_nul(self):
+        def nul_ending_description(balance):
+            for number in range(10000):
+                description = f"STORE {number}"
+                fingerprint = transaction_fingerprint("DEBIT", "08/05/2024", description, "-1.00", "DEBIT_CARD",
+                                                      balance, "", "Chase")
+                if fingerprint.endswith(b"\x00"):
+                    return description
+
+        csv_text = ("Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n"
+                    f"DEBIT,08/05/2024,{nul_ending_description(' ')},-1.00,DEBIT_CARD, ,\n"
+                    f"DEBIT,08/05/2024,{nul_ending_description('900.00')},-1.00,DEBIT_CARD,900.00,\n")
+        self.kash_db.import_transactions(StringIO(csv_text), "Chase")
+
+        self.assertTrue(self.kash_db.import_transactions(StringIO(csv_text), "Chase").empty)
+        self.assertEqual(self.kash_db.query_df("SELECT COUNT(*) AS Count FROM bank_activity;")["Count"][0], 1)
+        self.assertEqual(self.kash_db.query_df("SELECT ID FROM pending_transactions;")["ID"].tolist(), [1])
+
+    def test_import_transactions_missing_columns(self):
+        with self.assertRaises(ValueError):
+            self.kash_db.import_transactions(pd.DataFrame({"Description": ["GROCER"]}), "Chase")
+
+    def test_iter_query(self):
+        self.kash_db.import_transactions(StringIO(CSV_TEXT), "Chase")
+        query = "SELECT Description FROM bank_activity WHERE Amount < :amount ORDER BY ID;"
+
+        self.assertEqual(list(self.kash_db.iter_query(query, {"amount": 0}, batch_size=1)),
+                         [("GROCER",), ("COFFEE BAR",)])
+        batches = list(self.kash_db.iter_query_dfs(query, {"amount": 0}, batch_size=1))
+        self.assertEqual([batch["Description"].tolist() for batch in batches], [["GROCER"], ["COFFEE BAR"]])
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import tempfile
+import importlib.util
+from io import StringIO
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.interface_funcs import ArchiveFormatError
+from src.archive import BankActivityArchive
+from src.api import KashDatabase
+from src.fingerprint import TRANSACTION_ID_SIZE
+
+CSV_TEXT = (
+    "Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n"
+    "DEBIT,08/03/2024,\"GROCER\",-12.50,DEBIT_CARD,980.00,\n"
+    "DEBIT,08/02/2024,\"COFFEE BAR\",-4.00,DEBIT_CARD,992.50,\n"
+)
+
+
+@skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+class TestBankActivityArchive(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive = BankActivityArchive(self.directory.name)
+        self.insert([
+            ("2024-01-05", "COFFEE", -4.5, "95.50"),
+            ("2024-01-20", "PAYCHECK", 100.0, 195.5),
+            ("2024-02-01", "RENT", -150.0, " "),
+        ])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def insert(self, rows):
+        query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Description, Amount, Balance) VALUES('Chase', ?, ?, ?, ?);"""
+        self.conn.executemany(query, rows)
+        self.conn.commit()
+
+    def test_export_only_writes_new_months(self):
+        self.assertEqual(self.archive.export(self.conn)["Month"].tolist(), ["2024-01", "2024-02"])
+        self.assertTrue(self.archive.export(self.conn).empty)
+
+        self.insert([("2024-02-03", "GROCER", -20.0, "")])
+
+        self.assertEqual(self.archive.export(self.conn)[["Month", "Rows"]].values.tolist(), [["2024-02", 2]])
+        self.assertEqual(self.archive.get_manifest()["partitions"], {"2024-01": 2, "2024-02": 2})
+
+    def test_read_df(self):
+        for file_format in ("parquet", "arrow"):
+            self.archive.export(self.conn, file_format, rebuild=True)
+
+            df = self.archive.read_df(["Amount", "Balance"], since="2024-01-10")
+
+            self.assertEqual(df.values.tolist(), [[100.0, "195.5"], [-150.0, " "]])
+            self.assertEqual(str(df["Amount"].dtype), "float64")
+
+    def test_export_in_another_format_needs_rebuild(self):
+        self.archive.export(self.conn, "parquet")
+
+        with self.assertRaises(ArchiveFormatError):
+            self.archive.export(self.conn, "arrow")
+
+    def test_export_imported_transaction_ids(self):
+        with patch("builtins.print"):
+            kash_db = KashDatabase(os.path.join(self.directory.name, "test.db"))
+        self.addCleanup(kash_db.close)
+        kash_db.import_transactions(StringIO(CSV_TEXT), "Chase")
+
+        for file_format in ("parquet", "arrow"):
+            self.archive.export(kash_db.conn, file_format, rebuild=True)
+
+            df = self.archive.read_df(["Transaction_ID", "Description"])
+
+            self.assertEqual(df["Description"].tolist(), ["GROCER", "COFFEE BAR"])
+            self.assertEqual([len(transaction_id) for transaction_id in df["Transaction_ID"]], [TRANSACTION_ID_SIZE] * 2)
+            self.assertEqual(self.archive.get_manifest()["columns"]["Transaction_ID"], "binary")
@@ -0,0 +1,49 @@
+import os
+import asyncio
+import tempfile
+from io import StringIO
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from src.async_api import AsyncKashDatabase
+
+CSV_TEXT = (
+    "Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n"
+    "DEBIT,08/03/2024,\"GROCER\",-12.50,DEBIT_CARD,980.00,\n"
+    "DEBIT,08/02/2024,\"COFFEE BAR\",-4.00,DEBIT_CARD,992.50,\n"
+)
+
+# Counts to a billion, which takes far longer than the test waits
+LONG_QUERY = """WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM (SELECT x FROM c LIMIT 1000000000);"""
+
+
+class TestAsyncKashDatabase(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with patch("builtins.print"):
+            self.kash_db = await AsyncKashDatabase(os.path.join(self.directory.name, "test.db"), readers=1).open()
+        await self.kash_db.import_transactions(StringIO(CSV_TEXT), "Chase")
+
+    async def asyncTearDown(self):
+        await self.kash_db.close()
+        self.directory.cleanup()
+
+    async def test_queries(self):
+        df = await self.kash_db.query_df("SELECT Description FROM bank_activity WHERE Amount < ? ORDER BY ID;", (-5,))
+        rows = [row async for row in self.kash_db.iter_query("SELECT Description FROM bank_activity ORDER BY ID;",
+                                                               batch_size=1)]
+
+        self.assertEqual(df["Description"].tolist(), ["GROCER"])
+        self.assertEqual(rows, [("GROCER",), ("COFFEE BAR",)])
+
+    async def test_cancel_query(self):
+        task = asyncio.create_task(self.kash_db.query_df(LONG_QUERY))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await asyncio.wait_for(task, timeout=5)
+        # The only reader connection is back in the pool
+        df = await asyncio.wait_for(self.kash_db.query_df("SELECT COUNT(*) AS n FROM bank_activity;"), timeout=5)
+        self.assertEqual(df["n"].tolist(), [2])
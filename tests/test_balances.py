@@ -0,0 +1,89 @@
+import sqlite3
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.balances import daily_balances
+from src.balances import BalanceSnapshots
+
+
+class TestBalanceFunctions(TestCase):
+
+    def test_daily_balances(self):
+        rows = pd.DataFrame.from_records([
+            ("2024-01-01", -10.0, np.nan),
+            ("2024-01-01", -5.0, 85.0),
+            ("2024-01-03", -1.5, np.nan),
+            ("2024-01-04", 20.0, 103.5),
+        ], columns=["Posting Date", "Amount", "Balance"])
+
+        result = daily_balances(rows)
+
+        self.assertEqual(result.values.tolist(), [
+            ["2024-01-01", 85.0, -15.0, 2],
+            ["2024-01-03", 83.5, -1.5, 1],
+            ["2024-01-04", 103.5, 20.0, 1],
+        ])
+
+    def test_daily_balances_with_opening_balance(self):
+        rows = pd.DataFrame.from_records([("2024-01-02", -10.0, np.nan)], columns=["Posting Date", "Amount", "Balance"])
+
+        self.assertEqual(daily_balances(rows, 50.0)["Balance"].tolist(), [40.0])
+        self.assertTrue(daily_balances(rows).empty)
+
+
+class TestBalanceSnapshots(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        self.snapshots = BalanceSnapshots(self.conn)
+        self.insert([
+            ("Chase", "2024-01-03", -5.0, "85.00"),
+            ("Chase", "2024-01-03", -10.0, "90.00"),
+            ("Chase", "2024-01-01", 100.0, "100.00"),
+            ("Amex", "2024-01-02", -1.0, " "),
+        ])
+        self.snapshots.update()
+
+    def insert(self, rows):
+        query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Amount, Balance) VALUES(?, ?, ?, ?);"""
+        self.conn.executemany(query, rows)
+        self.conn.commit()
+
+    def test_balance_as_of(self):
+        self.assertEqual(self.snapshots.balance_as_of("Chase", "2024-01-02"), ("2024-01-01", 100.0))
+        self.assertEqual(self.snapshots.balance_as_of("Chase"), ("2024-01-03", 85.0))
+        self.assertIsNone(self.snapshots.balance_as_of("Chase", "2023-12-31"))
+        self.assertIsNone(self.snapshots.balance_as_of("Amex"))
+
+    def test_update_with_older_rows(self):
+        # A row imported later, posted before the latest snapshot and without a balance
+        self.insert([("Chase", "2024-01-02", -20.0, " ")])
+
+        self.assertEqual(self.snapshots.update(), 2)
+        self.assertEqual(self.snapshots.balance_as_of("Chase", "2024-01-02"), ("2024-01-02", 80.0))
+        # The later balances come from the bank and are kept
+        self.assertEqual(self.snapshots.balance_as_of("Chase"), ("2024-01-03", 85.0))
+        self.assertEqual(self.snapshots.update(), 0)
+
+    def test_update_with_overlapping_imports(self):
+        self.insert([("Chase", "2024-01-15", -5.25, "94.75")])
+        self.snapshots.update()
+        # A later file of the same day, whose first row was already imported
+        self.insert([("Chase", "2024-01-15", -10.0, "84.75")])
+        self.snapshots.update()
+
+        self.assertEqual(self.snapshots.balance_as_of("Chase"), ("2024-01-15", 84.75))
+
+    def test_get_balance_history(self):
+        history = self.snapshots.get_balance_history("2023-12-31", "2024-01-04")
+
+        self.assertEqual(history["Date"].tolist(), ["2023-12-31", "2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"])
+        self.assertEqual(history["Chase"].tolist()[1:], [100.0, 100.0, 85.0, 85.0])
+        self.assertTrue(np.isnan(history["Total"].iloc[0]))
+        self.assertNotIn("Amex", history.columns)
@@ -0,0 +1,96 @@
+import sqlite3
+from datetime import date
+from unittest import TestCase
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.budgets import period_start
+from src.budgets import previous_period_start
+from src.budgets import BudgetTracker
+
+
+class TestBudgetFunctions(TestCase):
+
+    def test_period_start(self):
+        day = date(2024, 8, 15)
+
+        self.assertEqual(period_start(day, "weekly"), date(2024, 8, 12))
+        self.assertEqual(period_start(day, "monthly"), date(2024, 8, 1))
+        self.assertEqual(period_start(day, "quarterly"), date(2024, 7, 1))
+        self.assertEqual(period_start(day, "yearly"), date(2024, 1, 1))
+
+    def test_previous_period_start(self):
+        self.assertEqual(previous_period_start(date(2024, 1, 1), "monthly"), date(2023, 12, 1))
+        self.assertEqual(previous_period_start(date(2024, 1, 1), "quarterly"), date(2023, 10, 1))
+        self.assertEqual(previous_period_start(date(2024, 8, 12), "weekly"), date(2024, 8, 5))
+
+
+class TestBudgetTracker(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        self.tracker = BudgetTracker(self.conn)
+        self.insert([
+            ("T1", "2024-07-30", "GROCER", -40.0, "Groceries"),
+            ("T2", "2024-08-02", "GROCER", -70.0, "Groceries"),
+            ("T3", "2024-08-03", "COFFEE BAR", -5.0, None),
+            ("T4", "2024-08-04", "GROCER REFUND", 10.0, "Groceries"),
+        ])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def insert(self, rows):
+        query = """INSERT INTO bank_activity (Transaction_ID, Account_Alias, Posting_Date, Description, Amount, Category) VALUES(?, 'Chase', ?, ?, ?, ?);"""
+        self.conn.executemany(query, rows)
+        self.conn.commit()
+
+    def get_totals(self):
+        return self.conn.execute("SELECT Budget_ID, Period_Start, Spent, Transactions FROM budget_totals "
+                                 "ORDER BY Budget_ID, Period_Start;").fetchall()
+
+    def test_set_budget_counts_history(self):
+        self.tracker.set_budget("Food", 100.0, category="Groceries")
+        self.tracker.set_budget("Everything", 200.0, period="yearly", pattern="%")
+
+        self.assertEqual(self.get_totals(), [(1, "2024-07-01", 40.0, 1), (1, "2024-08-01", 70.0, 1),
+                                             (2, "2024-01-01", 115.0, 3)])
+
+    def test_update_is_incremental(self):
+        self.tracker.set_budget("Food", 100.0, category="Groceries")
+        self.insert([("T5", "2024-08-10", "GROCER", -35.0, "Groceries")])
+
+        self.tracker.update()
+        self.tracker.update()
+
+        self.assertEqual(self.get_totals(), [(1, "2024-07-01", 40.0, 1), (1, "2024-08-01", 105.0, 2)])
+
+    def test_rebuild_after_recategorizing(self):
+        self.tracker.set_budget("Food", 100.0, category="Groceries")
+        self.conn.execute("UPDATE bank_activity SET Category = 'Groceries' WHERE Description = 'COFFEE BAR';")
+
+        self.tracker.rebuild()
+
+        self.assertEqual(self.get_totals(), [(1, "2024-07-01", 40.0, 1), (1, "2024-08-01", 75.0, 2)])
+
+    def test_get_utilization(self):
+        self.tracker.set_budget("Food", 100.0, category="Groceries")
+        self.insert([("T5", "2024-08-10", "GROCER", -35.0, "Groceries")])
+        self.tracker.update()
+
+        df = self.tracker.get_utilization(date(2024, 8, 20), periods=3)
+
+        self.assertEqual(df["Period Start"].tolist(), ["2024-08-01", "2024-07-01", "2024-06-01"])
+        self.assertEqual(df["Spent"].tolist(), [105.0, 40.0, 0.0])
+        self.assertEqual(df["Remaining"].tolist(), [-5.0, 60.0, 100.0])
+        self.assertEqual(df["Used (%)"].tolist(), [105.0, 40.0, 0.0])
+
+    def test_remove_budget(self):
+        self.tracker.set_budget("Food", 100.0, category="Groceries")
+
+        self.assertTrue(self.tracker.remove_budget("Food"))
+        self.assertFalse(self.tracker.remove_budget("Food"))
+        self.assertEqual(self.get_totals(), [])
+        self.assertTrue(self.tracker.get_budgets().empty)
@@ -0,0 +1,103 @@
+import sqlite3
+import configparser
+from unittest import TestCase
+
+import pandas as pd
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.interface_funcs import ConfigSectionIncompleteError
+from src.categorize import load_category_rules
+from src.categorize import Recategorizer
+
+
+def get_config(text):
+    config = configparser.ConfigParser()
+    config.read_string(text)
+    return config
+
+
+RULES = """
+[Coffee]
+keywords = STARBUCKS
+    blue bottle
+
+[Groceries]
+keywords = WHOLE FOODS
+patterns = ^HEB\\b
+
+[Shopping]
+keywords = AMAZON
+    STORE
+"""
+
+
+class TestCategoryRules(TestCase):
+
+    def setUp(self):
+        self.rules = load_category_rules(get_config(RULES))
+
+    def test_categorize(self):
+        descriptions = pd.Series(["Starbucks Store 1234", "WHOLE FOODS MKT", "HEB #55", "HEBREW BOOKS",
+                                  "AMZN Mktp", None, "blue bottle"], index=[10, 11, 12, 13, 14, 15, 16])
+
+        result = self.rules.categorize(descriptions)
+
+        # "Starbucks Store" matches both Coffee and Shopping, the first rule wins
+        self.assertEqual(result.tolist(), ["Coffee", "Groceries", "Groceries", None, None, None, "Coffee"])
+        self.assertEqual(result.index.tolist(), descriptions.index.tolist())
+
+    def test_keywords_are_literal(self):
+        rules = load_category_rules(get_config("[Fees]\nkeywords = FEE (MONTHLY)\n"))
+
+        result = rules.categorize(pd.Series(["SERVICE FEE (MONTHLY)", "SERVICE FEE MONTHLY"]))
+
+        self.assertEqual(result.tolist(), ["Fees", None])
+
+    def test_fingerprint_follows_rules(self):
+        changed = load_category_rules(get_config(RULES.replace("AMAZON", "EBAY")))
+
+        self.assertEqual(self.rules.fingerprint, load_category_rules(get_config(RULES)).fingerprint)
+        self.assertNotEqual(self.rules.fingerprint, changed.fingerprint)
+
+    def test_load_category_rules_bad_section(self):
+        with self.assertRaises(ConfigSectionIncompleteError):
+            load_category_rules(get_config("[Empty]\nnotes = nothing\n"))
+        with self.assertRaises(ConfigSectionIncompleteError):
+            load_category_rules(get_config("[Bad]\npatterns = HEB(\n"))
+
+
+class TestRecategorizer(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Description, Amount, Category) VALUES(?, ?, ?, ?, ?);"""
+        self.conn.executemany(query, [
+            ("Chase", "2024-01-01", "STARBUCKS 1", -5.0, None),
+            ("Chase", "2024-01-02", "WHOLE FOODS", -50.0, "Groceries"),
+            ("Chase", "2024-01-03", "AMAZON", -20.0, "Groceries"),
+            ("Chase", "2024-01-04", "PAYROLL", 1000.0, None),
+            ("Chase", "2024-01-05", "STARBUCKS 2", -6.0, None),
+        ])
+        self.recategorizer = Recategorizer(self.conn, load_category_rules(get_config(RULES)))
+
+    def test_recategorize(self):
+        self.assertFalse(self.recategorizer.is_current())
+
+        changed = self.recategorizer.recategorize(batch_size=2)
+
+        self.assertEqual(changed, 3)
+        self.assertTrue(self.recategorizer.is_current())
+        categories = self.conn.execute("SELECT Category FROM bank_activity ORDER BY ID;").fetchall()
+        self.assertEqual([record[0] for record in categories], ["Coffee", "Groceries", "Shopping", None, "Coffee"])
+        self.assertEqual(self.recategorizer.recategorize(batch_size=2), 0)
+
+    def test_get_category_totals(self):
+        self.recategorizer.recategorize()
+
+        totals = self.recategorizer.get_category_totals()
+
+        self.assertEqual(totals.iloc[0].tolist(), ["Coffee", 2, -11.0])
+        self.assertEqual(len(totals.index), 4)
@@ -1,3 +1,4 @@
+import sqlite3
 from configparser import ConfigParser
 from unittest import TestCase
 from unittest.mock import MagicMock
@@ -14,9 +15,15 @@ from src.controller import format_date
 from src.controller import format_amount
 from src.controller import print_bank_activity_dataframe
 from src.controller import ImportParserController
+from src.controller import MakeImportReadyParserController
 from src.controller import DataBaseInterface
 from src.controller import CSVHandler
+from src.controller import TrendParserController
+from src.controller import print_dataframe_table
+from src.controller import filter_date_window
 from src.interface_funcs import ConfigSectionIncompleteError
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
 
 class TestFormattingFunctions(TestCase):
     def test_format_date(self):
@@ -82,6 +89,30 @@ class TestFormattingFunctions(TestCase):
 
         self.assertEqual(print_mock.call_args_list, expected_calls)
 
+    @patch('src.controller.print')
+    def test_print_dataframe_table(self, print_mock):
+        df = pd.DataFrame(data={"Month": ["2024-01"], "Total": [30.0]})
+
+        print_dataframe_table("trend monthly", df, header=True)
+
+        expected_calls = [
+            call('\n"trend monthly" results:'),
+            call('+----------------+----------------+'),
+            call('|          Month |          Total |'),
+            call('+----------------+----------------+'),
+            call('|        2024-01 |           30.0 |'),
+            call('+----------------+----------------+'),
+        ]
+        self.assertEqual(print_mock.call_args_list, expected_calls)
+
+
+    def test_filter_date_window(self):
+        df = pd.DataFrame(data={"Posting Date": ["1/5/2024", "12/31/2023", "2024-02-01", "BAD", NaN, "03/31/2024"]})
+
+        self.assertEqual(filter_date_window(df, "2024-01-01", "2024-03-31").index.tolist(), [0, 2, 5])
+        self.assertEqual(filter_date_window(df, until="2024-01-05").index.tolist(), [0, 1])
+        self.assertIs(filter_date_window(df), df)
+
 
 class TestImportParserController(TestCase):
 
@@ -120,6 +151,22 @@ class TestImportParserController(TestCase):
         self_mock._db_interface.insert_df_into_bank_activity_table.assert_called_once_with(new_transactions_df)
         print_bank_activity_dataframe_mock.assert_called_once_with(new_transactions_df)
 
+class TestMakeImportReadyParserController(TestCase):
+
+    def test_get_new_filepath(self):
+        controller = MakeImportReadyParserController.__new__(MakeImportReadyParserController)
+        expected_paths = {
+            "exports/raw.csv": "exports/raw_import_ready.csv",
+            "exports/raw.csv.gz": "exports/raw_import_ready.csv",
+            "exports/raw.zip": "exports/raw_import_ready.csv",
+            "raw.gz": "raw_import_ready.csv",
+            "exports/raw.txt": "exports/raw_import_ready.txt",
+        }
+        for raw_csv_file, expected_path in expected_paths.items():
+            controller.raw_csv_file = raw_csv_file
+            self.assertEqual(controller._get_new_filepath(), expected_path)
+
+
 class TestDataBaseInterface(TestCase):
 
     @classmethod
@@ -141,13 +188,12 @@ class TestDataBaseInterface(TestCase):
 
     def test_get_existing_transaction_ids(self):
         self_mock = MagicMock()
-        records = [["ABC123"],["DEF234"],["GHI345"]]
-        self_mock._conn.execute.return_value.fetchall.return_value = records
+        transaction_ids = [b"ABC123", b"DEF234"]
 
-        result = DataBaseInterface.get_existing_transaction_ids(self_mock)
+        result = DataBaseInterface.get_existing_transaction_ids(self_mock, transaction_ids)
 
-        expected_result = [record[0] for record in records]
-        self.assertEqual(result, expected_result)
+        self_mock._transaction_id_index.find_existing.assert_called_once_with(transaction_ids)
+        self.assertEqual(result, self_mock._transaction_id_index.find_existing.return_value)
 
     def test_insert_df_into_bank_activity_table_commit_is_False(self):
         self_mock = MagicMock()
@@ -168,13 +214,72 @@ class TestDataBaseInterface(TestCase):
         
         DataBaseInterface.insert_df_into_bank_activity_table(self_mock, df)
 
-        query = """INSERT INTO bank_activity (Account_Alias, Transaction_ID, Details, Posting_Date, Description, Amount, Type, Balance, Check_or_Slip_num, Reconciled) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"""
-        values = ('Chase Bank', 'DEF234', 'DEBIT', '2024-02-01', 'SPAM BAR HAM', -7.77, 'DEBIT_CARD', 6.66, NaN, 'N')
+        query = """INSERT INTO bank_activity (Account_Alias, Transaction_ID, Details, Posting_Date, Description, Amount, Type, Balance, Check_or_Slip_num, Reconciled, Category) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"""
+        values = ('Chase Bank', 'DEF234', 'DEBIT', '2024-02-01', 'SPAM BAR HAM', -7.77, 'DEBIT_CARD', 6.66, NaN, 'N', None)
         expected_calls = [call(query, values)]
         actual_calls = self_mock._conn.execute.call_args_list
         self.assertEqual(str(expected_calls), str(actual_calls))
 
 
+class TestDataBaseInterfacePendingTransactions(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        user_settings = MagicMock()
+        user_settings.conn = self.conn
+        user_settings.commit = True
+        self.db_interface = DataBaseInterface(user_settings)
+        self.db_interface.insert_df_into_pending_transactions_table(self.pending_df(["A1", "A2"], "Chase"), "Chase")
+        self.db_interface.insert_df_into_pending_transactions_table(self.pending_df(["B1"], "Amex"), "Amex")
+
+    def pending_df(self, transaction_ids, account_alias):
+        return pd.DataFrame({
+            "Transaction ID": transaction_ids,
+            "Account Alias": [account_alias] * len(transaction_ids),
+            "Details": ["DEBIT"] * len(transaction_ids),
+            "Posting Date": ["02/01/2024"] * len(transaction_ids),
+            "Description": [f"STORE {transaction_id}" for transaction_id in transaction_ids],
+            "Amount": [-10.0] * len(transaction_ids),
+            "Type": ["DEBIT_CARD"] * len(transaction_ids),
+            "Balance": [" "] * len(transaction_ids),
+            "Check or Slip #": [NaN] * len(transaction_ids),
+        })
+
+    def pending(self):
+        query = "SELECT ID, Account_Alias, Transaction_ID FROM pending_transactions ORDER BY ID;"
+        return self.conn.execute(query).fetchall()
+
+    def test_insert_df_into_pending_transactions_table_diffs_account(self):
+        self.db_interface.insert_df_into_pending_transactions_table(self.pending_df(["A2", "A3"], "Chase"), "Chase")
+
+        # A1 is gone, A2 is kept as is, A3 is new and Amex's pending rows are untouched
+        self.assertEqual(self.pending(), [(2, "Chase", "A2"), (3, "Amex", "B1"), (4, "Chase", "A3")])
+
+    def test_insert_df_into_pending_transactions_table_deletes_settled(self):
+        query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Description, Amount) VALUES(?, ?, ?, ?);"""
+        self.conn.executemany(query, [
+            ("Chase", "2024-02-03", "STORE A1", -10.0),
+            ("Chase", "2024-03-01", "STORE A2", -10.0),
+            ("Chase", "2024-02-02", "STORE B1", -10.0),
+        ])
+
+        self.db_interface.insert_df_into_pending_transactions_table(self.pending_df(["A1", "A2"], "Chase"), "Chase")
+
+        # A1 settled two days later, A2's match is too late and B1's match is in another account
+        self.assertEqual(self.pending(), [(2, "Chase", "A2"), (3, "Amex", "B1")])
+
+    def test_insert_df_into_pending_transactions_table_within_window(self):
+        self.db_interface.insert_df_into_pending_transactions_table(self.pending_df([], "Chase"), "Chase",
+                                                                    since="2024-03-01")
+        self.assertEqual(len(self.pending()), 3)  # A1 and A2 were posted before the window
+
+        self.db_interface.insert_df_into_pending_transactions_table(self.pending_df([], "Chase"), "Chase",
+                                                                    since="2024-02-01", until="2024-02-01")
+        self.assertEqual(self.pending(), [(3, "Amex", "B1")])
+
+
 class TestCSVHandlerHappyPathChaseCSV(TestCase):
 
     @classmethod
@@ -289,15 +394,15 @@ class TestCSVHandlerHappyPathChaseCSV(TestCase):
         _add_required_columns_to_df_mock.called_once_with(pandas_mock.read_csv.return_value)
         self.assertEqual(result, self_mock._add_required_columns_to_df.return_value)
 
-    @patch('src.controller.hashlib')
-    def test__add_required_columns_to_df(self, hashlib_mock):
-        hashlib_mock.sha256.return_value.hexdigest.return_value = "DEF234"
+    @patch('src.controller.transaction_fingerprint')
+    def test__add_required_columns_to_df(self, transaction_fingerprint_mock):
+        transaction_fingerprint_mock.return_value = b"DEF234"
         self_mock = MagicMock()
         self_mock._account_alias = "Chase Bank"
         df = self.unprocessed_df
 
         result = CSVHandler._add_required_columns_to_df(self_mock, df)
-        expected_df = self.processed_df
+        expected_df = self.processed_df.assign(**{"Transaction ID": [b"DEF234"]})
         assert_frame_equal(result.sort_index(axis=1), expected_df.sort_index(axis=1))
 
 
@@ -617,4 +722,26 @@ class TesatCSVHandlerBadConfigGeneralSectionMissingKey(TestCase):
         with self.assertRaises(ConfigSectionIncompleteError) as context:
             CSVHandler._convert_dataframe_to_chase_format(self_mock, df)
 
-        self.assertTrue('Troubleshooting help' in str(context.exception))
\ No newline at end of file
+        self.assertTrue('Troubleshooting help' in str(context.exception))
+
+class TestTrendParserController(TestCase):
+
+    @patch('src.controller.print_dataframe_table')
+    def test_start_process(self, print_dataframe_table_mock):
+        self_mock = MagicMock()
+        self_mock._user_settings.rows = 0
+        self_mock._user_settings.save_results = False
+        rolling = pd.DataFrame(data={"Daily": [1.0]}, index=pd.to_datetime(["2024-01-01"]))
+        windows, monthly, growth = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        self_mock._trend_engine.analyze.return_value = {
+            "windows": windows, "monthly": monthly, "growth": growth, "rolling": rolling
+        }
+
+        TrendParserController.start_process(self_mock)
+
+        expected_calls = [
+            call("trend windows", windows, header=True),
+            call("trend monthly", monthly, header=True),
+            call("trend growth", growth, header=True),
+        ]
+        self.assertEqual(print_dataframe_table_mock.call_args_list, expected_calls)
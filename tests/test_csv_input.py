@@ -0,0 +1,113 @@
+import io
+import os
+import gzip
+import zipfile
+import tempfile
+import importlib.util
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+import pandas as pd
+
+from src.csv_input import CSVChunkReader
+from src.csv_input import read_csv_input
+from src.csv_input import strip_compression_suffix
+
+CSV_TEXT = "Description,Amount\nGROCER,-12.50\nCOFFEE BAR,-4.00\n"
+CHASE_CSV_TEXT = (
+    "Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n"
+    "DEBIT,08/03/2024,\"GROCER, INC\",-12.50,DEBIT_CARD,980.00,,\n"
+    "DEBIT,08/02/2024,\"BOOKSHOP\",-9.00,DEBIT_CARD, ,,\n"
+    "CHECK,08/01/2024,\"CHECK 123\",-9,CHECK,,123,\n"
+)
+CHASE_NAMES = ["Details", "Posting Date", "Description", "Amount", "Type", "Balance", "Check or Slip #", "Extra 1"]
+
+
+class TestReadCsvInput(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_csv_input_gzip(self):
+        path = os.path.join(self.directory.name, "activity.csv.gz")
+        with gzip.open(path, "wt") as gzip_file:
+            gzip_file.write(CSV_TEXT)
+
+        df = read_csv_input(path)
+
+        self.assertEqual(df["Description"].tolist(), ["GROCER", "COFFEE BAR"])
+
+    def test_read_csv_input_zip(self):
+        path = os.path.join(self.directory.name, "activity.zip")
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("2024-07.csv", CSV_TEXT)
+            zip_file.writestr("2024-08.csv", "Description,Amount\nBOOKSHOP,-20.00\n")
+
+        df = read_csv_input(path)
+
+        self.assertEqual(df["Description"].tolist(), ["GROCER", "COFFEE BAR", "BOOKSHOP"])
+
+    def test_read_csv_input_stdin(self):
+        stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(gzip.compress(CSV_TEXT.encode()))))
+
+        with patch("sys.stdin", stdin):
+            df = read_csv_input("-")
+
+        self.assertEqual(df["Amount"].tolist(), [-12.5, -4.0])
+
+    def test_csv_chunk_reader(self):
+        path = os.path.join(self.directory.name, "activity.zip")
+        with zipfile.ZipFile(path, "w") as zip_file:
+            zip_file.writestr("2024-07.csv", CSV_TEXT + "BAKERY,-3.00\n")
+            zip_file.writestr("2024-08.csv", "Description,Amount\nBOOKSHOP,-20.00\n")
+
+        with CSVChunkReader(path, text_columns=["Description"]) as reader:
+            chunks = [reader.read(2), reader.read(2), reader.read(5), reader.read(5)]
+
+        self.assertEqual([chunk["Description"].tolist() for chunk in chunks[:3]],
+                         [["GROCER", "COFFEE BAR"], ["BAKERY"], ["BOOKSHOP"]])
+        self.assertIsNone(chunks[3])
+
+    def test_strip_compression_suffix(self):
+        self.assertEqual(strip_compression_suffix("downloads/activity.csv.GZ"), "downloads/activity.csv")
+        self.assertEqual(strip_compression_suffix("activity.csv"), "activity.csv")
+
+
+@skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+class TestReadCsvInputEngines(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "activity.csv")
+        with open(self.path, "w") as f:
+            f.write(CHASE_CSV_TEXT)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_engines_read_the_same_dataframe(self):
+        dfs = [read_csv_input(self.path, names=CHASE_NAMES, text_columns=["Balance"], engine=engine)
+               for engine in ("pandas", "pyarrow")]
+
+        pd.testing.assert_frame_equal(dfs[0], dfs[1])
+        self.assertEqual(dfs[1]["Balance"].tolist(), ["980.00", " ", ""])
+        self.assertEqual(dfs[1]["Description"].tolist(), ["GROCER, INC", "BOOKSHOP", "CHECK 123"])
+
+    def test_engines_read_the_same_numbered_columns(self):
+        dfs = [read_csv_input(self.path, skip_rows=1, header=False, engine=engine) for engine in ("pandas", "pyarrow")]
+
+        pd.testing.assert_frame_equal(dfs[0], dfs[1])
+        self.assertEqual(list(dfs[1].columns), list(range(8)))
+
+    def test_auto_engine_falls_back_to_pandas(self):
+        with open(self.path, "a") as f:
+            f.write("DEBIT,07/31/2024,\"PHARMACY\",-20.00,DEBIT_CARD,989.00\n")
+
+        df = read_csv_input(self.path, names=CHASE_NAMES, text_columns=["Balance"])
+
+        self.assertEqual(df["Description"].tolist()[-1], "PHARMACY")
+        with self.assertRaises(ValueError):
+            read_csv_input(self.path, names=CHASE_NAMES, text_columns=["Balance"], engine="pyarrow")
@@ -0,0 +1,140 @@
+import os
+import sqlite3
+import zipfile
+import tempfile
+from unittest import TestCase
+import xml.etree.ElementTree as ElementTree
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.dashboard import column_letter
+from src.dashboard import add_date_style
+from src.dashboard import read_signatures
+from src.dashboard import write_signatures
+from src.dashboard import DashboardWorkbook
+from src.dashboard import DASHBOARD_SHEETS
+from src.dashboard import NEW_WORKBOOK_PARTS
+from src.dashboard import MAIN_NS
+from src.dashboard import RELATIONSHIPS_NS
+
+DASHBOARD_SHEET_XML = (f'<worksheet xmlns="{MAIN_NS}"><sheetData><row r="1"><c r="A1"><f>SUM(Transactions!E:E)</f>'
+                       '<v>0</v></c></row></sheetData></worksheet>')
+
+
+def read_sheet(path, sheet_name):
+    """Read the cells of a sheet written by DashboardWorkbook as {reference: value}."""
+    with zipfile.ZipFile(path) as workbook:
+        rels = {rel.get("Id"): rel.get("Target") for rel in ElementTree.fromstring(workbook.read("xl/_rels/workbook.xml.rels"))}
+        for sheet in ElementTree.fromstring(workbook.read("xl/workbook.xml")).iter(f"{{{MAIN_NS}}}sheet"):
+            if sheet.get("name") == sheet_name:
+                part = "xl/" + rels[sheet.get(f"{{{RELATIONSHIPS_NS}}}id")]
+                root = ElementTree.fromstring(workbook.read(part))
+                return {cell.get("r"): "".join(cell.itertext()) for cell in root.iter(f"{{{MAIN_NS}}}c")}
+    return None
+
+
+class TestDashboardFunctions(TestCase):
+
+    def test_column_letter(self):
+        self.assertEqual([column_letter(idx) for idx in (0, 25, 26, 701, 702)], ["A", "Z", "AA", "ZZ", "AAA"])
+
+    def test_add_date_style(self):
+        date_style, styles_xml = add_date_style(NEW_WORKBOOK_PARTS["xl/styles.xml"])
+
+        self.assertEqual(date_style, 1)
+        self.assertIn('<cellXfs count="2">', styles_xml)
+        self.assertEqual(add_date_style(styles_xml), (1, styles_xml))
+
+    def test_write_signatures_keeps_other_properties(self):
+        custom_xml = write_signatures(None, {"Transactions": "abc"})
+        custom_xml = custom_xml.replace(
+            "</Properties>", '<property fmtid="{D5CDD505-2E9C-101B-9397-08002B2CF9AE}" pid="9" name="Owner">'
+                             '<vt:lpwstr>me</vt:lpwstr></property></Properties>')
+
+        custom_xml = write_signatures(custom_xml, {"Transactions": "def", "Pending": "ghi"})
+
+        self.assertEqual(read_signatures(custom_xml), {"Transactions": "def", "Pending": "ghi"})
+        self.assertIn('pid="2" name="Owner"', custom_xml)
+        ElementTree.fromstring(custom_xml)
+
+
+class TestDashboardWorkbook(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "Dashboard.xlsx")
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        query = """INSERT INTO bank_activity (Transaction_ID, Account_Alias, Posting_Date, Description, Amount, Balance, Category) VALUES(?, 'Chase', ?, ?, ?, ?, ?);"""
+        self.conn.executemany(query, [
+            ("T1", "2024-07-30", "GROCER", -40.0, "960.00", "Groceries"),
+            ("T2", "2024-08-02", "PAYROLL", 1000.0, "1960.00", None),
+            ("T3", "2024-08-03", "CAFÉ <& BAR>", -5.0, " ", None),
+        ])
+        self.conn.commit()
+        self.workbook = DashboardWorkbook(self.path)
+
+    def tearDown(self):
+        self.conn.close()
+        self.directory.cleanup()
+
+    def get_statuses(self, df):
+        return dict(zip(df["Sheet"], df["Status"]))
+
+    def test_export_creates_workbook(self):
+        df = self.workbook.export(self.conn)
+
+        self.assertEqual(df["Sheet"].tolist(), list(DASHBOARD_SHEETS))
+        self.assertEqual(df["Rows"].tolist()[:3], [3, 2, 2])
+        cells = read_sheet(self.path, "Transactions")
+        self.assertEqual(cells["A1"], "Posting Date")
+        self.assertEqual(cells["A2"], "45507")  # 2024-08-03 as an Excel date
+        self.assertEqual(cells["C2"], "CAFÉ <& BAR>")
+        self.assertNotIn("F2", cells)  # Blank balance
+        self.assertEqual(cells["F3"], "1960.0")
+
+    def test_export_only_rewrites_changed_sheets(self):
+        self.workbook.export(self.conn)
+        self.assertEqual(set(self.get_statuses(self.workbook.export(self.conn)).values()), {"unchanged"})
+
+        self.conn.execute("""INSERT INTO pending_transactions (Account_Alias, Posting_Date, Description, Amount) VALUES('Chase', '2024-08-04', 'BOOKSTORE', -9.0);""")
+        statuses = self.get_statuses(self.workbook.export(self.conn))
+
+        self.assertEqual(statuses["Pending"], "written")
+        self.assertEqual(statuses["Transactions"], "unchanged")
+        self.assertEqual(read_sheet(self.path, "Pending")["C2"], "BOOKSTORE")
+        self.assertEqual(set(self.get_statuses(self.workbook.export(self.conn, rebuild=True)).values()), {"written"})
+
+    def test_export_keeps_other_sheets(self):
+        parts = dict(NEW_WORKBOOK_PARTS)
+        parts["[Content_Types].xml"] = parts["[Content_Types].xml"].replace("</Types>", (
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/calcChain.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.calcChain+xml"/></Types>'))
+        parts["xl/workbook.xml"] = parts["xl/workbook.xml"].replace(
+            "<sheets></sheets>", '<sheets><sheet name="Dashboard" sheetId="1" r:id="rId2"/></sheets>'
+                                 '<calcPr calcId="191029"/>')
+        parts["xl/_rels/workbook.xml.rels"] = parts["xl/_rels/workbook.xml.rels"].replace("</Relationships>", (
+            f'<Relationship Id="rId2" Type="{RELATIONSHIPS_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId3" Type="{RELATIONSHIPS_NS}/calcChain" Target="calcChain.xml"/></Relationships>'))
+        parts["xl/worksheets/sheet1.xml"] = DASHBOARD_SHEET_XML
+        parts["xl/calcChain.xml"] = f'<calcChain xmlns="{MAIN_NS}"><c r="A1" i="1"/></calcChain>'
+        with zipfile.ZipFile(self.path, "w") as workbook:
+            for name, content in parts.items():
+                workbook.writestr(name, content)
+
+        self.workbook.export(self.conn)
+
+        with zipfile.ZipFile(self.path) as workbook:
+            self.assertEqual(workbook.read("xl/worksheets/sheet1.xml").decode(), DASHBOARD_SHEET_XML)
+            self.assertNotIn("xl/calcChain.xml", workbook.namelist())
+            self.assertNotIn("calcChain", workbook.read("xl/_rels/workbook.xml.rels").decode())
+            workbook_xml = workbook.read("xl/workbook.xml").decode()
+            self.assertIn('<calcPr calcId="191029" fullCalcOnLoad="1"/>', workbook_xml)
+            for name in workbook.namelist():
+                ElementTree.fromstring(workbook.read(name))
+        sheets = [sheet.get("name") for sheet in ElementTree.fromstring(workbook_xml).iter(f"{{{MAIN_NS}}}sheet")]
+        self.assertEqual(sheets, ["Dashboard"] + list(DASHBOARD_SHEETS))
+        self.assertEqual(read_sheet(self.path, "Monthly Totals")["C2"], "1000.0")
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+from unittest import TestCase
+
+import pandas
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.dedup import BloomFilter
+from src.dedup import TransactionIdIndex
+from src.dedup import find_near_duplicates
+from src.dedup import transaction_ids_in
+
+
+class TestBloomFilter(TestCase):
+
+    def test_might_contain(self):
+        added = [os.urandom(16) for _ in range(5000)]
+        others = [os.urandom(16) for _ in range(5000)]
+        bloom_filter = BloomFilter.with_capacity(len(added))
+
+        bloom_filter.add(added)
+
+        self.assertTrue(bloom_filter.might_contain(added).all())
+        self.assertLess(bloom_filter.might_contain(others).mean(), 0.03)
+        self.assertEqual(bloom_filter.items, 5000)
+
+
+class TestTransactionIdIndex(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        self.insert([b"A" * 16, b"B" * 16, "DEF234"])
+
+    def insert(self, transaction_ids):
+        self.conn.executemany("INSERT INTO bank_activity (Transaction_ID) VALUES(?);",
+                              [(transaction_id,) for transaction_id in transaction_ids])
+        self.conn.commit()
+
+    def test_find_existing(self):
+        index = TransactionIdIndex(self.conn)
+
+        self.assertEqual(index.find_existing([b"A" * 16, b"C" * 16, "DEF234"]), {b"A" * 16, "DEF234"})
+
+    def test_find_existing_after_save(self):
+        TransactionIdIndex(self.conn).save()
+        self.conn.commit()
+        self.insert([b"C" * 16])
+
+        index = TransactionIdIndex(self.conn)
+
+        self.assertEqual(index.find_existing([b"B" * 16, b"C" * 16, b"D" * 16]), {b"B" * 16, b"C" * 16})
+
+
+class TestTransactionIdsIn(TestCase):
+
+    def test_transaction_ids_in(self):
+        transaction_ids = pandas.Series([b"\x02AB\x00", b"\x02AB", b"\x02CD"])
+
+        result = transaction_ids_in(transaction_ids, {b"\x02AB\x00", b"\x02CD"})
+
+        self.assertEqual(result.tolist(), [True, False, True])
+
+
+class TestFindNearDuplicates(TestCase):
+
+    def test_find_near_duplicates(self):
+        columns = ["Transaction ID", "Account Alias", "Posting Date", "Amount", "Description"]
+        stored_df = pandas.DataFrame([
+            [b"1", "Chase", "2024-02-01", -7.77, "SPAM BAR HAM"],
+            [b"2", "Chase", "2024-02-03", -4.0, "COFFEE BAR"],
+            [b"3", "Other", "2024-02-03", -12.5, "GROCER #12"],
+        ], columns=columns)
+        new_df = pandas.DataFrame([
+            ["A", "Chase", "02/02/2024", -7.77, "SPAM BAR HAM #2"],   # Re-export posted a day later
+            ["B", "Chase", "02/03/2024", -4.0, "COFFEE BAR"],         # Same as stored
+            ["C", "Chase", "02/03/2024", -4.0, "COFFEE BAR"],         # Second coffee that day
+            ["D", "Chase", "02/10/2024", -7.77, "SPAM BAR HAM"],      # Too late
+            ["E", "Chase", "02/03/2024", -12.5, "GROCER #12"],        # Other account
+        ], columns=columns)
+
+        result = find_near_duplicates(new_df, stored_df)
+
+        self.assertEqual(result["Transaction ID"].tolist(), ["A", "B"])
+        self.assertEqual(result["Stored Description"].tolist(), ["SPAM BAR HAM", "COFFEE BAR"])
@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from src.fingerprint import normalize_text
+from src.fingerprint import normalize_date
+from src.fingerprint import normalize_money
+from src.fingerprint import transaction_fingerprint
+from src.fingerprint import FINGERPRINT_VERSION
+from src.fingerprint import TRANSACTION_ID_SIZE
+
+
+class TestFingerprint(TestCase):
+
+    def test_normalize(self):
+        self.assertEqual(normalize_text("  Spam\tbar  HAM "), "SPAM BAR HAM")
+        self.assertEqual(normalize_text(float("nan")), "")
+        self.assertEqual(normalize_text(1234.0), "1234")
+        self.assertEqual(normalize_date("2/01/2024"), "2024-02-01")
+        self.assertEqual(normalize_date("2024-02-01"), "2024-02-01")
+        self.assertEqual(normalize_money("1,234.5"), "1234.50")
+        self.assertEqual(normalize_money(-7.7), "-7.70")
+        self.assertEqual(normalize_money(" "), "")
+
+    def test_transaction_fingerprint(self):
+        fields = ["DEBIT", "02/01/2024", "SPAM BAR", -7.77, "DEBIT_CARD", "6.66", "", "Chase"]
+
+        transaction_id = transaction_fingerprint(*fields)
+
+        self.assertEqual(len(transaction_id), TRANSACTION_ID_SIZE)
+        self.assertEqual(transaction_id[0], FINGERPRINT_VERSION)
+        # Same transaction, formatted differently
+        self.assertEqual(transaction_fingerprint("DEBIT", "2024-02-01", "Spam  Bar", "-7.770", "DEBIT_CARD",
+                                                 "6.660", None, "Chase"), transaction_id)
+        # Field boundaries are part of the fingerprint
+        self.assertNotEqual(transaction_fingerprint("DEBIT", "02/01/2024", "SPAM BAR", -7.77, "DEBIT_CARD",
+                                                    "6.66", "1", "Chase"),
+                            transaction_fingerprint("DEBIT", "02/01/2024", "SPAM BAR", -7.77, "DEBIT_CARD",
+                                                    "6.66", "", "1Chase"))
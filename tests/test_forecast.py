@@ -0,0 +1,234 @@
+import sqlite3
+from configparser import ConfigParser
+from datetime import date
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy
+import pandas as pd
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import create_pending_transactions_table
+from src.interface_funcs import upgrade_db
+from src.interface_funcs import ConfigSectionIncompleteError
+from src.forecast import load_scheduled_items
+from src.forecast import load_budgets
+from src.forecast import load_balance_overrides
+from src.forecast import recurring_items
+from src.forecast import scheduled_occurrences
+from src.forecast import ForecastEngine
+from src.forecast import simulate_chunk
+from src.forecast import weekday
+
+
+def sleeping_chunk(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def forecast_config(text):
+    config = ConfigParser()
+    config.optionxform = str
+    config.read_string(text)
+    return config
+
+
+class TestForecastConfig(TestCase):
+
+    def test_load_scheduled_items(self):
+        config = forecast_config(
+            "[SCHEDULE rent]\naccount_alias = Chase\namount = -1500\nstart = 2024-01-31\nfrequency = Monthly\n"
+            "[BUDGET groceries]\naccount_alias = Chase\namount = 300\n"
+        )
+
+        items = load_scheduled_items(config)
+
+        self.assertEqual(items["Name"].tolist(), ["rent"])
+        self.assertEqual(items["Amount"].tolist(), [-1500.0])
+        self.assertEqual(items["Unit"].tolist(), ["M"])
+        self.assertEqual(items["Step"].tolist(), [1])
+
+    def test_load_scheduled_items_bad_frequency(self):
+        config = forecast_config(
+            "[SCHEDULE rent]\naccount_alias = Chase\namount = -1500\nstart = 2024-01-31\nfrequency = FOO\n"
+        )
+
+        with self.assertRaises(ConfigSectionIncompleteError) as context:
+            load_scheduled_items(config)
+
+        self.assertTrue('Troubleshooting help' in str(context.exception))
+
+    def test_load_budgets(self):
+        config = forecast_config("[BUDGET groceries]\naccount_alias = Chase\namount = -300\npattern = %MART%\n")
+
+        budgets = load_budgets(config)
+
+        self.assertEqual(budgets["Amount"].tolist(), [300.0])
+        self.assertEqual(budgets["Pattern"].tolist(), ["%MART%"])
+
+    def test_load_balance_overrides(self):
+        config = forecast_config("[BALANCES]\nMy Savings = 100.5\n")
+
+        self.assertEqual(load_balance_overrides(config), {"My Savings": 100.5})
+        self.assertEqual(load_balance_overrides(forecast_config("")), {})
+
+    def test_recurring_items(self):
+        recurring = pd.DataFrame({
+            "Account Alias": ["Chase", "Chase"],
+            "Description": ["NETFLIX", "OLD GYM"],
+            "Period": ["monthly", "weekly"],
+            "Average Amount": [-15.99, -10.0],
+            "Last Date": ["2024-01-15", "2023-06-01"],
+            "Next Date": ["2024-02-15", "2023-06-08"],
+        })
+
+        items = recurring_items(recurring, date(2024, 2, 1))
+
+        self.assertEqual(items["Name"].tolist(), ["NETFLIX"])
+        occurrences = scheduled_occurrences(items, numpy.datetime64("2024-02-01"), 30)
+        self.assertEqual(occurrences["Day"].tolist(), [14])
+        self.assertEqual(occurrences["Amount"].tolist(), [-15.99])
+
+
+class TestScheduledOccurrences(TestCase):
+
+    def test_scheduled_occurrences(self):
+        config = forecast_config(
+            "[SCHEDULE rent]\naccount_alias = Chase\namount = -1000\nstart = 2023-10-31\nfrequency = monthly\n"
+            "[SCHEDULE pay]\naccount_alias = Chase\namount = 500\nstart = 2024-01-05\nfrequency = biweekly\n"
+            "end = 2024-02-10\n"
+            "[SCHEDULE gift]\naccount_alias = Savings\namount = 50\nstart = 2024-02-01\nfrequency = once\n"
+            "[SCHEDULE old]\naccount_alias = Savings\namount = 50\nstart = 2023-02-01\nfrequency = once\n"
+        )
+        items = load_scheduled_items(config)
+
+        occurrences = scheduled_occurrences(items, numpy.datetime64("2024-01-10"), 60)
+
+        occurrences = occurrences.sort_values(["Day", "Amount"]).reset_index(drop=True)
+        start = numpy.datetime64("2024-01-10")
+        dates = [str(start + day) for day in occurrences["Day"]]
+        self.assertEqual(dates, ["2024-01-19", "2024-01-31", "2024-02-01", "2024-02-02", "2024-02-29"])
+        self.assertEqual(occurrences["Amount"].tolist(), [500.0, -1000.0, 50.0, 500.0, -1000.0])
+
+
+class TestForecastEngine(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        create_pending_transactions_table(self.conn)
+        upgrade_db(self.conn)
+        query = """INSERT INTO bank_activity (ID, Account_Alias, Posting_Date, Description, Amount, Balance) VALUES(?, ?, ?, ?, ?, ?);"""
+        self.conn.executemany(query, [
+            (1, "Chase", "2024-01-02", "SPAM MART", -20.0, "980.00"),
+            (2, "Chase", "2024-01-02", "SPAM MART", -10.0, "1000.00"),
+            (3, "Chase", "2024-01-01", "PAYROLL", 1000.0, "1010.00"),
+            (4, "Savings", "2024-01-01", "TRANSFER", 100.0, " "),
+        ])
+        query = """INSERT INTO pending_transactions (Account_Alias, Posting_Date, Description, Amount) VALUES(?, ?, ?, ?);"""
+        self.conn.execute(query, ("Chase", "2024-01-03", "FOO BAR", -80.0))
+        self.engine = ForecastEngine(self.conn)
+
+    def test_get_current_balances(self):
+        self.assertEqual(self.engine.get_current_balances(), {"Chase": 900.0})
+        self.assertEqual(self.engine.get_current_balances({"Savings": 50.0}), {"Chase": 900.0, "Savings": 50.0})
+
+    def test_project(self):
+        config = forecast_config(
+            "[SCHEDULE rent]\naccount_alias = Chase\namount = -500\nstart = 2024-01-05\nfrequency = monthly\n"
+            "[BUDGET groceries]\naccount_alias = Chase\namount = 130\npattern = %MART\n"
+        )
+
+        df = self.engine.project(load_scheduled_items(config), load_budgets(config),
+                                 start=date(2024, 1, 3), days=4)
+
+        # 100 of the 130 budget is left, spread over the 29 remaining days of January
+        daily_budget = 100 / 29
+        self.assertEqual(df["Date"].tolist(), ["2024-01-03", "2024-01-04", "2024-01-05", "2024-01-06"])
+        expected = [round(900 - daily_budget * day - (500 if day >= 3 else 0), 2) for day in range(1, 5)]
+        self.assertEqual(df["Chase"].tolist(), expected)
+        self.assertEqual(df["Total"].tolist(), expected)
+
+
+class TestSimulation(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        create_pending_transactions_table(self.conn)
+        upgrade_db(self.conn)
+        query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Description, Amount, Balance) VALUES(?, ?, ?, ?, ?);"""
+        # Two grocery runs every Monday for the last 8 weeks
+        rows = [("Chase", str(numpy.datetime64("2024-01-01") - 7 * week), "SPAM MART", amount, " ")
+                for week in range(1, 9) for amount in (-10.0, -30.0)]
+        rows.append(("Chase", "2024-01-01", "PAYROLL", 1000.0, "1000.00"))
+        self.conn.executemany(query, rows)
+        self.engine = ForecastEngine(self.conn)
+        self.config = forecast_config(
+            "[SCHEDULE rent]\naccount_alias = Chase\namount = -500\nstart = 2024-01-05\nfrequency = monthly\n"
+            "[BUDGET groceries]\naccount_alias = Chase\namount = 130\npattern = %MART\n"
+        )
+        self.items = load_scheduled_items(self.config)
+        self.budgets = load_budgets(self.config)
+
+    def test_weekday(self):
+        self.assertEqual(weekday(numpy.array(["2024-01-01", "2024-01-07"], dtype="datetime64[D]")).tolist(), [0, 6])
+
+    def test_fit_budget_distributions(self):
+        rates, amounts = self.engine.fit_budget_distributions(self.budgets, date(2024, 1, 1), 7, lookback_days=56)
+
+        # 16 transactions over the 8 Mondays of the lookback period
+        self.assertEqual(rates.tolist(), [[2.0, 0, 0, 0, 0, 0, 0]])
+        self.assertEqual(sorted(set(amounts[0].tolist())), [10.0, 30.0])
+
+    def test_fit_budget_distributions_without_history(self):
+        budgets = load_budgets(forecast_config("[BUDGET fun]\naccount_alias = Chase\namount = 365\npattern = FOO\n"))
+
+        rates, amounts = self.engine.fit_budget_distributions(budgets, date(2024, 1, 1), 3)
+
+        self.assertEqual(rates.tolist(), [[1.0, 1.0, 1.0]])
+        self.assertEqual(amounts[0].tolist(), [12.0])
+
+    def test_simulate_chunk(self):
+        seed = numpy.random.SeedSequence(1)
+        baseline = numpy.array([[100.0, 100.0, 100.0]])
+
+        totals, minimums = simulate_chunk(seed, 4, numpy.array([[1.0, 0.0, 2.0]]), [numpy.array([5.0])],
+                                          numpy.array([0]), baseline)
+
+        self.assertEqual(totals.shape, (4, 3))
+        self.assertEqual(minimums.shape, (4, 1))
+        self.assertTrue((totals[:, 0] == totals[:, 1]).all())
+        self.assertTrue(((100.0 - totals) % 5.0 == 0).all())
+
+    def test_simulate(self):
+        results = self.engine.simulate(self.items, self.budgets, start=date(2024, 1, 1), days=14,
+                                       paths=1200, seed=42, threshold=480.0, lookback_days=56)
+
+        self.assertEqual(results["paths"], 1200)
+        self.assertEqual(results["seed"], 42)
+        bands = results["bands"]
+        self.assertEqual(len(bands), 14)
+        self.assertTrue((bands["P5"] <= bands["P50"]).all() and (bands["P50"] <= bands["P95"]).all())
+        # Only Mondays have grocery spending: two runs of 20 on average
+        self.assertAlmostEqual(bands["Mean"].iloc[0], 960.0, delta=5.0)
+        self.assertEqual(bands["P(Below 480)"].iloc[3], 0.0)
+        self.assertEqual(results["accounts"]["Account Alias"].tolist(), ["Chase", "Total"])
+
+    @patch("src.forecast.simulate_chunk", sleeping_chunk)
+    def test_run_chunks_stops_at_time_limit(self):
+        start = time.monotonic()
+
+        results = self.engine._run_chunks([(0.2, "first"), (5, "second"), (5, "third")], 2, 0.01)
+
+        self.assertEqual(results, ["first"])
+        self.assertLess(time.monotonic() - start, 3)
+
+    def test_simulate_is_reproducible_across_workers(self):
+        kwargs = dict(start=date(2024, 1, 1), days=10, paths=1000, seed=7, lookback_days=56)
+
+        inline = self.engine.simulate(self.items, self.budgets, workers=1, **kwargs)
+        pooled = self.engine.simulate(self.items, self.budgets, workers=2, **kwargs)
+
+        self.assertTrue(inline["bands"].equals(pooled["bands"]))
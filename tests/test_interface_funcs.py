@@ -2,12 +2,24 @@ from unittest import TestCase, skip
 from unittest.mock import MagicMock
 from unittest.mock import patch
 from unittest.mock import call
+import sqlite3
 from sqlite3 import OperationalError
+from argparse import ArgumentTypeError
 
 from src.interface_funcs import db_connection
 from src.interface_funcs import pathlib_path
 from src.interface_funcs import create_bank_activity_table
 from src.interface_funcs import check_bank_activity_table_exists
+from src.interface_funcs import upgrade_db
+from src.interface_funcs import convert_transaction_ids
+from src.interface_funcs import create_pending_transactions_table
+from src.interface_funcs import create_kash_metadata_table
+from src.interface_funcs import update_transaction_fingerprints
+from src.fingerprint import transaction_fingerprint
+from src.interface_funcs import iso_date
+from src.interface_funcs import memory_size
+from src.interface_funcs import query_parameter
+from src.interface_funcs import get_query_parameter_names
 from src.interface_funcs import WrongFileExtension
 from src.interface_funcs import SQLOperationalError
 
@@ -129,4 +141,80 @@ class TestInterfaceFuncs(TestCase):
         filepath = "path/to/file.csv"
 
         with self.assertRaises(FileNotFoundError) as context:
-            pathlib_path(filepath)
\ No newline at end of file
+            pathlib_path(filepath)
+    def test_upgrade_db(self):
+        conn_mock = MagicMock()
+
+        upgrade_db(conn_mock)
+
+        self.assertIn("idx_bank_activity_posting_date_account", conn_mock.execute.call_args_list[0][0][0])
+        conn_mock.commit.assert_called_once()
+
+    def test_upgrade_db_keeps_insertion_order_of_narrow_queries(self):
+        conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(conn)
+        conn.execute("CREATE INDEX idx_bank_activity_posting_date ON bank_activity(Posting_Date, Account_Alias, Amount, Description);")
+        conn.executemany("INSERT INTO bank_activity (Posting_Date, Description, Amount) VALUES(?, ?, ?);",
+                         [("2024-08-03", "A", -1.0), ("2024-08-02", "B", -2.0), ("2024-08-01", "C", -3.0)])
+
+        upgrade_db(conn)
+
+        rows = conn.execute("SELECT ID, Description FROM bank_activity;").fetchall()
+        self.assertEqual(rows, [(1, "A"), (2, "B"), (3, "C")])
+        rows = conn.execute("SELECT Posting_Date, Amount FROM bank_activity;").fetchall()
+        self.assertEqual(rows, [("2024-08-03", -1.0), ("2024-08-02", -2.0), ("2024-08-01", -3.0)])
+
+    def test_convert_transaction_ids(self):
+        conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(conn)
+        hex_id = "ab" * 32
+        create_pending_transactions_table(conn)
+        create_kash_metadata_table(conn)
+        conn.executemany("INSERT INTO bank_activity (Transaction_ID) VALUES(?);", [(hex_id,), ("DEF234",)])
+
+        self.assertEqual(convert_transaction_ids(conn), 1)
+
+        records = conn.execute("SELECT Transaction_ID FROM bank_activity ORDER BY ID;").fetchall()
+        self.assertEqual(records, [(b"\xab" * 16,), ("DEF234",)])
+        self.assertEqual(convert_transaction_ids(conn), 0)
+
+    def test_update_transaction_fingerprints(self):
+        conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(conn)
+        conn.execute("""INSERT INTO bank_activity (Account_Alias, Transaction_ID, Details, Posting_Date, Description,
+                        Amount, Type, Balance, Check_or_Slip_num) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?);""",
+                     ("Chase", b"\xab" * 16, "DEBIT", "2024-02-01", "SPAM  BAR", -7.7, "DEBIT_CARD", "6.66", None))
+        upgrade_db(conn)
+
+        record = conn.execute("SELECT Transaction_ID FROM bank_activity;").fetchone()
+        # Same ID as the row of a CSV file
+        self.assertEqual(record[0], transaction_fingerprint("DEBIT", "2/01/2024", "Spam Bar", "-7.70", "DEBIT_CARD",
+                                                            "6.660", float("nan"), "Chase"))
+        self.assertEqual(update_transaction_fingerprints(conn), 0)
+
+    def test_iso_date(self):
+        self.assertEqual(iso_date("2024-04-16"), "2024-04-16")
+
+        with self.assertRaises(ArgumentTypeError):
+            iso_date("04/16/2024")
+
+    def test_memory_size(self):
+        self.assertEqual(memory_size("512M"), 512 * 2 ** 20)
+        self.assertEqual(memory_size("1.5gb"), 3 * 2 ** 29)
+        self.assertEqual(memory_size("4096"), 4096)
+
+        with self.assertRaises(ArgumentTypeError):
+            memory_size("lots")
+
+    def test_query_parameter(self):
+        self.assertEqual(query_parameter("acct=Chase"), ("acct", "Chase"))
+        self.assertEqual(query_parameter(":memo=a=b"), ("memo", "a=b"))
+
+        with self.assertRaises(ArgumentTypeError):
+            query_parameter("Chase")
+
+    def test_get_query_parameter_names(self):
+        query = """SELECT * FROM bank_activity WHERE Posting_Date BETWEEN :since AND :until AND Account_Alias = @acct
+            AND Description <> 'AT 12:30 :not' -- AND Amount > :nope
+            AND "a:b" = $x;"""
+        self.assertEqual(get_query_parameter_names(query), {"since", "until", "acct", "x"})
@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import tempfile
+import warnings
+import configparser
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from src.controller import DataBaseInterface
+from src.interface_funcs import ConfigSectionIncompleteError, create_bank_activity_table, upgrade_db
+from src.manifest import ManifestRun, load_manifest
+
+HEADER = "Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n"
+JULY_CSV_TEXT = (
+    HEADER +
+    "DEBIT,07/30/2024,\"GROCER\",-12.50,DEBIT_CARD,980.00,\n"
+    "DEBIT,07/29/2024,\"COFFEE BAR\",-4.00,DEBIT_CARD,992.50,\n"
+)
+AUGUST_CSV_TEXT = (
+    HEADER +
+    "DEBIT,08/02/2024,\"BOOKSTORE\",-9.00,DEBIT_CARD, ,\n"
+    "DEBIT,08/01/2024,\"PHARMACY\",-20.00,DEBIT_CARD,960.00,\n"
+    "DEBIT,07/30/2024,\"GROCER\",-12.50,DEBIT_CARD,980.00,\n"
+)
+
+
+class TestLoadManifest(TestCase):
+
+    def test_load_manifest(self):
+        config = configparser.ConfigParser()
+        config.read_string("[Chase]\npaths =\n    chase/*.csv\n    chase_old.csv\naccount_alias = Checking\n"
+                           "[Card]\npaths = card.csv\naccount_alias = Card\nconversion_config = card.ini\n"
+                           "skip_near_duplicates = yes\n")
+
+        sources = load_manifest(config, "downloads")
+
+        self.assertEqual([source.account_alias for source in sources], ["Checking", "Card"])
+        self.assertEqual(sources[0].patterns, [os.path.join("downloads", "chase/*.csv"),
+                                               os.path.join("downloads", "chase_old.csv")])
+        self.assertFalse(sources[0].skip_near_duplicates)
+        self.assertEqual(sources[1].conversion_config, os.path.join("downloads", "card.ini"))
+        self.assertTrue(sources[1].skip_near_duplicates)
+
+    def test_load_manifest_missing_paths(self):
+        config = configparser.ConfigParser()
+        config.read_string("[Chase]\naccount_alias = Checking\n")
+
+        with self.assertRaises(ConfigSectionIncompleteError):
+            load_manifest(config)
+
+
+class TestManifestRun(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for filename, text, modified in (("chase_07.csv", JULY_CSV_TEXT, 1000),
+                                         ("chase_08.csv", AUGUST_CSV_TEXT, 2000)):
+            path = os.path.join(self.directory.name, filename)
+            with open(path, "w") as f:
+                f.write(text)
+            os.utime(path, (modified, modified))
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        user_settings = MagicMock()
+        user_settings.conn = self.conn
+        user_settings.commit = True
+        self.db_interface = DataBaseInterface(user_settings)
+        config = configparser.ConfigParser()
+        config.read_string("[Chase]\npaths = chase_*.csv\naccount_alias = Checking\n")
+        self.sources = load_manifest(config, self.directory.name)
+
+    def tearDown(self):
+        self.conn.close()
+        self.directory.cleanup()
+
+    def test_run_imports_overlapping_files_once(self):
+        summary_df, new_transactions_df = ManifestRun(self.db_interface, self.conn, self.sources,
+                                                      commit=True, jobs=1).run()
+
+        self.assertEqual(summary_df["File"].tolist(), ["chase_07.csv", "chase_08.csv"])
+        self.assertEqual(summary_df["Rows"].tolist(), [2, 3])
+        self.assertEqual(summary_df["New"].tolist(), [2, 1])
+        self.assertEqual(summary_df["Pending"].tolist(), [0, 1])
+        self.assertEqual(sorted(new_transactions_df["Description"]), ["COFFEE BAR", "GROCER", "PHARMACY"])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM bank_activity;").fetchone()[0], 3)
+        pending = self.conn.execute("SELECT Description FROM pending_transactions;").fetchall()
+        self.assertEqual(pending, [("BOOKSTORE",)])
+
+        summary_df, _ = ManifestRun(self.db_interface, self.conn, self.sources, commit=True, jobs=1).run()
+
+        self.assertEqual(summary_df["New"].tolist(), [0, 0])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM bank_activity;").fetchone()[0], 3)
+
+    def test_run_concatenates_only_found_near_duplicates(self):
+        query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Description, Amount) VALUES('Checking', '2024-08-02', 'PHARMACY', -20.0);"""
+        self.conn.execute(query)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FutureWarning)
+            summary_df, _ = ManifestRun(self.db_interface, self.conn, self.sources, commit=True, jobs=1).run()
+
+        self.assertEqual(summary_df["Possible Duplicates"].tolist(), [0, 1])
+
+    def test_run_without_commit_writes_nothing(self):
+        _, new_transactions_df = ManifestRun(self.db_interface, self.conn, self.sources, jobs=1).run()
+
+        self.assertEqual(len(new_transactions_df.index), 3)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM bank_activity;").fetchone()[0], 0)
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import argparse
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.controller import ImportParserController
+from src.interface_funcs import create_bank_activity_table, create_pending_transactions_table, upgrade_db
+from src.memory_budget import MemoryBudget, MIN_CHUNK_ROWS
+
+
+class TestMemoryBudget(TestCase):
+
+    @patch("src.memory_budget.get_current_memory", return_value=2 * 2 ** 20)
+    @patch("src.memory_budget.tracemalloc")
+    def test_chunk_rows_from_first_chunk(self, tracemalloc_mock, _):
+        tracemalloc_mock.is_tracing.side_effect = [False, True]
+        tracemalloc_mock.get_traced_memory.return_value = (0, 1000 * 512)
+        memory_budget = MemoryBudget(10 * 2 ** 20)
+
+        memory_budget.start_chunk()
+        memory_budget.end_chunk(1000)
+
+        self.assertEqual(memory_budget.bytes_per_row, 512)
+        self.assertEqual(memory_budget.chunk_rows, 8 * 2 ** 20 // 2 // 512)
+        tracemalloc_mock.stop.assert_called_once()
+
+    @patch("src.memory_budget.get_current_memory", return_value=2 ** 30)
+    @patch("src.memory_budget.tracemalloc")
+    def test_chunk_rows_when_budget_is_used_up(self, tracemalloc_mock, _):
+        tracemalloc_mock.is_tracing.side_effect = [False, True]
+        tracemalloc_mock.get_traced_memory.return_value = (0, 1000 * 512)
+        memory_budget = MemoryBudget(2 ** 20)
+
+        memory_budget.start_chunk()
+        memory_budget.end_chunk(1000)
+
+        self.assertEqual(memory_budget.chunk_rows, MIN_CHUNK_ROWS)
+
+    @patch("src.memory_budget.reset_peak_memory")
+    @patch("src.memory_budget.get_peak_memory", side_effect=[300, 500, 200])
+    def test_stage_keeps_highest_peak(self, *_):
+        memory_budget = MemoryBudget(400)
+
+        for name in ("parse", "parse", "write"):
+            with memory_budget.stage(name):
+                pass
+
+        self.assertEqual(memory_budget.peaks, {"parse": 500, "write": 200})
+        self.assertTrue(memory_budget.is_exceeded())
+
+
+class TestImportWithinMemoryBudget(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_file = os.path.join(self.directory.name, "activity.csv")
+        with open(self.csv_file, "w") as f:
+            f.write("Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n")
+            f.write("DEBIT,08/05/2024,\"BOOKSHOP\",-9.00,DEBIT_CARD, ,\n")
+            for day in range(250):
+                f.write(f"DEBIT,{1 + day % 12:02d}/{1 + day % 28:02d}/2023,\"STORE {day}\",-{day}.25,DEBIT_CARD,{day}.50,\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def import_csv_file(self, max_memory):
+        conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(conn)
+        create_pending_transactions_table(conn)
+        upgrade_db(conn)
+        cli_args = argparse.Namespace(sqlite_db=conn, csv_file=self.csv_file, account_alias="Chase", commit=True,
+                                      max_memory=max_memory)
+        with patch("builtins.print"):
+            ImportParserController(cli_args).start_process()
+        return conn
+
+    @patch("src.memory_budget.SAMPLE_ROWS", 50)
+    def test_import_in_chunks_matches_import_at_once(self):
+        conn = self.import_csv_file(max_memory=None)
+        chunked_conn = self.import_csv_file(max_memory=1)
+
+        query = "SELECT Transaction_ID, Posting_Date, Description, Amount, Balance FROM bank_activity ORDER BY 1;"
+        self.assertEqual(len(chunked_conn.execute(query).fetchall()), 250)
+        self.assertEqual(chunked_conn.execute(query).fetchall(), conn.execute(query).fetchall())
+        self.assertEqual(chunked_conn.execute("SELECT Description FROM pending_transactions;").fetchall(),
+                         [("BOOKSHOP",)])
@@ -0,0 +1,86 @@
+import sqlite3
+from unittest import TestCase
+
+import pandas as pd
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.interface_funcs import get_metadata
+from src.merchants import merchant_key
+from src.merchants import normalize_descriptions
+from src.merchants import MerchantIndex
+from src.merchants import LAST_ID_METADATA_KEY
+
+
+def insert_bank_activity(conn, descriptions):
+    query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Description, Amount) VALUES(?, ?, ?, ?);"""
+    conn.executemany(query, [("Chase", "2024-01-01", description, -10.0) for description in descriptions])
+    conn.commit()
+
+
+class TestMerchantFunctions(TestCase):
+
+    def test_merchant_key(self):
+        self.assertEqual(merchant_key("SQ *BLUE BOTTLE 1234"), "BLUE BOTTLE")
+        self.assertEqual(merchant_key("TST* Joe's Pizza"), "JOE S PIZZA")
+        self.assertEqual(merchant_key("12345"), "")
+
+    def test_normalize_descriptions(self):
+        descriptions = pd.Series(["Netflix.com 4/16 #1039", "NETFLIX.COM 05/16/24 #1040",
+                                  "7-11 #5486792135 PURCHASE   1/24/2024", None], index=[3, 4, 5, 6])
+
+        result = normalize_descriptions(descriptions)
+
+        self.assertEqual(result.tolist(), ["NETFLIX COM", "NETFLIX COM", "7 11 PURCHASE", ""])
+        self.assertEqual(result.index.tolist(), [3, 4, 5, 6])
+
+
+class TestMerchantIndex(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        self.merchant_index = MerchantIndex(self.conn)
+
+    def merchants(self):
+        query = """SELECT b.Description, m.Merchant_Key FROM bank_activity b LEFT JOIN merchants m ON m.ID = b.Merchant_ID ORDER BY b.ID;"""
+        return self.conn.execute(query).fetchall()
+
+    def test_update(self):
+        insert_bank_activity(self.conn, ["NETFLIX.COM #1039", "NETFLIX.COM #1040", "ACME 1234"])
+
+        self.assertEqual(self.merchant_index.update(), 3)
+
+        insert_bank_activity(self.conn, ["NETFLIX.COM #1039", "NETFLIX.COM #1041"])
+
+        # Only the description never seen before is normalized
+        self.assertEqual(self.merchant_index.update(), 1)
+        self.assertEqual(self.merchant_index.update(), 0)
+        self.assertEqual(self.merchants(), [
+            ("NETFLIX.COM #1039", "NETFLIX COM"),
+            ("NETFLIX.COM #1040", "NETFLIX COM"),
+            ("ACME 1234", "ACME"),
+            ("NETFLIX.COM #1039", "NETFLIX COM"),
+            ("NETFLIX.COM #1041", "NETFLIX COM"),
+        ])
+        self.assertEqual(int(get_metadata(self.conn, LAST_ID_METADATA_KEY)), 5)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM merchants;").fetchone()[0], 2)
+
+    def test_rebuild_keeps_merchant_ids(self):
+        insert_bank_activity(self.conn, ["ACME 1234", "NETFLIX.COM #1039"])
+        self.merchant_index.update()
+        ids = self.conn.execute("SELECT Merchant_ID FROM bank_activity ORDER BY ID;").fetchall()
+        self.conn.execute("UPDATE merchant_descriptions SET Merchant_ID = NULL;")
+
+        self.merchant_index.rebuild()
+
+        self.assertEqual(self.conn.execute("SELECT Merchant_ID FROM bank_activity ORDER BY ID;").fetchall(), ids)
+
+    def test_get_merchants(self):
+        insert_bank_activity(self.conn, ["NETFLIX.COM #1039", "NETFLIX.COM #1040", "ACME 1234"])
+        self.merchant_index.update()
+
+        merchants = self.merchant_index.get_merchants(top=1)
+
+        self.assertEqual(merchants[["Merchant", "Transactions", "Total"]].values.tolist(), [["NETFLIX COM", 2, -20.0]])
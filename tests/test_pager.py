@@ -0,0 +1,96 @@
+import sqlite3
+from unittest import TestCase
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import BadQueryStructureError
+from src.pager import parse_key_value
+from src.pager import KeysetPager
+
+QUERY = """SELECT ID, Posting_Date, Description, Amount FROM bank_activity ORDER BY Amount;"""
+
+
+class TestPagerFunctions(TestCase):
+
+    def test_parse_key_value(self):
+        self.assertEqual([parse_key_value(value) for value in ("12", "-4.5", "2024-08-01")], [12, -4.5, "2024-08-01"])
+
+
+class TestKeysetPager(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        query = """INSERT INTO bank_activity (Transaction_ID, Account_Alias, Posting_Date, Description, Amount) VALUES(?, 'Chase', ?, ?, ?);"""
+        self.conn.executemany(query, [
+            ("T1", "2024-08-03", "A", -1.0),
+            ("T2", "2024-08-01", "B", -2.0),
+            ("T3", "2024-08-02", "C", -3.0),
+            ("T4", "2024-08-01", "D", -4.0),
+            ("T5", None, "E", -5.0),
+        ])
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_pages_by_id(self):
+        pager = KeysetPager(self.conn, QUERY, 2)
+
+        self.assertEqual(pager.first()["ID"].tolist(), [1, 2])
+        self.assertEqual(pager.next()["ID"].tolist(), [3, 4])
+        self.assertEqual((pager.page_number, pager.first_row, pager.is_last_page), (2, 3, False))
+        self.assertEqual(pager.next()["ID"].tolist(), [5])
+        self.assertTrue(pager.is_last_page)
+        self.assertEqual(pager.next()["ID"].tolist(), [5])
+        self.assertEqual(pager.previous()["ID"].tolist(), [3, 4])
+        self.assertEqual(pager.previous()["ID"].tolist(), [1, 2])
+        self.assertEqual(pager.previous()["ID"].tolist(), [1, 2])
+
+    def test_pages_by_key_break_ties_by_id(self):
+        pager = KeysetPager(self.conn, QUERY, 2, key="posting_date")
+
+        self.assertEqual(pager.first()["ID"].tolist(), [2, 4])
+        self.assertEqual(pager.next()["ID"].tolist(), [3, 1])
+        self.assertTrue(pager.is_last_page)  # The row without a date is left out
+
+    def test_pages_descending(self):
+        pager = KeysetPager(self.conn, QUERY, 3, key="Posting_Date", descending=True)
+
+        self.assertEqual(pager.first()["ID"].tolist(), [1, 3, 4])
+        self.assertEqual(pager.next()["ID"].tolist(), [2])
+
+    def test_jump(self):
+        pager = KeysetPager(self.conn, QUERY, 2, key="Posting_Date")
+
+        self.assertEqual(pager.jump("2024-08-02")["ID"].tolist(), [3, 1])
+        self.assertIsNone(pager.page_number)
+        self.assertTrue(pager.jump("2024-09-01").empty)
+
+    def test_jump_then_previous(self):
+        pager = KeysetPager(self.conn, QUERY, 1, key="Posting_Date")
+
+        self.assertEqual(pager.jump("2024-08-03")["ID"].tolist(), [1])
+        self.assertEqual(pager.previous()["ID"].tolist(), [3])
+        self.assertIsNone(pager.page_number)
+        self.assertFalse(pager.is_last_page)
+        self.assertEqual(pager.previous()["ID"].tolist(), [4])
+        self.assertEqual(pager.previous()["ID"].tolist(), [2])
+        self.assertEqual(pager.page_number, 1)
+        self.assertTrue(pager.jump("2024-09-01").empty)
+        self.assertEqual(pager.previous()["ID"].tolist(), [1])
+
+    def test_query_parameters(self):
+        query = """SELECT ID, Posting_Date FROM bank_activity WHERE Posting_Date BETWEEN :since AND :until"""
+        pager = KeysetPager(self.conn, query, 1, key="Posting_Date",
+                            parameters={"since": "2024-08-01", "until": "2024-08-02"})
+
+        self.assertEqual(pager.first()["ID"].tolist(), [2])
+        self.assertEqual(pager.next()["ID"].tolist(), [4])
+        self.assertEqual(pager.next()["ID"].tolist(), [3])
+        self.assertTrue(pager.is_last_page)
+
+    def test_query_without_key_column(self):
+        with self.assertRaises(BadQueryStructureError):
+            KeysetPager(self.conn, "SELECT Description FROM bank_activity", 2)
+        with self.assertRaises(BadQueryStructureError):
+            KeysetPager(self.conn, QUERY, 2, key="Category")
@@ -0,0 +1,124 @@
+import sqlite3
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.reconcile import parse_balances
+from src.reconcile import check_balance_chain
+from src.reconcile import order_within_days
+from src.reconcile import BalanceReconciler
+
+
+def chain(rows):
+    return pd.DataFrame.from_records(rows, columns=["ID", "Posting Date", "Amount", "Balance"])
+
+
+class TestReconcileFunctions(TestCase):
+
+    def test_parse_balances(self):
+        result = parse_balances(pd.Series(["1,234.56", " ", "", None, "-7.5", "$10"]))
+
+        np.testing.assert_array_equal(result.to_numpy(), [1234.56, np.nan, np.nan, np.nan, -7.5, 10.0])
+
+    def test_check_balance_chain(self):
+        rows = chain([
+            (1, "2024-01-01", -10.0, 90.0),
+            (2, "2024-01-02", -0.1, np.nan),
+            (3, "2024-01-03", -0.2, 89.7),
+            (4, "2024-01-05", -5.0, 80.0),
+            (5, "2024-01-06", 20.0, 100.0),
+            (6, "2024-01-07", -1.0, np.nan),
+        ])
+
+        statuses, gaps = check_balance_chain(rows, ("2023-12-31", 100.0))
+
+        self.assertEqual(statuses.tolist(), ["Y", "Y", "Y", "G", "Y", "N"])
+        self.assertEqual(gaps.values.tolist(), [[4, "2024-01-03", "2024-01-05", 84.7, 80.0, -4.7]])
+
+    def test_check_balance_chain_without_anchor(self):
+        rows = chain([(1, "2024-01-01", -10.0, 90.0), (2, "2024-01-02", -5.0, 85.0)])
+
+        statuses, gaps = check_balance_chain(rows)
+
+        self.assertEqual(statuses.tolist(), ["Y", "Y"])
+        self.assertTrue(gaps.empty)
+
+
+    def test_order_within_days(self):
+        # Two imports of the same day: 3 and 1 from the first file, 4 and 2 from the second one
+        rows = chain([
+            (1, "2024-01-02", -5.0, 93.0),
+            (2, "2024-01-02", 3.0, 99.0),
+            (3, "2024-01-02", -2.0, 98.0),
+            (4, "2024-01-02", 3.0, 96.0),
+            (5, "2024-01-01", 100.0, 100.0),
+            (6, "2024-01-03", -1.0, np.nan),
+            (7, "2024-01-03", -1.0, np.nan),
+        ])
+
+        self.assertEqual(order_within_days(rows)["ID"].tolist(), [5, 3, 1, 4, 2, 7, 6])
+
+
+class TestBalanceReconciler(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        self.reconciler = BalanceReconciler(self.conn)
+
+    def insert(self, rows):
+        query = """INSERT INTO bank_activity (ID, Account_Alias, Posting_Date, Amount, Balance, Reconciled) VALUES(?, ?, ?, ?, ?, 'N');"""
+        self.conn.executemany(query, rows)
+        self.conn.commit()
+
+    def reconciled(self):
+        return self.conn.execute("SELECT ID, Reconciled FROM bank_activity ORDER BY ID;").fetchall()
+
+    def test_update(self):
+        # Newest first within a day, like a Chase CSV file
+        self.insert([
+            (1, "Chase", "2024-01-02", -5.0, "85.00"),
+            (2, "Chase", "2024-01-02", -10.0, "90.00"),
+            (3, "Chase", "2024-01-01", 100.0, "100.00"),
+            (4, "Amex", "2024-01-01", -1.0, "5.00"),
+        ])
+
+        self.assertEqual(self.reconciler.update(), 4)
+        self.assertEqual(self.reconciled(), [(1, "Y"), (2, "Y"), (3, "Y"), (4, "Y")])
+
+        # A later import missing a transaction
+        self.insert([(5, "Chase", "2024-01-04", -1.0, "80.00"), (6, "Chase", "2024-01-03", -1.0, "84.00")])
+
+        self.assertEqual(self.reconciler.update(["Chase"]), 2)
+        self.assertEqual(self.reconciled()[4:], [(5, "G"), (6, "Y")])
+        gaps = self.reconciler.get_gaps()
+        self.assertEqual(gaps.values.tolist(), [["Chase", "2024-01-03", "2024-01-04", 83.0, 80.0, -3.0]])
+
+        # Importing the missing transaction closes the gap
+        self.insert([(7, "Chase", "2024-01-04", -3.0, "81.00")])
+        self.reconciler.update()
+
+        self.assertEqual(self.reconciled()[4:], [(5, "Y"), (6, "Y"), (7, "Y")])
+        self.assertTrue(self.reconciler.get_gaps().empty)
+
+    def test_update_with_overlapping_imports(self):
+        self.insert([(1, "Chase", "2024-01-15", -5.25, "994.75"), (2, "Chase", "2024-01-10", 1000.0, "1,000.00")])
+        self.reconciler.update()
+        # A later file of the same day, whose first row was already imported
+        self.insert([(3, "Chase", "2024-01-15", -10.0, "984.75")])
+
+        self.assertEqual(self.reconciler.update(), 1)
+        self.assertEqual(self.reconciled(), [(1, "Y"), (2, "Y"), (3, "Y")])
+        self.assertTrue(self.reconciler.get_gaps().empty)
+
+    def test_get_summary(self):
+        self.insert([(1, "Chase", "2024-01-01", -5.0, "95.00"), (2, "Chase", "2024-01-02", -5.0, " ")])
+        self.reconciler.rebuild()
+
+        summary = self.reconciler.get_summary()
+
+        self.assertEqual(summary.values.tolist(), [["Chase", 2, 1, 0, 1]])
@@ -0,0 +1,111 @@
+import sqlite3
+from datetime import date, timedelta
+from unittest import TestCase
+
+import pandas as pd
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.interface_funcs import get_metadata
+from src.recurring import amount_bands
+from src.recurring import RecurringDetector
+from src.recurring import LAST_ID_METADATA_KEY
+
+
+def insert_bank_activity(conn, rows):
+    query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Description, Amount) VALUES(?, ?, ?, ?);"""
+    conn.executemany(query, rows)
+    conn.commit()
+
+
+def every(start, days, count, account_alias, description, amount):
+    return [(account_alias, str(start + timedelta(days=days * n)), description, amount) for n in range(count)]
+
+
+class TestRecurringFunctions(TestCase):
+
+    def test_amount_bands(self):
+        bands = amount_bands(pd.Series([-15.99, -16.49, 15.99, -40.0, 0.0]))
+
+        self.assertEqual(bands[0], bands[1])
+        self.assertEqual(bands[0], -bands[2])
+        self.assertNotEqual(bands[0], bands[3])
+        self.assertEqual(bands[4], 0)
+
+
+class TestRecurringDetector(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        self.detector = RecurringDetector(self.conn)
+
+    def recurring(self):
+        df = self.detector.get_recurring_transactions()
+        return sorted(zip(df["Account Alias"], df["Period"], df["Average Amount"]))
+
+    def test_update_detects_periods(self):
+        insert_bank_activity(self.conn,
+            every(date(2024, 1, 1), 7, 6, "Chase", "GYM #1234", -10.0)
+            + every(date(2024, 1, 5), 14, 4, "Chase", "ACME PAYROLL", 2000.0)
+            + [("Chase", str(date(2024, 1, 15) + timedelta(days=30 * n + n % 2)), f"NETFLIX.COM {n}/15", -15.99)
+               for n in range(4)]
+            + every(date(2020, 3, 1), 365, 3, "Savings", "ANNUAL FEE", -95.0)
+            + [("Chase", "2024-01-09", "SPAM BAR HAM", -7.77), ("Chase", "2024-03-01", "SPAM BAR HAM", -7.77)])
+
+        processed = self.detector.update()
+
+        self.assertEqual(processed, 19)
+        self.assertEqual(self.recurring(), [
+            ("Chase", "biweekly", 2000.0),
+            ("Chase", "monthly", -15.99),
+            ("Chase", "weekly", -10.0),
+            ("Savings", "yearly", -95.0),
+        ])
+        self.assertEqual(get_metadata(self.conn, LAST_ID_METADATA_KEY), 19)
+
+    def test_update_is_incremental(self):
+        rows = every(date(2024, 1, 1), 7, 6, "Chase", "GYM #1234", -10.0)
+        insert_bank_activity(self.conn, rows[:3])
+        self.detector.update()
+        self.assertEqual(self.recurring(), [])
+
+        insert_bank_activity(self.conn, rows[3:])
+        processed = self.detector.update()
+
+        self.assertEqual(processed, 3)
+        self.assertEqual(self.recurring(), [("Chase", "weekly", -10.0)])
+        record = self.conn.execute("SELECT Occurrences, Interval_Count, First_Date, Last_Date, Next_Date FROM recurring_transactions;").fetchone()
+        self.assertEqual(record, (6, 5, "2024-01-01", "2024-02-05", "2024-02-12"))
+
+    def test_update_with_row_on_last_date(self):
+        insert_bank_activity(self.conn, every(date(2024, 1, 1), 7, 6, "Chase", "GYM #1234", -10.0))
+        self.detector.update()
+
+        insert_bank_activity(self.conn, [("Chase", "2024-02-05", "GYM #1234", -10.0)])
+        self.detector.update()
+
+        record = self.conn.execute("SELECT Occurrences, Interval_Count, Interval_Sum, Last_Date FROM recurring_transactions;").fetchone()
+        self.assertEqual(record, (6, 5, 35.0, "2024-02-05"))
+
+    def test_update_rebuilds_accounts_with_older_rows(self):
+        rows = every(date(2024, 1, 1), 7, 6, "Chase", "GYM #1234", -10.0)
+        insert_bank_activity(self.conn, rows[3:])
+        self.detector.update()
+
+        insert_bank_activity(self.conn, rows[:3])
+        self.detector.update()
+
+        record = self.conn.execute("SELECT Occurrences, Interval_Count, Interval_Sum, First_Date FROM recurring_transactions;").fetchone()
+        self.assertEqual(record, (6, 5, 35.0, "2024-01-01"))
+        self.assertEqual(self.recurring(), [("Chase", "weekly", -10.0)])
+
+    def test_rebuild(self):
+        insert_bank_activity(self.conn, every(date(2024, 1, 1), 7, 6, "Chase", "GYM #1234", -10.0))
+        self.detector.update()
+        self.conn.execute("UPDATE recurring_transactions SET Period = NULL;")
+
+        self.assertEqual(self.detector.rebuild(), 1)
+
+        self.assertEqual(self.recurring(), [("Chase", "weekly", -10.0)])
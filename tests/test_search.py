@@ -0,0 +1,79 @@
+import sqlite3
+from unittest import TestCase
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.interface_funcs import BadQueryStructureError
+from src.search import build_match_query
+from src.search import TransactionSearch
+
+
+def insert_bank_activity(conn, rows):
+    query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Description, Details, Amount) VALUES(?, ?, ?, ?, ?);"""
+    conn.executemany(query, rows)
+    conn.commit()
+
+
+class TestSearchFunctions(TestCase):
+
+    def test_build_match_query(self):
+        self.assertEqual(build_match_query(["coffee", "shop"]), '"coffee" "shop"')
+        self.assertEqual(build_match_query(["star"], prefix=True), '"star"*')
+        self.assertEqual(build_match_query(["coffee shop"], phrase=True), '"coffee shop"')
+        self.assertEqual(build_match_query(['AND"']), '"AND"""')
+
+    def test_build_match_query_without_terms(self):
+        with self.assertRaises(BadQueryStructureError):
+            build_match_query([" "])
+
+
+class TestTransactionSearch(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        insert_bank_activity(self.conn, [
+            ("Chase", "2024-01-02", "STARBUCKS STORE 1234", "DEBIT", -5.25),
+        ])
+        # Rows imported before the index existed are indexed when it's created
+        upgrade_db(self.conn)
+        insert_bank_activity(self.conn, [
+            ("Chase", "2024-02-03", "BLUE BOTTLE COFFEE", "DEBIT", -6.0),
+            ("Amex", "2024-03-04", "COFFEE SHOP BLUE", "DEBIT", -4.5),
+            ("Chase", "2024-03-05", "ACME PAYROLL", "ACH_CREDIT", 2000.0),
+        ])
+        self.search = TransactionSearch(self.conn)
+
+    def descriptions(self, *args, **kwargs):
+        return sorted(self.search.search(*args, **kwargs)["Description"])
+
+    def test_search(self):
+        self.assertTrue(self.search.has_fts)
+        self.assertEqual(self.descriptions(["coffee"]), ["BLUE BOTTLE COFFEE", "COFFEE SHOP BLUE"])
+        self.assertEqual(self.descriptions(["starbucks"]), ["STARBUCKS STORE 1234"])
+        self.assertEqual(self.descriptions(["ach_credit"]), ["ACME PAYROLL"])
+
+    def test_search_prefix_and_phrase(self):
+        self.assertEqual(self.descriptions(["star"]), [])
+        self.assertEqual(self.descriptions(["star"], prefix=True), ["STARBUCKS STORE 1234"])
+        self.assertEqual(self.descriptions(["blue", "coffee"]), ["BLUE BOTTLE COFFEE", "COFFEE SHOP BLUE"])
+        self.assertEqual(self.descriptions(["coffee", "shop"], phrase=True), ["COFFEE SHOP BLUE"])
+        self.assertEqual(self.descriptions(["payroll OR starbucks"], raw=True),
+                         ["ACME PAYROLL", "STARBUCKS STORE 1234"])
+
+    def test_search_filters(self):
+        self.assertEqual(self.descriptions(["coffee"], since="2024-03-01"), ["COFFEE SHOP BLUE"])
+        self.assertEqual(self.descriptions(["coffee"], until="2024-03-01"), ["BLUE BOTTLE COFFEE"])
+        self.assertEqual(self.descriptions(["coffee"], account_aliases=["Amex"]), ["COFFEE SHOP BLUE"])
+        self.assertEqual(len(self.search.search(["coffee"], limit=1)), 1)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.conn.execute("UPDATE bank_activity SET Description = 'PEET''S COFFEE' WHERE Description = 'ACME PAYROLL';")
+        self.conn.execute("DELETE FROM bank_activity WHERE Description = 'BLUE BOTTLE COFFEE';")
+
+        self.assertEqual(self.descriptions(["coffee"]), ["COFFEE SHOP BLUE", "PEET'S COFFEE"])
+        self.assertEqual(self.descriptions(["payroll"]), [])
+
+    def test_search_invalid_raw_query(self):
+        with self.assertRaises(BadQueryStructureError):
+            self.search.search(["coffee OR"], raw=True)
@@ -0,0 +1,84 @@
+import sqlite3
+import argparse
+from unittest import TestCase
+
+import numpy
+
+from src.interface_funcs import create_bank_activity_table
+from src.interface_funcs import upgrade_db
+from src.trend import parse_windows
+from src.trend import TrendEngine
+
+
+def insert_bank_activity(conn, rows):
+    query = """INSERT INTO bank_activity (Account_Alias, Posting_Date, Description, Amount) VALUES(?, ?, ?, ?);"""
+    conn.executemany(query, rows)
+
+
+class TestParseWindows(TestCase):
+    def test_parse_windows(self):
+        self.assertEqual(parse_windows("30, 7,90,7"), [7, 30, 90])
+
+    def test_parse_windows_bad_value(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_windows("7,FOO")
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_windows("0")
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_windows(",")
+
+
+class TestTrendEngine(TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_bank_activity_table(self.conn)
+        upgrade_db(self.conn)
+        insert_bank_activity(self.conn, [
+            ("Chase", "2024-01-01", "SPAM BAR HAM", -10.0),
+            ("Chase", "2024-01-02", "SPAM BAR HAM", -20.0),
+            ("Chase", "2024-01-02", "PAYROLL", 1000.0),
+            ("Chase", "2024-02-01", "FOO BAR BAZ", -5.0),
+            ("Savings", "2024-02-02", "FOO BAR BAZ", -7.0),
+        ])
+        self.engine = TrendEngine(self.conn, [2])
+
+    def test_load_daily_spending(self):
+        daily = self.engine.load_daily_spending("2023-12-31", "2024-01-03")
+
+        self.assertEqual(daily.tolist(), [0.0, 10.0, 20.0, 0.0])
+
+    def test_load_daily_spending_account_filter(self):
+        daily = self.engine.load_daily_spending("2024-02-01", "2024-02-02", ["Savings"])
+
+        self.assertEqual(daily.tolist(), [0.0, 7.0])
+
+    def test_analyze(self):
+        results = self.engine.analyze(since="2024-01-01", until="2024-02-02")
+
+        rolling = results["rolling"]
+        self.assertEqual(rolling.loc["2024-01-02", "2d Total"], 30.0)
+        self.assertEqual(rolling.loc["2024-01-02", "2d Average"], 15.0)
+
+        windows = results["windows"]
+        self.assertEqual(windows["Total"].tolist(), [12.0])
+        self.assertEqual(windows["Previous Total"].tolist(), [0.0])
+
+        monthly = results["monthly"]
+        self.assertEqual(monthly["Month"].tolist(), ["2024-01", "2024-02"])
+        self.assertEqual(monthly["Total"].tolist(), [30.0, 12.0])
+        self.assertEqual(monthly["Delta"].tolist()[1], -18.0)
+        self.assertEqual(monthly["Delta %"].tolist()[1], -60.0)
+
+        growth = results["growth"]
+        self.assertEqual(growth["Description"].tolist(), ["FOO BAR BAZ"])
+        self.assertEqual(growth["Current"].tolist(), [12.0])
+        self.assertTrue(numpy.isnan(growth["Change %"].iloc[0]))
+
+    def test_analyze_empty_database(self):
+        self.conn.execute("DELETE FROM bank_activity;")
+
+        results = self.engine.analyze(since="2024-01-01", until="2024-01-31")
+
+        self.assertEqual(results["windows"]["Total"].tolist(), [0.0])
+        self.assertTrue(results["growth"].empty)
@@ -0,0 +1,85 @@
+import os
+import time
+import tempfile
+import configparser
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.api import KashDatabase
+from src.interface_funcs import ConfigSectionIncompleteError
+from src.watch import FolderWatcher
+from src.watch import load_watch_routes
+
+CSV_TEXT = (
+    "Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n"
+    "DEBIT,08/03/2024,\"GROCER\",-12.50,DEBIT_CARD,980.00,\n"
+    "DEBIT,08/02/2024,\"COFFEE BAR\",-4.00,DEBIT_CARD,992.50,\n"
+)
+
+
+class TestLoadWatchRoutes(TestCase):
+
+    def test_load_watch_routes(self):
+        config = configparser.ConfigParser()
+        config.read_string("[Chase]\npattern = Chase*.csv\naccount_alias = Checking\n"
+                           "[Other]\npattern = *.csv\naccount_alias = Card\nconversion_config = card.ini\n")
+
+        routes = load_watch_routes(config, "configs")
+
+        self.assertEqual([route.account_alias for route in routes], ["Checking", "Card"])
+        self.assertTrue(routes[0].matches("chase_0801.CSV"))
+        self.assertIsNone(routes[0].conversion_config)
+        self.assertEqual(routes[1].conversion_config, os.path.join("configs", "card.ini"))
+
+    def test_load_watch_routes_missing_account_alias(self):
+        config = configparser.ConfigParser()
+        config.read_string("[Chase]\npattern = Chase*.csv\n")
+
+        with self.assertRaises(ConfigSectionIncompleteError):
+            load_watch_routes(config)
+
+
+class TestFolderWatcher(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.downloads = os.path.join(self.directory.name, "downloads")
+        os.mkdir(self.downloads)
+        with patch("builtins.print"):
+            self.kash_db = KashDatabase(os.path.join(self.directory.name, "test.db"))
+        config = configparser.ConfigParser()
+        config.read_string("[Chase]\npattern = chase*.csv\naccount_alias = Checking\n")
+        self.routes = load_watch_routes(config)
+        self.now = time.time()
+
+    def tearDown(self):
+        self.kash_db.close()
+        self.directory.cleanup()
+
+    def write(self, filename, age):
+        path = os.path.join(self.downloads, filename)
+        with open(path, "w") as csv_file:
+            csv_file.write(CSV_TEXT)
+        os.utime(path, (self.now - age, self.now - age))
+
+    def test_poll(self):
+        self.write("chase_old.csv", age=60)
+        self.write("chase_new.csv.crdownload", age=60)
+        self.write("chase_writing.csv", age=0)
+        watcher = FolderWatcher(self.kash_db, self.downloads, self.routes, clock=lambda: self.now)
+
+        imported = watcher.poll()
+
+        self.assertEqual([(filename, len(df)) for filename, _, df in imported], [("chase_old.csv", 2)])
+        # The file being written is imported once it settles, and only once
+        self.now += 10
+        self.assertEqual([filename for filename, _, _ in watcher.poll()], ["chase_writing.csv"])
+        self.assertEqual(watcher.poll(), [])
+
+    def test_poll_after_restart(self):
+        self.write("chase_old.csv", age=60)
+        FolderWatcher(self.kash_db, self.downloads, self.routes, clock=lambda: self.now).poll()
+
+        watcher = FolderWatcher(self.kash_db, self.downloads, self.routes, clock=lambda: self.now)
+
+        self.assertEqual(watcher.poll(), [])